@@ -13,7 +13,7 @@ from services_search import semantic_search_nodes
 from services_graphrag import semantic_search_communities, retrieve_graphrag_context
 from services_graph import get_evidence_subgraph
 from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context
-from cache_utils import get_cached, set_cached
+from cache_utils import cached
 from typing import List, Optional
 from auth import require_auth
 from fastapi.responses import StreamingResponse
@@ -463,10 +463,11 @@ async def chat_stream_endpoint(
             ]
             
             # Add tools to the completion call
-            stream = model_router.completion(
+            # Async stream: waiting for tokens does not block the event loop, and a client
+            # disconnect (generator cancelled) closes the upstream request.
+            stream = model_router.astream_completion(
                 task_type=TASK_CHAT_FAST,
                 messages=messages,
-                stream=True,
                 tools=GRAPH_TOOLS,
                 tool_choice="auto"
             )
@@ -476,7 +477,9 @@ async def chat_stream_endpoint(
             tool_calls = []
             actions = []  # Store action buttons to send to frontend
             
-            for chunk in stream:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
                 delta = chunk.choices[0].delta
                 
                 # Handle tool calls
@@ -604,18 +607,15 @@ async def chat_stream_endpoint(
                     messages.append(result)
                 
                 # Get final response from model
-                final_stream = model_router.completion(
+                final_stream = model_router.astream_text(
                     task_type=TASK_CHAT_FAST,
                     messages=messages,
-                    stream=True
                 )
                 
-                for chunk in final_stream:
-                    if chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_response += content
-                        data = {"type": "chunk", "content": content, "cache": {"hit": False}}
-                        yield f"data: {json.dumps(data)}\n\n"
+                async for content in final_stream:
+                    full_response += content
+                    data = {"type": "chunk", "content": content, "cache": {"hit": False}}
+                    yield f"data: {json.dumps(data)}\n\n"
             
             # Add compact evidence anchors when available
             try:
@@ -802,11 +802,14 @@ def graphrag_context_endpoint(
     Returns formatted context text and debug information.
     Cached for 5 minutes to improve performance for repeated queries.
     """
-    # Build cache key from query parameters
+    return GraphRAGContextResponse(**_graphrag_context(payload, session, auth.get("tenant_id")))
+
+
+def _graphrag_context_cache_key(payload: GraphRAGContextRequest, session, tenant_id: Optional[str]) -> tuple:
     # Use a hash of the message to keep cache keys reasonable length
     message_hash = hashlib.md5(payload.message.encode()).hexdigest()[:8]
-    cache_key = (
-        "graphrag_context",
+    return (
+        tenant_id or "",
         payload.graph_id or "",
         payload.branch_id or "",
         message_hash,
@@ -814,12 +817,11 @@ def graphrag_context_endpoint(
         payload.evidence_strictness or "medium",
         payload.include_proposed_edges if payload.include_proposed_edges is not None else True,
     )
-    
-    # Try cache first (5 minute TTL for expensive GraphRAG operations)
-    cached_result = get_cached(*cache_key, ttl_seconds=300)
-    if cached_result is not None:
-        return GraphRAGContextResponse(**cached_result)
-    
+
+
+# 5 minute TTL for expensive GraphRAG operations; concurrent identical questions share one retrieval
+@cached("graphrag_context", key=_graphrag_context_cache_key, ttl_seconds=300, distributed_lock=True)
+def _graphrag_context(payload: GraphRAGContextRequest, session, tenant_id: Optional[str]) -> dict:
     context = retrieve_graphrag_context(
         session=session,
         graph_id=payload.graph_id,
@@ -846,10 +848,7 @@ def graphrag_context_endpoint(
     
     # Add citations to response
     response = GraphRAGContextResponse(context_text=context["context_text"], debug=debug, citations=citations)
-
-    # Cache the result
-    set_cached(cache_key[0], response.dict(), *cache_key[1:], ttl_seconds=300)
-    return response
+    return response.dict()
 
 
 @router.post("/evidence-subgraph")
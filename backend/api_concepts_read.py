@@ -5,17 +5,20 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
-from db_neo4j import get_neo4j_session
-from cache_utils import get_cached, set_cached
+from db_neo4j import get_async_neo4j_session, get_neo4j_session
+from cache_utils import cached
 
 from models import Concept, LectureMention
 from services_graph import (
     get_concept_by_id,
-    get_concept_by_name,
-    get_concept_by_slug,
     get_all_concepts,
-    get_neighbors,
-    get_neighbors_with_relationships,
+    get_concept_by_id_async,
+    get_concept_by_name_async,
+    get_concept_by_slug_async,
+    get_all_concepts_async,
+    get_all_relationships_async,
+    get_neighbors_async,
+    get_neighbors_with_relationships_async,
     get_nodes_missing_description,
     find_concept_gaps,
     get_graph_overview,
@@ -24,6 +27,7 @@ from services_graph import (
 )
 from services_lecture_mentions import list_concept_mentions
 from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context, set_active_graph
+from services_graph_helpers import get_tenant_scoped_graph_context_async
 from auth import require_auth
 from pydantic import BaseModel
 
@@ -167,9 +171,9 @@ def search_concepts(
 
 
 @router.get("/all/graph")
-def get_all_graph_data(
+async def get_all_graph_data(
     include_proposed: Literal["auto", "all", "none"] = Query("auto", description="Visibility policy: 'auto' (default), 'all', or 'none'"),
-    session=Depends(get_neo4j_session),
+    session=Depends(get_async_neo4j_session),
     auth_ctx: Dict[str, Any] = Depends(require_auth)
 ):
     """
@@ -183,8 +187,8 @@ def get_all_graph_data(
     tenant_id = auth_ctx.get("tenant_id")
     
     try:
-        nodes = get_all_concepts(session, tenant_id=tenant_id)
-        relationships = get_all_relationships(session, include_proposed=include_proposed, tenant_id=tenant_id)
+        nodes = await get_all_concepts_async(session, tenant_id=tenant_id)
+        relationships = await get_all_relationships_async(session, include_proposed=include_proposed, tenant_id=tenant_id)
         logger.debug(f"Fetched {len(nodes)} nodes and {len(relationships)} relationships for tenant {tenant_id}")
         return {
             "nodes": nodes,
@@ -200,7 +204,7 @@ def get_all_graph_data(
 
 
 @router.get("/by-name/{name}", response_model=Concept)
-def read_concept_by_name(name: str, session=Depends(get_neo4j_session)):
+async def read_concept_by_name(name: str, session=Depends(get_async_neo4j_session)):
     """
     Get a concept by its name (exact match).
     
@@ -225,14 +229,14 @@ def read_concept_by_name(name: str, session=Depends(get_neo4j_session)):
     - Notion sync - Matches concepts by name
     - Command system - Navigation by name
     """
-    concept = get_concept_by_name(session, name)
+    concept = await get_concept_by_name_async(session, name)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept not found")
     return concept
 
 
 @router.get("/by-slug/{slug}", response_model=Concept)
-def read_concept_by_slug(slug: str, session=Depends(get_neo4j_session)):
+async def read_concept_by_slug(slug: str, session=Depends(get_async_neo4j_session)):
     """
     Get a concept by its URL slug (Wikipedia-style).
     
@@ -258,7 +262,7 @@ def read_concept_by_slug(slug: str, session=Depends(get_neo4j_session)):
     - Graph visualization - Link to concept pages
     - Wikipedia-style navigation
     """
-    concept = get_concept_by_slug(session, slug)
+    concept = await get_concept_by_slug_async(session, slug)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept not found")
     return concept
@@ -351,7 +355,7 @@ def get_concept_notes(
 
 
 @router.get("/{node_id}", response_model=Concept)
-def read_concept(node_id: str, session=Depends(get_neo4j_session)):
+async def read_concept(node_id: str, session=Depends(get_async_neo4j_session)):
     """
     Get a concept by its node_id (the unique identifier).
     
@@ -378,7 +382,7 @@ def read_concept(node_id: str, session=Depends(get_neo4j_session)):
     - Concept Board - Full concept view
     - All relationship operations - Use node_id for stability
     """
-    concept = get_concept_by_id(session, node_id)
+    concept = await get_concept_by_id_async(session, node_id)
     if not concept:
         raise HTTPException(status_code=404, detail="Concept not found")
     return concept
@@ -445,11 +449,11 @@ def get_linked_instances_endpoint(
         raise HTTPException(status_code=500, detail=f"Failed to get linked instances: {str(e)}")
 
 @router.get("/{node_id}/neighbors", response_model=List[Concept])
-def read_neighbors(
+async def read_neighbors(
     node_id: str,
     include_proposed: Literal["auto", "all", "none"] = Query("all", description="Visibility policy: 'all' (default, show all), 'auto' (threshold-based), or 'none' (ACCEPTED only)"),
     status: Optional[str] = Query(None, description="Filter by relationship status: 'ACCEPTED', 'PROPOSED', or None (show all)"),
-    session=Depends(get_neo4j_session)
+    session=Depends(get_async_neo4j_session)
 ):
     """
     Get all concepts connected to a given concept (neighbors).
@@ -488,15 +492,15 @@ def read_neighbors(
         include_proposed = "all"  # Will need to filter to PROPOSED only in the query
     # If status is None, use include_proposed as-is (defaults to "all" to show everything)
     
-    return get_neighbors(session, node_id, include_proposed=include_proposed)
+    return await get_neighbors_async(session, node_id, include_proposed=include_proposed)
 
 
 @router.get("/{node_id}/neighbors-with-relationships")
-def read_neighbors_with_relationships(
+async def read_neighbors_with_relationships(
     node_id: str,
     include_proposed: Literal["auto", "all", "none"] = Query("all", description="Visibility policy: 'all' (default, show all), 'auto' (threshold-based), or 'none' (ACCEPTED only)"),
     status: Optional[str] = Query(None, description="Filter by relationship status: 'ACCEPTED', 'PROPOSED', or None (show all)"),
-    session=Depends(get_neo4j_session)
+    session=Depends(get_async_neo4j_session)
 ):
     """
     Get neighbors with relationship metadata.
@@ -552,17 +556,24 @@ def read_neighbors_with_relationships(
         include_proposed = "all"  # Will need to filter to PROPOSED only in the query
     # If status is None, use include_proposed as-is (defaults to "all" to show everything)
     
-    # Try cache first
-    cache_key = ("neighbors_with_relationships", node_id, include_proposed, status)
-    cached_result = get_cached(*cache_key, ttl_seconds=60)
-    if cached_result is not None:
-        return cached_result
-    
-    result = get_neighbors_with_relationships(session, node_id, include_proposed=include_proposed)
-    
-    # Cache the result
-    set_cached(cache_key[0], result, *cache_key[1:], ttl_seconds=60)
-    return result
+    # The neighbors depend on the caller's tenant and active graph/branch, so they are part of the key
+    graph_id, branch_id, tenant_id = await get_tenant_scoped_graph_context_async(session)
+    return await _neighbors_with_relationships(session, tenant_id, graph_id, branch_id, node_id, include_proposed, status)
+
+
+@cached(
+    "neighbors_with_relationships",
+    key=lambda session, *params: params,
+    ttl_seconds=60,
+    stale_ttl_seconds=60,
+    # Concepts without neighbors are common; relationship writes invalidate this cache
+    negative_ttl_seconds=15,
+)
+async def _neighbors_with_relationships(session, tenant_id, graph_id, branch_id, node_id, include_proposed, status):
+    return await get_neighbors_with_relationships_async(
+        session, node_id, include_proposed=include_proposed, tenant_id=tenant_id
+    )
+
 
 @router.get("/{node_id}/claims")
 def get_claims_for_concept(
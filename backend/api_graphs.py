@@ -2,27 +2,30 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import Optional, List
 from neo4j import Session
 
-from db_neo4j import get_neo4j_session
+from db_neo4j import get_async_neo4j_session, get_neo4j_session
 from auth import require_auth
 from models import GraphCreateRequest, GraphListResponse, GraphRenameRequest, GraphSelectResponse, Concept
 from services_branch_explorer import (
     create_graph,
     delete_graph,
-    list_graphs,
+    list_graphs_async,
     rename_graph,
     set_active_graph,
+    set_active_graph_async,
     get_active_graph_context,
+    get_active_graph_context_async,
     ensure_graph_scoping_initialized,
+    ensure_graph_scoping_initialized_async,
 )
 from services_graph import (
     get_graph_overview,
-    get_neighbors_with_relationships,
-    get_concept_by_id,
+    get_neighbors_with_relationships_async,
+    get_concept_by_id_async,
     _normalize_concept_from_db,
     _normalize_include_proposed,
     _build_edge_visibility_where_clause,
 )
-from cache_utils import get_cached, set_cached, invalidate_cache_pattern
+from cache_utils import aget_cached, aset_cached, cached, get_cached, set_cached, invalidate_cache_pattern
 
 router = APIRouter(prefix="/graphs", tags=["graphs"])
 
@@ -36,13 +39,13 @@ def _require_graph_identity(request: Request) -> tuple[str, str]:
 
 
 @router.get("/", response_model=GraphListResponse)
-def list_graphs_endpoint(
+async def list_graphs_endpoint(
     request: Request,
-    session=Depends(get_neo4j_session),
+    session=Depends(get_async_neo4j_session),
 ):
     user_id, tenant_id = _require_graph_identity(request)
-    graphs = list_graphs(session, tenant_id=tenant_id)
-    active_graph_id, active_branch_id = get_active_graph_context(
+    graphs = await list_graphs_async(session, tenant_id=tenant_id)
+    active_graph_id, active_branch_id = await get_active_graph_context_async(
         session,
         tenant_id=tenant_id,
         user_id=user_id,
@@ -164,54 +167,59 @@ def get_graph_overview_endpoint(
     Get a lightweight overview of the graph with top nodes by degree.
     
     Returns a sampled subset of the graph for fast initial loading.
-    Cached for 2 minutes to improve performance.
+    Cached for 2 minutes to improve performance; for 2 more minutes the expired
+    overview is served while one request refreshes it.
     """
     user_id, tenant_id = _require_graph_identity(request)
-    # Try cache first (cache key includes all parameters)
-    cache_key = ("graph_overview", tenant_id, graph_id, limit_nodes, limit_edges, include_proposed)
-    cached_result = get_cached(*cache_key, ttl_seconds=120)
-    if cached_result is not None:
-        return cached_result
-    
     try:
-        # Set the active graph context
-        set_active_graph(session, graph_id, tenant_id=tenant_id, user_id=user_id)
-        ensure_graph_scoping_initialized(session)
-        
-        result = get_graph_overview(
+        # Always switch the caller's active graph, even when the overview is served from cache;
+        # the resolved branch scopes the cache entry.
+        graph_id, branch_id = set_active_graph(session, graph_id, tenant_id=tenant_id, user_id=user_id)
+        return _graph_overview(session, tenant_id, user_id, graph_id, branch_id, limit_nodes, limit_edges, include_proposed)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@cached(
+    "graph_overview",
+    key=lambda session, tenant_id, user_id, *params: (tenant_id, *params),
+    ttl_seconds=120,
+    stale_ttl_seconds=120,
+    # DO NOT CACHE empty results to avoid sticking in a bad state if data is loading/ingesting
+    is_empty=lambda response: len(response["nodes"]) == 0,
+    negative_ttl_seconds=0,
+    distributed_lock=True,
+)
+def _graph_overview(session, tenant_id, user_id, graph_id, branch_id, limit_nodes, limit_edges, include_proposed):
+    ensure_graph_scoping_initialized(session)
+    
+    result = get_graph_overview(
+        session,
+        limit_nodes=limit_nodes,
+        limit_edges=limit_edges,
+        include_proposed=include_proposed,
+        tenant_id=tenant_id,
+    )
+    response = {
+        "nodes": result["nodes"],
+        "edges": result["edges"],
+        "meta": result["meta"]
+    }
+    
+    # Log for debugging if no nodes found
+    if len(response["nodes"]) == 0:
+        import sys
+        graph_id_actual, branch_id_actual = get_active_graph_context(
             session,
-            limit_nodes=limit_nodes,
-            limit_edges=limit_edges,
-            include_proposed=include_proposed,
             tenant_id=tenant_id,
+            user_id=user_id,
         )
-        response = {
-            "nodes": result["nodes"],
-            "edges": result["edges"],
-            "meta": result["meta"]
-        }
-        
-        # Log for debugging if no nodes found
-        if len(response["nodes"]) == 0:
-            import sys
-            graph_id_actual, branch_id_actual = get_active_graph_context(
-                session,
-                tenant_id=tenant_id,
-                user_id=user_id,
-            )
-            print(f"[DEBUG] Graph {graph_id} overview returned 0 nodes (active context: graph_id={graph_id_actual}, branch_id={branch_id_actual})", file=sys.stderr)
-            # DO NOT CACHE empty results to avoid sticking in a bad state if data is loading/ingesting
-        else:
-            # Cache the result only if nodes successfully retrieved
-            set_cached(cache_key[0], response, *cache_key[1:], ttl_seconds=120)
-        
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        print(f"[DEBUG] Graph {graph_id} overview returned 0 nodes (active context: graph_id={graph_id_actual}, branch_id={branch_id_actual})", file=sys.stderr)
+    return response
 
 
 @router.get("/{graph_id}/neighbors")
-def get_graph_neighbors_endpoint(
+async def get_graph_neighbors_endpoint(
     graph_id: str,
     concept_id: str,
     request: Request,
@@ -219,7 +227,7 @@ def get_graph_neighbors_endpoint(
     limit: int = 80,
     include_proposed: str = "auto",
     auth: dict = Depends(require_auth),
-    session=Depends(get_neo4j_session),
+    session=Depends(get_async_neo4j_session),
 ):
     """
     Get neighbors of a concept within a specific graph.
@@ -228,24 +236,28 @@ def get_graph_neighbors_endpoint(
     Cached for 1 minute to improve performance.
     """
     user_id, tenant_id = _require_graph_identity(request)
+    try:
+        # Set the active graph context (also on a cache hit); the resolved branch scopes the cache entry
+        graph_id, branch_id = await set_active_graph_async(session, graph_id, tenant_id=tenant_id, user_id=user_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
     # Try cache first
-    cache_key = ("graph_neighbors", tenant_id, graph_id, concept_id, hops, limit, include_proposed)
-    cached_result = get_cached(*cache_key, ttl_seconds=60)
+    cache_key = ("graph_neighbors", tenant_id, graph_id, branch_id, concept_id, hops, limit, include_proposed)
+    cached_result = await aget_cached(*cache_key)
     if cached_result is not None:
         return cached_result
     
     try:
-        # Set the active graph context
-        set_active_graph(session, graph_id, tenant_id=tenant_id, user_id=user_id)
-        ensure_graph_scoping_initialized(session)
+        await ensure_graph_scoping_initialized_async(session)
         
         # Get the center node
-        center = get_concept_by_id(session, concept_id, tenant_id=tenant_id)
+        center = await get_concept_by_id_async(session, concept_id, tenant_id=tenant_id)
         if not center:
             raise HTTPException(status_code=404, detail=f"Concept {concept_id} not found")
         
         # Get neighbors (only 1-hop for now)
-        neighbors_with_rels = get_neighbors_with_relationships(
+        neighbors_with_rels = await get_neighbors_with_relationships_async(
             session,
             concept_id,
             include_proposed=include_proposed,
@@ -290,7 +302,7 @@ def get_graph_neighbors_endpoint(
         }
         
         # Cache the result
-        set_cached(cache_key[0], response, *cache_key[1:], ttl_seconds=60)
+        await aset_cached(cache_key[0], response, *cache_key[1:], ttl_seconds=60)
         return response
     except HTTPException:
         raise
@@ -92,12 +92,47 @@ async def detailed_health_check(session: Session = Depends(get_neo4j_session)):
             "connectivity": "failed"
         }
 
+@router.get("/events")
+async def event_store_health():
+    """Health and per-operation latency of the event store(s) built in this process."""
+    try:
+        from events.store import get_event_store_stats
+        return get_event_store_stats()
+    except Exception as e:
+        logger.error(f"Failed to fetch event store stats: {e}")
+        return {"error": str(e)}
+
+
+@router.get("/projections")
+async def projection_queue_health():
+    """Depth, lag and per-projector latency of the background projection queue."""
+    try:
+        from events.background import get_projection_queue_stats
+        return get_projection_queue_stats()
+    except Exception as e:
+        logger.error(f"Failed to fetch projection queue stats: {e}")
+        return {"error": str(e)}
+
+
 @router.get("/cache")
 async def cache_stats():
     """Get statistics for the multi-level cache."""
     try:
         from cache_utils import get_cache_stats
-        return get_cache_stats()
+        from services_community_index import get_community_index_stats
+        from services_embedding_cache import get_embedding_cache_stats
+        from services_embedding_batcher import get_embedding_batcher_stats
+        from services_search import get_reembed_stats
+        from services_semantic_cache import get_semantic_cache_stats
+        from services_branch_explorer import get_graph_context_cache_stats
+        stats = get_cache_stats()
+        stats["community_index"] = get_community_index_stats()
+        stats["embeddings"] = get_embedding_cache_stats()
+        stats["embedding_batcher"] = get_embedding_batcher_stats()
+        stats["reembed"] = get_reembed_stats()
+        stats["semantic_cache"] = get_semantic_cache_stats()
+        stats["graph_context"] = get_graph_context_cache_stats()
+        return stats
     except Exception as e:
         logger.error(f"Failed to fetch cache stats: {e}")
         return {"error": str(e)}
\ No newline at end of file
@@ -1,14 +1,16 @@
 """Unified minimal home feed API."""
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, Depends
 
 from auth import require_auth
-from db_neo4j import get_neo4j_session
+from db_neo4j import get_async_neo4j_session
 from db_postgres import execute_query
+from neo4j_query import Cypher, QueryPlan, run_plan_async
 from services_interest_recommender import get_recent_suggestions
 
 router = APIRouter(prefix="/home", tags=["home"])
@@ -21,13 +23,7 @@ def _today_window_iso() -> tuple[str, str]:
     return start.isoformat(), end.isoformat()
 
 
-@router.get("/feed")
-def get_home_feed(user_ctx=Depends(require_auth), session=Depends(get_neo4j_session)) -> Dict[str, Any]:
-    user_id = user_ctx.user_id
-    tenant_id = user_ctx.tenant_id
-
-    # 1) Today's tasks (minimal)
-    start_iso, end_iso = _today_window_iso()
+def _today_tasks_plan(tenant_id: str, start_iso: str, end_iso: str) -> QueryPlan[List[Dict[str, Any]]]:
     tasks_query = """
     MATCH (t:Task)
     WHERE ($tenant_id = 'default' OR t.tenant_id = $tenant_id OR t.tenant_id IS NULL)
@@ -42,14 +38,12 @@ def get_home_feed(user_ctx=Depends(require_auth), session=Depends(get_neo4j_sess
       coalesce(t.due_date, '9999-12-31T00:00:00') ASC
     LIMIT 5
     """
-    tasks_res = session.run(tasks_query, tenant_id=tenant_id, start_iso=start_iso, end_iso=end_iso)
-    tasks = [dict(r) for r in tasks_res]
+    tasks_res = yield Cypher(tasks_query, {"tenant_id": tenant_id, "start_iso": start_iso, "end_iso": end_iso})
+    return [dict(r) for r in tasks_res]
 
-    # 2) Suggested reads (already personalized)
-    picks = get_recent_suggestions(user_id=user_id, tenant_id=tenant_id, limit=3)
 
-    # 3) Lightweight continuity summary from latest chat history (Postgres)
-    continuity: List[str] = []
+def _continuity(user_id: str, tenant_id: str) -> List[str]:
+    """Lightweight continuity summary from latest chat history (Postgres)."""
     try:
         rows = execute_query(
             """
@@ -61,11 +55,12 @@ def get_home_feed(user_ctx=Depends(require_auth), session=Depends(get_neo4j_sess
             """,
             (str(user_id), str(tenant_id)),
         ) or []
-        continuity = [str(r.get("content") or "")[:180] for r in rows if r.get("content")]
+        return [str(r.get("content") or "")[:180] for r in rows if r.get("content")]
     except Exception:
-        continuity = []
+        return []
+
 
-    capture_new_count = 0
+def _capture_new_count(user_id: str, tenant_id: str) -> int:
     try:
         cap_rows = execute_query(
             """
@@ -76,9 +71,27 @@ def get_home_feed(user_ctx=Depends(require_auth), session=Depends(get_neo4j_sess
             (str(user_id), str(tenant_id)),
         ) or []
         if cap_rows:
-            capture_new_count = int(cap_rows[0].get("c") or 0)
+            return int(cap_rows[0].get("c") or 0)
     except Exception:
-        capture_new_count = 0
+        pass
+    return 0
+
+
+@router.get("/feed")
+async def get_home_feed(user_ctx=Depends(require_auth), session=Depends(get_async_neo4j_session)) -> Dict[str, Any]:
+    user_id = user_ctx.user_id
+    tenant_id = user_ctx.tenant_id
+
+    # Today's tasks run on the async Neo4j session; the Postgres reads use the sync
+    # pool, so they run in worker threads, all four concurrently.
+    start_iso, end_iso = _today_window_iso()
+    tasks, picks, continuity, capture_new_count = await asyncio.gather(
+        run_plan_async(session, _today_tasks_plan(tenant_id, start_iso, end_iso)),
+        # Suggested reads (already personalized)
+        asyncio.to_thread(get_recent_suggestions, user_id=user_id, tenant_id=tenant_id, limit=3),
+        asyncio.to_thread(_continuity, user_id, tenant_id),
+        asyncio.to_thread(_capture_new_count, user_id, tenant_id),
+    )
 
     return {
         "today": {
@@ -232,8 +232,13 @@ def retrieve_endpoint(
     Otherwise: run router → plan.
     
     Returns RetrievalResult with intent, trace, and context.
-    
+
     Cached for 2 minutes to improve performance for repeated queries.
+
+    Stays a sync route on the sync session (FastAPI runs it in the threadpool): the
+    retrieval plans (services_retrieval_plans), the intent router's LLM fallback, the
+    voice transcript search and the evidence/trail/focus lookups are all synchronous,
+    so an async route would have to hand almost the whole request to a thread anyway.
     """
     ensure_graph_scoping_initialized(session)
     
@@ -128,7 +128,7 @@ async def voice_session_ws(
                 pcm = await decoder_proc.stdout.read(4096)
                 if not pcm: break
                 
-                segments = segmenter.process_pcm16(pcm)
+                segments = await segmenter.aprocess_pcm16(pcm)
                 for seg in segments:
                     # Run processing in a task so we don't block audio feeding
                     asyncio.create_task(process_utterance(seg.pcm16))
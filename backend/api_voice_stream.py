@@ -14,6 +14,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
 import asyncio
+import functools
 import json
 
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
@@ -36,9 +37,10 @@ from services_stt import (
     wav_bytes_from_pcm16
 )
 from services_tts import (
+    SpeechSegmenter,
+    TtsPipeline,
     map_tutor_voice_id_to_openai_voice,
     split_sentences,
-    synthesize_speech_bytes,
     tts_instructions_for_voice_id,
 )
 from services_vad import VadConfig, VadUtteranceSegmenter, get_speech_detector
@@ -170,6 +172,7 @@ async def voice_stream_ws(websocket: WebSocket):
     audio_last_ms: Optional[int] = None
 
     tts_cancelled = False
+    active_tts: Optional[TtsPipeline] = None
     _interrupt_event: asyncio.Event = asyncio.Event()
     session_voice_id: Optional[str] = None
     session_voice_resolved = False
@@ -186,6 +189,8 @@ async def voice_stream_ws(websocket: WebSocket):
         nonlocal tts_cancelled
         tts_cancelled = True
         _interrupt_event.set()
+        if active_tts is not None:
+            active_tts.cancel()  # drop audio still being synthesized
         # Drain the utterance queue so queued items don't process after interrupt
         while not utterance_q.empty():
             try:
@@ -252,61 +257,70 @@ async def voice_stream_ws(websocket: WebSocket):
         speed = max(0.85, min(2.0, float(speech_rate)))
 
         full_reply = ""
-        sentence_buf = ""
-        seq = 0
-        
+        segmenter = SpeechSegmenter()
+
         # Reset per-stream so each reply starts clean
-        nonlocal tts_cancelled
+        nonlocal tts_cancelled, active_tts
         tts_cancelled = False
         _interrupt_event.clear()
+        # Synthesizes segment N+1 while N is being sent, instead of pausing the LLM stream on each sentence
+        tts = active_tts = TtsPipeline(
+            deliver=functools.partial(_send_tts_segment, voice=openai_voice),
+            voice=openai_voice,
+            speed=speed,
+            instructions=instructions,
+        )
 
-        async for chunk in reply_stream:
-            if _interrupt_event.is_set():
-                tts_cancelled = True
-                break
-                
-            if chunk["type"] == "content":
-                delta = chunk["delta"]
-                full_reply += delta
-                sentence_buf += delta
-                
-                # If we hit an end-of-sentence or newline, and have enough text to speak...
-                if any(c in delta for c in ".!?\n") and len(sentence_buf.strip()) > 10:
-                    seq += 1
-                    # Await sequential TTS delivery
-                    await _run_tts_segment(text=sentence_buf, seq=seq, voice=openai_voice, speed=speed, instructions=instructions)
-                    sentence_buf = ""
-            
-            elif chunk["type"] == "done":
-                # Final flush
-                if sentence_buf.strip():
-                    seq += 1
-                    await _run_tts_segment(text=sentence_buf, seq=seq, voice=openai_voice, speed=speed, instructions=instructions)
-                
-                # Now send the final JSON for the UI transcript
-                await _send_json(
-                    {
-                        "type": "agent_reply",
-                        "transcript": transcript,
-                        "agent_response": chunk["full_response"],
-                        "should_speak": True,
-                        "speech_rate": speech_rate,
-                        "perf_metrics": perf_metrics,
-                        "policy": result.get("policy", {}),
-                        "learning_signals": result.get("learning_signals", []),
-                        "is_eureka": result.get("is_eureka", False),
-                        "is_fog_clearing": result.get("is_fog_clearing", False),
-                        "fog_node_id": result.get("fog_node_id"),
-                        "actions": result.get("actions", []),
-                        "action_summaries": result.get("action_summaries", []),
-                    }
-                )
+        try:
+            async for chunk in reply_stream:
+                if _interrupt_event.is_set():
+                    tts_cancelled = True
+                    break
 
-    async def _run_tts_segment(*, text: str, seq: int, voice: str, speed: float, instructions: str) -> None:
-        nonlocal tts_cancelled
-        if tts_cancelled or _interrupt_event.is_set():
+                if chunk["type"] == "content":
+                    delta = chunk["delta"]
+                    full_reply += delta
+                    for segment in segmenter.feed(delta):
+                        await tts.submit(segment)
+
+                elif chunk["type"] == "done":
+                    # Final flush
+                    for segment in segmenter.flush():
+                        await tts.submit(segment)
+                    await tts.drain()
+                    perf_metrics["tts_first_audio_ms"] = tts.first_audio_ms
+                    perf_metrics["tts_segments"] = tts.segment_metrics()
+                    if chunk.get("retrieval_cache") is not None:
+                        perf_metrics["retrieval_cache"] = chunk["retrieval_cache"]
+
+                    # Now send the final JSON for the UI transcript
+                    await _send_json(
+                        {
+                            "type": "agent_reply",
+                            "transcript": transcript,
+                            "agent_response": chunk["full_response"],
+                            "should_speak": True,
+                            "speech_rate": speech_rate,
+                            "perf_metrics": perf_metrics,
+                            "policy": result.get("policy", {}),
+                            "learning_signals": result.get("learning_signals", []),
+                            "is_eureka": result.get("is_eureka", False),
+                            "is_fog_clearing": result.get("is_fog_clearing", False),
+                            "fog_node_id": result.get("fog_node_id"),
+                            "actions": result.get("actions", []),
+                            "action_summaries": result.get("action_summaries", []),
+                        }
+                    )
+        finally:
+            tts.cancel()  # no-op once drained
+            active_tts = None
+            # Stops the LLM stream right away when we bail out on an interrupt
+            await reply_stream.aclose()
+
+    async def _send_tts_segment(seq: int, text: str, audio_bytes: bytes, *, voice: str) -> None:
+        # TtsPipeline delivery: called in seq order once the segment's audio is ready
+        if tts_cancelled or _interrupt_event.is_set() or not audio_bytes:
             return
-
         await _send_json(
             {
                 "type": "tts_start",
@@ -316,33 +330,29 @@ async def voice_stream_ws(websocket: WebSocket):
                 "text": text[:120],
             }
         )
-        try:
-            audio_bytes = await asyncio.to_thread(
-                synthesize_speech_bytes,
-                text,
-                voice=voice,
-                speed=speed,
-                response_format="mp3",
-                instructions=instructions,
-            )
-            if not _interrupt_event.is_set() and not tts_cancelled and audio_bytes:
-                await _send_bytes(audio_bytes)
-                await _send_json({"type": "tts_end", "seq": seq})
-        except Exception as e:
-            logger.error(f"TTS segment {seq} failed: {e}")
+        await _send_bytes(audio_bytes)
+        await _send_json({"type": "tts_end", "seq": seq})
 
     async def _run_tts_stream(*, text: str, voice_id: Optional[str], speech_rate: float) -> None:
         # Backward compat for simple strings (acks)
-        nonlocal tts_cancelled
+        nonlocal tts_cancelled, active_tts
         tts_cancelled = False
         _interrupt_event.clear()
         openai_voice = map_tutor_voice_id_to_openai_voice(voice_id)
-        instructions = tts_instructions_for_voice_id(voice_id)
-        speed = max(0.85, min(2.0, float(speech_rate or 1.15)))
-        segments = split_sentences(text, max_chars=160)
-        for idx, seg in enumerate(segments, start=1):
-            if _interrupt_event.is_set(): break
-            await _run_tts_segment(text=seg, seq=idx, voice=openai_voice, speed=speed, instructions=instructions)
+        tts = active_tts = TtsPipeline(
+            deliver=functools.partial(_send_tts_segment, voice=openai_voice),
+            voice=openai_voice,
+            speed=max(0.85, min(2.0, float(speech_rate or 1.15))),
+            instructions=tts_instructions_for_voice_id(voice_id),
+        )
+        try:
+            for seg in split_sentences(text, max_chars=160):
+                if _interrupt_event.is_set(): break
+                await tts.submit(seg)
+            await tts.drain()
+        finally:
+            tts.cancel()
+            active_tts = None
         await _send_json({"type": "tts_done"})
 
     async def _process_utterance_webm(*, client_start_ms: Optional[int] = None, client_end_ms: Optional[int] = None) -> None:
@@ -404,6 +414,7 @@ async def voice_stream_ws(websocket: WebSocket):
                 client_start_ms=start_ms,
                 client_end_ms=end_ms,
                 stt_metadata=stt_result,
+                cancel_event=_interrupt_event,
             )
         except Exception as e:
             await _send_json({"type": "agent_error", "message": str(e)[:400]})
@@ -474,6 +485,7 @@ async def voice_stream_ws(websocket: WebSocket):
                 client_start_ms=int(utt.start_epoch_ms),
                 client_end_ms=int(utt.end_epoch_ms),
                 stt_metadata=stt_result,
+                cancel_event=_interrupt_event,
             )
         except Exception as e:
             await _send_json({"type": "agent_error", "message": str(e)[:400]})
@@ -563,7 +575,7 @@ async def voice_stream_ws(websocket: WebSocket):
                     pcm = await decoder_proc.stdout.read(4096)
                     if not pcm:
                         break
-                    segments = segmenter.process_pcm16(pcm)
+                    segments = await segmenter.aprocess_pcm16(pcm)
                     speech_start_sample = segmenter.pop_speech_start_sample()
                     if speech_start_sample is not None:
                         start_ms = stream_started_at_ms + int(speech_start_sample * 1000 / vad_config.sample_rate_hz)
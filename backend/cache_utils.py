@@ -1,13 +1,31 @@
 """
 Multi-level caching utilities for API responses.
 Provides Memory -> Disk -> Redis (optional) caching to speed up transitions and minimize latency.
+
+Keys are "<cache_name>:<args...>"; the cache_name is the key's namespace. The memory
+level is a bounded LRU (CACHE_L1_MAX_ENTRIES / CACHE_L1_MAX_BYTES, sizes estimated from
+the JSON encoding) with a background sweep of expired entries. Keys are indexed by
+namespace, so invalidate_cache_pattern only touches the matching namespace, and disk
+entries are tagged with their namespace so they can be evicted without a full scan.
+
+The cached(...) decorator adds single-flight recomputation, stale-while-revalidate and
+negative caching on top of get_cached/set_cached. Async code uses aget_cached/aset_cached
+(and the decorator on async functions does), which keep Redis and disk I/O off the loop.
 """
+import asyncio
+import heapq
+import inspect
+import os
+import sys
 import time
 import json
 import logging
-from typing import Any, Optional, Dict, Union
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Optional, Dict, List, Set, Sized, Tuple, cast
 from threading import Lock
-from pathlib import Path
 
 try:
     import redis
@@ -25,34 +43,221 @@ from config import repo_root
 
 logger = logging.getLogger("brain_web")
 
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "2048"))
+CACHE_L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_L1_SWEEP_SECONDS = float(os.getenv("CACHE_L1_SWEEP_SECONDS", "30"))
+
+
+def _namespace(cache_key: str) -> str:
+    return cache_key.split(":", 1)[0]
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached value (its JSON length)."""
+    try:
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _MemoryCache:
+    """
+    Bounded LRU for Level 1. Not thread-safe: callers hold _cache_lock.
+
+    Entries are evicted least-recently-used first once either limit is exceeded.
+    Expired entries are dropped on read and by sweep(), which pops a min-heap of
+    expiry times so it only visits entries that have actually expired.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._by_namespace: Dict[str, Set[str]] = {}
+        self._namespace_bytes: Dict[str, int] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: float) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if now > entry[1]:
+            self._remove(key)
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[0]
+
+    def set(self, key: str, value: Any, expires_at: float, size: int) -> List[str]:
+        """Store an entry; returns the namespaces of entries evicted to make room."""
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes or self.max_entries == 0:
+            return []  # Would evict everything else and still not fit
+        ns = _namespace(key)
+        self._entries[key] = (value, expires_at, size)
+        self._by_namespace.setdefault(ns, set()).add(key)
+        self._namespace_bytes[ns] = self._namespace_bytes.get(ns, 0) + size
+        self.bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        evicted = []
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+            evicted.append(_namespace(oldest))
+        return evicted
+
+    def pop(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def pop_prefix(self, prefix: str) -> int:
+        """Remove every key starting with prefix, visiting only the candidate namespaces."""
+        if ":" in prefix:
+            namespaces = [_namespace(prefix)]
+        else:
+            namespaces = [ns for ns in self._by_namespace if ns.startswith(prefix)]
+        keys = [
+            k for ns in namespaces for k in self._by_namespace.get(ns, ()) if k.startswith(prefix)
+        ]
+        for k in keys:
+            self._remove(k)
+        return len(keys)
+
+    def sweep(self, now: float) -> int:
+        """Drop expired entries. The heap may hold stale (overwritten/removed) records."""
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                removed += 1
+        # Stale records pile up when keys are rewritten before they expire
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [(e[1], k) for k, e in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
+        self.expirations += removed
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_namespace.clear()
+        self._namespace_bytes.clear()
+        self._expiry_heap = []
+        self.bytes = 0
+
+    def namespace_usage(self) -> Dict[str, Tuple[int, int]]:
+        """namespace -> (entries, bytes)"""
+        return {ns: (len(keys), self._namespace_bytes.get(ns, 0)) for ns, keys in self._by_namespace.items()}
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        ns = _namespace(key)
+        keys = self._by_namespace.get(ns)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_namespace[ns]
+        remaining = self._namespace_bytes.get(ns, 0) - size
+        if remaining > 0:
+            self._namespace_bytes[ns] = remaining
+        else:
+            self._namespace_bytes.pop(ns, None)
+        self.bytes -= size
+
+
 # In-memory cache storage (Level 1)
-_memory_cache: Dict[str, Dict[str, Any]] = {}
+_memory_cache = _MemoryCache(CACHE_L1_MAX_ENTRIES, CACHE_L1_MAX_BYTES)
 _cache_lock = Lock()
+_sweeper: Optional[threading.Thread] = None
 
-# Disk cache storage (Level 2)
+# Disk (Level 2) and Redis (Level 3) are opened on first use, not at import:
+# importing this module must not touch the filesystem or the network.
+_backend_lock = Lock()
 _disk_cache = None
-if HAS_DISKCACHE:
-    cache_dir = repo_root / ".cache" / "api_data"
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    _disk_cache = Cache(str(cache_dir))
-
-# Redis cache (Level 3)
+_disk_cache_ready = False
 _redis_client = None
-if USE_REDIS:
-    try:
-        _redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB,
-            password=REDIS_PASSWORD,
-            socket_timeout=2,
-            decode_responses=False # Keep bytes for pickling if needed, but we prefer JSON
-        )
-        _redis_client.ping()
-        logger.info(f"Connected to Redis for caching at {REDIS_HOST}:{REDIS_PORT}")
-    except Exception as e:
-        logger.warning(f"Failed to connect to Redis: {e}. Falling back to Disk/Memory cache.")
-        _redis_client = None
+_redis_ready = False
+
+
+def _get_disk_cache():
+    """Open the disk cache on first use (None if diskcache is not installed)."""
+    global _disk_cache, _disk_cache_ready
+    if _disk_cache_ready:
+        return _disk_cache
+    with _backend_lock:
+        if not _disk_cache_ready:
+            if HAS_DISKCACHE:
+                try:
+                    cache_dir = repo_root / ".cache" / "api_data"
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    _disk_cache = Cache(str(cache_dir))
+                    # Entries are tagged with their namespace; the index makes evict(tag) cheap
+                    _disk_cache.create_tag_index()
+                except Exception as e:
+                    logger.warning(f"Failed to open disk cache: {e}. Using memory cache only.")
+                    _disk_cache = None
+            _disk_cache_ready = True
+    return _disk_cache
+
+
+def _get_redis_client():
+    """Connect to Redis on first use. A failed connection is not retried (memory/disk only)."""
+    global _redis_client, _redis_ready
+    if _redis_ready:
+        return _redis_client
+    with _backend_lock:
+        if not _redis_ready:
+            if USE_REDIS:
+                try:
+                    client = redis.Redis(
+                        host=REDIS_HOST,
+                        port=REDIS_PORT,
+                        db=REDIS_DB,
+                        password=REDIS_PASSWORD,
+                        socket_timeout=2,
+                        decode_responses=False # Keep bytes for pickling if needed, but we prefer JSON
+                    )
+                    client.ping()
+                    _redis_client = client
+                    logger.info(f"Connected to Redis for caching at {REDIS_HOST}:{REDIS_PORT}")
+                except Exception as e:
+                    logger.warning(f"Failed to connect to Redis: {e}. Falling back to Disk/Memory cache.")
+                    _redis_client = None
+            _redis_ready = True
+    return _redis_client
+
+def _ensure_sweeper() -> None:
+    """Start the background expiry sweep (once, on first write)."""
+    global _sweeper
+    if _sweeper is not None or CACHE_L1_SWEEP_SECONDS <= 0:
+        return
+    with _backend_lock:
+        if _sweeper is not None:
+            return
+
+        def sweep_forever():
+            while True:
+                time.sleep(CACHE_L1_SWEEP_SECONDS)
+                try:
+                    with _cache_lock:
+                        _memory_cache.sweep(time.time())
+                except Exception as e:
+                    logger.warning(f"Cache sweep failed: {e}")
+
+        _sweeper = threading.Thread(target=sweep_forever, name="cache-sweep", daemon=True)
+        _sweeper.start()
+
 
 # Cache statistics
 _cache_stats = {
@@ -61,6 +266,31 @@ _cache_stats = {
     "hits_l3": 0, # Redis
     "misses": 0,
 }
+_NAMESPACE_COUNTERS = (
+    "hits_l1", "hits_l2", "hits_l3", "misses", "sets", "evictions",
+    # cached(...) decorator
+    "coalesced", "stale_served", "negative_sets",
+)
+_namespace_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _count(namespace: str, counter: str) -> None:
+    """Bump a global and a per-namespace counter. Callers hold _cache_lock."""
+    if counter in _cache_stats:
+        _cache_stats[counter] += 1
+    stats = _namespace_stats.get(namespace)
+    if stats is None:
+        stats = _namespace_stats[namespace] = dict.fromkeys(_NAMESPACE_COUNTERS, 0)
+    stats[counter] += 1
+
+
+def _set_memory(cache_key: str, value: Any, ttl_seconds: float) -> None:
+    size = _estimate_size(value)
+    with _cache_lock:
+        for ns in _memory_cache.set(cache_key, value, time.time() + ttl_seconds, size):
+            _count(ns, "evictions")
+    _ensure_sweeper()
+
 
 def _make_key(cache_name: str, *args, **kwargs) -> str:
     """Create a cache key from cache name and arguments."""
@@ -72,121 +302,172 @@ def _make_key(cache_name: str, *args, **kwargs) -> str:
         key_parts.extend(f"{k}={v}" for k, v in sorted_kwargs)
     return ":".join(key_parts)
 
-def get_cached(cache_name: str, *args, **kwargs) -> Optional[Any]:
+def get_cached(cache_name: str, *args, ttl_seconds: Optional[int] = None, **kwargs) -> Optional[Any]:
     """
     Get a value from multi-level cache.
+
+    ttl_seconds is accepted (and ignored) so callers can pass the same arguments as
+    to set_cached; it is not part of the key.
     """
+    disk_cache = _get_disk_cache()
+    redis_client = _get_redis_client()
     cache_key = _make_key(cache_name, *args, **kwargs)
     
     # 1. Try Memory (L1)
     with _cache_lock:
-        entry = _memory_cache.get(cache_key)
-        if entry and time.time() <= entry["expires_at"]:
-            _cache_stats["hits_l1"] += 1
-            return entry["value"]
-        elif entry:
-            del _memory_cache[cache_key]
+        found, value = _memory_cache.get(cache_key, time.time())
+        if found:
+            _count(cache_name, "hits_l1")
+            return value
 
     # 2. Try Redis (L3) if enabled
-    if _redis_client:
+    if redis_client:
         try:
-            data = _redis_client.get(cache_key)
+            pipe = redis_client.pipeline()
+            pipe.get(cache_key)
+            pipe.ttl(cache_key)
+            data, remaining = pipe.execute()
             if data:
                 value = json.loads(data)
-                _cache_stats["hits_l3"] += 1
-                # Promote to Memory
-                set_cached(cache_name, value, *args, **kwargs)
+                with _cache_lock:
+                    _count(cache_name, "hits_l3")
+                # Promote to Memory for the rest of its lifetime
+                if remaining and remaining > 0:
+                    _set_memory(cache_key, value, remaining)
                 return value
         except Exception:
             pass
 
     # 3. Try Disk (L2)
-    if _disk_cache:
+    if disk_cache is not None:
         try:
-            value = _disk_cache.get(cache_key)
+            value, expire_time = cast(
+                Tuple[Any, Optional[float]], disk_cache.get(cache_key, expire_time=True)
+            )
             if value is not None:
-                _cache_stats["hits_l2"] += 1
-                # Promote to Memory/Redis
-                set_cached(cache_name, value, *args, **kwargs)
+                with _cache_lock:
+                    _count(cache_name, "hits_l2")
+                # Promote to Memory for the rest of its lifetime
+                if expire_time:
+                    _set_memory(cache_key, value, expire_time - time.time())
                 return value
         except Exception:
             pass
 
-    _cache_stats["misses"] += 1
+    with _cache_lock:
+        _count(cache_name, "misses")
     return None
 
 def set_cached(cache_name: str, value: Any, *args, ttl_seconds: int = 300, **kwargs) -> None:
     """
     Set a value in multi-level cache.
     """
+    disk_cache = _get_disk_cache()
+    redis_client = _get_redis_client()
     cache_key = _make_key(cache_name, *args, **kwargs)
-    expires_at = time.time() + ttl_seconds
 
     # 1. Set Memory (L1)
+    _set_memory(cache_key, value, ttl_seconds)
     with _cache_lock:
-        _memory_cache[cache_key] = {
-            "value": value,
-            "expires_at": expires_at,
-        }
+        _count(cache_name, "sets")
 
     # 2. Set Disk (L2)
-    if _disk_cache:
+    if disk_cache is not None:
         try:
-            _disk_cache.set(cache_key, value, expire=ttl_seconds)
+            disk_cache.set(cache_key, value, expire=ttl_seconds, tag=cache_name)
         except Exception:
             pass
 
     # 3. Set Redis (L3)
-    if _redis_client:
+    if redis_client:
         try:
-            _redis_client.setex(cache_key, ttl_seconds, json.dumps(value))
+            redis_client.setex(cache_key, ttl_seconds, json.dumps(value))
         except Exception:
             pass
 
+async def aget_cached(cache_name: str, *args, ttl_seconds: Optional[int] = None, **kwargs) -> Optional[Any]:
+    """
+    get_cached for event-loop callers.
+
+    Memory hits are answered inline; Redis and disk lookups (and the first Redis
+    connection) run in a worker thread so they never block the loop.
+    """
+    cache_key = _make_key(cache_name, *args, **kwargs)
+    with _cache_lock:
+        found, value = _memory_cache.get(cache_key, time.time())
+        if found:
+            _count(cache_name, "hits_l1")
+            return value
+    return await asyncio.to_thread(get_cached, cache_name, *args, **kwargs)
+
+async def aset_cached(cache_name: str, value: Any, *args, ttl_seconds: int = 300, **kwargs) -> None:
+    """set_cached for event-loop callers (disk and Redis writes run in a worker thread)."""
+    await asyncio.to_thread(set_cached, cache_name, value, *args, ttl_seconds=ttl_seconds, **kwargs)
+
 def invalidate_cache(cache_name: str, *args, **kwargs) -> None:
     """Invalidate a specific cache entry across all levels."""
+    disk_cache = _get_disk_cache()
+    redis_client = _get_redis_client()
     cache_key = _make_key(cache_name, *args, **kwargs)
     
     with _cache_lock:
-        _memory_cache.pop(cache_key, None)
+        _memory_cache.pop(cache_key)
     
-    if _disk_cache:
-        _disk_cache.delete(cache_key)
+    if disk_cache is not None:
+        disk_cache.delete(cache_key)
         
-    if _redis_client:
+    if redis_client:
         try:
-            _redis_client.delete(cache_key)
+            redis_client.delete(cache_key)
         except Exception:
             pass
 
+def _disk_keys_with_tag(disk_cache: Any, tag: str) -> List[str]:
+    """Keys of the disk entries carrying tag, read through the tag index.
+
+    Cache has no public per-tag listing; this is the query evict(tag) runs.
+    """
+    rows = disk_cache._sql("SELECT key FROM Cache WHERE tag = ?", (tag,)).fetchall()
+    return [key for (key,) in rows if isinstance(key, str)]
+
+
 def invalidate_cache_pattern(pattern: str) -> None:
-    """Invalidate all cache entries matching a prefix pattern."""
+    """
+    Invalidate all cache entries matching a prefix pattern.
+
+    Memory and Redis drop exactly the keys starting with pattern. On disk a whole
+    namespace ("lectures") is evicted by its tag; a narrower pattern
+    ("lectures:steps:<id>") only walks the keys tagged with its namespace and
+    deletes the matching ones.
+    """
+    disk_cache = _get_disk_cache()
+    redis_client = _get_redis_client()
     # 1. Memory
     with _cache_lock:
-        keys_to_delete = [k for k in _memory_cache.keys() if k.startswith(pattern)]
-        for k in keys_to_delete:
-            del _memory_cache[k]
+        _memory_cache.pop_prefix(pattern)
     
     # 2. Disk
-    if _disk_cache:
+    if disk_cache is not None:
         try:
-            # diskcache doesn't have a direct pattern delete, so we clear if it's too much
-            # or just iterate which might be slow. For now, simple iteration.
-            keys_to_delete = [k for k in _disk_cache if isinstance(k, str) and k.startswith(pattern)]
-            for k in keys_to_delete:
-                _disk_cache.delete(k)
+            namespace = _namespace(pattern)
+            if pattern == namespace:
+                disk_cache.evict(namespace)
+            else:
+                for key in _disk_keys_with_tag(disk_cache, namespace):
+                    if key.startswith(pattern):
+                        disk_cache.delete(key)
         except Exception:
             pass
             
     # 3. Redis
-    if _redis_client:
+    if redis_client:
         try:
             # Use SCAN to find keys without blocking
             cursor = 0
             while True:
-                cursor, keys = _redis_client.scan(cursor=cursor, match=f"{pattern}*", count=100)
+                cursor, keys = redis_client.scan(cursor=cursor, match=f"{pattern}*", count=100)
                 if keys:
-                    _redis_client.delete(*keys)
+                    redis_client.delete(*keys)
                 if cursor == 0:
                     break
         except Exception:
@@ -194,29 +475,279 @@ def invalidate_cache_pattern(pattern: str) -> None:
 
 def clear_cache() -> None:
     """Clear all cache entries across all levels."""
+    disk_cache = _get_disk_cache()
+    redis_client = _get_redis_client()
     with _cache_lock:
         _memory_cache.clear()
     
-    if _disk_cache:
-        _disk_cache.clear()
+    if disk_cache is not None:
+        disk_cache.clear()
         
-    if _redis_client:
+    if redis_client:
         try:
-            _redis_client.flushdb()
+            redis_client.flushdb()
         except Exception:
             pass
 
 def get_cache_stats() -> Dict[str, Any]:
-    """Get multi-level cache statistics."""
-    total_hits = _cache_stats["hits_l1"] + _cache_stats["hits_l2"] + _cache_stats["hits_l3"]
-    total = total_hits + _cache_stats["misses"]
-    hit_rate = total_hits / total if total > 0 else 0.0
-    
-    return {
-        **_cache_stats,
-        "total_hits": total_hits,
-        "hit_rate": hit_rate,
-        "memory_size": len(_memory_cache),
-        "disk_size": len(_disk_cache) if _disk_cache else 0,
-    }
+    """Get multi-level cache statistics, overall and per namespace (cache name)."""
+    disk_cache = _get_disk_cache()
+    with _cache_lock:
+        total_hits = _cache_stats["hits_l1"] + _cache_stats["hits_l2"] + _cache_stats["hits_l3"]
+        total = total_hits + _cache_stats["misses"]
+        hit_rate = total_hits / total if total > 0 else 0.0
+
+        usage = _memory_cache.namespace_usage()
+        namespaces = {}
+        for ns in sorted(set(_namespace_stats) | set(usage)):
+            counters = _namespace_stats.get(ns) or dict.fromkeys(_NAMESPACE_COUNTERS, 0)
+            ns_hits = counters["hits_l1"] + counters["hits_l2"] + counters["hits_l3"]
+            ns_total = ns_hits + counters["misses"]
+            entries, size = usage.get(ns, (0, 0))
+            namespaces[ns] = {
+                **counters,
+                "hit_rate": ns_hits / ns_total if ns_total > 0 else 0.0,
+                "memory_entries": entries,
+                "memory_bytes": size,
+            }
+
+        return {
+            **_cache_stats,
+            "total_hits": total_hits,
+            "hit_rate": hit_rate,
+            "memory_size": len(_memory_cache),
+            "memory_bytes": _memory_cache.bytes,
+            "memory_max_entries": _memory_cache.max_entries,
+            "memory_max_bytes": _memory_cache.max_bytes,
+            "memory_evictions": _memory_cache.evictions,
+            "memory_expirations": _memory_cache.expirations,
+            "disk_size": len(cast(Sized, disk_cache)) if disk_cache is not None else 0,
+            "namespaces": namespaces,
+        }
+
+
+# ---- cached(...) decorator ----
+
+_flight_guard = Lock()
+_sync_flights: Dict[str, list] = {}
+_async_flights: Dict[Tuple[int, str], list] = {}
+
+# Delete the lock only if we still own it
+_REDIS_UNLOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _flight_acquire_ref(table: Dict[Any, list], key: Any, factory: Callable[[], Any]) -> Any:
+    """Per-key lock that exists only while someone holds or waits on it."""
+    with _flight_guard:
+        ref = table.get(key)
+        if ref is None:
+            ref = table[key] = [factory(), 0]
+        ref[1] += 1
+        return ref[0]
+
+
+def _flight_release_ref(table: Dict[Any, list], key: Any) -> None:
+    with _flight_guard:
+        ref = table[key]
+        ref[1] -= 1
+        if ref[1] == 0:
+            del table[key]
+
+
+def _redis_lock_acquire(cache_key: str, timeout_seconds: float) -> Optional[str]:
+    """Try to take the cross-process lock; token on success, "" if Redis is unavailable, None if held elsewhere."""
+    redis_client = _get_redis_client()
+    if not redis_client:
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        if redis_client.set(f"lock:{cache_key}", token, nx=True, px=int(timeout_seconds * 1000)):
+            return token
+        return None
+    except Exception:
+        return ""
+
+
+def _redis_lock_release(cache_key: str, token: Optional[str]) -> None:
+    redis_client = _get_redis_client()
+    if not token or not redis_client:
+        return
+    try:
+        redis_client.eval(_REDIS_UNLOCK_SCRIPT, 1, f"lock:{cache_key}", token)
+    except Exception:
+        pass
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (list, tuple, dict, set, str)) and len(value) == 0)
+
+
+def cached(
+    cache_name: str,
+    key: Callable[..., Tuple[Any, ...]],
+    ttl_seconds: int = 300,
+    stale_ttl_seconds: int = 0,
+    negative_ttl_seconds: Optional[int] = None,
+    is_empty: Callable[[Any], bool] = _is_empty,
+    distributed_lock: bool = False,
+    lock_timeout_seconds: float = 30.0,
+):
+    """
+    Decorator that caches a function's result with get_cached/set_cached.
+
+    Works on sync and async functions. Only one caller per key recomputes at a time
+    (single-flight); concurrent callers wait for its result instead of repeating the
+    work. Exceptions are never cached.
+
+    Args:
+        cache_name: Cache namespace (invalidate with invalidate_cache_pattern(cache_name))
+        key: Called with the function's arguments; returns the key parts after cache_name
+        ttl_seconds: How long a result is fresh
+        stale_ttl_seconds: How long after that an expired result is still served while
+            one caller refreshes it (stale-while-revalidate); also served if the refresh fails
+        negative_ttl_seconds: TTL for empty results (see is_empty). None caches them like
+            any other result, 0 never caches them
+        is_empty: Which results count as empty
+        distributed_lock: Also coalesce across processes with a Redis lock (when Redis is
+            available); callers that lose the race poll the cache until lock_timeout_seconds
+        lock_timeout_seconds: Expiry of the Redis lock, and how long losers wait on it
+    """
+    def decorator(func: Callable) -> Callable:
+        def lookup(parts: Tuple[Any, ...]) -> Tuple[bool, Any, bool]:
+            """(found, value, fresh)"""
+            entry = get_cached(cache_name, *parts)
+            if not isinstance(entry, dict) or "fresh_until" not in entry:
+                return False, None, False
+            return True, entry["value"], time.time() < entry["fresh_until"]
+
+        def store(parts: Tuple[Any, ...], value: Any) -> None:
+            ttl = ttl_seconds
+            if is_empty(value) and negative_ttl_seconds is not None:
+                if negative_ttl_seconds <= 0:
+                    return
+                ttl = negative_ttl_seconds
+                with _cache_lock:
+                    _count(cache_name, "negative_sets")
+            entry = {"value": value, "fresh_until": time.time() + ttl}
+            set_cached(cache_name, entry, *parts, ttl_seconds=ttl + stale_ttl_seconds)
+
+        async def alookup(parts: Tuple[Any, ...]) -> Tuple[bool, Any, bool]:
+            entry = await aget_cached(cache_name, *parts)
+            if not isinstance(entry, dict) or "fresh_until" not in entry:
+                return False, None, False
+            return True, entry["value"], time.time() < entry["fresh_until"]
+
+        async def astore(parts: Tuple[Any, ...], value: Any) -> None:
+            await asyncio.to_thread(store, parts, value)
+
+        def serve_stale(value: Any) -> Any:
+            with _cache_lock:
+                _count(cache_name, "stale_served")
+            return value
+
+        def coalesced(value: Any) -> Any:
+            with _cache_lock:
+                _count(cache_name, "coalesced")
+            return value
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                parts = tuple(key(*args, **kwargs))
+                found, value, fresh = await alookup(parts)
+                if fresh:
+                    return value
+                cache_key = _make_key(cache_name, *parts)
+                flight = (id(asyncio.get_running_loop()), cache_key)
+                lock = _flight_acquire_ref(_async_flights, flight, asyncio.Lock)
+                try:
+                    if found and lock.locked():
+                        return serve_stale(value)  # Someone in this process is refreshing it
+                    async with lock:
+                        found_now, value_now, fresh_now = await alookup(parts)
+                        if fresh_now:
+                            return coalesced(value_now)
+                        if found_now:
+                            found, value = True, value_now
+                        token = ""
+                        if distributed_lock:
+                            token = await asyncio.to_thread(_redis_lock_acquire, cache_key, lock_timeout_seconds)
+                            if token is None:
+                                if found:
+                                    return serve_stale(value)  # Another process is refreshing it
+                                deadline = time.monotonic() + lock_timeout_seconds
+                                while time.monotonic() < deadline:
+                                    await asyncio.sleep(0.05)
+                                    found_now, value_now, fresh_now = await alookup(parts)
+                                    if fresh_now:
+                                        return coalesced(value_now)
+                        try:
+                            result = await func(*args, **kwargs)
+                        except Exception as e:
+                            if not found:
+                                raise
+                            logger.warning(f"Refreshing cached {cache_name} failed, serving stale value: {e}")
+                            return serve_stale(value)
+                        finally:
+                            if token:
+                                await asyncio.to_thread(_redis_lock_release, cache_key, token)
+                        await astore(parts, result)
+                        return result
+                finally:
+                    _flight_release_ref(_async_flights, flight)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            parts = tuple(key(*args, **kwargs))
+            found, value, fresh = lookup(parts)
+            if fresh:
+                return value
+            cache_key = _make_key(cache_name, *parts)
+            lock = _flight_acquire_ref(_sync_flights, cache_key, threading.Lock)
+            try:
+                if not lock.acquire(blocking=not found):
+                    return serve_stale(value)  # Someone in this process is refreshing it
+                try:
+                    found_now, value_now, fresh_now = lookup(parts)
+                    if fresh_now:
+                        return coalesced(value_now)
+                    if found_now:
+                        found, value = True, value_now
+                    token = ""
+                    if distributed_lock:
+                        token = _redis_lock_acquire(cache_key, lock_timeout_seconds)
+                        if token is None:
+                            if found:
+                                return serve_stale(value)  # Another process is refreshing it
+                            deadline = time.monotonic() + lock_timeout_seconds
+                            while time.monotonic() < deadline:
+                                time.sleep(0.05)
+                                found_now, value_now, fresh_now = lookup(parts)
+                                if fresh_now:
+                                    return coalesced(value_now)
+                    try:
+                        result = func(*args, **kwargs)
+                    except Exception as e:
+                        if not found:
+                            raise
+                        logger.warning(f"Refreshing cached {cache_name} failed, serving stale value: {e}")
+                        return serve_stale(value)
+                    finally:
+                        if token:
+                            _redis_lock_release(cache_key, token)
+                    store(parts, result)
+                    return result
+                finally:
+                    lock.release()
+            finally:
+                _flight_release_ref(_sync_flights, cache_key)
 
+        return wrapper
+    return decorator
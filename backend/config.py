@@ -88,11 +88,16 @@ REQUEST_TIMEOUT_SECONDS = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "300"))  #
 NEO4J_QUERY_TIMEOUT_SECONDS = float(os.getenv("NEO4J_QUERY_TIMEOUT_SECONDS", "60"))  # 1 minute default
 DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "20"))
 MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+# Import API router modules on first request instead of at startup (see router_registry.py)
+LAZY_ROUTER_LOADING = os.getenv("LAZY_ROUTER_LOADING", "false").lower() in ("true", "1", "yes")
+# In lazy mode, import the remaining routers in the background once the app has started
+LAZY_ROUTER_WARMUP = os.getenv("LAZY_ROUTER_WARMUP", "true").lower() in ("true", "1", "yes")
 
 # Voice agent performance configuration
 VOICE_AGENT_CACHE_TTL_SECONDS = int(os.getenv("VOICE_AGENT_CACHE_TTL_SECONDS", "300"))  # 5 minutes
 VOICE_SESSION_HISTORY_LIMIT = int(os.getenv("VOICE_SESSION_HISTORY_LIMIT", "20"))  # Keep last 20 interactions
 VOICE_CONTEXT_MAX_LENGTH = int(os.getenv("VOICE_CONTEXT_MAX_LENGTH", "2000"))  # Max context chars
+VOICE_GRAPHRAG_COMMUNITY_K = int(os.getenv("VOICE_GRAPHRAG_COMMUNITY_K", "5"))  # Communities per GraphRAG lookup
 VOICE_MEMORY_CONTEXT_MAX_LENGTH = int(os.getenv("VOICE_MEMORY_CONTEXT_MAX_LENGTH", "1000"))  # Max memory context chars
 VOICE_CONCEPT_EXTRACTION_MAX_TOKENS = int(os.getenv("VOICE_CONCEPT_EXTRACTION_MAX_TOKENS", "500"))
 VOICE_ARTICLE_TEXT_MAX_LENGTH = int(os.getenv("VOICE_ARTICLE_TEXT_MAX_LENGTH", "50000"))  # Max article text to index
@@ -1,7 +1,23 @@
-from neo4j import GraphDatabase
+"""
+Neo4j driver lifecycle.
+
+The pooled driver is created once and kept hot. Connectivity is verified at startup
+(start_neo4j_connection_manager) and by a periodic background probe, never on the
+session acquisition path. After a connection error the driver is reset and rebuilt
+lazily on next use.
+
+Async routes use a second pooled driver (neo4j.AsyncGraphDatabase) with the same
+settings via get_async_neo4j_session(), so they never block the event loop or hold a
+threadpool slot while waiting on Neo4j.
+"""
+import asyncio
+from neo4j import AsyncGraphDatabase, GraphDatabase
 from neo4j.exceptions import SessionExpired, ServiceUnavailable, TransientError, DriverError
-from typing import Generator, Optional
-from contextlib import contextmanager
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+import os
+import threading
 import time
 import logging
 
@@ -10,43 +26,253 @@ from config import NEO4J_DATABASE, NEO4J_QUERY_TIMEOUT_SECONDS
 
 logger = logging.getLogger(__name__)
 
-_driver: Optional[GraphDatabase.driver] = None
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "50"))
+NEO4J_HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("NEO4J_HEALTH_PROBE_INTERVAL_SECONDS", "30"))
 
 
-def _get_driver():
-    """Get or create the Neo4j driver, with lazy validation."""
-    global _driver
-    if _driver is None:
+class Neo4jConnectionManager:
+    """Owns the process-wide driver, its background health probe and pool metrics."""
+
+    def __init__(self, probe_interval: float = NEO4J_HEALTH_PROBE_INTERVAL_SECONDS):
+        self.probe_interval = probe_interval
+        self._driver = None
+        self._async_driver = None
+        # Async drivers dropped outside the event loop; closed on the next async use.
+        self._retired_async: List[Any] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Any] = {
+            "drivers_created": 0,
+            "resets": 0,
+            "defunct_resets": 0,
+            "last_reset_reason": None,
+            "acquisitions": 0,
+            "acquisition_errors": 0,
+            "acquire_total_ms": 0.0,
+            "acquire_max_ms": 0.0,
+            "healthy": None,
+            "last_probe_at": None,
+            "last_probe_ms": None,
+            "probe_failures": 0,
+            "last_error": None,
+        }
+
+    def _create_driver(self, factory=GraphDatabase):
         if not NEO4J_PASSWORD:
             raise ValueError(
                 "NEO4J_PASSWORD environment variable is required. "
                 "Please set it in your .env.local file (see .env.example for reference)."
             )
-        _driver = GraphDatabase.driver(
+        driver = factory.driver(
             NEO4J_URI,
             auth=(NEO4J_USER, NEO4J_PASSWORD),
             max_connection_lifetime=600,
-            max_connection_pool_size=50,
+            max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE,
             connection_acquisition_timeout=30,
             keep_alive=True,
         )
+        self._instrument_pool(driver)
+        self._stats["drivers_created"] += 1
+        return driver
 
-    try:
-        _driver.verify_connectivity()
-    except Exception:
+    def _record_acquire(self, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self._stats["acquisitions"] += 1
+        self._stats["acquire_total_ms"] += elapsed_ms
+        self._stats["acquire_max_ms"] = max(self._stats["acquire_max_ms"], elapsed_ms)
+
+    def _instrument_pool(self, driver) -> None:
+        """Time connection acquisition from the driver's pool (best effort, private API)."""
+        pool = getattr(driver, "_pool", None)
+        acquire = getattr(pool, "acquire", None)
+        if not callable(acquire):
+            return
+
+        if asyncio.iscoroutinefunction(acquire):
+            async def timed_acquire(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await acquire(*args, **kwargs)
+                except Exception:
+                    self._stats["acquisition_errors"] += 1
+                    raise
+                finally:
+                    self._record_acquire(started)
+        else:
+            def timed_acquire(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return acquire(*args, **kwargs)
+                except Exception:
+                    self._stats["acquisition_errors"] += 1
+                    raise
+                finally:
+                    self._record_acquire(started)
+
+        pool.acquire = timed_acquire
+
+    def driver(self):
+        """The pooled driver, created on first use. No network round trip."""
+        driver = self._driver
+        if driver is not None:
+            return driver
+        with self._lock:
+            if self._driver is None:
+                self._driver = self._create_driver()
+            return self._driver
+
+    def async_driver(self):
+        """The pooled async driver for use inside the app's event loop, created on first use."""
+        if self._retired_async:
+            self._close_retired_async()
+        driver = self._async_driver
+        if driver is not None:
+            return driver
+        with self._lock:
+            if self._async_driver is None:
+                self._async_driver = self._create_driver(AsyncGraphDatabase)
+            return self._async_driver
+
+    def _close_retired_async(self) -> None:
+        with self._lock:
+            retired, self._retired_async = self._retired_async, []
+        for driver in retired:
+            asyncio.get_running_loop().create_task(driver.close())
+
+    def reset(self, reason: str = "") -> None:
+        """Close the drivers after a connection error; the next driver() call rebuilds them."""
+        with self._lock:
+            driver, self._driver = self._driver, None
+            async_driver, self._async_driver = self._async_driver, None
+            if driver is None and async_driver is None:
+                return
+            if async_driver is not None:
+                self._retired_async.append(async_driver)
+            self._stats["resets"] += 1
+            if "defunct" in reason.lower():
+                self._stats["defunct_resets"] += 1
+            self._stats["last_reset_reason"] = reason[:200] or None
+        if driver is not None:
+            try:
+                driver.close()
+            except Exception:
+                pass
+        if async_driver is not None:
+            try:
+                self._close_retired_async()
+            except RuntimeError:
+                pass  # No running loop (probe thread); closed on next async use or aclose()
+
+    def verify(self) -> bool:
+        """One connectivity round trip; resets the driver on failure."""
+        started = time.perf_counter()
         try:
-            _driver.close()
-        except Exception:
-            pass
-        _driver = GraphDatabase.driver(
-            NEO4J_URI,
-            auth=(NEO4J_USER, NEO4J_PASSWORD),
-            max_connection_lifetime=600,
-            max_connection_pool_size=50,
-            connection_acquisition_timeout=30,
-            keep_alive=True,
-        )
-    return _driver
+            self.driver().verify_connectivity()
+            ok = True
+        except Exception as e:
+            ok = False
+            self._stats["probe_failures"] += 1
+            self._stats["last_error"] = str(e)[:200]
+            logger.warning(f"Neo4j connectivity check failed: {e}")
+            self.reset(f"health probe: {e}")
+        self._stats["healthy"] = ok
+        self._stats["last_probe_at"] = datetime.utcnow().isoformat() + "Z"
+        self._stats["last_probe_ms"] = (time.perf_counter() - started) * 1000.0
+        return ok
+
+    def start_probe(self) -> None:
+        if self.probe_interval <= 0 or (self._probe_thread and self._probe_thread.is_alive()):
+            return
+        self._stop.clear()
+
+        def probe():
+            while not self._stop.wait(self.probe_interval):
+                self.verify()
+
+        self._probe_thread = threading.Thread(target=probe, name="neo4j-health-probe", daemon=True)
+        self._probe_thread.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._probe_thread:
+            self._probe_thread.join(timeout=5.0)
+            self._probe_thread = None
+        self.reset()
+
+    async def aclose(self) -> None:
+        """Close the async driver(s); call from the event loop at shutdown."""
+        with self._lock:
+            drivers = self._retired_async + ([self._async_driver] if self._async_driver else [])
+            self._retired_async, self._async_driver = [], None
+        for driver in drivers:
+            try:
+                await driver.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _pool_usage(driver) -> Dict[str, Any]:
+        pool = getattr(driver, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        in_use = idle = 0
+        if connections is not None:
+            for conns in list(connections.values()):
+                for conn in list(conns):
+                    if getattr(conn, "in_use", False):
+                        in_use += 1
+                    else:
+                        idle += 1
+        return {
+            "connected": driver is not None,
+            "in_use": in_use,
+            "idle": idle,
+            "max_size": NEO4J_MAX_CONNECTION_POOL_SIZE,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        acquisitions = stats.pop("acquisitions")
+        total_ms = stats.pop("acquire_total_ms")
+        stats["acquisition"] = {
+            "count": acquisitions,
+            "errors": stats.pop("acquisition_errors"),
+            "avg_wait_ms": total_ms / acquisitions if acquisitions else 0.0,
+            "max_wait_ms": stats.pop("acquire_max_ms"),
+        }
+        stats["pool"] = self._pool_usage(self._driver)
+        stats["async_pool"] = self._pool_usage(self._async_driver)
+        return stats
+
+
+_manager = Neo4jConnectionManager()
+
+
+def _get_driver():
+    """Get or create the pooled Neo4j driver (connectivity is checked by the health probe)."""
+    return _manager.driver()
+
+
+def start_neo4j_connection_manager(verify: bool = True) -> bool:
+    """Verify connectivity once at startup and start the periodic health probe."""
+    healthy = _manager.verify() if verify else True
+    _manager.start_probe()
+    return healthy
+
+
+def close_neo4j_driver() -> None:
+    """Stop the health probe and close the driver (app shutdown)."""
+    _manager.close()
+
+
+async def close_neo4j_async_driver() -> None:
+    """Close the async driver (app shutdown, from the event loop)."""
+    await _manager.aclose()
+
+
+def get_neo4j_pool_stats() -> Dict[str, Any]:
+    """Pool usage, acquisition wait times, resets and last probe result."""
+    return _manager.stats()
 
 
 def retry_neo4j_operation(func, max_retries=3, delay=1):
@@ -67,13 +293,7 @@ def retry_neo4j_operation(func, max_retries=3, delay=1):
                 raise
             
             # Reset the driver on connection errors
-            global _driver
-            if _driver:
-                try:
-                    _driver.close()
-                except Exception:
-                    pass
-                _driver = None
+            _manager.reset(str(e))
             
             time.sleep(delay * (attempt + 1))  # Exponential backoff
         except Exception as e:
@@ -103,13 +323,8 @@ def get_neo4j_session() -> Generator:
 
     except Exception as e:
         logger.error(f"Failed to create Neo4j session after retries: {e}")
-        global _driver
-        try:
-            if _driver:
-                _driver.close()
-        except Exception:
-            pass
-        _driver = None
+        if isinstance(e, (SessionExpired, ServiceUnavailable, ConnectionResetError, DriverError)):
+            _manager.reset(str(e))
         raise
     finally:
         if session:
@@ -136,6 +351,41 @@ def neo4j_session():
             pass
 
 
+async def get_async_neo4j_session() -> AsyncGenerator:
+    """
+    FastAPI dependency that yields a neo4j.AsyncSession pinned to NEO4J_DATABASE.
+
+    Use from `async def` routes together with the *_async service functions
+    (see neo4j_query.run_plan_async).
+    """
+    session = None
+    try:
+        session = _manager.async_driver().session(database=NEO4J_DATABASE, fetch_size=1000)
+        yield session
+    except Exception as e:
+        if isinstance(e, (SessionExpired, ServiceUnavailable, ConnectionResetError, DriverError)):
+            logger.error(f"Neo4j async session failed: {e}")
+            _manager.reset(str(e))
+        raise
+    finally:
+        if session is not None:
+            try:
+                await session.close()
+            except Exception:
+                pass
+
+
+@asynccontextmanager
+async def async_neo4j_session():
+    """Async context manager counterpart of neo4j_session() for non-route code."""
+    session_gen = get_async_neo4j_session()
+    session = await session_gen.__anext__()
+    try:
+        yield session
+    finally:
+        await session_gen.aclose()
+
+
 def get_driver():
     """Get the Neo4j driver (for scripts that need direct access)."""
     return _get_driver()
@@ -1,110 +1,243 @@
-"""Background task processing for event projection."""
-import asyncio
+"""Background task processing for event projection.
+
+Projection work is coalesced per (session_id, projector): a burst of events on one
+session results in a single projection run once the burst settles.
+
+- enqueue() marks the key pending and (re)arms a debounce timer of
+  PROJECTION_DEBOUNCE_MS, capped at PROJECTION_MAX_DELAY_MS after the first enqueue so
+  a steady stream still gets projected.
+- PROJECTION_WORKERS threads run due tasks. A session is only ever processed by one
+  worker at a time, and tasks for a session run in the order they became pending.
+- Work enqueued while a session is being projected stays pending and runs afterwards,
+  so the last event of a burst is never dropped.
+- stop_worker() drains pending work (ignoring the debounce) before stopping.
+"""
 import logging
-from typing import Set, Optional
-from datetime import datetime
-from queue import Queue, Empty
-from threading import Thread
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger("brain_web")
 
+PROJECTION_WORKERS = int(os.getenv("PROJECTION_WORKERS", "2"))
+PROJECTION_DEBOUNCE_MS = int(os.getenv("PROJECTION_DEBOUNCE_MS", "250"))
+PROJECTION_MAX_DELAY_MS = int(os.getenv("PROJECTION_MAX_DELAY_MS", "2000"))
+
+TaskKey = Tuple[str, str]
+
+
+def run_projection(session_id: str, projector_name: str) -> None:
+    """Run one projector for one session, persisting to the Neo4j read model."""
+    from db_neo4j import get_neo4j_session
+
+    neo4j_session = next(get_neo4j_session())
+    try:
+        if projector_name == "session_context":
+            from projectors.session_context import SessionContextProjector
+            SessionContextProjector().project_and_save(session_id, neo4j_session)
+            # Note: WebSocket notifications are handled separately
+            # Clients can poll or we can add async bridge later
+        elif projector_name == "user_preferences":
+            from projectors.user_preferences import UserPreferencesProjector
+            UserPreferencesProjector().update_preferences(session_id, neo4j_session)
+        else:
+            raise ValueError(f"Unknown projector: {projector_name}")
+    finally:
+        neo4j_session.close()
+    logger.debug(f"Projected {projector_name} for session {session_id}")
+
 
 class ProjectionTaskQueue:
-    """Simple in-memory task queue for projection tasks."""
-    
-    def __init__(self):
+    """Coalescing, debounced projection scheduler with a small worker pool."""
+
+    def __init__(
+        self,
+        workers: int = PROJECTION_WORKERS,
+        debounce_ms: int = PROJECTION_DEBOUNCE_MS,
+        max_delay_ms: int = PROJECTION_MAX_DELAY_MS,
+        runner=run_projection,
+    ):
         """Initialize task queue."""
-        self.queue: Queue = Queue()
-        self.processing: Set[str] = set()  # Track sessions being processed
-        self.worker_thread: Optional[Thread] = None
+        self.workers = max(1, int(workers))
+        self.debounce = max(0, debounce_ms) / 1000.0
+        self.max_delay = max(self.debounce, max_delay_ms / 1000.0)
+        self.runner = runner
+        # key -> {"first": monotonic ts of first enqueue, "due": monotonic ts to run at}
+        self._pending: "OrderedDict[TaskKey, Dict[str, float]]" = OrderedDict()
+        self.processing: Set[str] = set()  # Sessions currently being projected
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
         self.running = False
-    
+        self._draining = False
+        self._stats: Dict[str, Any] = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "processed": 0,
+            "failed": 0,
+            "max_lag_ms": 0.0,
+        }
+        self._latency: Dict[str, Dict[str, float]] = {}
+
     def enqueue(self, session_id: str, projector_name: str = "session_context"):
         """
         Enqueue a projection task.
-        
+
         Args:
             session_id: Session to project
             projector_name: Name of projector to run
         """
-        if session_id not in self.processing:
-            self.queue.put((session_id, projector_name))
-            logger.debug(f"Enqueued projection task for session {session_id}")
-    
+        key = (session_id, projector_name)
+        now = time.monotonic()
+        with self._cond:
+            self._stats["enqueued"] += 1
+            task = self._pending.get(key)
+            if task is None:
+                self._pending[key] = {"first": now, "due": now + self.debounce}
+            else:
+                self._stats["coalesced"] += 1
+                task["due"] = min(task["first"] + self.max_delay, now + self.debounce)
+            self._cond.notify()
+        logger.debug(f"Enqueued projection task for session {session_id}")
+
+    def _next_task(self) -> Tuple[Optional[TaskKey], Optional[float]]:
+        """Oldest due task whose session is idle, else (None, seconds until one may be due)."""
+        now = time.monotonic()
+        wait: Optional[float] = None
+        blocked: Set[str] = set()
+        for key, task in self._pending.items():
+            session_id = key[0]
+            if session_id in self.processing or session_id in blocked:
+                # Keep per-session order: later tasks for this session wait as well
+                blocked.add(session_id)
+                continue
+            if self._draining or task["due"] <= now:
+                return key, None
+            blocked.add(session_id)
+            remaining = task["due"] - now
+            wait = remaining if wait is None else min(wait, remaining)
+        return None, wait
+
+    def _worker(self):
+        """Worker thread that processes tasks."""
+        while True:
+            with self._cond:
+                while True:
+                    if not self.running:
+                        return
+                    key, wait = self._next_task()
+                    if key is not None:
+                        break
+                    self._cond.wait(wait)
+                task = self._pending.pop(key)
+                session_id, projector_name = key
+                self.processing.add(session_id)
+                lag_ms = (time.monotonic() - task["first"]) * 1000.0
+                self._stats["max_lag_ms"] = max(self._stats["max_lag_ms"], lag_ms)
+
+            started = time.perf_counter()
+            ok = True
+            try:
+                self.runner(session_id, projector_name)
+            except Exception as e:
+                ok = False
+                logger.error(f"Failed to project {projector_name} for session {session_id}: {e}", exc_info=True)
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+            with self._cond:
+                self.processing.discard(session_id)
+                self._stats["processed" if ok else "failed"] += 1
+                s = self._latency.setdefault(projector_name, {"runs": 0, "total_ms": 0.0, "max_ms": 0.0})
+                s["runs"] += 1
+                s["total_ms"] += elapsed_ms
+                s["max_ms"] = max(s["max_ms"], elapsed_ms)
+                s["last_ms"] = elapsed_ms
+                self._cond.notify_all()
+
     def start_worker(self):
-        """Start background worker thread."""
-        if self.running:
-            return
-        
-        self.running = True
-        
-        def worker():
-            """Worker thread that processes tasks."""
-            while self.running:
-                try:
-                    session_id, projector_name = self.queue.get(timeout=1.0)
-                    self.processing.add(session_id)
-                    
-                    try:
-                        if projector_name == "session_context":
-                            from projectors.session_context import SessionContextProjector
-                            from db_neo4j import get_neo4j_session
-                            projector = SessionContextProjector()
-                            # Get Neo4j session for read model persistence
-                            neo4j_session = next(get_neo4j_session())
-                            try:
-                                projector.project_and_save(session_id, neo4j_session)
-                                
-                                # Note: WebSocket notifications are handled separately
-                                # Clients can poll or we can add async bridge later
-                            finally:
-                                neo4j_session.close()
-                            logger.debug(f"Projected context for session {session_id}")
-                        elif projector_name == "user_preferences":
-                            from projectors.user_preferences import UserPreferencesProjector
-                            projector = UserPreferencesProjector()
-                            projector.update_preferences(session_id)
-                            logger.debug(f"Projected preferences for session {session_id}")
-                    except Exception as e:
-                        logger.error(f"Failed to project {projector_name} for session {session_id}: {e}", exc_info=True)
-                    finally:
-                        self.processing.discard(session_id)
-                        self.queue.task_done()
-                        
-                except Empty:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error in projection worker: {e}", exc_info=True)
-        
-        self.worker_thread = Thread(target=worker, daemon=True)
-        self.worker_thread.start()
-        logger.info("Projection task queue worker started")
-    
-    def stop_worker(self):
-        """Stop background worker thread."""
-        self.running = False
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5.0)
+        """Start background worker threads."""
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+            self._draining = False
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"projection-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for t in self._threads:
+            t.start()
+        logger.info(f"Projection task queue started ({self.workers} workers)")
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Run all pending work now (ignoring debounce) and wait for it. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._draining = True
+            self._cond.notify_all()
+            try:
+                while self.running and (self._pending or self.processing):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return not self._pending and not self.processing
+            finally:
+                self._draining = False
+
+    def stop_worker(self, drain_timeout: float = 10.0):
+        """Drain pending projections, then stop the worker threads."""
+        if self.running and not self.drain(drain_timeout):
+            logger.warning(f"Projection queue stopped with {len(self._pending)} pending tasks")
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=5.0)
+        self._threads = []
         logger.info("Projection task queue worker stopped")
 
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, lag of the oldest pending task and per-projector latency."""
+        now = time.monotonic()
+        with self._cond:
+            oldest = min((t["first"] for t in self._pending.values()), default=None)
+            return {
+                **self._stats,
+                "depth": len(self._pending),
+                "in_flight": len(self.processing),
+                "lag_ms": (now - oldest) * 1000.0 if oldest is not None else 0.0,
+                "workers": len([t for t in self._threads if t.is_alive()]),
+                "debounce_ms": self.debounce * 1000.0,
+                "latency": {
+                    name: {**s, "avg_ms": s["total_ms"] / s["runs"] if s["runs"] else 0.0}
+                    for name, s in self._latency.items()
+                },
+            }
+
 
 # Global task queue instance
 _task_queue: Optional[ProjectionTaskQueue] = None
+_task_queue_lock = threading.Lock()
 
 
 def get_task_queue() -> ProjectionTaskQueue:
     """Get or create global task queue."""
     global _task_queue
     if _task_queue is None:
-        _task_queue = ProjectionTaskQueue()
-        _task_queue.start_worker()
+        with _task_queue_lock:
+            if _task_queue is None:
+                queue = ProjectionTaskQueue()
+                queue.start_worker()
+                _task_queue = queue
     return _task_queue
 
 
 def enqueue_projection(session_id: str, projector_name: str = "session_context"):
     """
     Enqueue a projection task to run in background.
-    
+
     Args:
         session_id: Session to project
         projector_name: Name of projector to run
@@ -112,3 +245,9 @@ def enqueue_projection(session_id: str, projector_name: str = "session_context")
     queue = get_task_queue()
     queue.enqueue(session_id, projector_name)
 
+
+def get_projection_queue_stats() -> Dict[str, Any]:
+    """Stats of the global projection queue (empty dict if it was never started)."""
+    if _task_queue is None:
+        return {}
+    return _task_queue.stats()
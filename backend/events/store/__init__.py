@@ -1,6 +1,5 @@
 """Event store implementations."""
 from .base import EventStore
-from .factory import get_event_store
-
-__all__ = ["EventStore", "get_event_store"]
+from .factory import get_event_store, get_event_store_stats, shutdown_event_stores
 
+__all__ = ["EventStore", "get_event_store", "get_event_store_stats", "shutdown_event_stores"]
@@ -1,44 +1,324 @@
-"""Factory for creating event store instances."""
+"""Factory for creating event store instances.
+
+Stores are built (and their schema migrated) once per process and configuration,
+then reused by every get_event_store() call. Each store is wrapped so that call
+counts, errors and latencies are available via get_event_store_stats().
+
+If PostgreSQL is configured but cannot be initialized, the SQLite fallback is
+used meanwhile and PostgreSQL is retried with exponential backoff
+(EVENTS_POSTGRES_RETRY_SECONDS doubling up to EVENTS_POSTGRES_RETRY_MAX_SECONDS).
+On recovery the events appended to SQLite during the outage are replayed into
+PostgreSQL (appends are idempotent) before it takes over; anything that could not
+be replayed is reported under "recovered_from_fallback" in get_event_store_stats().
+"""
 import os
-from typing import Optional
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
 from .base import EventStore
 from .dynamodb import DynamoDBEventStore
 from .sqlite import SQLiteEventStore
+from ..schema import EventEnvelope
 # Lazy import PostgresEventStore to avoid requiring psycopg2 if not using Postgres
 
+EVENTS_POSTGRES_RETRY_SECONDS = float(os.getenv("EVENTS_POSTGRES_RETRY_SECONDS", "5"))
+EVENTS_POSTGRES_RETRY_MAX_SECONDS = float(os.getenv("EVENTS_POSTGRES_RETRY_MAX_SECONDS", "300"))
+EVENTS_FALLBACK_REPLAY_BATCH = int(os.getenv("EVENTS_FALLBACK_REPLAY_BATCH", "500"))
+
+
+class InstrumentedEventStore(EventStore):
+    """Delegates to a concrete store and records per-operation latency and errors."""
+
+    def __init__(
+        self,
+        inner: EventStore,
+        backend: str,
+        init_ms: float,
+        fallback: Optional[Dict[str, Any]] = None,
+    ):
+        self.inner = inner
+        self.backend = backend
+        self.init_ms = init_ms
+        self.created_at = datetime.utcnow()
+        self._lock = threading.Lock()
+        self._ops: Dict[str, Dict[str, Any]] = {}
+        # Set when this store stands in for a backend that failed to initialize:
+        # {"from", "reason", "retryable", "attempts", "retry_delay_s", "next_retry_at",
+        #  "replay_from_rowid"}
+        self.fallback = fallback
+        # Set on a store that took over from a fallback: {"from", "replayed", "unreplayed_after_rowid", "error"}
+        self.recovered_from_fallback: Optional[Dict[str, Any]] = None
+
+    def retry_due(self) -> bool:
+        fallback = self.fallback
+        return bool(fallback and fallback["retryable"] and time.monotonic() >= fallback["next_retry_at"])
+
+    def retry_failed(self, error: Exception) -> None:
+        fallback = self.fallback
+        if fallback is None:
+            return
+        fallback["attempts"] += 1
+        fallback["reason"] = str(error)[:200]
+        fallback["retry_delay_s"] = min(fallback["retry_delay_s"] * 2, EVENTS_POSTGRES_RETRY_MAX_SECONDS)
+        fallback["next_retry_at"] = time.monotonic() + fallback["retry_delay_s"]
+        print(
+            f"WARNING: {fallback['from']} event store still unavailable (attempt {fallback['attempts']}): {error}; "
+            f"retrying in {fallback['retry_delay_s']:.0f}s"
+        )
+
+    def _record(self, op: str, started: float, error: Optional[Exception] = None) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            s = self._ops.setdefault(
+                op, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_error": None}
+            )
+            s["calls"] += 1
+            s["total_ms"] += elapsed_ms
+            s["max_ms"] = max(s["max_ms"], elapsed_ms)
+            if error is not None:
+                s["errors"] += 1
+                s["last_error"] = str(error)[:200]
+
+    def _timed(self, op: str, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record(op, started, e)
+            raise
+        self._record(op, started)
+        return result
+
+    def append(self, event: EventEnvelope) -> None:
+        return self._timed("append", self.inner.append, event)
+
+    def list_events(
+        self,
+        session_id: str,
+        after_ts: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[EventEnvelope]:
+        return self._timed("list_events", self.inner.list_events, session_id, after_ts=after_ts, limit=limit)
+
+    def replay(self, session_id: str) -> List[EventEnvelope]:
+        return self._timed("replay", self.inner.replay, session_id)
+
+    def close(self) -> None:
+        close = getattr(self.inner, "close", None)
+        if callable(close):
+            close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ops = {
+                op: {
+                    **s,
+                    "avg_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0,
+                }
+                for op, s in self._ops.items()
+            }
+        errors = sum(s["errors"] for s in ops.values())
+        calls = sum(s["calls"] for s in ops.values())
+        stats: Dict[str, Any] = {
+            "backend": self.backend,
+            "init_ms": self.init_ms,
+            "created_at": self.created_at.isoformat() + "Z",
+            "healthy": calls == 0 or errors < calls,
+            "operations": ops,
+        }
+        if self.fallback is not None:
+            fallback = dict(self.fallback)
+            next_retry_at = fallback.pop("next_retry_at")
+            if fallback["retryable"]:
+                fallback["next_retry_in_s"] = max(0.0, next_retry_at - time.monotonic())
+            stats["fallback"] = fallback
+        if self.recovered_from_fallback is not None:
+            stats["recovered_from_fallback"] = dict(self.recovered_from_fallback)
+        inner_stats = getattr(self.inner, "stats", None)
+        if callable(inner_stats):
+            stats["store"] = inner_stats()
+        return stats
+
+
+_stores: Dict[Tuple[str, ...], InstrumentedEventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _config_key() -> Tuple[str, ...]:
+    ddb_table = os.getenv("EVENTS_DDB_TABLE", "").strip()
+    if ddb_table:
+        return ("dynamodb", ddb_table)
+    if os.getenv("EVENTS_POSTGRES", "false").lower() in ("true", "1", "yes"):
+        return ("postgres",)
+    return ("sqlite", os.getenv("EVENTS_SQLITE_PATH", "events.db"))
+
+
+def _build_postgres_store() -> EventStore:
+    # Lazy import to avoid requiring psycopg2 if not using Postgres
+    from .postgres import PostgresEventStore
+    return PostgresEventStore()
+
+
+def _build_event_store(key: Tuple[str, ...]) -> Tuple[EventStore, str, Optional[Dict[str, Any]]]:
+    """Build the store for key; the third item describes the fallback taken, if any."""
+    if key[0] == "dynamodb":
+        return DynamoDBEventStore(table_name=key[1]), "dynamodb", None
+
+    fallback = None
+    if key[0] == "postgres":
+        try:
+            return _build_postgres_store(), "postgres", None
+        except ImportError as e:
+            print(f"WARNING: psycopg2 not available, cannot use PostgreSQL event store: {e}")
+            print("Falling back to SQLite...")
+            fallback = {"reason": str(e)[:200], "retryable": False}
+        except Exception as e:
+            print(f"WARNING: Failed to initialize PostgreSQL event store: {e}")
+            print(f"Falling back to SQLite; retrying PostgreSQL in {EVENTS_POSTGRES_RETRY_SECONDS:.0f}s...")
+            fallback = {"reason": str(e)[:200], "retryable": True}
+        fallback.update(
+            {
+                "from": "postgres",
+                "attempts": 1,
+                "retry_delay_s": EVENTS_POSTGRES_RETRY_SECONDS,
+                "next_retry_at": time.monotonic() + EVENTS_POSTGRES_RETRY_SECONDS,
+            }
+        )
+
+    # Fall back to SQLite for dev
+    db_path = os.getenv("EVENTS_SQLITE_PATH", "events.db")
+    store = SQLiteEventStore(db_path=db_path)
+    if fallback is not None:
+        # Events written from here on are replayed into PostgreSQL when it recovers
+        fallback["replay_from_rowid"] = store.last_rowid()
+    return store, "sqlite", fallback
+
+
+def _replay_fallback(current: InstrumentedEventStore, target: EventStore) -> int:
+    """
+    Copy the events appended to a SQLite fallback since it took over into target.
+
+    Advances the fallback's replay_from_rowid page by page, so a failed replay resumes
+    where it stopped on the next retry. Returns the number of events replayed.
+    """
+    fallback = current.fallback
+    source = current.inner
+    if fallback is None or not isinstance(source, SQLiteEventStore):
+        return 0
+    flush = getattr(target, "flush", None)
+    replayed = 0
+    while True:
+        page = source.events_after_rowid(fallback["replay_from_rowid"], EVENTS_FALLBACK_REPLAY_BATCH)
+        if not page:
+            return replayed
+        for _, event in page:
+            target.append(event)
+        if callable(flush) and not flush(timeout=30.0):
+            raise RuntimeError("replayed events could not be flushed")
+        fallback["replay_from_rowid"] = page[-1][0]
+        replayed += len(page)
+
+
+def _retry_postgres(key: Tuple[str, ...], current: InstrumentedEventStore) -> InstrumentedEventStore:
+    """
+    Try to replace a SQLite fallback with PostgreSQL; keeps the fallback on failure.
+
+    The fallback's events are replayed first. Events appended to it while the swap
+    happens are picked up by a second pass; if that pass fails they stay in SQLite
+    only, and the gap is reported in the new store's stats.
+    """
+    started = time.perf_counter()
+    try:
+        inner = _build_postgres_store()
+    except Exception as e:
+        current.retry_failed(e)
+        return current
+    init_ms = (time.perf_counter() - started) * 1000.0
+    try:
+        replayed = _replay_fallback(current, inner)
+    except Exception as e:
+        close = getattr(inner, "close", None)
+        if callable(close):
+            close()
+        current.retry_failed(e)
+        return current
+    store = InstrumentedEventStore(inner, "postgres", init_ms)
+    _stores[key] = store
+    recovered: Dict[str, Any] = {
+        "from": current.backend,
+        "replayed": replayed,
+        "unreplayed_after_rowid": None,
+        "error": None,
+    }
+    store.recovered_from_fallback = recovered
+    try:
+        recovered["replayed"] += _replay_fallback(current, inner)
+    except Exception as e:
+        recovered["unreplayed_after_rowid"] = (current.fallback or {}).get("replay_from_rowid")
+        recovered["error"] = str(e)[:200]
+        print(
+            f"WARNING: events appended to the {current.backend} fallback after rowid "
+            f"{recovered['unreplayed_after_rowid']} were not replayed into PostgreSQL: {e}"
+        )
+    print(
+        f"PostgreSQL event store recovered; replayed {recovered['replayed']} events "
+        f"from the {current.backend} fallback"
+    )
+    try:
+        current.close()
+    except Exception as e:
+        print(f"WARNING: Failed to close {current.backend} fallback event store: {e}")
+    return store
+
 
 def get_event_store() -> EventStore:
     """
     Get the appropriate event store based on environment configuration.
-    
+
     Priority:
     1. DynamoDB if EVENTS_DDB_TABLE is set
     2. PostgreSQL if EVENTS_POSTGRES is set to "true"
     3. SQLite (dev fallback)
-    
+
+    The store is constructed (schema bootstrap included) on the first call for a
+    given configuration and reused afterwards. A SQLite store standing in for an
+    unreachable PostgreSQL is replaced once a backoff retry succeeds.
+
     Returns:
         EventStore instance
     """
-    ddb_table = os.getenv("EVENTS_DDB_TABLE", "").strip()
-    
-    if ddb_table:
-        return DynamoDBEventStore(table_name=ddb_table)
-    
-    use_postgres = os.getenv("EVENTS_POSTGRES", "false").lower() in ("true", "1", "yes")
-    if use_postgres:
+    key = _config_key()
+    store = _stores.get(key)
+    if store is not None and not store.retry_due():
+        return store
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            started = time.perf_counter()
+            inner, backend, fallback = _build_event_store(key)
+            store = InstrumentedEventStore(inner, backend, (time.perf_counter() - started) * 1000.0, fallback)
+            _stores[key] = store
+        elif store.retry_due():
+            store = _retry_postgres(key, store)
+    return store
+
+
+def get_event_store_stats() -> Dict[str, Any]:
+    """Health/latency metrics for every event store built in this process."""
+    with _stores_lock:
+        stores = list(_stores.items())
+    return {":".join(key): store.stats() for key, store in stores}
+
+
+def shutdown_event_stores() -> None:
+    """Flush and close all stores (buffered Postgres writes are drained here)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
         try:
-            # Lazy import to avoid requiring psycopg2 if not using Postgres
-            from .postgres import PostgresEventStore
-            return PostgresEventStore()
-        except ImportError as e:
-            print(f"WARNING: psycopg2 not available, cannot use PostgreSQL event store: {e}")
-            print("Falling back to SQLite...")
+            store.close()
         except Exception as e:
-            print(f"WARNING: Failed to initialize PostgreSQL event store: {e}")
-            print("Falling back to SQLite...")
-    
-    # Fall back to SQLite for dev
-    db_path = os.getenv("EVENTS_SQLITE_PATH", "events.db")
-    return SQLiteEventStore(db_path=db_path)
-
+            print(f"WARNING: Failed to close {store.backend} event store: {e}")
@@ -1,37 +1,159 @@
 """PostgreSQL + TimescaleDB implementation of event store."""
+import atexit
 import json
-from typing import List, Optional
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from datetime import datetime
 import psycopg2
 from psycopg2.extras import execute_values, RealDictCursor
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
 from ..schema import EventEnvelope, ObjectRef
 from .base import EventStore
 from config import POSTGRES_CONNECTION_STRING
 
 
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("true", "1", "yes")
+
+
+EVENTS_PG_POOL_MIN = int(os.getenv("EVENTS_PG_POOL_MIN", "1"))
+EVENTS_PG_POOL_MAX = int(os.getenv("EVENTS_PG_POOL_MAX", "10"))
+# How long a caller waits for a pooled connection before giving up
+EVENTS_PG_POOL_TIMEOUT_SECONDS = float(os.getenv("EVENTS_PG_POOL_TIMEOUT_SECONDS", "10"))
+# Buffered (group-commit) mode: append() only enqueues; a flusher thread writes batches.
+EVENTS_PG_BUFFERED = _env_flag("EVENTS_PG_BUFFERED")
+EVENTS_PG_BATCH_SIZE = int(os.getenv("EVENTS_PG_BATCH_SIZE", "200"))
+EVENTS_PG_FLUSH_INTERVAL_MS = float(os.getenv("EVENTS_PG_FLUSH_INTERVAL_MS", "50"))
+EVENTS_PG_MAX_BUFFERED = int(os.getenv("EVENTS_PG_MAX_BUFFERED", "10000"))
+EVENTS_PG_DEAD_LETTER_MAX = int(os.getenv("EVENTS_PG_DEAD_LETTER_MAX", "1000"))
+
+# The database (not the row) is the problem: keep the rows and retry later
+_UNAVAILABLE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolError)
+
+_INSERT_SQL = """
+    INSERT INTO events (
+        event_id, session_id, event_type, actor_id,
+        occurred_at, version, correlation_id, trace_id,
+        idempotency_key, object_ref_type, object_ref_id, payload
+    ) VALUES %s
+    ON CONFLICT DO NOTHING
+"""
+
+
 class PostgresEventStore(EventStore):
-    """PostgreSQL + TimescaleDB-backed event store."""
+    """
+    PostgreSQL + TimescaleDB-backed event store.
+
+    Connections come from a ThreadedConnectionPool; callers wait (up to
+    EVENTS_PG_POOL_TIMEOUT_SECONDS) for a free connection rather than failing when all
+    pool_max are checked out. Each append is a single
+    INSERT ... ON CONFLICT DO NOTHING, so duplicate idempotency keys (or event ids)
+    are skipped without a separate SELECT.
+
+    In buffered mode, append() enqueues the event and a background thread
+    group-commits batches with execute_values every flush_interval_ms or once
+    batch_size events are waiting. The buffer is bounded by max_buffered: when it is
+    full the caller flushes synchronously (backpressure) before enqueueing, and if
+    that flush fails (database down) the append is rejected with the error and
+    counted, so an outage cannot grow the buffer past its bound.
+    Events are serialized in append(), so a bad payload fails its own caller. If a
+    batch is rejected for any reason other than the database being unavailable, its
+    rows are retried one by one and the ones that still fail are dead-lettered (kept
+    in `dead_letters`, bounded) so they cannot block the events behind them.
+    flush()/close() drain the buffer; close() is registered with atexit.
+    """
     
-    def __init__(self, connection_string: Optional[str] = None):
+    def __init__(
+        self,
+        connection_string: Optional[str] = None,
+        buffered: bool = EVENTS_PG_BUFFERED,
+        pool_min: int = EVENTS_PG_POOL_MIN,
+        pool_max: int = EVENTS_PG_POOL_MAX,
+        batch_size: int = EVENTS_PG_BATCH_SIZE,
+        flush_interval_ms: float = EVENTS_PG_FLUSH_INTERVAL_MS,
+        max_buffered: int = EVENTS_PG_MAX_BUFFERED,
+    ):
         """
         Initialize PostgreSQL event store.
         
         Args:
             connection_string: PostgreSQL connection string (defaults to config)
+            buffered: Group-commit appends from a background flusher thread
+            pool_min / pool_max: Connection pool bounds
+            batch_size: Max events per INSERT in buffered mode
+            flush_interval_ms: Max time an event waits in the buffer
+            max_buffered: Buffer bound; appends beyond it flush inline or are rejected
         """
         self.connection_string = connection_string or POSTGRES_CONNECTION_STRING
+        self._pool = ThreadedConnectionPool(
+            minconn=pool_min,
+            maxconn=pool_max,
+            dsn=self.connection_string,
+        )
+        # getconn() raises instead of blocking once maxconn are out; make callers queue
+        self._pool_slots = threading.BoundedSemaphore(pool_max)
+        self.buffered = buffered
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = max(0.0, flush_interval_ms) / 1000.0
+        self.max_buffered = max(self.batch_size, int(max_buffered))
+        self._buffer: Deque[tuple] = deque()
+        self.dead_letters: Deque[Tuple[tuple, str]] = deque(maxlen=EVENTS_PG_DEAD_LETTER_MAX)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+        # Updated from the flusher and from caller threads
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "appended": 0,
+            "inserted": 0,
+            "duplicates": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "dead_lettered": 0,
+            "inline_flushes": 0,
+            "rejected": 0,
+            "last_flush_ms": 0.0,
+        }
         self._init_db()
+        if self.buffered:
+            self._flusher = threading.Thread(target=self._flush_loop, name="events-pg-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
     
-    def _get_connection(self):
-        """Get database connection."""
-        return psycopg2.connect(self.connection_string)
+    def _count(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+    
+    @contextmanager
+    def _connection(self):
+        """Borrow a pooled connection; roll back and return it (discard if broken)."""
+        if not self._pool_slots.acquire(timeout=EVENTS_PG_POOL_TIMEOUT_SECONDS):
+            raise PoolError("timed out waiting for an events connection")
+        try:
+            conn = self._pool.getconn()
+            try:
+                yield conn
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                self._pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._pool_slots.release()
     
     def _init_db(self):
         """Initialize database schema with TimescaleDB hypertable."""
-        conn = self._get_connection()
-        try:
+        with self._connection() as conn:
             with conn.cursor() as cur:
                 # Create events table
                 cur.execute("""
@@ -71,6 +193,7 @@ class PostgresEventStore(EventStore):
                 
                 # Create TimescaleDB hypertable (if extension is available)
                 try:
+                    cur.execute("SAVEPOINT hypertable")
                     cur.execute("""
                         SELECT create_hypertable('events', 'occurred_at', 
                                                  if_not_exists => TRUE);
@@ -79,60 +202,173 @@ class PostgresEventStore(EventStore):
                 except psycopg2.Error as e:
                     # TimescaleDB extension might not be available
                     if "extension" in str(e).lower() or "does not exist" in str(e).lower():
+                        cur.execute("ROLLBACK TO SAVEPOINT hypertable")
                         print("[PostgresEventStore] TimescaleDB extension not available, using regular table")
                     else:
                         raise
                 
                 conn.commit()
-        finally:
-            conn.close()
+    
+    @staticmethod
+    def _event_row(event: EventEnvelope) -> tuple:
+        return (
+            event.event_id,
+            event.session_id,
+            # Handle both enum and string event_type (use_enum_values=True in Pydantic config)
+            event.event_type.value if hasattr(event.event_type, "value") else str(event.event_type),
+            event.actor_id,
+            event.occurred_at,
+            event.version,
+            event.correlation_id,
+            event.trace_id,
+            event.idempotency_key,
+            event.object_ref.type if event.object_ref else None,
+            event.object_ref.id if event.object_ref else None,
+            json.dumps(event.payload),
+        )
+    
+    def _insert_rows(self, rows: List[tuple]) -> int:
+        """Insert rows in one statement; duplicates are skipped. Returns rows inserted."""
+        if not rows:
+            return 0
+        start = time.perf_counter()
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                execute_values(cur, _INSERT_SQL, rows, page_size=len(rows))
+                inserted = cur.rowcount if cur.rowcount is not None and cur.rowcount >= 0 else len(rows)
+            conn.commit()
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["inserted"] += inserted
+            self._stats["duplicates"] += len(rows) - inserted
+            self._stats["last_flush_ms"] = (time.perf_counter() - start) * 1000.0
+        return inserted
     
     def append(self, event: EventEnvelope) -> None:
-        """Append event to PostgreSQL with idempotency check."""
-        conn = self._get_connection()
+        """Append event to PostgreSQL (idempotent on idempotency_key / event_id)."""
+        row = self._event_row(event)  # serialization errors belong to this caller
+        self._count(appended=1)
+        if not self.buffered or self._closed:
+            self._insert_rows([row])
+            return
+        while True:
+            with self._cond:
+                if len(self._buffer) < self.max_buffered:
+                    self._buffer.append(row)
+                    if len(self._buffer) >= self.batch_size:
+                        self._cond.notify()
+                    return
+            # Backpressure: the flusher is behind (or the DB is down); write a batch inline
+            # to make room. If that fails the row is rejected, not queued past the bound.
+            self._count(inline_flushes=1)
+            try:
+                self._flush_once()
+            except Exception:
+                self._count(rejected=1)
+                raise
+    
+    # ---- Buffered mode ----
+    
+    def _take(self) -> List[tuple]:
+        with self._cond:
+            n = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(n)]
+    
+    def _requeue(self, rows: List[tuple]) -> None:
+        with self._cond:
+            self._buffer.extendleft(reversed(rows))
+    
+    def _flush_once(self) -> int:
+        """
+        Write one batch from the buffer.
+
+        If the database is unavailable the batch is put back (front) and the error
+        raised. Any other failure is isolated row by row: rows that still fail are
+        dead-lettered, the rest are written.
+        """
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            try:
+                self._insert_rows(batch)
+                return len(batch)
+            except _UNAVAILABLE_ERRORS as e:
+                self._count(flush_errors=1)
+                print(f"[PostgresEventStore] WARNING: flush of {len(batch)} events failed: {e}")
+                self._requeue(batch)
+                raise
+            except Exception as e:
+                self._count(flush_errors=1)
+                print(f"[PostgresEventStore] WARNING: batch of {len(batch)} events rejected ({e}); retrying row by row")
+            for i, row in enumerate(batch):
+                try:
+                    self._insert_rows([row])
+                except _UNAVAILABLE_ERRORS:
+                    self._requeue(batch[i:])
+                    raise
+                except Exception as e:
+                    self._count(dead_lettered=1)
+                    self.dead_letters.append((row, str(e)))
+                    print(f"[PostgresEventStore] ERROR: dead-lettered event {row[0]}: {e}")
+            return len(batch)
+    
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                if not self._buffer and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._buffer:
+                    return
+                # Give a short window for more events to join this batch.
+                if len(self._buffer) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval_s)
+            try:
+                self._flush_once()
+            except Exception:
+                if self._closed:
+                    return
+                time.sleep(max(self.flush_interval_s, 0.5))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything buffered so far. Returns False if events remain (timeout/DB error)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if not self._buffer:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            try:
+                self._flush_once()
+            except Exception:
+                return False
+    
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush the buffer, stop the flusher and close pooled connections."""
+        if self._closed:
+            return
+        remaining = self.flush(timeout=timeout) if self.buffered else True
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join(timeout=1.0)
+        if not remaining:
+            print(f"[PostgresEventStore] WARNING: {len(self._buffer)} buffered events not written on shutdown")
         try:
-            with conn.cursor() as cur:
-                # Check idempotency if key is provided
-                if event.idempotency_key:
-                    cur.execute("""
-                        SELECT event_id FROM events 
-                        WHERE idempotency_key = %s
-                    """, (event.idempotency_key,))
-                    if cur.fetchone():
-                        # Event already exists, skip
-                        return
-                
-                # Insert event
-                cur.execute("""
-                    INSERT INTO events (
-                        event_id, session_id, event_type, actor_id,
-                        occurred_at, version, correlation_id, trace_id,
-                        idempotency_key, object_ref_type, object_ref_id, payload
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (event_id) DO NOTHING
-                """, (
-                    event.event_id,
-                    event.session_id,
-                    event.event_type.value,
-                    event.actor_id,
-                    event.occurred_at,
-                    event.version,
-                    event.correlation_id,
-                    event.trace_id,
-                    event.idempotency_key,
-                    event.object_ref.type if event.object_ref else None,
-                    event.object_ref.id if event.object_ref else None,
-                    json.dumps(event.payload)
-                ))
-                conn.commit()
-        except psycopg2.IntegrityError as e:
-            # Idempotency key conflict or event_id conflict
-            if "idempotency_key" in str(e) or "event_id" in str(e):
-                # Event already exists, skip
-                return
-            raise
-        finally:
-            conn.close()
+            self._pool.closeall()
+        except Exception:
+            pass
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            **stats,
+            "buffered": len(self._buffer),
+            "mode": "buffered" if self.buffered else "sync",
+        }
     
     def list_events(
         self,
@@ -141,8 +377,10 @@ class PostgresEventStore(EventStore):
         limit: int = 100
     ) -> List[EventEnvelope]:
         """List events for a session."""
-        conn = self._get_connection()
-        try:
+        if self.buffered:
+            # Read-your-writes: projections run right after emit_event.
+            self.flush(timeout=5.0)
+        with self._connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cur:
                 query = """
                     SELECT * FROM events
@@ -161,8 +399,6 @@ class PostgresEventStore(EventStore):
                 rows = cur.fetchall()
                 
                 return [self._row_to_event(dict(row)) for row in rows]
-        finally:
-            conn.close()
     
     def replay(self, session_id: str) -> List[EventEnvelope]:
         """Replay all events for a session."""
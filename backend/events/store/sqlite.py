@@ -1,7 +1,7 @@
 """SQLite implementation of event store (dev fallback)."""
 import sqlite3
 import json
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -146,6 +146,26 @@ class SQLiteEventStore(EventStore):
         """Replay all events for a session."""
         return self.list_events(session_id, limit=10000)
     
+    def last_rowid(self) -> int:
+        """Highest rowid written so far (0 when empty); a watermark for events_after_rowid."""
+        conn = self._get_connection()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM events").fetchone()[0]
+        finally:
+            conn.close()
+    
+    def events_after_rowid(self, rowid: int, limit: int = 500) -> List[Tuple[int, EventEnvelope]]:
+        """Events written after the given rowid, in write order, with their rowids."""
+        conn = self._get_connection()
+        try:
+            cursor = conn.execute(
+                "SELECT rowid AS row_id, * FROM events WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (rowid, limit),
+            )
+            return [(row["row_id"], self._row_to_event(row)) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
     def _row_to_event(self, row: sqlite3.Row) -> EventEnvelope:
         """Convert database row to EventEnvelope."""
         object_ref = None
@@ -10,89 +10,18 @@ from pathlib import Path
 from urllib.parse import urlparse
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, HTTPException, Response
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 
 
-from api_auth import router as auth_router
-from api_v1_api_keys import router as api_keys_router
-from api_v1_ingest import router as ingest_v1_router
-from api_health import router as health_router
 from db_postgres import init_postgres_db
-from api_concepts import router as concepts_router
-from api_ai import router as ai_router
-from api_retrieval import router as retrieval_router
-from api_lectures import router as lectures_router
-from api_lecture_links import router as lecture_links_router, sections_router as lecture_sections_router
-from api_mentions import router as mentions_router
-from api_admin import router as admin_router
-from api_notion import router as notion_router
-from api_preferences import router as preferences_router
-from api_feedback import router as feedback_router
-# Debug router - only include in development
-debug_router = None
-if os.getenv("NODE_ENV", "development") != "production":
-    try:
-        from api_debug import router as debug_router
-    except ImportError:
-        pass
-from api_answers import router as answers_router
-from api_resources import router as resources_router
-from api_refresh import router as refresh_router
-from api_templates import router as templates_router
-from api_tests import router as tests_router
-from api_gaps import router as gaps_router
-from api_graphs import router as graphs_router
-from api_branches import router as branches_router
-from api_contextual_branches import router as contextual_branches_router
-from api_notes_digest import router as notes_digest_router
-from api_snapshots import router as snapshots_router
-from api_events import router as events_router, sessions_router
-from api_events_replay import router as events_replay_router
-from api_review import router as review_router
-from api_suggestions import router as suggestions_router
-from api_interest import router as interest_router
-from api_assistant import router as assistant_router
-from api_home import router as home_router
-from api_capture import router as capture_router
-from api_indexing_health import router as indexing_health_router
-from api_learning import router as learning_router
-from api_ingestion_runs import router as ingestion_runs_router
-from api_paths import router as paths_router
-from api_quality import router as quality_router
-from api_web_ingestion import router as web_ingestion_router
-from api_web_reader import router as web_reader_router
-from api_pdf_ingestion import router as pdf_ingestion_router
-from api_quotes import router as quotes_router
-from api_claims_from_quotes import router as claims_from_quotes_router
-from api_signals import router as signals_router
-from api_voice import router as voice_router
-from api_voice_agent import router as voice_agent_router
-from api_voice_stream import router as voice_stream_router
-from api_voice_extension import router as voice_extension_router
-from api_note_images import router as note_images_router
-from api_fill import router as fill_router
-from api_extend import router as extend_router
-from api_trails import router as trails_router
-from api_offline import router as offline_router
-from api_sync import router as sync_router
-from api_dashboard import router as dashboard_router
-from api_exams import router as exams_router
-from api_calendar import router as calendar_router
-from api_scheduler import tasks_router, schedule_router
-from api_observability_ingest import router as observability_ingest_router
-
-# Phase 4: Analytics router
-try:
-    from routers.analytics import router as analytics_router
-except ImportError:
-    analytics_router = None
-
-
+from demo_mode import load_demo_settings, enforce_demo_mode_request, FixedWindowRateLimiter
 from auth import (
     get_user_context_from_request,
     is_public_endpoint,
@@ -100,8 +29,10 @@ from auth import (
 )
 from services_branch_explorer import set_request_graph_identity, reset_request_graph_identity
 from db_postgres import set_request_db_identity, reset_request_db_identity
+from services_embedding_cache import begin_embedding_request_scope, end_embedding_request_scope
 from middleware_timeout import TimeoutMiddleware
-from config import REQUEST_TIMEOUT_SECONDS
+from config import REQUEST_TIMEOUT_SECONDS, LAZY_ROUTER_LOADING, LAZY_ROUTER_WARMUP
+from router_registry import ROUTERS, LazyRouterMiddleware, RouterLoader, start_router_warmup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(message)s")
@@ -272,7 +203,15 @@ async def lifespan(app: FastAPI):
         neo4j_host = parsed.hostname or "localhost"
         neo4j_port = parsed.port or 7687
 
-        if not _is_tcp_reachable(neo4j_host, neo4j_port):
+        neo4j_reachable = _is_tcp_reachable(neo4j_host, neo4j_port)
+        try:
+            # Verify once here; afterwards a background probe watches connectivity
+            from db_neo4j import start_neo4j_connection_manager
+            start_neo4j_connection_manager(verify=neo4j_reachable)
+        except Exception as e:
+            logger.warning(f"Failed to start Neo4j connection manager: {e}")
+
+        if not neo4j_reachable:
             msg = f"Neo4j not reachable at {neo4j_host}:{neo4j_port}; skipping CSV auto-import."
             print(f"[SYNC] ⚠ {msg}")
             logger.warning(msg)
@@ -291,6 +230,9 @@ async def lifespan(app: FastAPI):
         init_postgres_db()
     except Exception as e:
         print(f"Warning: Failed to initialize Postgres database: {e}")
+
+    if LAZY_ROUTER_LOADING and LAZY_ROUTER_WARMUP:
+        start_router_warmup(app.state.router_loader)
     
     # Start Notion auto-sync background loop if enabled
     from config import ENABLE_NOTION_AUTO_SYNC
@@ -389,10 +331,16 @@ async def lifespan(app: FastAPI):
     try:
         from events.background import _task_queue
         if _task_queue:
-            _task_queue.stop_worker()
+            _task_queue.stop_worker()  # drains pending projections first
             print("[Events] Background projection task queue stopped")
     except Exception:
         pass
+
+    try:
+        from events.store import shutdown_event_stores
+        shutdown_event_stores()  # drains buffered event writes
+    except Exception as e:
+        logger.warning(f"Failed to close event stores: {e}")
     
     try:
         from services_task_queue import _task_queue as ai_task_queue
@@ -409,6 +357,13 @@ async def lifespan(app: FastAPI):
         except Exception:
             pass
 
+    try:
+        from db_neo4j import close_neo4j_async_driver, close_neo4j_driver
+        await close_neo4j_async_driver()
+        close_neo4j_driver()
+    except Exception:
+        pass
+
 
 app = FastAPI(
     title="Brain Web Backend",
@@ -458,109 +413,18 @@ if "*" in origins:
 # Add timeout middleware (after CORS, before auth)
 app.add_middleware(TimeoutMiddleware)
 
-app.include_router(auth_router)
-app.include_router(api_keys_router)
-app.include_router(ingest_v1_router)
-app.include_router(health_router)
-app.include_router(observability_ingest_router)
-app.include_router(concepts_router)
-app.include_router(ai_router)
-app.include_router(retrieval_router)
-app.include_router(lectures_router)
-app.include_router(lecture_links_router)
-app.include_router(lecture_sections_router)
-app.include_router(mentions_router)
-app.include_router(preferences_router)
-app.include_router(feedback_router)
-app.include_router(answers_router)
-app.include_router(resources_router)
-app.include_router(refresh_router)
-app.include_router(templates_router)
-app.include_router(gaps_router)
-app.include_router(graphs_router)
-app.include_router(branches_router)
-app.include_router(contextual_branches_router)
-app.include_router(notes_digest_router)
-app.include_router(snapshots_router)
-app.include_router(events_router)
-app.include_router(sessions_router)
-app.include_router(events_replay_router)
-app.include_router(review_router)
-app.include_router(suggestions_router)
-app.include_router(interest_router)
-app.include_router(assistant_router)
-app.include_router(home_router)
-app.include_router(capture_router)
-app.include_router(indexing_health_router)
-app.include_router(learning_router)
-app.include_router(paths_router)
-app.include_router(quality_router)
-# Web ingestion router is always included but has local-only guard
-app.include_router(web_ingestion_router)
-app.include_router(web_reader_router)
-# PDF ingestion router for ingesting PDFs into the knowledge graph
-app.include_router(pdf_ingestion_router)
-# Phase 2: Evidence Graph endpoints
-app.include_router(quotes_router)
-app.include_router(claims_from_quotes_router)
-# Phase D: Whiteboard/photo note images
-app.include_router(note_images_router)
-# Phase E: /fill command router
-app.include_router(fill_router)
-# Learning State Engine: Signals and Voice
-app.include_router(signals_router)
-app.include_router(voice_router)
-app.include_router(voice_agent_router)
-app.include_router(voice_stream_router)
-app.include_router(voice_extension_router)
-# Phase 3: Extend system
-app.include_router(extend_router)
-# Phase 4: Trails system
-app.include_router(trails_router)
-# Phase 5: Offline system
-app.include_router(offline_router)
-# Sync system (capture selection, events)
-app.include_router(sync_router)
-# Dashboard and study analytics
-app.include_router(dashboard_router)
-app.include_router(exams_router)
-# Calendar events (native calendar functionality)
-app.include_router(calendar_router)
-# Smart Scheduler (tasks and plan suggestions)
-app.include_router(tasks_router)
-app.include_router(schedule_router)
-# Unified workflows (Capture → Explore → Synthesize)
-from api_workflows import router as workflows_router
-app.include_router(workflows_router)
-# Session events and context API
-from api_sessions_events import router as sessions_events_router
-app.include_router(sessions_events_router)
-# Session websocket API
-from api_sessions_websocket import router as sessions_websocket_router
-app.include_router(sessions_websocket_router)
-# Web search API (native Brain Web web search)
-from api_web_search import router as web_search_router
-app.include_router(web_search_router)
-
-# Deep Research API
-from api_deep_research import router as deep_research_router
-app.include_router(deep_research_router)
-
-# Adaptive Learning System (Phase 1: Selection → Context → Clarify)
-from routers.study import router as study_router
-app.include_router(study_router)
-
-# Phase 4: Analytics
-if analytics_router:
-    app.include_router(analytics_router)
-
-# Include all routers
-app.include_router(admin_router)
-app.include_router(notion_router)
-if debug_router:
-    app.include_router(debug_router)
-app.include_router(tests_router)
-app.include_router(ingestion_runs_router)
+# API routers (see router_registry.ROUTERS). Eager by default; with
+# LAZY_ROUTER_LOADING a router module is imported on the first request under its path.
+# Debug router - only include in development
+router_loader = RouterLoader(
+    app,
+    [spec for spec in ROUTERS if spec.module != "api_debug" or os.getenv("NODE_ENV", "development") != "production"],
+)
+app.state.router_loader = router_loader
+if LAZY_ROUTER_LOADING:
+    app.add_middleware(LazyRouterMiddleware, loader=router_loader)
+else:
+    router_loader.load_all()
 
 
 if _ENABLE_DEBUG_INTROSPECTION:
@@ -603,10 +467,9 @@ if _ENABLE_DEBUG_INTROSPECTION:
             return {"error": str(e)}
 
 
-@app.middleware("http")
-async def auth_middleware(request: Request, call_next):
+class AuthContextMiddleware:
     """
-    Authentication middleware.
+    Authentication middleware (pure ASGI).
     
     Flow:
     1. Extract request metadata (request_id, session_id, client_ip)
@@ -614,129 +477,158 @@ async def auth_middleware(request: Request, call_next):
     3. Extract user/tenant context from auth token
     4. Attach context to request.state for downstream use
     5. Log request metrics
+
+    Runs the request in the caller's task, so the identity context vars set here are
+    visible to the endpoint, and passes the response through unbuffered.
     """
-    start = time.perf_counter()
-    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
-    session_id = request.headers.get("x-session-id") or request.cookies.get("bw_session_id") or uuid.uuid4().hex
-    client_ip = request.headers.get("x-forwarded-for", "").split(",")[0].strip() if request.headers.get("x-forwarded-for") else (request.client.host if request.client else "unknown")
-
-    # Attach basic context
-    request.state.request_id = request_id
-    request.state.session_id = session_id
-    request.state.client_ip = client_ip
-
-    # demo_settings moved up to check before 401
-    from demo_mode import load_demo_settings, enforce_demo_mode_request, FixedWindowRateLimiter
-    
-    # Simple global limiter for the middleware
-    if not hasattr(app.state, "demo_limiter"):
-        app.state.demo_limiter = FixedWindowRateLimiter()
-    
-    demo_settings = load_demo_settings()
-    path = request.url.path
-
-    is_public = is_public_endpoint(path)
-    if is_public:
-        # Public endpoint - no auth strictly required by middleware
-        user_context = {
-            "user_id": "public",
-            "tenant_id": "public",
-            "is_authenticated": False,
-        }
-    else:
-        # Extract user context from auth token
-        user_context = get_user_context_from_request(request)
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request = Request(scope)
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        session_id = request.headers.get("x-session-id") or request.cookies.get("bw_session_id") or uuid.uuid4().hex
+        client_ip = request.headers.get("x-forwarded-for", "").split(",")[0].strip() if request.headers.get("x-forwarded-for") else (request.client.host if request.client else "unknown")
+
+        # Attach basic context
+        request.state.request_id = request_id
+        request.state.session_id = session_id
+        request.state.client_ip = client_ip
+
+        # Simple global limiter for the middleware
+        if not hasattr(app.state, "demo_limiter"):
+            app.state.demo_limiter = FixedWindowRateLimiter()
         
-        # In Demo Mode, elevate unauthenticated users BEFORE the strict 401 check
-        if demo_settings.demo_mode and not user_context["is_authenticated"]:
+        # demo_settings checked before 401
+        demo_settings = load_demo_settings()
+        path = scope["path"]
+
+        is_public = is_public_endpoint(path)
+        if is_public:
+            # Public endpoint - no auth strictly required by middleware
             user_context = {
-                "user_id": "guest",
-                "tenant_id": demo_settings.tenant_id,
-                "is_authenticated": True, # Elevate to allowed for demo purposes
+                "user_id": "public",
+                "tenant_id": "public",
+                "is_authenticated": False,
             }
+        else:
+            # Extract user context from auth token
+            user_context = get_user_context_from_request(request)
+            
+            # In Demo Mode, elevate unauthenticated users BEFORE the strict 401 check
+            if demo_settings.demo_mode and not user_context["is_authenticated"]:
+                user_context = {
+                    "user_id": "guest",
+                    "tenant_id": demo_settings.tenant_id,
+                    "is_authenticated": True, # Elevate to allowed for demo purposes
+                }
+            
+            # If still not authenticated and not a public endpoint, require auth
+            if not user_context["is_authenticated"]:
+                await JSONResponse(
+                    status_code=401,
+                    content={"detail": "Authentication required"}
+                )(scope, receive, send)
+                return
+            if not user_context.get("tenant_id"):
+                await JSONResponse(
+                    status_code=401,
+                    content={"detail": "Tenant context missing in authentication token"}
+                )(scope, receive, send)
+                return
+            header_tenant_id = request.headers.get("x-tenant-id")
+            if header_tenant_id and str(header_tenant_id) != str(user_context.get("tenant_id")):
+                await JSONResponse(
+                    status_code=403,
+                    content={"detail": "Tenant mismatch between token and request header"}
+                )(scope, receive, send)
+                return
         
-        # If still not authenticated and not a public endpoint, require auth
-        if not user_context["is_authenticated"]:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Authentication required"}
-            )
-        if not user_context.get("tenant_id"):
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Tenant context missing in authentication token"}
-            )
-        header_tenant_id = request.headers.get("x-tenant-id")
-        if header_tenant_id and str(header_tenant_id) != str(user_context.get("tenant_id")):
-            return JSONResponse(
-                status_code=403,
-                content={"detail": "Tenant mismatch between token and request header"}
-            )
-    
-    # Attach user/tenant context to request state
-    request.state.user_id = user_context.get("user_id")
-    request.state.tenant_id = user_context.get("tenant_id")
-    request.state.is_authenticated = user_context.get("is_authenticated", False)
-    _sentry_set_request_scope(request)
-
-    # Propagate request identity to graph-context services for strict per-user scoping.
-    identity_tokens = set_request_graph_identity(request.state.user_id, request.state.tenant_id)
-    db_identity_tokens = set_request_db_identity(request.state.user_id, request.state.tenant_id)
-    try:
-        if demo_settings.demo_mode:
+        # Attach user/tenant context to request state
+        request.state.user_id = user_context.get("user_id")
+        request.state.tenant_id = user_context.get("tenant_id")
+        request.state.is_authenticated = user_context.get("is_authenticated", False)
+        _sentry_set_request_scope(request)
+
+        # Propagate request identity to graph-context services for strict per-user scoping.
+        identity_tokens = set_request_graph_identity(request.state.user_id, request.state.tenant_id)
+        db_identity_tokens = set_request_db_identity(request.state.user_id, request.state.tenant_id)
+        # Repeated embeddings of the same text within one request are computed once.
+        embedding_scope_token = begin_embedding_request_scope()
+        try:
+            if demo_settings.demo_mode:
+                try:
+                    enforce_demo_mode_request(request, demo_settings, app.state.demo_limiter)
+                except HTTPException as e:
+                    await JSONResponse(status_code=e.status_code, content={"detail": e.detail})(scope, receive, send)
+                    return
+
+            status_code = 500
+            latency_ms = None
+
+            async def send_with_context(message: Message) -> None:
+                nonlocal status_code, latency_ms
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    # Latency is time to response start (streamed bodies may run much longer)
+                    latency_ms = int((time.perf_counter() - start) * 1000)
+                    # Set response headers
+                    headers = MutableHeaders(scope=message)
+                    headers["x-request-id"] = request_id
+                    headers["x-session-id"] = session_id
+                await send(message)
+
             try:
-                enforce_demo_mode_request(request, demo_settings, app.state.demo_limiter)
+                await self.app(scope, receive, send_with_context)
             except HTTPException as e:
-                return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
-
-        try:
-            response = await call_next(request)
-        except HTTPException as e:
-            if e.status_code >= 500:
-                _log_json(
-                    logging.ERROR,
-                    {
-                        "event": "http_exception",
-                        "status": e.status_code,
-                        "detail": e.detail,
-                        **_request_meta(request),
-                    },
-                )
-                if _sentry_enabled():
-                    try:
-                        sentry_sdk.capture_exception(e)  # type: ignore[union-attr]
-                    except Exception:
-                        pass
-            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail})
-        except Exception:
-            # Let exception handlers do sanitization; still record metrics/logs here
-            raise
+                if latency_ms is not None:
+                    raise  # Response already started; nothing sensible to send
+                if e.status_code >= 500:
+                    _log_json(
+                        logging.ERROR,
+                        {
+                            "event": "http_exception",
+                            "status": e.status_code,
+                            "detail": e.detail,
+                            **_request_meta(request),
+                        },
+                    )
+                    if _sentry_enabled():
+                        try:
+                            sentry_sdk.capture_exception(e)  # type: ignore[union-attr]
+                        except Exception:
+                            pass
+                await JSONResponse(status_code=e.status_code, content={"detail": e.detail})(scope, receive, send_with_context)
+            # Other exceptions propagate: exception handlers do sanitization; still record metrics/logs here
+            finally:
+                if latency_ms is None:
+                    latency_ms = int((time.perf_counter() - start) * 1000)
+                log_data = {
+                    "event": "request",
+                    "request_id": request_id,
+                    "session_id": session_id,
+                    "route": path,
+                    "method": request.method,
+                    "status": status_code,
+                    "latency_ms": latency_ms,
+                    "user_id": request.state.user_id if hasattr(request.state, "user_id") else None,
+                    "tenant_id": request.state.tenant_id if hasattr(request.state, "tenant_id") else None,
+                    "is_authenticated": request.state.is_authenticated if hasattr(request.state, "is_authenticated") else False,
+                }
+                logger.info(json.dumps(log_data, separators=(",", ":"), ensure_ascii=False))
         finally:
-            latency_ms = int((time.perf_counter() - start) * 1000)
-            status_code = getattr(locals().get("response"), "status_code", 500)
-
-            log_data = {
-                "event": "request",
-                "request_id": request_id,
-                "session_id": session_id,
-                "route": path,
-                "method": request.method,
-                "status": status_code,
-                "latency_ms": latency_ms,
-                "user_id": request.state.user_id if hasattr(request.state, "user_id") else None,
-                "tenant_id": request.state.tenant_id if hasattr(request.state, "tenant_id") else None,
-                "is_authenticated": request.state.is_authenticated if hasattr(request.state, "is_authenticated") else False,
-            }
-            logger.info(json.dumps(log_data, separators=(",", ":"), ensure_ascii=False))
-
-        # Set response headers
-        if isinstance(response, Response):
-            response.headers["x-request-id"] = request_id
-            response.headers["x-session-id"] = session_id
-        return response
-    finally:
-        reset_request_db_identity(db_identity_tokens)
-        reset_request_graph_identity(identity_tokens)
+            end_embedding_request_scope(embedding_scope_token)
+            reset_request_db_identity(db_identity_tokens)
+            reset_request_graph_identity(identity_tokens)
+
+
+app.add_middleware(AuthContextMiddleware)
 
 # Mount static files for uploaded resources
 # This serves files from the uploaded_resources directory at /static/resources/
@@ -5,47 +5,63 @@ Enforces maximum request duration to prevent long-running requests from blocking
 """
 import asyncio
 import logging
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from config import REQUEST_TIMEOUT_SECONDS
 
 logger = logging.getLogger("brain_web")
 
 
-class TimeoutMiddleware(BaseHTTPMiddleware):
+def _skips_timeout(path: str) -> bool:
+    # Streaming endpoints send data incrementally; bootstrap loads large datasets
+    return path.endswith('-stream') or '/stream' in path or path.endswith('/bootstrap')
+
+
+class TimeoutMiddleware:
     """
     Middleware that enforces request timeout.
-    
-    If a request takes longer than REQUEST_TIMEOUT_SECONDS, it will be cancelled
-    and return a 504 Gateway Timeout response.
+
+    If a request takes longer than REQUEST_TIMEOUT_SECONDS to start its response, it
+    will be cancelled and return a 504 Gateway Timeout response. Once the response has
+    started the deadline is lifted (a partly sent response cannot turn into a 504).
+
+    Pure ASGI: the request runs in the caller's task and the response is passed
+    through unbuffered.
     """
-    
-    async def dispatch(self, request: Request, call_next):
-        # Skip timeout for streaming endpoints and bootstrap endpoint (they send data incrementally or load large datasets)
-        if (request.url.path.endswith('-stream') or 
-            '/stream' in request.url.path or 
-            request.url.path.endswith('/bootstrap')):
-            return await call_next(request)
-        
+
+    def __init__(self, app: ASGIApp, timeout_seconds: float = REQUEST_TIMEOUT_SECONDS):
+        self.app = app
+        self.timeout_seconds = timeout_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _skips_timeout(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        deadline = asyncio.timeout(self.timeout_seconds)
+
+        async def send_until_started(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                deadline.reschedule(None)
+            await send(message)
+
         try:
-            # Wrap the request in a timeout
-            response = await asyncio.wait_for(
-                call_next(request),
-                timeout=REQUEST_TIMEOUT_SECONDS
-            )
-            return response
-        except asyncio.TimeoutError:
+            async with deadline:
+                await self.app(scope, receive, send_until_started)
+        except TimeoutError:
+            if not deadline.expired():
+                raise  # Raised by the endpoint itself, not our deadline
             logger.warning(
-                f"Request timeout: {request.method} {request.url.path} exceeded {REQUEST_TIMEOUT_SECONDS}s"
+                f"Request timeout: {scope['method']} {scope['path']} exceeded {self.timeout_seconds}s"
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=504,
                 content={
                     "error": "Gateway Timeout",
-                    "message": f"Request exceeded maximum duration of {REQUEST_TIMEOUT_SECONDS} seconds",
-                    "timeout_seconds": REQUEST_TIMEOUT_SECONDS,
+                    "message": f"Request exceeded maximum duration of {self.timeout_seconds} seconds",
+                    "timeout_seconds": self.timeout_seconds,
                 }
             )
-
+            await response(scope, receive, send)
@@ -0,0 +1,82 @@
+"""
+Query plans shared by sync and async Neo4j callers.
+
+A query plan is a generator that yields Cypher statements and receives each statement's
+result back, using the same Result API the services already use (single(), iteration,
+data(), consume()). It returns its value via `return`:
+
+    def _concept_plan(node_id):
+        rec = (yield Cypher("MATCH (c:Concept {node_id: $node_id}) RETURN c", {"node_id": node_id})).single()
+        return rec["c"] if rec else None
+
+    run_plan(session, _concept_plan("N1"))                    # sync neo4j.Session
+    await run_plan_async(async_session, _concept_plan("N1"))  # neo4j.AsyncSession
+
+Plans compose with `yield from`, so one query function serves sync services, background
+tasks and async routes alike. Exceptions raised by the driver are thrown back into the
+plan at the failing statement, so try/except inside a plan behaves as in sync code.
+"""
+from typing import Any, Dict, Generator, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Cypher(NamedTuple):
+    text: str
+    params: Dict[str, Any] = {}
+
+
+QueryPlan = Generator[Cypher, Any, T]
+
+
+class BufferedResult:
+    """Fully fetched async result exposing the sync Result methods plans rely on."""
+
+    def __init__(self, records: List[Any]):
+        self._records = records
+
+    def single(self) -> Optional[Any]:
+        return self._records[0] if self._records else None
+
+    def data(self) -> List[Dict[str, Any]]:
+        return [record.data() for record in self._records]
+
+    def consume(self) -> "BufferedResult":
+        return self
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+def run_plan(session, plan: QueryPlan[T]) -> T:
+    """Drive a query plan on a sync neo4j session."""
+    try:
+        stmt = next(plan)
+        while True:
+            try:
+                result = session.run(stmt.text, **stmt.params)
+            except Exception as e:
+                stmt = plan.throw(e)
+            else:
+                stmt = plan.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_plan_async(session, plan: QueryPlan[T]) -> T:
+    """Drive a query plan on an async neo4j session (neo4j.AsyncSession)."""
+    try:
+        stmt = next(plan)
+        while True:
+            try:
+                result = await session.run(stmt.text, **stmt.params)
+                records = [record async for record in result]
+            except Exception as e:
+                stmt = plan.throw(e)
+            else:
+                stmt = plan.send(BufferedResult(records))
+    except StopIteration as stop:
+        return stop.value
@@ -90,7 +90,7 @@ def get_connection_health_info():
     Get information about Neo4j connection health.
     Useful for debugging and monitoring.
     """
-    from db_neo4j import _get_driver
+    from db_neo4j import _get_driver, get_neo4j_pool_stats
     
     try:
         driver = _get_driver()
@@ -98,11 +98,13 @@ def get_connection_health_info():
         return {
             "status": "healthy",
             "uri": driver._pool.address,
-            "database": "connected"
+            "database": "connected",
+            "pool": get_neo4j_pool_stats(),
         }
     except Exception as e:
         return {
             "status": "unhealthy",
             "error": str(e),
-            "message": "Failed to connect to Neo4j"
+            "message": "Failed to connect to Neo4j",
+            "pool": get_neo4j_pool_stats(),
         }
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Checkpoints for incremental projections.
+
+A projector keeps its folded state together with the position of the last event it
+applied. On the next run it asks the store only for events after that position
+(list_events(after_ts=...)) and folds those into the saved state, so projecting a
+session costs O(new events) instead of a full replay.
+
+Position handling: occurred_at is the producer's clock, not insertion order, so an
+event can be stored after others with a later occurred_at (a buffered or retried
+write, a skewed client). Each run therefore re-reads a window of
+PROJECTION_LATE_EVENT_WINDOW_SECONDS below the newest applied timestamp and skips the
+event ids already applied inside that window. Events that arrive later than the
+window are still missed; a full replay (clear the checkpoint) picks them up.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from events.schema import EventEnvelope
+from events.store.base import EventStore
+
+PROJECTION_PAGE_SIZE = int(os.getenv("PROJECTION_PAGE_SIZE", "500"))
+PROJECTION_CHECKPOINT_CACHE_SIZE = int(os.getenv("PROJECTION_CHECKPOINT_CACHE_SIZE", "2048"))
+PROJECTION_LATE_EVENT_WINDOW_SECONDS = float(os.getenv("PROJECTION_LATE_EVENT_WINDOW_SECONDS", "300"))
+
+
+class ProjectionCheckpoint(BaseModel):
+    """Folded projector state plus the position of the last applied event."""
+    projector: str
+    session_id: str
+    # Newest occurred_at applied so far (the high-water mark)
+    last_occurred_at: Optional[datetime] = None
+    last_event_id: Optional[str] = None
+    # event_id -> occurred_at of applied events inside the late-event window
+    recent_events: Dict[str, datetime] = Field(default_factory=dict)
+    event_count: int = 0
+    state: Dict[str, Any] = Field(default_factory=dict)
+
+
+def fold_new_events(
+    store: EventStore,
+    checkpoint: ProjectionCheckpoint,
+    apply: Callable[[Dict[str, Any], EventEnvelope], None],
+    page_size: int = PROJECTION_PAGE_SIZE,
+    late_window_seconds: Optional[float] = None,
+) -> int:
+    """
+    Apply every event not yet folded into checkpoint.state (in place).
+
+    Returns:
+        Number of newly applied events
+    """
+    if late_window_seconds is None:
+        late_window_seconds = PROJECTION_LATE_EVENT_WINDOW_SECONDS
+    window = timedelta(seconds=late_window_seconds)
+    after_ts = None
+    if checkpoint.last_occurred_at is not None:
+        after_ts = checkpoint.last_occurred_at - window - timedelta(microseconds=1)
+
+    applied = 0
+    while True:
+        events = store.list_events(checkpoint.session_id, after_ts=after_ts, limit=page_size)
+        for event in events:
+            if event.event_id in checkpoint.recent_events:
+                continue
+            apply(checkpoint.state, event)
+            checkpoint.recent_events[event.event_id] = event.occurred_at
+            if checkpoint.last_occurred_at is None or event.occurred_at >= checkpoint.last_occurred_at:
+                checkpoint.last_occurred_at = event.occurred_at
+            checkpoint.last_event_id = event.event_id
+            checkpoint.event_count += 1
+            applied += 1
+        if len(events) < page_size:
+            break
+        # Page on from just before the last timestamp seen; ids already applied there are
+        # skipped. If the whole page shares one timestamp we cannot advance further.
+        next_after = events[-1].occurred_at - timedelta(microseconds=1)
+        if after_ts is not None and next_after <= after_ts:
+            break
+        after_ts = next_after
+
+    if checkpoint.last_occurred_at is not None:
+        horizon = checkpoint.last_occurred_at - window
+        checkpoint.recent_events = {
+            event_id: occurred_at
+            for event_id, occurred_at in checkpoint.recent_events.items()
+            if occurred_at >= horizon
+        }
+    return applied
+
+
+class CheckpointCache:
+    """Process-wide LRU of checkpoints keyed by (projector, session_id)."""
+
+    def __init__(self, max_entries: int = PROJECTION_CHECKPOINT_CACHE_SIZE):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Tuple[str, str], ProjectionCheckpoint]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, projector: str, session_id: str) -> Optional[ProjectionCheckpoint]:
+        with self._lock:
+            checkpoint = self._entries.get((projector, session_id))
+            if checkpoint is not None:
+                self._entries.move_to_end((projector, session_id))
+                return checkpoint.model_copy(deep=True)
+            return None
+
+    def put(self, checkpoint: ProjectionCheckpoint) -> None:
+        key = (checkpoint.projector, checkpoint.session_id)
+        with self._lock:
+            self._entries[key] = checkpoint.model_copy(deep=True)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+checkpoint_cache = CheckpointCache()
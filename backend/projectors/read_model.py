@@ -6,6 +6,7 @@ from neo4j import Session
 
 if TYPE_CHECKING:
     from .session_context import SessionContext
+    from .checkpoint import ProjectionCheckpoint
 
 
 class ReadModelStore:
@@ -106,6 +107,73 @@ class ReadModelStore:
             last_updated=datetime.fromisoformat(record["last_updated"]),
         )
 
+    def save_checkpoint(self, session: Session, checkpoint: "ProjectionCheckpoint") -> None:
+        """
+        Save a projector checkpoint (position + folded state) to Neo4j.
+        
+        Args:
+            session: Neo4j session
+            checkpoint: ProjectionCheckpoint to save
+        """
+        query = """
+        MERGE (pc:ProjectionCheckpoint {projector: $projector, session_id: $session_id})
+        SET pc.last_occurred_at = $last_occurred_at,
+            pc.last_event_id = $last_event_id,
+            pc.recent_events = $recent_events,
+            pc.event_count = $event_count,
+            pc.state = $state
+        """
+        session.run(
+            query,
+            projector=checkpoint.projector,
+            session_id=checkpoint.session_id,
+            last_occurred_at=checkpoint.last_occurred_at.isoformat() if checkpoint.last_occurred_at else None,
+            last_event_id=checkpoint.last_event_id,
+            recent_events=json.dumps({k: v.isoformat() for k, v in checkpoint.recent_events.items()}),
+            event_count=checkpoint.event_count,
+            state=json.dumps(checkpoint.state),
+        )
+    
+    def load_checkpoint(self, session: Session, projector: str, session_id: str) -> Optional["ProjectionCheckpoint"]:
+        """
+        Load a projector checkpoint from Neo4j.
+        
+        Args:
+            session: Neo4j session
+            projector: Projector name
+            session_id: Session identifier
+            
+        Returns:
+            ProjectionCheckpoint or None if not found
+        """
+        query = """
+        MATCH (pc:ProjectionCheckpoint {projector: $projector, session_id: $session_id})
+        RETURN pc.last_occurred_at AS last_occurred_at,
+               pc.last_event_id AS last_event_id,
+               pc.recent_events AS recent_events,
+               pc.event_count AS event_count,
+               pc.state AS state
+        LIMIT 1
+        """
+        record = session.run(query, projector=projector, session_id=session_id).single()
+        # Checkpoints written before recent_events was tracked cannot dedupe the
+        # late-event window; returning None rebuilds them with a full replay.
+        if not record or (record["last_occurred_at"] and record["recent_events"] is None):
+            return None
+        
+        from .checkpoint import ProjectionCheckpoint
+        return ProjectionCheckpoint(
+            projector=projector,
+            session_id=session_id,
+            last_occurred_at=datetime.fromisoformat(record["last_occurred_at"]) if record["last_occurred_at"] else None,
+            last_event_id=record["last_event_id"],
+            recent_events={
+                k: datetime.fromisoformat(v) for k, v in json.loads(record["recent_events"] or "{}").items()
+            },
+            event_count=record["event_count"] or 0,
+            state=json.loads(record["state"]) if record["state"] else {},
+        )
+
 
 # Global read model store instance
 _read_model_store: Optional[ReadModelStore] = None
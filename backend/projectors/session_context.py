@@ -1,11 +1,13 @@
 """Session context projector - derives session context from events."""
-from typing import Dict, List, Optional
+import logging
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel, Field
 
 from events.schema import EventEnvelope, EventType, ObjectRef
 from events.store import get_event_store
 from .read_model import get_read_model_store
+from .checkpoint import ProjectionCheckpoint, checkpoint_cache, fold_new_events
 
 
 class ActiveConcept(BaseModel):
@@ -31,8 +33,112 @@ class SessionContext(BaseModel):
     last_updated: datetime
 
 
+PROJECTOR_NAME = "session_context"
+
+
+def _empty_state() -> Dict[str, Any]:
+    return {"concept_weights": {}, "concept_names": {}, "active_objects": {}}
+
+
+def _apply_event(state: Dict[str, Any], event: EventEnvelope) -> None:
+    """Fold one event into the session-context state."""
+    concept_weights: Dict[str, float] = state["concept_weights"]
+    concept_names: Dict[str, str] = state["concept_names"]
+    active_objects: Dict[str, Dict[str, Any]] = state["active_objects"]
+
+    if event.event_type == EventType.USER_VIEWED:
+        # User viewed a concept - increase weight
+        if event.object_ref and event.object_ref.type == "concept":
+            concept_id = event.object_ref.id
+            concept_weights[concept_id] = concept_weights.get(concept_id, 0.0) + 0.2
+            if "name" in event.payload:
+                concept_names[concept_id] = event.payload["name"]
+
+    elif event.event_type == EventType.CHAT_MESSAGE_CREATED:
+        # Chat message - extract mentioned concepts from payload
+        if "mentioned_concepts" in event.payload:
+            for concept_info in event.payload["mentioned_concepts"]:
+                concept_id = concept_info.get("concept_id")
+                if concept_id:
+                    concept_weights[concept_id] = concept_weights.get(concept_id, 0.0) + 0.15
+                    if "name" in concept_info:
+                        concept_names[concept_id] = concept_info["name"]
+
+    elif event.event_type == EventType.SOURCE_CAPTURED:
+        # Source captured - add as active object
+        if event.object_ref:
+            obj_key = f"{event.object_ref.type}:{event.object_ref.id}"
+            active_objects[obj_key] = {
+                "object_type": event.object_ref.type,
+                "object_id": event.object_ref.id,
+                "relevance_score": 0.7,
+            }
+
+    elif event.event_type == EventType.CLAIM_UPSERTED:
+        # Claim upserted - add as active object
+        if event.object_ref and event.object_ref.type == "claim":
+            obj_key = f"claim:{event.object_ref.id}"
+            active_objects[obj_key] = {
+                "object_type": "claim",
+                "object_id": event.object_ref.id,
+                "relevance_score": 0.8,
+            }
+            # Also boost related concepts
+            if "concept_ids" in event.payload:
+                for concept_id in event.payload["concept_ids"]:
+                    concept_weights[concept_id] = concept_weights.get(concept_id, 0.0) + 0.1
+
+
+def _context_from_state(session_id: str, state: Dict[str, Any], event_count: int) -> SessionContext:
+    """Build the SessionContext view from folded state."""
+    concept_names = state["concept_names"]
+
+    # Build active concepts list (top 10 by weight, capped at 1.0)
+    sorted_concepts = sorted(
+        state["concept_weights"].items(),
+        key=lambda x: x[1],
+        reverse=True
+    )[:10]
+    active_concepts = [
+        ActiveConcept(
+            concept_id=concept_id,
+            weight=min(weight, 1.0),
+            name=concept_names.get(concept_id)
+        )
+        for concept_id, weight in sorted_concepts
+    ]
+
+    # Build active objects list (top 20)
+    active_objects = [ActiveObject(**o) for o in list(state["active_objects"].values())[:20]]
+
+    # Compute uncertainty score (inverse of activity)
+    # More events = lower uncertainty
+    if event_count == 0:
+        uncertainty_score = 1.0
+    elif event_count < 5:
+        uncertainty_score = 0.8
+    elif event_count < 10:
+        uncertainty_score = 0.5
+    else:
+        uncertainty_score = 0.2
+
+    return SessionContext(
+        session_id=session_id,
+        active_concepts=active_concepts,
+        active_objects=active_objects,
+        uncertainty_score=uncertainty_score,
+        last_updated=datetime.utcnow(),
+    )
+
+
 class SessionContextProjector:
-    """Projects session context from events."""
+    """
+    Projects session context from events.
+
+    Projection is incremental: the folded state and the position of the last applied
+    event are kept in a checkpoint (process cache + Neo4j read model), and each
+    call folds only events after that position.
+    """
     
     def __init__(self, use_read_model: bool = True):
         """
@@ -46,9 +152,29 @@ class SessionContextProjector:
         # In-memory cache for context (fallback if read model unavailable)
         self._context_cache: Dict[str, SessionContext] = {}
     
+    def _load_checkpoint(self, session_id: str, neo4j_session=None) -> ProjectionCheckpoint:
+        checkpoint = checkpoint_cache.get(PROJECTOR_NAME, session_id)
+        if checkpoint is None and self.read_model_store and neo4j_session is not None:
+            try:
+                checkpoint = self.read_model_store.load_checkpoint(neo4j_session, PROJECTOR_NAME, session_id)
+            except Exception as e:
+                logging.getLogger("brain_web").warning(f"Failed to load session context checkpoint: {e}")
+        if checkpoint is None:
+            checkpoint = ProjectionCheckpoint(projector=PROJECTOR_NAME, session_id=session_id, state=_empty_state())
+        return checkpoint
+    
+    def _project(self, session_id: str, neo4j_session=None) -> Tuple[SessionContext, ProjectionCheckpoint, int]:
+        checkpoint = self._load_checkpoint(session_id, neo4j_session)
+        applied = fold_new_events(self.store, checkpoint, _apply_event)
+        checkpoint_cache.put(checkpoint)
+        context = _context_from_state(session_id, checkpoint.state, checkpoint.event_count)
+        # Cache context
+        self._context_cache[session_id] = context
+        return context, checkpoint, applied
+    
     def project(self, session_id: str) -> SessionContext:
         """
-        Project session context from all events for a session.
+        Project session context, folding only events newer than the checkpoint.
         
         Args:
             session_id: Session identifier
@@ -56,120 +182,12 @@ class SessionContextProjector:
         Returns:
             SessionContext derived from events
         """
-        # Replay all events for the session
-        events = self.store.replay(session_id)
-        
-        # Initialize context
-        context = SessionContext(
-            session_id=session_id,
-            last_updated=datetime.utcnow()
-        )
-        
-        # Track concept weights
-        concept_weights: Dict[str, float] = {}
-        concept_names: Dict[str, str] = {}
-        
-        # Track active objects
-        active_objects: Dict[str, ActiveObject] = {}
-        
-        # Process events chronologically
-        for event in events:
-            if event.event_type == EventType.USER_VIEWED:
-                # User viewed a concept - increase weight
-                if event.object_ref and event.object_ref.type == "concept":
-                    concept_id = event.object_ref.id
-                    concept_weights[concept_id] = concept_weights.get(concept_id, 0.0) + 0.2
-                    if "name" in event.payload:
-                        concept_names[concept_id] = event.payload["name"]
-            
-            elif event.event_type == EventType.CHAT_MESSAGE_CREATED:
-                # Chat message - extract mentioned concepts from payload
-                if "mentioned_concepts" in event.payload:
-                    for concept_info in event.payload["mentioned_concepts"]:
-                        concept_id = concept_info.get("concept_id")
-                        if concept_id:
-                            concept_weights[concept_id] = concept_weights.get(concept_id, 0.0) + 0.15
-                            if "name" in concept_info:
-                                concept_names[concept_id] = concept_info["name"]
-            
-            elif event.event_type == EventType.SOURCE_CAPTURED:
-                # Source captured - add as active object
-                if event.object_ref:
-                    obj_key = f"{event.object_ref.type}:{event.object_ref.id}"
-                    active_objects[obj_key] = ActiveObject(
-                        object_type=event.object_ref.type,
-                        object_id=event.object_ref.id,
-                        relevance_score=0.7
-                    )
-            
-            elif event.event_type == EventType.CLAIM_UPSERTED:
-                # Claim upserted - add as active object
-                if event.object_ref and event.object_ref.type == "claim":
-                    obj_key = f"claim:{event.object_ref.id}"
-                    active_objects[obj_key] = ActiveObject(
-                        object_type="claim",
-                        object_id=event.object_ref.id,
-                        relevance_score=0.8
-                    )
-                    # Also boost related concepts
-                    if "concept_ids" in event.payload:
-                        for concept_id in event.payload["concept_ids"]:
-                            concept_weights[concept_id] = concept_weights.get(concept_id, 0.0) + 0.1
-        
-        # Normalize concept weights (cap at 1.0)
-        for concept_id in concept_weights:
-            concept_weights[concept_id] = min(concept_weights[concept_id], 1.0)
-        
-        # Build active concepts list (top 10 by weight)
-        sorted_concepts = sorted(
-            concept_weights.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-        
-        context.active_concepts = [
-            ActiveConcept(
-                concept_id=concept_id,
-                weight=weight,
-                name=concept_names.get(concept_id)
-            )
-            for concept_id, weight in sorted_concepts
-        ]
-        
-        # Build active objects list (top 20)
-        context.active_objects = list(active_objects.values())[:20]
-        
-        # Compute uncertainty score (inverse of activity)
-        # More events = lower uncertainty
-        event_count = len(events)
-        if event_count == 0:
-            context.uncertainty_score = 1.0
-        elif event_count < 5:
-            context.uncertainty_score = 0.8
-        elif event_count < 10:
-            context.uncertainty_score = 0.5
-        else:
-            context.uncertainty_score = 0.2
-        
-        context.last_updated = datetime.utcnow()
-        
-        # Save to read model store if available
-        if self.read_model_store:
-            try:
-                # Note: This requires a Neo4j session, which we don't have here
-                # The read model will be saved by the caller or background task
-                pass
-            except Exception:
-                pass
-        
-        # Cache context
-        self._context_cache[session_id] = context
-        
+        context, _, _ = self._project(session_id)
         return context
     
     def project_and_save(self, session_id: str, neo4j_session) -> SessionContext:
         """
-        Project context and save to read model store.
+        Project context and save it (plus the checkpoint) to the read model store.
         
         Args:
             session_id: Session identifier
@@ -178,14 +196,14 @@ class SessionContextProjector:
         Returns:
             SessionContext
         """
-        context = self.project(session_id)
+        context, checkpoint, _ = self._project(session_id, neo4j_session)
         
         # Save to read model store
         if self.read_model_store:
             try:
                 self.read_model_store.save_session_context(neo4j_session, context)
+                self.read_model_store.save_checkpoint(neo4j_session, checkpoint)
             except Exception as e:
-                import logging
                 logging.getLogger("brain_web").warning(f"Failed to save session context: {e}")
         
         return context
@@ -1,10 +1,13 @@
 """User preferences projector - derives user preferences from events."""
-from typing import Dict, List, Optional, Set
+import logging
+from typing import Any, Dict, List, Optional, Set
 from datetime import datetime
 from pydantic import BaseModel, Field
 
-from events.schema import EventType
+from events.schema import EventEnvelope, EventType
 from events.store import get_event_store
+from .checkpoint import ProjectionCheckpoint, checkpoint_cache, fold_new_events
+from .read_model import get_read_model_store
 
 
 class UserPreference(BaseModel):
@@ -24,99 +27,128 @@ class UserPreferences(BaseModel):
     last_updated: datetime
 
 
+PROJECTOR_NAME = "user_preferences"
+
+
+def _empty_state() -> Dict[str, Any]:
+    return {
+        "user_id": None,
+        "domain_counts": {},
+        "concept_counts": {},
+        "interaction_counts": {"chat": 0, "capture": 0, "view": 0},
+    }
+
+
+def _apply_event(state: Dict[str, Any], event: EventEnvelope) -> None:
+    """Fold one event into the user-preferences state."""
+    # user_id comes from the first event of the session
+    if state["user_id"] is None:
+        state["user_id"] = event.actor_id or "unknown"
+    
+    # Track domains from payload
+    if "domain" in event.payload:
+        domain = event.payload["domain"]
+        state["domain_counts"][domain] = state["domain_counts"].get(domain, 0) + 1
+    
+    # Track concepts
+    if event.object_ref and event.object_ref.type == "concept":
+        concept_id = event.object_ref.id
+        state["concept_counts"][concept_id] = state["concept_counts"].get(concept_id, 0) + 1
+    
+    # Track interaction patterns
+    counts = state["interaction_counts"]
+    if event.event_type == EventType.CHAT_MESSAGE_CREATED:
+        counts["chat"] += 1
+    elif event.event_type == EventType.SOURCE_CAPTURED:
+        counts["capture"] += 1
+    elif event.event_type == EventType.USER_VIEWED:
+        counts["view"] += 1
+
+
+def _preferences_from_state(state: Dict[str, Any]) -> UserPreferences:
+    """Build the UserPreferences view from folded state."""
+    counts = state["interaction_counts"]
+    chat_count = counts["chat"]
+    capture_count = counts["capture"]
+    view_count = counts["view"]
+    
+    # Determine interaction style
+    total_interactions = chat_count + capture_count + view_count
+    if total_interactions == 0:
+        interaction_style = "exploratory"
+    elif chat_count / total_interactions > 0.5:
+        interaction_style = "inquisitive"
+    elif capture_count / total_interactions > 0.4:
+        interaction_style = "collector"
+    elif view_count / total_interactions > 0.6:
+        interaction_style = "explorer"
+    else:
+        interaction_style = "mixed"
+    
+    # Get top domains (top 5)
+    sorted_domains = sorted(
+        state["domain_counts"].items(),
+        key=lambda x: x[1],
+        reverse=True
+    )[:5]
+    preferred_domains = [domain for domain, _ in sorted_domains]
+    
+    # Get top concepts (top 10)
+    sorted_concepts = sorted(
+        state["concept_counts"].items(),
+        key=lambda x: x[1],
+        reverse=True
+    )[:10]
+    preferred_concepts = [concept_id for concept_id, _ in sorted_concepts]
+    
+    return UserPreferences(
+        user_id=state["user_id"] or "unknown",
+        preferred_domains=preferred_domains,
+        preferred_concepts=preferred_concepts,
+        interaction_style=interaction_style,
+        last_updated=datetime.utcnow()
+    )
+
+
 class UserPreferencesProjector:
-    """Projects user preferences from events."""
+    """
+    Projects user preferences from events.
+
+    Incremental like SessionContextProjector: only events after the saved
+    checkpoint are folded on each update.
+    """
     
-    def __init__(self):
+    def __init__(self, use_read_model: bool = True):
         """Initialize projector."""
         self.store = get_event_store()
+        self.read_model_store = get_read_model_store() if use_read_model else None
     
-    def update_preferences(self, session_id: str) -> UserPreferences:
+    def update_preferences(self, session_id: str, neo4j_session=None) -> UserPreferences:
         """
         Update user preferences from events.
         
         Args:
             session_id: Session identifier (we'll extract user_id from events)
+            neo4j_session: Optional Neo4j session to load/save the checkpoint
             
         Returns:
             UserPreferences
         """
-        # Replay all events for the session
-        events = self.store.replay(session_id)
-        
-        if not events:
-            # No events, return default preferences
-            return UserPreferences(
-                user_id="unknown",
-                last_updated=datetime.utcnow()
-            )
+        checkpoint = checkpoint_cache.get(PROJECTOR_NAME, session_id)
+        if checkpoint is None and self.read_model_store and neo4j_session is not None:
+            try:
+                checkpoint = self.read_model_store.load_checkpoint(neo4j_session, PROJECTOR_NAME, session_id)
+            except Exception as e:
+                logging.getLogger("brain_web").warning(f"Failed to load user preferences checkpoint: {e}")
+        if checkpoint is None:
+            checkpoint = ProjectionCheckpoint(projector=PROJECTOR_NAME, session_id=session_id, state=_empty_state())
         
-        # Extract user_id from first event
-        user_id = events[0].actor_id or "unknown"
+        applied = fold_new_events(self.store, checkpoint, _apply_event)
+        checkpoint_cache.put(checkpoint)
+        if applied and self.read_model_store and neo4j_session is not None:
+            try:
+                self.read_model_store.save_checkpoint(neo4j_session, checkpoint)
+            except Exception as e:
+                logging.getLogger("brain_web").warning(f"Failed to save user preferences checkpoint: {e}")
         
-        # Track domain preferences
-        domain_counts: Dict[str, int] = {}
-        concept_counts: Dict[str, int] = {}
-        interaction_patterns: List[str] = []
-        
-        # Process events
-        for event in events:
-            # Track domains from payload
-            if "domain" in event.payload:
-                domain = event.payload["domain"]
-                domain_counts[domain] = domain_counts.get(domain, 0) + 1
-            
-            # Track concepts
-            if event.object_ref and event.object_ref.type == "concept":
-                concept_id = event.object_ref.id
-                concept_counts[concept_id] = concept_counts.get(concept_id, 0) + 1
-            
-            # Track interaction patterns
-            if event.event_type == EventType.CHAT_MESSAGE_CREATED:
-                interaction_patterns.append("chat")
-            elif event.event_type == EventType.SOURCE_CAPTURED:
-                interaction_patterns.append("capture")
-            elif event.event_type == EventType.USER_VIEWED:
-                interaction_patterns.append("view")
-        
-        # Determine interaction style
-        chat_count = interaction_patterns.count("chat")
-        capture_count = interaction_patterns.count("capture")
-        view_count = interaction_patterns.count("view")
-        
-        total_interactions = len(interaction_patterns)
-        if total_interactions == 0:
-            interaction_style = "exploratory"
-        elif chat_count / total_interactions > 0.5:
-            interaction_style = "inquisitive"
-        elif capture_count / total_interactions > 0.4:
-            interaction_style = "collector"
-        elif view_count / total_interactions > 0.6:
-            interaction_style = "explorer"
-        else:
-            interaction_style = "mixed"
-        
-        # Get top domains (top 5)
-        sorted_domains = sorted(
-            domain_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
-        preferred_domains = [domain for domain, _ in sorted_domains]
-        
-        # Get top concepts (top 10)
-        sorted_concepts = sorted(
-            concept_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-        preferred_concepts = [concept_id for concept_id, _ in sorted_concepts]
-        
-        return UserPreferences(
-            user_id=user_id,
-            preferred_domains=preferred_domains,
-            preferred_concepts=preferred_concepts,
-            interaction_style=interaction_style,
-            last_updated=datetime.utcnow()
-        )
-
+        return _preferences_from_state(checkpoint.state)
@@ -0,0 +1,253 @@
+"""
+Router registry and lazy router loading.
+
+ROUTERS lists every APIRouter the app serves, in registration order, together with the
+first path segment(s) its routes live under. main.py registers them through a
+RouterLoader in one of two modes:
+
+- eager (default): every router module is imported at startup, in table order, exactly
+  like the old top-of-file imports.
+- lazy (LAZY_ROUTER_LOADING=true): nothing is imported up front. LazyRouterMiddleware
+  loads the routers owning a request's first path segment just before routing (in a
+  worker thread, off the event loop), and
+  the OpenAPI/docs paths load everything. With LAZY_ROUTER_WARMUP (default on) the
+  remaining routers are then imported in a background thread after startup.
+
+Routers sharing a segment are always loaded together and in table order, so route
+precedence inside a segment is unchanged. When adding a router, add it here with its
+segments; tests/test_router_registry.py checks the table against the real routes.
+"""
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import anyio
+
+logger = logging.getLogger("brain_web")
+
+# Paths served by FastAPI itself that describe every route
+_ALL_ROUTES_SEGMENTS = frozenset({"openapi.json", "docs", "redoc"})
+
+
+class RouterSpec(NamedTuple):
+    module: str
+    attr: str
+    segments: Tuple[str, ...]
+    optional: bool = False  # Skip (instead of failing) when the module cannot be imported
+
+
+ROUTERS: Tuple[RouterSpec, ...] = (
+    RouterSpec("api_auth", "router", ("auth",)),
+    RouterSpec("api_v1_api_keys", "router", ("v1",)),
+    RouterSpec("api_v1_ingest", "router", ("v1",)),
+    RouterSpec("api_health", "router", ("health",)),
+    RouterSpec("api_observability_ingest", "router", ("observability",)),
+    RouterSpec("api_concepts", "router", ("concepts",)),
+    RouterSpec("api_ai", "router", ("ai",)),
+    RouterSpec("api_retrieval", "router", ("ai",)),
+    RouterSpec("api_lectures", "router", ("lectures",)),
+    RouterSpec("api_lecture_links", "router", ("lecture-links",)),
+    RouterSpec("api_lecture_links", "sections_router", ("lectures",)),
+    RouterSpec("api_mentions", "router", ("mentions",)),
+    RouterSpec("api_preferences", "router", ("preferences",)),
+    RouterSpec("api_feedback", "router", ("feedback",)),
+    RouterSpec("api_answers", "router", ("answers",)),
+    RouterSpec("api_resources", "router", ("resources",)),
+    RouterSpec("api_refresh", "router", ("refresh",)),
+    RouterSpec("api_templates", "router", ("templates",)),
+    RouterSpec("api_gaps", "router", ("gaps",)),
+    RouterSpec("api_graphs", "router", ("graphs",)),
+    RouterSpec("api_branches", "router", ("branches",)),
+    RouterSpec("api_contextual_branches", "router", ("contextual-branches",)),
+    RouterSpec("api_notes_digest", "router", ("chats",)),
+    RouterSpec("api_snapshots", "router", ("snapshots",)),
+    RouterSpec("api_events", "router", ("events",)),
+    RouterSpec("api_events", "sessions_router", ("sessions",)),
+    RouterSpec("api_events_replay", "router", ("events",)),
+    RouterSpec("api_review", "router", ("review",)),
+    RouterSpec("api_suggestions", "router", ("suggestions",)),
+    RouterSpec("api_interest", "router", ("interest",)),
+    RouterSpec("api_assistant", "router", ("assistant",)),
+    RouterSpec("api_home", "router", ("home",)),
+    RouterSpec("api_capture", "router", ("capture",)),
+    RouterSpec("api_indexing_health", "router", ("indexing",)),
+    RouterSpec("api_learning", "router", ("learning",)),
+    RouterSpec("api_paths", "router", ("paths",)),
+    RouterSpec("api_quality", "router", ("quality",)),
+    # Web ingestion router is always included but has local-only guard
+    RouterSpec("api_web_ingestion", "router", ("web",)),
+    RouterSpec("api_web_reader", "router", ("web",)),
+    # PDF ingestion router for ingesting PDFs into the knowledge graph
+    RouterSpec("api_pdf_ingestion", "router", ("pdf",)),
+    # Phase 2: Evidence Graph endpoints
+    RouterSpec("api_quotes", "router", ("quotes",)),
+    RouterSpec("api_claims_from_quotes", "router", ("claims",)),
+    # Phase D: Whiteboard/photo note images
+    RouterSpec("api_note_images", "router", ("note-images",)),
+    # Phase E: /fill command router
+    RouterSpec("api_fill", "router", ("fill",)),
+    # Learning State Engine: Signals and Voice
+    RouterSpec("api_signals", "router", ("signals",)),
+    RouterSpec("api_voice", "router", ("voice",)),
+    RouterSpec("api_voice_agent", "router", ("voice-agent",)),
+    RouterSpec("api_voice_stream", "router", ("voice-stream",)),
+    RouterSpec("api_voice_extension", "router", ("voice",)),
+    # Phase 3: Extend system
+    RouterSpec("api_extend", "router", ("extend",)),
+    # Phase 4: Trails system
+    RouterSpec("api_trails", "router", ("trails",)),
+    # Phase 5: Offline system
+    RouterSpec("api_offline", "router", ("offline",)),
+    # Sync system (capture selection, events)
+    RouterSpec("api_sync", "router", ("sync",)),
+    # Dashboard and study analytics
+    RouterSpec("api_dashboard", "router", ("dashboard",)),
+    RouterSpec("api_exams", "router", ("exams",)),
+    # Calendar events (native calendar functionality)
+    RouterSpec("api_calendar", "router", ("calendar",)),
+    # Smart Scheduler (tasks and plan suggestions)
+    RouterSpec("api_scheduler", "tasks_router", ("tasks",)),
+    RouterSpec("api_scheduler", "schedule_router", ("schedule",)),
+    # Unified workflows (Capture → Explore → Synthesize)
+    RouterSpec("api_workflows", "router", ("workflows",)),
+    # Session events/context and session websocket API
+    RouterSpec("api_sessions_events", "router", ("api",)),
+    RouterSpec("api_sessions_websocket", "router", ("api",)),
+    # Web search API (native Brain Web web search)
+    RouterSpec("api_web_search", "router", ("web-search",)),
+    # Deep Research API
+    RouterSpec("api_deep_research", "router", ("deep-research",)),
+    # Adaptive Learning System (Phase 1: Selection → Context → Clarify)
+    RouterSpec("routers.study", "router", ("study",)),
+    # Phase 4: Analytics
+    RouterSpec("routers.analytics", "router", ("analytics",), optional=True),
+    RouterSpec("api_admin", "router", ("admin",)),
+    RouterSpec("api_notion", "router", ("notion",)),
+    # Debug router - only included in development (see main.py)
+    RouterSpec("api_debug", "router", ("debug",), optional=True),
+    RouterSpec("api_tests", "router", ("tests",)),
+    RouterSpec("api_ingestion_runs", "router", ("ingestion",)),
+)
+
+
+def _first_segment(path: str) -> str:
+    return path.lstrip("/").split("/", 1)[0]
+
+
+class RouterLoader:
+    """Imports router modules on demand and includes their routers into the app."""
+
+    def __init__(self, app, specs: Iterable[RouterSpec] = ROUTERS):
+        self.app = app
+        self.specs: List[RouterSpec] = list(specs)
+        self._by_segment: Dict[str, List[int]] = {}
+        for i, spec in enumerate(self.specs):
+            for segment in spec.segments:
+                self._by_segment.setdefault(segment, []).append(i)
+        self._loaded = [False] * len(self.specs)
+        self._pending = len(self.specs)
+        self._lock = threading.RLock()
+        self._load_ms: Dict[str, float] = {}
+        self._skipped: Dict[str, str] = {}
+
+    @property
+    def fully_loaded(self) -> bool:
+        return self._pending == 0
+
+    def _include(self, i: int) -> None:
+        spec = self.specs[i]
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(spec.module)
+        except ImportError as e:
+            if not spec.optional:
+                raise
+            self._skipped[spec.module] = str(e)[:200]
+            router = None
+        else:
+            router = getattr(module, spec.attr)
+        if router is not None:
+            self.app.include_router(router)
+        self._load_ms[spec.module] = self._load_ms.get(spec.module, 0.0) + (time.perf_counter() - started) * 1000.0
+        self._loaded[i] = True
+        self._pending -= 1
+
+    def _load(self, indexes: Iterable[int]) -> None:
+        # Lock per router so a request never waits for a whole background warmup
+        for i in indexes:
+            if self._loaded[i]:
+                continue
+            with self._lock:
+                if not self._loaded[i]:
+                    self._include(i)
+
+    def load_all(self) -> None:
+        """Include every router, in table order."""
+        if self._pending:
+            self._load(range(len(self.specs)))
+
+    def _indexes_for_path(self, path: str) -> Iterable[int]:
+        segment = _first_segment(path)
+        if segment in _ALL_ROUTES_SEGMENTS:
+            return range(len(self.specs))
+        return self._by_segment.get(segment, ())
+
+    def needs_load(self, path: str) -> bool:
+        """Whether serving `path` still needs a router import (cheap; no lock)."""
+        return bool(self._pending) and not all(self._loaded[i] for i in self._indexes_for_path(path))
+
+    def load_for_path(self, path: str) -> None:
+        """Include the routers that can serve `path` (all of them for the docs/OpenAPI paths)."""
+        if self._pending:
+            self._load(self._indexes_for_path(path))
+
+    def stats(self) -> Dict[str, Any]:
+        """Which routers are loaded, and how long each module took to import and include."""
+        with self._lock:
+            return {
+                "routers": len(self.specs),
+                "loaded": len(self.specs) - self._pending,
+                "load_ms": dict(sorted(self._load_ms.items(), key=lambda kv: -kv[1])),
+                "load_total_ms": sum(self._load_ms.values()),
+                "skipped": dict(self._skipped),
+            }
+
+
+class LazyRouterMiddleware:
+    """
+    Pure ASGI middleware that loads a request's routers before routing.
+
+    Imports run in a worker thread (the loader's lock is taken there), so a cold
+    segment never blocks the event loop; requests for loaded segments skip the hop.
+    """
+
+    def __init__(self, app, loader: RouterLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            path = scope.get("path", "/")
+            if self.loader.needs_load(path):
+                await anyio.to_thread.run_sync(self.loader.load_for_path, path)
+        await self.app(scope, receive, send)
+
+
+def start_router_warmup(loader: RouterLoader) -> Optional[threading.Thread]:
+    """Import the remaining routers in a background thread (lazy mode, after startup)."""
+    if loader.fully_loaded:
+        return None
+
+    def warm():
+        started = time.perf_counter()
+        try:
+            loader.load_all()
+            logger.info(f"Router warmup finished in {(time.perf_counter() - started) * 1000.0:.0f}ms")
+        except Exception as e:
+            logger.warning(f"Router warmup failed: {e}")
+
+    thread = threading.Thread(target=warm, name="router-warmup", daemon=True)
+    thread.start()
+    return thread
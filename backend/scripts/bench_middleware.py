@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of per-request middleware overhead.
+Run from backend/: PYTHONPATH=. python scripts/bench_middleware.py [--requests 5000]
+
+Requests are driven straight through the ASGI interface (no HTTP client, no sockets),
+so the numbers are the cost of the app's middleware stack and routing:
+
+- app: GET / (public) through the full `main.app` stack (CORS, auth, timeout, ...)
+- app: GET /health/ through the full stack with a bearer token
+- layers: a trivial endpoint wrapped in 2 BaseHTTPMiddleware pass-through layers vs
+  2 pure ASGI pass-through layers, to show the cost of the wrapper style itself
+
+Per-request access logging is silenced so the numbers are not dominated by log I/O.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _scope(path: str, headers=()):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")] + list(headers),
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+
+async def _request(app, path: str, headers=()) -> int:
+    status = 0
+    body_sent = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a server: nothing more until the client goes away
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    await app(_scope(path, headers), receive, send)
+    return status
+
+
+async def _measure(app, path: str, requests: int, headers=()) -> dict:
+    status = await _request(app, path, headers)  # warm up (lazy routers, caches)
+    for _ in range(min(200, requests)):
+        await _request(app, path, headers)
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await _request(app, path, headers)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "status": status,
+        "mean_us": statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2],
+        "p99_us": samples[int(len(samples) * 0.99) - 1],
+    }
+
+
+def _layer_apps():
+    from starlette.applications import Starlette
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    def bare():
+        return Starlette(routes=[Route("/", endpoint)])
+
+    class PassThroughHTTP(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            return await call_next(request)
+
+    class PassThroughASGI:
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            await self.app(scope, receive, send)
+
+    base_http = bare()
+    base_http.add_middleware(PassThroughHTTP)
+    base_http.add_middleware(PassThroughHTTP)
+    pure_asgi = bare()
+    pure_asgi.add_middleware(PassThroughASGI)
+    pure_asgi.add_middleware(PassThroughASGI)
+    return {"bare": bare(), "2x BaseHTTPMiddleware": base_http, "2x pure ASGI": pure_asgi}
+
+
+async def _run(requests: int):
+    results = {}
+    for name, app in _layer_apps().items():
+        results[f"layers: {name}"] = await _measure(app, "/", requests)
+
+    os.environ.setdefault("LAZY_ROUTER_LOADING", "true")
+    os.environ.setdefault("LAZY_ROUTER_WARMUP", "false")
+    from main import app
+    from auth import create_token
+    logging.getLogger("brain_web").setLevel(logging.WARNING)
+
+    token = create_token("bench-user", "bench-tenant")
+    results["app: GET / (public)"] = await _measure(app, "/", requests)
+    results["app: GET /health/ (bearer)"] = await _measure(
+        app, "/health/", requests, headers=[(b"authorization", f"Bearer {token}".encode())]
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request middleware overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    results = asyncio.run(_run(args.requests))
+    print(f"{'case':40} {'status':>6} {'mean':>10} {'p50':>10} {'p99':>10}")
+    for name, r in results.items():
+        print(f"{name:40} {r['status']:>6} {r['mean_us']:>8.1f}us {r['p50_us']:>8.1f}us {r['p99_us']:>8.1f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
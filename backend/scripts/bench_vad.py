@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Real-time factor of the streaming VAD with many concurrent sessions.
+Run from backend/: PYTHONPATH=. python scripts/bench_vad.py [--streams 1 8 32] [--seconds 10]
+
+Every stream is a VadUtteranceSegmenter fed synthetic 16 kHz PCM (speech bursts and
+pauses) in 4096-byte chunks, like the ffmpeg reader in api_voice_stream, from its own
+task on one event loop via aprocess_pcm16. Streams are fed as fast as possible.
+RTF = wall time / audio seconds per stream (< 1.0 keeps up with live audio; 0.01 means
+100x faster than real time).
+
+Detectors:
+- energy/batched: EnergySpeechDetector, one vectorized call per chunk
+- energy/per-frame: same scores, one call per frame (the pre-batching code path)
+- model/batched: SileroSpeechDetector (per-stream state, 512-sample windows) on a simulated
+  step (fixed cost per call + cost per row, GIL released like torch/onnxruntime) behind
+  the shared _InferenceQueue, so each step batches one window of every waiting stream
+- model/per-stream: the same detector, each stream's windows stepped inline one at a time
+- silero/batched, silero/per-stream: the same two with --silero-model PATH (.onnx needs
+  onnxruntime, torchscript needs torch and a v5+ model; older torchscript models only
+  have a stateful per-stream call, so they are reported and skipped)
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNK_BYTES = 4096
+
+
+def _synthetic_pcm(seconds: float, sample_rate_hz: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate_hz)
+    parts = []
+    n = 0
+    speaking = False
+    while n < total:
+        length = int(rng.uniform(0.3, 1.5) * sample_rate_hz)
+        amp = 5000 if speaking else 60
+        parts.append((rng.standard_normal(length) * amp).clip(-32768, 32767).astype(np.int16))
+        n += length
+        speaking = not speaking
+    return np.concatenate(parts)[:total].tobytes()
+
+
+def _detectors(args):
+    from services_vad import (
+        EnergySpeechDetector,
+        SileroSpeechDetector,
+        SileroStep,
+        SpeechDetector,
+        _InferenceQueue,
+        _load_silero_step,
+    )
+
+    class PerFrameEnergy(SpeechDetector):
+        # The pre-batching EnergySpeechDetector.speech_probability
+        def speech_probability(self, pcm16_frame, *, sample_rate_hz):
+            samples = np.frombuffer(pcm16_frame, dtype=np.int16).astype(np.float32)
+            return max(0.0, min(1.0, float(np.sqrt(np.mean(samples * samples)) / 32768.0) * 20.0))
+
+    def simulated_step(x, state, sample_rate_hz):
+        time.sleep(args.model_call_ms / 1000.0 + x.shape[0] * args.model_frame_us / 1e6)
+        return np.sqrt(np.mean(x * x, axis=1)) * 20.0, state
+
+    class InlineSteps:
+        # Same windows and per-stream state, scored in the caller's thread one window at a time
+        def __init__(self, step: SileroStep):
+            self._step = step
+
+        def infer(self, windows: np.ndarray, state: np.ndarray, sample_rate_hz: int) -> Tuple[np.ndarray, np.ndarray]:
+            probs = np.empty(windows.shape[0], dtype=np.float32)
+            for t, row in enumerate(windows):
+                out, state = self._step(row.reshape(1, -1), state, sample_rate_hz)
+                probs[t] = out[0]
+            return probs, state
+
+    models: Dict[str, SileroStep] = {"model": simulated_step}
+    if args.silero_model:
+        silero_step = _load_silero_step(Path(args.silero_model))
+        if silero_step is None:
+            print(f"Skipping {args.silero_model}: pre-v5 torchscript model, no batched step to benchmark")
+        else:
+            models["silero"] = silero_step
+
+    out = {
+        "energy/batched": lambda: EnergySpeechDetector(),
+        "energy/per-frame": lambda: PerFrameEnergy(),
+    }
+    for name, step in models.items():
+        shared = _InferenceQueue(step)
+        inline = InlineSteps(step)
+        out[f"{name}/batched"] = lambda shared=shared: SileroSpeechDetector(model_path="", inference=shared)
+        out[f"{name}/per-stream"] = lambda inline=inline: SileroSpeechDetector(model_path="", inference=inline)
+    return out
+
+
+async def _run_streams(make_detector, streams: int, pcm: bytes, config) -> float:
+    from services_vad import VadUtteranceSegmenter
+
+    async def one_stream():
+        segmenter = VadUtteranceSegmenter(make_detector(), config)
+        for pos in range(0, len(pcm), CHUNK_BYTES):
+            await segmenter.aprocess_pcm16(pcm[pos : pos + CHUNK_BYTES])
+            await asyncio.sleep(0)  # let the other sessions' readers in, like real socket reads
+        segmenter.flush()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_stream() for _ in range(streams)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming VAD real-time factor per concurrent stream")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seconds", type=float, default=10.0, help="audio per stream")
+    parser.add_argument("--frame-ms", type=int, default=30)
+    parser.add_argument("--model-call-ms", type=float, default=0.3, help="simulated model: fixed cost per call")
+    parser.add_argument("--model-frame-us", type=float, default=20.0, help="simulated model: cost per window")
+    parser.add_argument("--silero-model", default="", help="Silero VAD model (.onnx or torchscript) to benchmark as well")
+    args = parser.parse_args()
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+    from services_vad import VadConfig
+
+    config = VadConfig(frame_ms=args.frame_ms)
+    pcm = _synthetic_pcm(args.seconds, config.sample_rate_hz, seed=1)
+    detectors = _detectors(args)
+
+    print(f"{args.seconds:.0f}s of audio per stream, {args.frame_ms}ms frames, {CHUNK_BYTES}-byte chunks")
+    print(f"{'detector':18} {'streams':>7} {'wall':>9} {'RTF/stream':>11} {'x realtime':>11}")
+    for name, make_detector in detectors.items():
+        for streams in args.streams:
+            wall = asyncio.run(_run_streams(make_detector, streams, pcm, config))
+            rtf = wall / args.seconds
+            print(f"{name:18} {streams:>7} {wall:>8.3f}s {rtf:>11.4f} {1 / rtf:>10.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
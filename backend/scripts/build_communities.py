@@ -18,6 +18,7 @@ from neo4j import Session
 from db_neo4j import get_driver
 from services_graph import upsert_community, set_concept_community_memberships
 from services_branch_explorer import ensure_graph_scoping_initialized, ensure_graphspace_exists, ensure_branch_exists
+from services_community_index import invalidate_community_index
 
 # Relationship weight mapping
 REL_WEIGHTS = {
@@ -304,6 +305,7 @@ def build_communities(
             print(f"[Build Communities] ERROR: Failed to assign concepts to community {community_id}: {e}")
             continue
     
+    invalidate_community_index(graph_id)
     print(f"[Build Communities] Completed: created {len(communities)} communities")
 
 
@@ -4,12 +4,16 @@ Migration script to move embeddings from Neo4j/in-memory cache to Qdrant.
 
 Usage:
     python scripts/migrate_to_qdrant.py
+    python scripts/migrate_to_qdrant.py --claims [--graph-id G1]
 
 This script:
 1. Loads all concepts from Neo4j
 2. Generates embeddings for concepts that don't have them
 3. Syncs all embeddings to Qdrant
 4. Optionally removes old cache files
+
+With --claims it instead backfills existing Claim embeddings (already stored on the
+Claim nodes, so no re-embedding) into the claims collection used by claim retrieval.
 """
 import sys
 import argparse
@@ -24,11 +28,34 @@ from services_graph import get_all_concepts
 from vector_store_qdrant import (
     ensure_collection,
     batch_upsert,
-    get_collection_info
+    get_collection_info,
+    ensure_claims_collection,
+    migrate_claims_from_neo4j,
+    QDRANT_CLAIMS_COLLECTION,
 )
-from services_search_qdrant import embed_text, _build_concept_text
+from services_search_qdrant import _build_concept_text
 from config import OPENAI_API_KEY
 
+def migrate_claims(graph_id=None, tenant_id=None) -> int:
+    print("=" * 60)
+    print("Qdrant Claims Backfill")
+    print("=" * 60)
+
+    print("\n[1/2] Ensuring Qdrant claims collection exists...")
+    ensure_claims_collection(dimension=1536)
+    print(f"✓ Collection '{QDRANT_CLAIMS_COLLECTION}' ready")
+
+    print("\n[2/2] Copying Claim embeddings from Neo4j...")
+    session = next(get_neo4j_session())
+    try:
+        migrated = migrate_claims_from_neo4j(session, graph_id=graph_id, tenant_id=tenant_id)
+    finally:
+        session.close()
+
+    print(f"\n✓ Backfilled {migrated} claims")
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Migrate concept embeddings to Qdrant (tenant-scoped).")
     parser.add_argument(
@@ -37,8 +64,22 @@ def main():
         default=None,
         help="Tenant ID to scope the migration (required for bouncer-safe Qdrant payloads).",
     )
+    parser.add_argument(
+        "--claims",
+        action="store_true",
+        help="Backfill Claim embeddings into the claims collection instead of migrating concepts.",
+    )
+    parser.add_argument(
+        "--graph-id",
+        dest="graph_id",
+        default=None,
+        help="Restrict the claims backfill to one graph.",
+    )
     args = parser.parse_args()
 
+    if args.claims:
+        return migrate_claims(graph_id=args.graph_id, tenant_id=args.tenant_id)
+
     print("=" * 60)
     print("Qdrant Migration Script")
     print("=" * 60)
@@ -76,12 +117,9 @@ def main():
     
     for i, concept in enumerate(all_concepts):
         try:
-            # Build text representation
+            # Build text representation (embedded per batch inside batch_upsert)
             concept_text = _build_concept_text(concept)
             
-            # Generate embedding
-            embedding = embed_text(concept_text)
-            
             # Prepare point for Qdrant
             tenant_id = getattr(concept, "tenant_id", None) or args.tenant_id
             if not tenant_id:
@@ -89,7 +127,7 @@ def main():
 
             points.append({
                 "concept_id": concept.node_id,
-                "embedding": embedding,
+                "text": concept_text,
                 "metadata": {
                     "name": concept.name,
                     "domain": concept.domain or "",
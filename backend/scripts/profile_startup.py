@@ -3,27 +3,215 @@
 Profile backend startup time by importing the FastAPI app.
 Run from backend/: PYTHONPATH=. python scripts/profile_startup.py
 
+The import runs in a fresh interpreter with `python -X importtime`, and the report
+breaks the time down per module and per top-level package.
+
+    python scripts/profile_startup.py                      # human-readable report
+    python scripts/profile_startup.py --lazy               # with LAZY_ROUTER_LOADING=true
+    python scripts/profile_startup.py --json               # structured report
+    python scripts/profile_startup.py --write-baseline startup_baseline.json
+    python scripts/profile_startup.py --baseline startup_baseline.json --tolerance 0.25
+
+Exit status is 1 if startup fails, exceeds --budget-seconds, or regresses against
+--baseline: total import time, or any package (self time) or router (import +
+include time) that grew by more than --tolerance and by at least --min-regression-ms.
+
 Requires Postgres (and optionally Neo4j) to be running for full startup.
 If DB is down, reports time until first import failure.
 """
-import sys
-import time
+import argparse
+import json
 import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_SNIPPET = (
+    "import json, time; _t = time.perf_counter(); import main; "
+    "print('STARTUP_SECONDS=%f' % (time.perf_counter() - _t)); "
+    "print('ROUTERS=' + json.dumps(main.app.state.router_loader.stats()))"
+)
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse `-X importtime` lines into {module, self_ms, cumulative_ms, depth} rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            self_ms = int(self_us) / 1000.0
+            cumulative_ms = int(cumulative_us) / 1000.0
+        except ValueError:
+            continue
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append({
+            "module": stripped.strip(),
+            "self_ms": self_ms,
+            "cumulative_ms": cumulative_ms,
+            "depth": depth,
+        })
+    return rows
+
+
+def build_report(
+    rows: List[Dict[str, Any]],
+    startup_seconds: Optional[float],
+    top: int,
+    routers: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    packages: Dict[str, float] = {}
+    for row in rows:
+        root = row["module"].split(".", 1)[0]
+        packages[root] = packages.get(root, 0.0) + row["self_ms"]
+    main_row = next((r for r in rows if r["module"] == "main"), None)
+    # Direct imports of main, i.e. what main.py pulls in itself
+    direct: List[Dict[str, Any]] = []
+    if main_row is not None:
+        main_depth = main_row["depth"]
+        main_index = rows.index(main_row)
+        # importtime prints children before their parent
+        for row in reversed(rows[:main_index]):
+            if row["depth"] <= main_depth:
+                break
+            if row["depth"] == main_depth + 1:
+                direct.append(row)
+    return {
+        "startup_seconds": startup_seconds,
+        "import_total_ms": main_row["cumulative_ms"] if main_row else sum(r["self_ms"] for r in rows),
+        "modules_imported": len(rows),
+        "top_modules_self": sorted(rows, key=lambda r: -r["self_ms"])[:top],
+        "main_imports": sorted(direct, key=lambda r: -r["cumulative_ms"])[:top],
+        "packages_self_ms": dict(sorted(packages.items(), key=lambda kv: -kv[1])),
+        "routers": routers or {},
+    }
+
+
+def compare_to_baseline(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    min_regression_ms: float,
+) -> List[str]:
+    """Human-readable regressions (empty list if none)."""
+    regressions = []
+    total, base_total = report["import_total_ms"], baseline.get("import_total_ms")
+    if base_total and total > base_total * (1 + tolerance) and total - base_total >= min_regression_ms:
+        regressions.append(f"total import time {base_total:.0f}ms -> {total:.0f}ms")
+    sections = [
+        ("", report["packages_self_ms"], baseline.get("packages_self_ms", {})),
+        # Routers are imported by main through the loader, so their cost also shows up here
+        ("router ", report["routers"].get("load_ms", {}), baseline.get("routers", {}).get("load_ms", {})),
+    ]
+    for label, current, base in sections:
+        for name, ms in current.items():
+            before = base.get(name, 0.0)
+            if ms - before >= min_regression_ms and ms > before * (1 + tolerance):
+                regressions.append(f"{label}{name}: {before:.0f}ms -> {ms:.0f}ms")
+    return regressions
+
+
+def run_import(lazy: bool) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    if lazy:
+        env["LAZY_ROUTER_LOADING"] = "true"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    startup_seconds = None
+    routers: Dict[str, Any] = {}
+    for line in proc.stdout.splitlines():
+        if line.startswith("STARTUP_SECONDS="):
+            startup_seconds = float(line.split("=", 1)[1])
+        elif line.startswith("ROUTERS="):
+            routers = json.loads(line.split("=", 1)[1])
+    error = None
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+    return {
+        "rows": parse_importtime(proc.stderr),
+        "startup_seconds": startup_seconds,
+        "routers": routers,
+        "error": error,
+    }
+
+
+def print_report(report: Dict[str, Any], top: int) -> None:
+    print(f"Startup time: {report['startup_seconds']:.3f}s ({report['modules_imported']} modules imported)")
+    print(f"\nmain.py imports (cumulative, top {top}):")
+    for row in report["main_imports"]:
+        print(f"  {row['cumulative_ms']:9.1f}ms  {row['module']}")
+    routers = report["routers"]
+    if routers:
+        print(f"\nRouters loaded at startup: {routers['loaded']}/{routers['routers']} "
+              f"({routers['load_total_ms']:.1f}ms import + include, top {top}):")
+        for module, ms in list(routers["load_ms"].items())[:top]:
+            print(f"  {ms:9.1f}ms  {module}")
+    print(f"\nSlowest modules (self, top {top}):")
+    for row in report["top_modules_self"]:
+        print(f"  {row['self_ms']:9.1f}ms  {row['module']}")
+    print(f"\nPackages (self, top {top}):")
+    for package, ms in list(report["packages_self_ms"].items())[:top]:
+        print(f"  {ms:9.1f}ms  {package}")
+
 
 def main():
-    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    if backend_dir not in sys.path:
-        sys.path.insert(0, backend_dir)
-    start = time.perf_counter()
-    try:
-        from main import app
-        elapsed = time.perf_counter() - start
-        print(f"Startup time: {elapsed:.3f}s")
-        return 0 if elapsed < 30 else 1
-    except Exception as e:
-        elapsed = time.perf_counter() - start
-        print(f"Startup failed after {elapsed:.3f}s: {e}")
+    parser = argparse.ArgumentParser(description=(__doc__ or "").split("\n\n")[0])
+    parser.add_argument("--lazy", action="store_true", help="Profile with LAZY_ROUTER_LOADING=true")
+    parser.add_argument("--top", type=int, default=20, help="Rows per section")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--budget-seconds", type=float,
+                        default=float(os.getenv("STARTUP_BUDGET_SECONDS", "30")),
+                        help="Fail if importing the app takes longer (default 30s or STARTUP_BUDGET_SECONDS)")
+    parser.add_argument("--baseline", help="Baseline report (JSON) to check for regressions")
+    parser.add_argument("--write-baseline", help="Write this run's report to the given path")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative growth vs baseline")
+    parser.add_argument("--min-regression-ms", type=float, default=50.0,
+                        help="Ignore regressions smaller than this (absolute)")
+    args = parser.parse_args()
+
+    result = run_import(args.lazy)
+    if result["error"] or result["startup_seconds"] is None:
+        print(f"Startup failed: {result['error']}")
         return 1
 
+    report = build_report(result["rows"], result["startup_seconds"], args.top, result["routers"])
+    report["mode"] = "lazy" if args.lazy else "eager"
+
+    status = 0
+    if report["startup_seconds"] > args.budget_seconds:
+        report.setdefault("failures", []).append(
+            f"startup {report['startup_seconds']:.3f}s exceeds budget {args.budget_seconds:.3f}s"
+        )
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance, args.min_regression_ms)
+        report.setdefault("failures", []).extend(f"regression: {r}" for r in regressions)
+    if report.get("failures"):
+        status = 1
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args.top)
+        for failure in report.get("failures", []):
+            print(f"FAIL: {failure}")
+    return status
+
+
 if __name__ == "__main__":
     sys.exit(main())
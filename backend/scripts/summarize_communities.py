@@ -20,6 +20,7 @@ from db_neo4j import get_driver
 from services_graph import upsert_community, get_claims_for_communities
 from services_search import embed_text
 from services_branch_explorer import ensure_graph_scoping_initialized, ensure_graphspace_exists, ensure_branch_exists
+from services_community_index import invalidate_community_index
 from config import OPENAI_API_KEY
 
 # Initialize OpenAI client
@@ -328,6 +329,7 @@ def summarize_all_communities(
         else:
             print(f"[Summarize Communities] Failed to generate summary for {community_name}")
     
+    invalidate_community_index(graph_id)
     print(f"[Summarize Communities] Completed: summarized {summarized}/{len(communities)} communities")
 
 
@@ -188,7 +188,9 @@ def upsert_claim(
            c.text AS text,
            c.confidence AS confidence,
            c.status AS status,
-           c.evidence_ids AS evidence_ids
+           c.evidence_ids AS evidence_ids,
+           c.on_branches AS on_branches,
+           c.ingestion_run_id AS ingestion_run_id
     """
     result = session.run(
         query,
@@ -6,6 +6,7 @@ from typing import Any, Dict, List, Optional
 from neo4j import Session
 
 from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context
+from services_community_index import invalidate_community_index
 
 
 def _normalize_claim_from_db(record_data: Any) -> dict:
@@ -57,6 +58,7 @@ def upsert_community(
     record = result.single()
     if not record:
         raise ValueError(f"Failed to create/update Community {community_id}")
+    invalidate_community_index(graph_id)
     return record.data()
 
 
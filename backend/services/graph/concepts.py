@@ -5,12 +5,14 @@ from typing import List, Optional, Dict, Any
 from neo4j import Session
 
 from models import Concept, ConceptCreate
-from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context
+from neo4j_query import Cypher, QueryPlan, run_plan, run_plan_async
+from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context, graph_scoping_plan
 from services_graph_helpers import (
     build_edge_visibility_where_clause as _build_edge_visibility_where_clause,
     build_tenant_filter_clause as _build_tenant_filter_clause,
     get_tenant_scoped_graph_context as _get_tenant_scoped_graph_context,
     normalize_include_proposed as _normalize_include_proposed,
+    tenant_scoped_graph_context_plan as _tenant_scoped_graph_context_plan,
 )
 from config import PROPOSED_VISIBILITY_THRESHOLD
 from utils.timestamp import utcnow_ms, utcnow_iso
@@ -50,19 +52,9 @@ def _normalize_concept_from_db(record_data: Dict[str, Any]) -> Concept:
     return Concept(**data)
 
 
-def get_concept_by_name(session: Session, name: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
-    """
-    Find a concept by name (exact match) or by alias (normalized match).
-    Phase 2: Now checks both name and aliases field.
-    
-    Args:
-        session: Neo4j session
-        name: Concept name to search for
-        include_archived: Whether to include archived concepts
-        tenant_id: Optional tenant_id for multi-tenant isolation
-    """
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, resolved_tenant_id = _get_tenant_scoped_graph_context(session, tenant_id=tenant_id)
+def _get_concept_by_name_plan(name: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> QueryPlan[Optional[Concept]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, resolved_tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     where_clauses = [
         "$branch_id IN COALESCE(c.on_branches, [])"
     ]
@@ -108,21 +100,33 @@ def get_concept_by_name(session: Session, name: str, include_archived: bool = Fa
            c.last_updated_by AS last_updated_by
     LIMIT 1
     """
-    result = session.run(query, **params)
-    record = result.single()
+    record = (yield Cypher(query, params)).single()
     if not record:
         return None
     return _normalize_concept_from_db(record.data())
 
 
-def get_concept_by_id(
-    session: Session,
-    node_id: str,
-    include_archived: bool = False,
-    tenant_id: Optional[str] = None,
-) -> Optional[Concept]:
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, tenant_id = _get_tenant_scoped_graph_context(session, tenant_id=tenant_id)
+def get_concept_by_name(session: Session, name: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
+    """
+    Find a concept by name (exact match) or by alias (normalized match).
+    Phase 2: Now checks both name and aliases field.
+    
+    Args:
+        session: Neo4j session
+        name: Concept name to search for
+        include_archived: Whether to include archived concepts
+        tenant_id: Optional tenant_id for multi-tenant isolation
+    """
+    return run_plan(session, _get_concept_by_name_plan(name, include_archived, tenant_id))
+
+
+async def get_concept_by_name_async(session, name: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
+    return await run_plan_async(session, _get_concept_by_name_plan(name, include_archived, tenant_id))
+
+
+def _get_concept_by_id_plan(node_id: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> QueryPlan[Optional[Concept]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     where_clauses = [
         "$branch_id IN COALESCE(c.on_branches, [])"
     ]
@@ -149,16 +153,25 @@ def get_concept_by_id(
            c.last_updated_by AS last_updated_by
     LIMIT 1
     """
-    record = session.run(query, node_id=node_id, graph_id=graph_id, branch_id=branch_id, tenant_id=tenant_id).single()
+    record = (yield Cypher(
+        query, {"node_id": node_id, "graph_id": graph_id, "branch_id": branch_id, "tenant_id": tenant_id}
+    )).single()
     if not record:
         return None
     return _normalize_concept_from_db(record.data())
 
 
-def get_concept_by_slug(session: Session, slug: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
-    """Get a concept by its URL slug (Wikipedia-style)."""
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, resolved_tenant_id = _get_tenant_scoped_graph_context(session, tenant_id=tenant_id)
+def get_concept_by_id(session: Session, node_id: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
+    return run_plan(session, _get_concept_by_id_plan(node_id, include_archived, tenant_id))
+
+
+async def get_concept_by_id_async(session, node_id: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
+    return await run_plan_async(session, _get_concept_by_id_plan(node_id, include_archived, tenant_id))
+
+
+def _get_concept_by_slug_plan(slug: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> QueryPlan[Optional[Concept]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, resolved_tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     where_clauses = [
         "c.url_slug = $slug",
         "$branch_id IN COALESCE(c.on_branches, [])"
@@ -186,12 +199,23 @@ def get_concept_by_slug(session: Session, slug: str, include_archived: bool = Fa
            c.last_updated_by AS last_updated_by
     LIMIT 1
     """
-    record = session.run(query, slug=slug, graph_id=graph_id, branch_id=branch_id, tenant_id=resolved_tenant_id).single()
+    record = (yield Cypher(
+        query, {"slug": slug, "graph_id": graph_id, "branch_id": branch_id, "tenant_id": resolved_tenant_id}
+    )).single()
     if not record:
         return None
     return _normalize_concept_from_db(record.data())
 
 
+def get_concept_by_slug(session: Session, slug: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
+    """Get a concept by its URL slug (Wikipedia-style)."""
+    return run_plan(session, _get_concept_by_slug_plan(slug, include_archived, tenant_id))
+
+
+async def get_concept_by_slug_async(session, slug: str, include_archived: bool = False, tenant_id: Optional[str] = None) -> Optional[Concept]:
+    return await run_plan_async(session, _get_concept_by_slug_plan(slug, include_archived, tenant_id))
+
+
 def create_concept(session: Session, payload: ConceptCreate, tenant_id: Optional[str] = None) -> Concept:
     """
     Creates a concept node with a generated node_id if not present.
@@ -374,25 +398,9 @@ def update_concept(session: Session, node_id: str, update: Dict[str, Any]) -> Co
 
 # Artifact functions: see services.graph.artifacts (imported above).
 
-def get_neighbors(
-    session: Session,
-    node_id: str,
-    include_proposed: str = "auto",
-    tenant_id: Optional[str] = None,
-) -> List[Concept]:
-    """
-    Returns direct neighbors of a concept node, excluding merged nodes.
-    
-    Args:
-        session: Neo4j session
-        node_id: Concept node_id
-        include_proposed: Visibility policy for proposed edges:
-            - "auto" (default): ACCEPTED + PROPOSED with confidence >= threshold
-            - "all": ACCEPTED + all PROPOSED
-            - "none": Only ACCEPTED
-    """
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, resolved_tenant_id = _get_tenant_scoped_graph_context(session, tenant_id=tenant_id)
+def _get_neighbors_plan(node_id: str, include_proposed: str = "auto", tenant_id: Optional[str] = None) -> QueryPlan[List[Concept]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, resolved_tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     
     include_proposed = _normalize_include_proposed(include_proposed)
     edge_visibility_clause = _build_edge_visibility_where_clause(include_proposed)
@@ -429,20 +437,13 @@ def get_neighbors(
                     n.created_by AS created_by,
                     n.last_updated_by AS last_updated_by
     """
-    result = session.run(query, **params)
+    result = yield Cypher(query, params)
     return [_normalize_concept_from_db(record.data()) for record in result]
 
 
-def get_neighbors_with_relationships(
-    session: Session,
-    node_id: str,
-    include_proposed: str = "auto",
-    tenant_id: Optional[str] = None,
-) -> List[dict]:
+def get_neighbors(session: Session, node_id: str, include_proposed: str = "auto", tenant_id: Optional[str] = None) -> List[Concept]:
     """
-    Returns direct neighbors with their relationship types, excluding merged nodes.
-    Returns a list of dicts with 'concept', 'predicate', 'is_outgoing', 'relationship_status',
-    'relationship_confidence', and 'relationship_method' keys.
+    Returns direct neighbors of a concept node, excluding merged nodes.
     
     Args:
         session: Neo4j session
@@ -452,8 +453,16 @@ def get_neighbors_with_relationships(
             - "all": ACCEPTED + all PROPOSED
             - "none": Only ACCEPTED
     """
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, resolved_tenant_id = _get_tenant_scoped_graph_context(session, tenant_id=tenant_id)
+    return run_plan(session, _get_neighbors_plan(node_id, include_proposed, tenant_id))
+
+
+async def get_neighbors_async(session, node_id: str, include_proposed: str = "auto", tenant_id: Optional[str] = None) -> List[Concept]:
+    return await run_plan_async(session, _get_neighbors_plan(node_id, include_proposed, tenant_id))
+
+
+def _get_neighbors_with_relationships_plan(node_id: str, include_proposed: str = "auto", tenant_id: Optional[str] = None) -> QueryPlan[List[dict]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, resolved_tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     
     include_proposed = _normalize_include_proposed(include_proposed)
     edge_visibility_clause = _build_edge_visibility_where_clause(include_proposed)
@@ -498,7 +507,7 @@ def get_neighbors_with_relationships(
                     r.source_id AS relationship_source_id,
                     r.chunk_id AS relationship_chunk_id
     """
-    result = session.run(query, **params)
+    result = yield Cypher(query, params)
     return [
         {
             "concept": _normalize_concept_from_db({k: v for k, v in record.data().items() if k not in ["predicate", "is_outgoing", "relationship_status", "relationship_confidence", "relationship_method"]}),
@@ -515,12 +524,30 @@ def get_neighbors_with_relationships(
     ]
 
 
-def get_all_concepts(session: Session, tenant_id: Optional[str] = None) -> List[Concept]:
+def get_neighbors_with_relationships(session: Session, node_id: str, include_proposed: str = "auto", tenant_id: Optional[str] = None) -> List[dict]:
     """
-    Returns all Concept nodes in the database, excluding merged nodes.
+    Returns direct neighbors with their relationship types, excluding merged nodes.
+    Returns a list of dicts with 'concept', 'predicate', 'is_outgoing', 'relationship_status',
+    'relationship_confidence', and 'relationship_method' keys.
+    
+    Args:
+        session: Neo4j session
+        node_id: Concept node_id
+        include_proposed: Visibility policy for proposed edges:
+            - "auto" (default): ACCEPTED + PROPOSED with confidence >= threshold
+            - "all": ACCEPTED + all PROPOSED
+            - "none": Only ACCEPTED
     """
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, resolved_tenant_id = _get_tenant_scoped_graph_context(session, tenant_id=tenant_id)
+    return run_plan(session, _get_neighbors_with_relationships_plan(node_id, include_proposed, tenant_id))
+
+
+async def get_neighbors_with_relationships_async(session, node_id: str, include_proposed: str = "auto", tenant_id: Optional[str] = None) -> List[dict]:
+    return await run_plan_async(session, _get_neighbors_with_relationships_plan(node_id, include_proposed, tenant_id))
+
+
+def _get_all_concepts_plan(tenant_id: Optional[str] = None) -> QueryPlan[List[Concept]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, resolved_tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     
     # Try the scoped query first
     query = """
@@ -545,12 +572,23 @@ def get_all_concepts(session: Session, tenant_id: Optional[str] = None) -> List[
            c.last_updated_by AS last_updated_by
     ORDER BY c.node_id
     """
-    result = session.run(query, graph_id=graph_id, branch_id=branch_id, tenant_id=resolved_tenant_id)
+    result = yield Cypher(query, {"graph_id": graph_id, "branch_id": branch_id, "tenant_id": resolved_tenant_id})
     concepts = [_normalize_concept_from_db(record.data()) for record in result]
     
     return concepts
 
 
+def get_all_concepts(session: Session, tenant_id: Optional[str] = None) -> List[Concept]:
+    """
+    Returns all Concept nodes in the database, excluding merged nodes.
+    """
+    return run_plan(session, _get_all_concepts_plan(tenant_id))
+
+
+async def get_all_concepts_async(session, tenant_id: Optional[str] = None) -> List[Concept]:
+    return await run_plan_async(session, _get_all_concepts_plan(tenant_id))
+
+
 def get_graph_overview(
     session: Session,
     limit_nodes: int = 300,
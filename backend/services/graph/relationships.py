@@ -6,11 +6,12 @@ from typing import Any, Dict, List, Optional
 from neo4j import Session
 
 from models import RelationshipCreate
-from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context
+from neo4j_query import Cypher, QueryPlan, run_plan, run_plan_async
+from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context, graph_scoping_plan
 from services_graph_helpers import (
     build_edge_visibility_where_clause as _build_edge_visibility_where_clause,
-    get_tenant_scoped_graph_context as _get_tenant_scoped_graph_context,
     normalize_include_proposed as _normalize_include_proposed,
+    tenant_scoped_graph_context_plan as _tenant_scoped_graph_context_plan,
 )
 from config import PROPOSED_VISIBILITY_THRESHOLD
 from utils.timestamp import utcnow_ms
@@ -45,16 +46,9 @@ def create_relationship(
     )
 
 
-def get_all_relationships(
-    session: Session,
-    include_proposed: str = "auto",
-    tenant_id: Optional[str] = None,
-) -> List[dict]:
-    """Return all relationships between Concept nodes."""
-    ensure_graph_scoping_initialized(session)
-    graph_id, branch_id, resolved_tenant_id = _get_tenant_scoped_graph_context(
-        session, tenant_id=tenant_id
-    )
+def _get_all_relationships_plan(include_proposed: str = "auto", tenant_id: Optional[str] = None) -> QueryPlan[List[dict]]:
+    yield from graph_scoping_plan()
+    graph_id, branch_id, resolved_tenant_id = yield from _tenant_scoped_graph_context_plan(tenant_id=tenant_id)
     include_proposed = _normalize_include_proposed(include_proposed)
     edge_visibility_clause = _build_edge_visibility_where_clause(include_proposed)
     params = {
@@ -84,7 +78,7 @@ def get_all_relationships(
            r.source_id AS relationship_source_id,
            r.chunk_id AS chunk_id
     """
-    result = session.run(query, **params)
+    result = yield Cypher(query, params)
     return [
         {
             "source_id": record.data()["source_id"],
@@ -101,6 +95,23 @@ def get_all_relationships(
     ]
 
 
+def get_all_relationships(
+    session: Session,
+    include_proposed: str = "auto",
+    tenant_id: Optional[str] = None,
+) -> List[dict]:
+    """Return all relationships between Concept nodes."""
+    return run_plan(session, _get_all_relationships_plan(include_proposed, tenant_id))
+
+
+async def get_all_relationships_async(
+    session,
+    include_proposed: str = "auto",
+    tenant_id: Optional[str] = None,
+) -> List[dict]:
+    return await run_plan_async(session, _get_all_relationships_plan(include_proposed, tenant_id))
+
+
 def create_relationship_by_ids(
     session: Session,
     source_id: str,
@@ -2,6 +2,7 @@
 Chunk text, extract claims (LLM), persist SourceChunks and Claims.
 """
 import hashlib
+import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Optional, List, Dict, Any
 from uuid import uuid4
@@ -18,10 +19,14 @@ from services_graph import (
     get_all_concepts,
 )
 from services_claims import extract_claims_from_chunk, normalize_claim_text
-from services_search import embed_text
+from services_embedding_batcher import embed_many
+from services_graph_helpers import resolve_graph_tenant_id
+from config import USE_QDRANT
 
 from .chunking import chunk_text, normalize_name
 
+logger = logging.getLogger("brain_web")
+
 
 def process_chunk_atomic(
     chunk_data: Dict[str, Any], known_concepts_dict: List[Dict[str, Any]]
@@ -29,7 +34,7 @@ def process_chunk_atomic(
     """
     Process a single chunk atomically (no DB side effects).
     - Extracts claims (LLM)
-    - Computes embeddings (LLM)
+    - Computes embeddings (one batched call for all claims in the chunk)
 
     Returns:
         Dict with 'chunk': chunk_data, 'claims': list_of_claims_with_embeddings, 'errors': list
@@ -40,12 +45,13 @@ def process_chunk_atomic(
     try:
         claims = extract_claims_from_chunk(chunk_data["text"], known_concepts_dict)
 
-        for claim_data in claims:
-            try:
-                embedding = embed_text(claim_data["claim_text"])
-            except Exception as e:
-                print(f"[Lecture Ingestion] WARNING: Failed to embed claim, continuing without embedding: {e}")
-                embedding = None
+        # One batched request per chunk; the batcher also merges chunks from sibling workers.
+        # A claim the API rejects comes back as None without affecting the others.
+        embeddings = embed_many([claim_data["claim_text"] for claim_data in claims])
+
+        for claim_data, embedding in zip(claims, embeddings):
+            if embedding is None:
+                print("[Lecture Ingestion] WARNING: Failed to embed claim, continuing without embedding")
             claim_data["embedding"] = embedding
             claims_with_embeddings.append(claim_data)
     except Exception as e:
@@ -58,6 +64,44 @@ def process_chunk_atomic(
     }
 
 
+def index_claims_in_qdrant(
+    session: Session,
+    graph_id: str,
+    claim_points: List[Dict[str, Any]],
+    tenant_id: Optional[str] = None,
+) -> int:
+    """
+    Write-through of freshly upserted claims to the Qdrant claims collection.
+
+    Best-effort: Neo4j stays the source of truth. When the claims cannot be indexed the
+    graph's backfill marker is cleared, so retrieval merges the Neo4j scan again until
+    scripts/migrate_to_qdrant.py (--claims) repairs the collection.
+
+    Returns:
+        Number of claims indexed
+    """
+    if not USE_QDRANT or not claim_points:
+        return 0
+    from vector_store_qdrant import batch_upsert_claims, clear_claims_backfill_marker
+
+    try:
+        tenant_id = tenant_id or resolve_graph_tenant_id(session, graph_id)
+        if not tenant_id:
+            logger.warning(f"[Lecture Ingestion] Graph {graph_id} has no tenant_id; skipping Qdrant claim indexing")
+        else:
+            for point in claim_points:
+                point["metadata"]["tenant_id"] = tenant_id
+            batch_upsert_claims(claim_points)
+            return len(claim_points)
+    except Exception as e:
+        logger.warning(f"[Lecture Ingestion] Failed to index {len(claim_points)} claims in Qdrant: {e}")
+    try:
+        clear_claims_backfill_marker(session, graph_id)
+    except Exception as e:
+        logger.warning(f"[Lecture Ingestion] Failed to clear the claims backfill marker of {graph_id}: {e}")
+    return 0
+
+
 def run_chunk_and_claims_engine(
     session: Session,
     source_id: str,
@@ -78,6 +122,7 @@ def run_chunk_and_claims_engine(
     claims_created = 0
     chunk_ids = []
     claim_ids = []
+    claim_points = []
 
     graph_id, branch_id = get_active_graph_context(session, tenant_id=tenant_id)
     print(f"[Chunk Ingestion] Using Graph: {graph_id}, Branch: {branch_id}")
@@ -188,7 +233,7 @@ def run_chunk_and_claims_engine(
                     mentioned_node_ids.append(found_id)
             claim_embedding = claim_data.get("embedding")
             try:
-                upsert_claim(
+                claim_record = upsert_claim(
                     session=session,
                     graph_id=graph_id,
                     branch_id=branch_id,
@@ -211,6 +256,22 @@ def run_chunk_and_claims_engine(
                     )
                 claims_created += 1
                 claim_ids.append(claim_id)
+                if claim_embedding:
+                    claim_points.append({
+                        "claim_id": claim_id,
+                        "embedding": claim_embedding,
+                        "metadata": {
+                            "graph_id": graph_id,
+                            "on_branches": claim_record.get("on_branches") or [branch_id],
+                            "ingestion_run_id": claim_record.get("ingestion_run_id") or run_id,
+                            "status": claim_record.get("status") or "PROPOSED",
+                            "confidence": claim_data["confidence"],
+                            "text": claim_data["claim_text"],
+                            "source_id": source_id,
+                            "source_span": claim_data.get("source_span", f"chunk {chunk['index']}"),
+                            "chunk_id": chunk_id,
+                        },
+                    })
             except Exception as e:
                 error_msg = f"Failed to create Claim {claim_id}: {e}"
                 errors.append(error_msg)
@@ -218,6 +279,7 @@ def run_chunk_and_claims_engine(
                 continue
 
     print(f"[Lecture Ingestion] Created {claims_created} claims from {len(chunks)} chunks")
+    index_claims_in_qdrant(session, graph_id, claim_points, tenant_id=tenant_id)
     return {
         "chunks_created": chunks_created,
         "claims_created": claims_created,
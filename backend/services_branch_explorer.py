@@ -4,12 +4,18 @@ from __future__ import annotations
 import datetime
 import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from contextvars import ContextVar, Token
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from neo4j import Session
 
+from neo4j_query import Cypher, QueryPlan, run_plan, run_plan_async
+
 logger = logging.getLogger("brain_web")
 
 
@@ -47,7 +53,7 @@ def get_request_graph_identity() -> Tuple[Optional[str], Optional[str]]:
     return _REQUEST_GRAPH_USER_ID.get(), _REQUEST_GRAPH_TENANT_ID.get()
 
 
-def ensure_schema_constraints(session: Session) -> None:
+def _ensure_schema_constraints_plan() -> QueryPlan[None]:
     """
     Ensure Neo4j constraints match the Branch Explorer model.
 
@@ -65,7 +71,7 @@ def ensure_schema_constraints(session: Session) -> None:
         return
 
     try:
-        constraints = session.run("SHOW CONSTRAINTS").data()
+        constraints = (yield Cypher("SHOW CONSTRAINTS")).data()
 
         def _labels(c):
             return [str(x) for x in (c.get("labelsOrTypes") or [])]
@@ -93,156 +99,156 @@ def ensure_schema_constraints(session: Session) -> None:
                 and _props(c) == ["name"]
                 and "UNIQUENESS" in _type(c)
             ):
-                session.run(f"DROP CONSTRAINT {name} IF EXISTS").consume()
+                (yield Cypher(f"DROP CONSTRAINT {name} IF EXISTS")).consume()
 
         # --- Core constraints ---
         if not _has("Concept", ["node_id"], "UNIQUENESS"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT concept_node_id_unique IF NOT EXISTS "
                 "FOR (c:Concept) REQUIRE c.node_id IS UNIQUE"
-            ).consume()
+            )).consume()
 
         if not _has("Concept", ["graph_id", "name"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT concept_graph_name_node_key IF NOT EXISTS "
                 "FOR (c:Concept) REQUIRE (c.graph_id, c.name) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("GraphSpace", ["graph_id"], "UNIQUENESS"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT graphspace_id_unique IF NOT EXISTS "
                 "FOR (g:GraphSpace) REQUIRE g.graph_id IS UNIQUE"
-            ).consume()
+            )).consume()
 
         if not _has("Lecture", ["lecture_id"], "UNIQUENESS"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT lecture_id_unique IF NOT EXISTS "
                 "FOR (l:Lecture) REQUIRE l.lecture_id IS UNIQUE"
-            ).consume()
+            )).consume()
 
         if not _has("MergeCandidate", ["graph_id", "candidate_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT merge_candidate_graph_candidate_node_key IF NOT EXISTS "
                 "FOR (m:MergeCandidate) REQUIRE (m.graph_id, m.candidate_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Artifact", ["graph_id", "url", "content_hash"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT artifact_graph_url_hash_node_key IF NOT EXISTS "
                 "FOR (a:Artifact) REQUIRE (a.graph_id, a.url, a.content_hash) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Event", ["event_id"], "UNIQUENESS"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT bw_event_id_unique IF NOT EXISTS "
                 "FOR (e:Event) REQUIRE e.event_id IS UNIQUE"
-            ).consume()
+            )).consume()
 
         # --- Graph-scoped node keys (domain entities) ---
         if not _has("Quote", ["graph_id", "quote_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT quote_graph_quote_id_node_key IF NOT EXISTS "
                 "FOR (q:Quote) REQUIRE (q.graph_id, q.quote_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Claim", ["graph_id", "claim_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT claim_graph_claim_id_node_key IF NOT EXISTS "
                 "FOR (c:Claim) REQUIRE (c.graph_id, c.claim_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("SourceChunk", ["graph_id", "chunk_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT chunk_graph_chunk_id_node_key IF NOT EXISTS "
                 "FOR (s:SourceChunk) REQUIRE (s.graph_id, s.chunk_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         # Create indexes for performance (bootstrap queries)
         # Check existing indexes first
         try:
-            existing_indexes = session.run("SHOW INDEXES").data()
+            existing_indexes = (yield Cypher("SHOW INDEXES")).data()
             index_names = [idx.get("name", "") for idx in existing_indexes]
             
             # Index on Artifact.captured_at for sorting (composite with graph_id)
             if "artifact_captured_at_index" not in index_names:
                 try:
-                    session.run(
+                    (yield Cypher(
                         "CREATE INDEX artifact_captured_at_index IF NOT EXISTS "
                         "FOR (a:Artifact) ON (a.graph_id, a.captured_at)"
-                    ).consume()
+                    )).consume()
                 except Exception as e:
                     logger.warning(f"Could not create artifact_captured_at_index: {e}")
 
             # Index on Concept.updated_at for sorting
             if "concept_updated_at_index" not in index_names:
                 try:
-                    session.run(
+                    (yield Cypher(
                         "CREATE INDEX concept_updated_at_index IF NOT EXISTS "
                         "FOR (c:Concept) ON (c.graph_id, c.updated_at)"
-                    ).consume()
+                    )).consume()
                 except Exception as e:
                     logger.warning(f"Could not create concept_updated_at_index: {e}")
 
             # Index on Concept.created_at for sorting
             if "concept_created_at_index" not in index_names:
                 try:
-                    session.run(
+                    (yield Cypher(
                         "CREATE INDEX concept_created_at_index IF NOT EXISTS "
                         "FOR (c:Concept) ON (c.graph_id, c.created_at)"
-                    ).consume()
+                    )).consume()
                 except Exception as e:
                     logger.warning(f"Could not create concept_created_at_index: {e}")
         except Exception as e:
             logger.warning(f"Could not check/create indexes: {e}")
 
         if not _has("SourceDocument", ["graph_id", "doc_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT sourcedoc_graph_doc_id_node_key IF NOT EXISTS "
                 "FOR (d:SourceDocument) REQUIRE (d.graph_id, d.doc_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Community", ["graph_id", "community_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT community_graph_comm_id_node_key IF NOT EXISTS "
                 "FOR (k:Community) REQUIRE (k.graph_id, k.community_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Branch", ["graph_id", "branch_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT branch_graph_branch_id_node_key IF NOT EXISTS "
                 "FOR (b:Branch) REQUIRE (b.graph_id, b.branch_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Trail", ["graph_id", "trail_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT trail_graph_trail_id_node_key IF NOT EXISTS "
                 "FOR (t:Trail) REQUIRE (t.graph_id, t.trail_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("TrailStep", ["graph_id", "step_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT trailstep_graph_step_id_node_key IF NOT EXISTS "
                 "FOR (s:TrailStep) REQUIRE (s.graph_id, s.step_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Snapshot", ["graph_id", "snapshot_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT snapshot_graph_snapshot_id_node_key IF NOT EXISTS "
                 "FOR (s:Snapshot) REQUIRE (s.graph_id, s.snapshot_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         if not _has("Resource", ["graph_id", "resource_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT resource_graph_resource_id_node_key IF NOT EXISTS "
                 "FOR (r:Resource) REQUIRE (r.graph_id, r.resource_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         # --- Idempotency for offline sync ---
         if not _has("ClientEvent", ["graph_id", "event_id"], "NODE_KEY"):
-            session.run(
+            (yield Cypher(
                 "CREATE CONSTRAINT client_event_graph_event_node_key IF NOT EXISTS "
                 "FOR (e:ClientEvent) REQUIRE (e.graph_id, e.event_id) IS NODE KEY"
-            ).consume()
+            )).consume()
 
         _SCHEMA_INITIALIZED = True
 
@@ -253,34 +259,161 @@ def ensure_schema_constraints(session: Session) -> None:
         return
 
 
+def ensure_schema_constraints(session: Session) -> None:
+    run_plan(session, _ensure_schema_constraints_plan())
+
+
 def _now_iso() -> str:
     return datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
 
 
-def ensure_graphspace_exists(
-    session: Session,
+# ---- Resolved graph-context cache ----
+#
+# get_active_graph_context is called by nearly every service. Resolving it costs a
+# handful of MERGE/MATCH round trips, so resolved (graph_id, branch_id) pairs are cached
+# per (tenant_id, user_id) for a short TTL, and GraphSpace/Branch nodes already ensured
+# by this process are remembered so they are not MERGEd again. set_active_graph /
+# set_active_branch (via _set_user_learning_prefs) and delete_graph invalidate entries;
+# the TTL bounds staleness from writes made by other processes. Only the default
+# graphs (which cannot be deleted) are trusted to the known-node cache when resolving a
+# context: a user-selected graph is re-ensured on every context-cache miss, since
+# another process's delete_graph does not clear this process's caches.
+
+GRAPH_CONTEXT_CACHE_TTL_SECONDS = float(os.getenv("GRAPH_CONTEXT_CACHE_TTL_SECONDS", "30"))
+GRAPH_CONTEXT_KNOWN_TTL_SECONDS = float(os.getenv("GRAPH_CONTEXT_KNOWN_TTL_SECONDS", "300"))
+GRAPH_CONTEXT_CACHE_MAX_ENTRIES = int(os.getenv("GRAPH_CONTEXT_CACHE_MAX_ENTRIES", "4096"))
+
+
+class _TTLCache:
+    """Small thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard_where(self, predicate) -> int:
+        with self._lock:
+            doomed = [k for k, (_, v) in self._entries.items() if predicate(k, v)]
+            for k in doomed:
+                del self._entries[k]
+            return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_context_cache = _TTLCache(GRAPH_CONTEXT_CACHE_TTL_SECONDS, GRAPH_CONTEXT_CACHE_MAX_ENTRIES)
+_known_graphspaces = _TTLCache(GRAPH_CONTEXT_KNOWN_TTL_SECONDS, GRAPH_CONTEXT_CACHE_MAX_ENTRIES)
+_known_branches = _TTLCache(GRAPH_CONTEXT_KNOWN_TTL_SECONDS, GRAPH_CONTEXT_CACHE_MAX_ENTRIES)
+_context_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "ensure_skipped": 0}
+_context_cache_stats_lock = threading.Lock()
+
+
+def _count_context_stat(name: str, n: int = 1) -> None:
+    with _context_cache_stats_lock:
+        _context_cache_stats[name] += n
+
+
+def invalidate_graph_context(tenant_id: Optional[str] = None, user_id: Optional[str] = None) -> None:
+    """Drop the cached active context for one (tenant_id, user_id)."""
+    if _context_cache.discard_where(lambda k, _: k == (tenant_id, user_id)):
+        _count_context_stat("invalidations")
+
+
+def _forget_graph(graph_id: str) -> None:
+    """Forget everything cached about graph_id (after it is deleted)."""
+    _known_graphspaces.discard_where(lambda k, _: k[0] == graph_id)
+    _known_branches.discard_where(lambda k, _: k[0] == graph_id)
+    _count_context_stat("invalidations", _context_cache.discard_where(lambda _, v: v[0] == graph_id))
+
+
+def clear_graph_context_cache() -> None:
+    _context_cache.clear()
+    _known_graphspaces.clear()
+    _known_branches.clear()
+
+
+def get_graph_context_cache_stats() -> Dict[str, Any]:
+    with _context_cache_stats_lock:
+        stats = dict(_context_cache_stats)
+    return {
+        **stats,
+        "contexts": len(_context_cache),
+        "known_graphspaces": len(_known_graphspaces),
+        "known_branches": len(_known_branches),
+        "ttl_seconds": GRAPH_CONTEXT_CACHE_TTL_SECONDS,
+    }
+
+
+def _ensure_graphspace_known_plan(
+    graph_id: str, name: Optional[str] = None, tenant_id: Optional[str] = None
+) -> QueryPlan[None]:
+    """ensure_graphspace_exists, skipped when this process recently ensured the same graph."""
+    if _known_graphspaces.get((graph_id, tenant_id)):
+        _count_context_stat("ensure_skipped")
+        return
+    yield from _ensure_graphspace_plan(graph_id, name=name, tenant_id=tenant_id)
+
+
+def _ensure_branch_known_plan(graph_id: str, branch_id: str, name: Optional[str] = None) -> QueryPlan[None]:
+    """ensure_branch_exists, skipped when this process recently ensured the same branch."""
+    if _known_branches.get((graph_id, branch_id)):
+        _count_context_stat("ensure_skipped")
+        return
+    yield from _ensure_branch_plan(graph_id, branch_id, name=name)
+
+
+def _ensure_graphspace_known(
+    session: Session, graph_id: str, name: Optional[str] = None, tenant_id: Optional[str] = None
+) -> None:
+    run_plan(session, _ensure_graphspace_known_plan(graph_id, name=name, tenant_id=tenant_id))
+
+
+def _ensure_branch_known(session: Session, graph_id: str, branch_id: str, name: Optional[str] = None) -> None:
+    run_plan(session, _ensure_branch_known_plan(graph_id, branch_id, name=name))
+
+
+def _ensure_graphspace_plan(
     graph_id: str,
     name: Optional[str] = None,
     tenant_id: Optional[str] = None,
-) -> Dict[str, Any]:
-    """
-    Ensure a GraphSpace exists; returns its properties.
-    
-    Args:
-        session: Neo4j session
-        graph_id: Graph identifier
-        name: Optional graph name
-        tenant_id: Optional tenant identifier for multi-tenant isolation
-    """
+) -> QueryPlan[Dict[str, Any]]:
     if tenant_id:
-        tenant_check = session.run(
+        tenant_check = (yield Cypher(
             """
             MATCH (g:GraphSpace {graph_id: $graph_id})
             RETURN g.tenant_id AS tenant_id
             LIMIT 1
             """,
-            graph_id=graph_id,
-        ).single()
+            {"graph_id": graph_id},
+        )).single()
         if tenant_check and tenant_check.get("tenant_id") not in (None, tenant_id):
             raise ValueError("Graph belongs to a different tenant")
 
@@ -294,10 +427,11 @@ def ensure_graphspace_exists(
                  g.tenant_id = COALESCE(g.tenant_id, $tenant_id)
     RETURN g
     """
-    rec = session.run(query, graph_id=graph_id, name=name, tenant_id=tenant_id, now=_now_iso()).single()
+    rec = (yield Cypher(query, {"graph_id": graph_id, "name": name, "tenant_id": tenant_id, "now": _now_iso()})).single()
     if rec is None:
         raise RuntimeError(f"Failed to create or retrieve GraphSpace with graph_id={graph_id}. Database query returned no result.")
     g = rec["g"]
+    _known_graphspaces.put((graph_id, tenant_id), True)
     return {
         "graph_id": g.get("graph_id"),
         "name": g.get("name"),
@@ -307,8 +441,25 @@ def ensure_graphspace_exists(
     }
 
 
-def ensure_branch_exists(session: Session, graph_id: str, branch_id: str, name: Optional[str] = None) -> Dict[str, Any]:
-    """Ensure a Branch exists for a GraphSpace."""
+def ensure_graphspace_exists(
+    session: Session,
+    graph_id: str,
+    name: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Ensure a GraphSpace exists; returns its properties.
+    
+    Args:
+        session: Neo4j session
+        graph_id: Graph identifier
+        name: Optional graph name
+        tenant_id: Optional tenant identifier for multi-tenant isolation
+    """
+    return run_plan(session, _ensure_graphspace_plan(graph_id, name=name, tenant_id=tenant_id))
+
+
+def _ensure_branch_plan(graph_id: str, branch_id: str, name: Optional[str] = None) -> QueryPlan[Dict[str, Any]]:
     query = """
     MERGE (g:GraphSpace {graph_id: $graph_id})
     ON CREATE SET g.name = COALESCE($name, $graph_id),
@@ -323,16 +474,14 @@ def ensure_branch_exists(session: Session, graph_id: str, branch_id: str, name:
     MERGE (b)-[:BRANCH_OF]->(g)
     RETURN b
     """
-    rec = session.run(
+    rec = (yield Cypher(
         query,
-        graph_id=graph_id,
-        branch_id=branch_id,
-        name=name,
-        now=_now_iso(),
-    ).single()
+        {"graph_id": graph_id, "branch_id": branch_id, "name": name, "now": _now_iso()},
+    )).single()
     if rec is None:
         raise RuntimeError(f"Failed to create or retrieve Branch with graph_id={graph_id}, branch_id={branch_id}. Database query returned no result.")
     b = rec["b"]
+    _known_branches.put((graph_id, branch_id), True)
     return {
         "branch_id": b.get("branch_id"),
         "graph_id": b.get("graph_id"),
@@ -342,13 +491,22 @@ def ensure_branch_exists(session: Session, graph_id: str, branch_id: str, name:
     }
 
 
-def ensure_default_context(session: Session) -> Tuple[str, str]:
-    ensure_schema_constraints(session)
-    ensure_graphspace_exists(session, DEFAULT_GRAPH_ID, name="Default")
-    ensure_branch_exists(session, DEFAULT_GRAPH_ID, DEFAULT_BRANCH_ID, name="Main")
+def ensure_branch_exists(session: Session, graph_id: str, branch_id: str, name: Optional[str] = None) -> Dict[str, Any]:
+    """Ensure a Branch exists for a GraphSpace."""
+    return run_plan(session, _ensure_branch_plan(graph_id, branch_id, name=name))
+
+
+def _ensure_default_context_plan() -> QueryPlan[Tuple[str, str]]:
+    yield from _ensure_schema_constraints_plan()
+    yield from _ensure_graphspace_known_plan(DEFAULT_GRAPH_ID, name="Default")
+    yield from _ensure_branch_known_plan(DEFAULT_GRAPH_ID, DEFAULT_BRANCH_ID, name="Main")
     return DEFAULT_GRAPH_ID, DEFAULT_BRANCH_ID
 
 
+def ensure_default_context(session: Session) -> Tuple[str, str]:
+    return run_plan(session, _ensure_default_context_plan())
+
+
 def _sanitize_identity(value: str) -> str:
     cleaned = "".join(ch if (ch.isalnum() or ch in "-_.") else "_" for ch in value)
     return cleaned[:96] if cleaned else "default"
@@ -384,12 +542,11 @@ def _tenant_default_graph_id(tenant_id: Optional[str]) -> str:
     return f"{DEFAULT_GRAPH_ID}_{_sanitize_identity(tenant_id)[:16]}"
 
 
-def _get_user_learning_prefs(
-    session: Session,
+def _get_user_learning_prefs_plan(
     *,
     user_id: Optional[str] = None,
     tenant_id: Optional[str] = None,
-) -> Dict[str, Any]:
+) -> QueryPlan[Dict[str, Any]]:
     resolved_user_id, resolved_tenant_id = _resolve_graph_identity(user_id=user_id, tenant_id=tenant_id)
     profile_id = _graph_context_profile_id(resolved_user_id, resolved_tenant_id)
 
@@ -409,13 +566,15 @@ def _get_user_learning_prefs(
     RETURN u.learning_preferences AS learning_preferences
     """
     empty_json = json.dumps({})
-    rec = session.run(
+    rec = (yield Cypher(
         query,
-        profile_id=profile_id,
-        user_id=resolved_user_id,
-        tenant_id=resolved_tenant_id,
-        empty_json=empty_json,
-    ).single()
+        {
+            "profile_id": profile_id,
+            "user_id": resolved_user_id,
+            "tenant_id": resolved_tenant_id,
+            "empty_json": empty_json,
+        },
+    )).single()
     lp = rec["learning_preferences"] if rec else "{}"
 
     if isinstance(lp, str):
@@ -428,13 +587,21 @@ def _get_user_learning_prefs(
     return {}
 
 
-def _set_user_learning_prefs(
+def _get_user_learning_prefs(
     session: Session,
+    *,
+    user_id: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    return run_plan(session, _get_user_learning_prefs_plan(user_id=user_id, tenant_id=tenant_id))
+
+
+def _set_user_learning_prefs_plan(
     prefs: Dict[str, Any],
     *,
     user_id: Optional[str] = None,
     tenant_id: Optional[str] = None,
-) -> None:
+) -> QueryPlan[None]:
     resolved_user_id, resolved_tenant_id = _resolve_graph_identity(user_id=user_id, tenant_id=tenant_id)
     profile_id = _graph_context_profile_id(resolved_user_id, resolved_tenant_id)
 
@@ -446,37 +613,39 @@ def _set_user_learning_prefs(
         u.context_kind = COALESCE(u.context_kind, 'graph_context')
     RETURN u
     """
-    session.run(
+    (yield Cypher(
         query,
-        profile_id=profile_id,
-        learning_preferences=json.dumps(prefs),
-        user_id=resolved_user_id,
-        tenant_id=resolved_tenant_id,
-    ).consume()
+        {
+            "profile_id": profile_id,
+            "learning_preferences": json.dumps(prefs),
+            "user_id": resolved_user_id,
+            "tenant_id": resolved_tenant_id,
+        },
+    )).consume()
+    invalidate_graph_context(resolved_tenant_id, resolved_user_id)
 
 
-def get_active_graph_context(
+def _set_user_learning_prefs(
     session: Session,
-    tenant_id: Optional[str] = None,
+    prefs: Dict[str, Any],
+    *,
     user_id: Optional[str] = None,
-) -> Tuple[str, str]:
-    """
-    Returns (graph_id, branch_id). Ensures defaults exist.
-    
-    Args:
-        session: Neo4j session
-        tenant_id: Optional tenant_id for multi-tenant isolation. If provided,
-                   ensures graph belongs to this tenant.
-    """
-    resolved_user_id, resolved_tenant_id = _resolve_graph_identity(user_id=user_id, tenant_id=tenant_id)
+    tenant_id: Optional[str] = None,
+) -> None:
+    run_plan(session, _set_user_learning_prefs_plan(prefs, user_id=user_id, tenant_id=tenant_id))
 
-    ensure_default_context(session)
+
+def _active_graph_context_plan(
+    resolved_tenant_id: Optional[str],
+    resolved_user_id: Optional[str],
+) -> QueryPlan[Tuple[str, str]]:
+    yield from _ensure_default_context_plan()
     default_graph_id = _tenant_default_graph_id(resolved_tenant_id)
     if resolved_tenant_id:
-        ensure_graphspace_exists(session, default_graph_id, name="Default", tenant_id=resolved_tenant_id)
-        ensure_branch_exists(session, default_graph_id, DEFAULT_BRANCH_ID, name="Main")
+        yield from _ensure_graphspace_known_plan(default_graph_id, name="Default", tenant_id=resolved_tenant_id)
+        yield from _ensure_branch_known_plan(default_graph_id, DEFAULT_BRANCH_ID, name="Main")
 
-    prefs = _get_user_learning_prefs(session, user_id=resolved_user_id, tenant_id=resolved_tenant_id)
+    prefs = yield from _get_user_learning_prefs_plan(user_id=resolved_user_id, tenant_id=resolved_tenant_id)
     graph_id = prefs.get("active_graph_id") or default_graph_id
     branch_id = prefs.get("active_branch_id") or DEFAULT_BRANCH_ID
 
@@ -487,51 +656,97 @@ def get_active_graph_context(
         WHERE g.tenant_id = $tenant_id
         RETURN g
         """
-        rec = session.run(query, graph_id=graph_id, tenant_id=resolved_tenant_id).single()
+        rec = (yield Cypher(query, {"graph_id": graph_id, "tenant_id": resolved_tenant_id})).single()
         if not rec:
             # Graph doesn't exist or doesn't belong to tenant, use default
             graph_id = default_graph_id
             branch_id = DEFAULT_BRANCH_ID
 
-    ensure_graphspace_exists(session, graph_id, tenant_id=resolved_tenant_id)
-    ensure_branch_exists(session, graph_id, branch_id)
-
+    if graph_id == default_graph_id and branch_id == DEFAULT_BRANCH_ID:
+        # Default graphs cannot be deleted, so the known-node cache is safe here
+        yield from _ensure_graphspace_known_plan(graph_id, tenant_id=resolved_tenant_id)
+        yield from _ensure_branch_known_plan(graph_id, branch_id)
+    else:
+        # The graph may have been deleted by another process since we last ensured it
+        yield from _ensure_graphspace_plan(graph_id, tenant_id=resolved_tenant_id)
+        yield from _ensure_branch_plan(graph_id, branch_id)
     return graph_id, branch_id
 
 
-def set_active_graph(
+def active_graph_context_plan(
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> QueryPlan[Tuple[str, str]]:
+    """Query plan behind get_active_graph_context (cached; issues no queries on a hit)."""
+    resolved_user_id, resolved_tenant_id = _resolve_graph_identity(user_id=user_id, tenant_id=tenant_id)
+    cache_key = (resolved_tenant_id, resolved_user_id)
+    cached = _context_cache.get(cache_key)
+    if cached is not None:
+        _count_context_stat("hits")
+        return cached
+    _count_context_stat("misses")
+    context = yield from _active_graph_context_plan(resolved_tenant_id, resolved_user_id)
+    _context_cache.put(cache_key, context)
+    return context
+
+
+def get_active_graph_context(
     session: Session,
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Tuple[str, str]:
+    """
+    Returns (graph_id, branch_id). Ensures defaults exist.
+
+    The result is cached per (tenant_id, user_id) for GRAPH_CONTEXT_CACHE_TTL_SECONDS.
+    
+    Args:
+        session: Neo4j session
+        tenant_id: Optional tenant_id for multi-tenant isolation. If provided,
+                   ensures graph belongs to this tenant.
+    """
+    return run_plan(session, active_graph_context_plan(tenant_id=tenant_id, user_id=user_id))
+
+
+async def get_active_graph_context_async(
+    session,
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Tuple[str, str]:
+    """get_active_graph_context for an async Neo4j session."""
+    return await run_plan_async(session, active_graph_context_plan(tenant_id=tenant_id, user_id=user_id))
+
+
+def _set_active_graph_plan(
     graph_id: str,
     *,
     tenant_id: Optional[str] = None,
     user_id: Optional[str] = None,
-) -> Tuple[str, str]:
-    ensure_schema_constraints(session)
+) -> QueryPlan[Tuple[str, str]]:
+    yield from _ensure_schema_constraints_plan()
     resolved_user_id, resolved_tenant_id = _resolve_graph_identity(user_id=user_id, tenant_id=tenant_id)
 
     if resolved_tenant_id:
-        rec = session.run(
+        rec = (yield Cypher(
             """
             MATCH (g:GraphSpace {graph_id: $graph_id})
             WHERE g.tenant_id = $tenant_id
             RETURN g
             """,
-            graph_id=graph_id,
-            tenant_id=resolved_tenant_id,
-        ).single()
+            {"graph_id": graph_id, "tenant_id": resolved_tenant_id},
+        )).single()
         if not rec:
             raise ValueError("Graph not found in tenant scope")
     else:
-        ensure_graphspace_exists(session, graph_id)
+        yield from _ensure_graphspace_plan(graph_id)
 
     # When switching graphs, default to its main branch.
-    ensure_branch_exists(session, graph_id, DEFAULT_BRANCH_ID, name="Main")
+    yield from _ensure_branch_known_plan(graph_id, DEFAULT_BRANCH_ID, name="Main")
 
-    prefs = _get_user_learning_prefs(session, user_id=resolved_user_id, tenant_id=resolved_tenant_id)
+    prefs = yield from _get_user_learning_prefs_plan(user_id=resolved_user_id, tenant_id=resolved_tenant_id)
     prefs["active_graph_id"] = graph_id
     prefs["active_branch_id"] = DEFAULT_BRANCH_ID
-    _set_user_learning_prefs(
-        session,
+    yield from _set_user_learning_prefs_plan(
         prefs,
         user_id=resolved_user_id,
         tenant_id=resolved_tenant_id,
@@ -540,6 +755,27 @@ def set_active_graph(
     return graph_id, DEFAULT_BRANCH_ID
 
 
+def set_active_graph(
+    session: Session,
+    graph_id: str,
+    *,
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Tuple[str, str]:
+    return run_plan(session, _set_active_graph_plan(graph_id, tenant_id=tenant_id, user_id=user_id))
+
+
+async def set_active_graph_async(
+    session,
+    graph_id: str,
+    *,
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Tuple[str, str]:
+    """set_active_graph for an async Neo4j session."""
+    return await run_plan_async(session, _set_active_graph_plan(graph_id, tenant_id=tenant_id, user_id=user_id))
+
+
 def set_active_branch(
     session: Session,
     branch_id: str,
@@ -550,7 +786,7 @@ def set_active_branch(
     resolved_user_id, resolved_tenant_id = _resolve_graph_identity(user_id=user_id, tenant_id=tenant_id)
     graph_id, _ = get_active_graph_context(session, tenant_id=resolved_tenant_id, user_id=resolved_user_id)
     ensure_schema_constraints(session)
-    ensure_branch_exists(session, graph_id, branch_id)
+    _ensure_branch_known(session, graph_id, branch_id)
 
     prefs = _get_user_learning_prefs(session, user_id=resolved_user_id, tenant_id=resolved_tenant_id)
     prefs["active_graph_id"] = graph_id
@@ -578,17 +814,30 @@ def list_graphs(session: Session, tenant_id: Optional[str] = None) -> List[Dict[
     List graphs for the given tenant. tenant_id is required for multi-tenant isolation.
     Resolved from request context if not provided. Use list_all_graphs() only for admin/scripts.
     """
+    return _list_graphs_impl(session, tenant_id=_require_list_tenant(tenant_id))
+
+
+async def list_graphs_async(session, tenant_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """list_graphs for an async Neo4j session."""
+    return await run_plan_async(session, _list_graphs_plan(tenant_id=_require_list_tenant(tenant_id)))
+
+
+def _require_list_tenant(tenant_id: Optional[str]) -> str:
     resolved = str(tenant_id).strip() if tenant_id else (str(_REQUEST_GRAPH_TENANT_ID.get()).strip() if _REQUEST_GRAPH_TENANT_ID.get() else None)
     if not resolved:
         raise ValueError("tenant_id is required for list_graphs; use list_all_graphs() for admin/script use only.")
-    return _list_graphs_impl(session, tenant_id=resolved)
+    return resolved
 
 
 def _list_graphs_impl(session: Session, tenant_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """Internal: run the list query with optional tenant filter."""
-    ensure_default_context(session)
+    return run_plan(session, _list_graphs_plan(tenant_id=tenant_id))
+
+
+def _list_graphs_plan(tenant_id: Optional[str] = None) -> QueryPlan[List[Dict[str, Any]]]:
+    yield from _ensure_default_context_plan()
     if tenant_id:
-        ensure_graphspace_exists(session, _tenant_default_graph_id(tenant_id), name="Default", tenant_id=tenant_id)
+        yield from _ensure_graphspace_known_plan(_tenant_default_graph_id(tenant_id), name="Default", tenant_id=tenant_id)
 
     where_clause = ""
     params: Dict[str, Any] = {}
@@ -609,7 +858,7 @@ def _list_graphs_impl(session: Session, tenant_id: Optional[str] = None) -> List
     ORDER BY g.created_at ASC
     """
     out: List[Dict[str, Any]] = []
-    for rec in session.run(query, **params):
+    for rec in (yield Cypher(query, params)):
         g = rec["g"]
         node_count = rec["node_count"] or 0
         edge_count = rec["edge_count"] or 0
@@ -767,12 +1016,28 @@ def delete_graph(
     summary = result.consume()
     if summary.counters.nodes_deleted == 0:
         raise ValueError("Graph not found")
+    _forget_graph(graph_id)
+    _delete_graph_claims_from_qdrant(graph_id)
+
+
+def _delete_graph_claims_from_qdrant(graph_id: str) -> None:
+    """Best-effort: claim retrieval also drops hits Neo4j no longer has."""
+    from config import USE_QDRANT
+
+    if not USE_QDRANT:
+        return
+    try:
+        from vector_store_qdrant import delete_graph_claims
+
+        delete_graph_claims(graph_id)
+    except Exception as e:
+        logger.warning(f"[Graph] Failed to delete claims of graph {graph_id} from Qdrant: {e}")
 
 
 _SCOPING_INITIALIZED = False
 
 
-def ensure_graph_scoping_initialized(session: Session) -> None:
+def graph_scoping_plan() -> QueryPlan[None]:
     """Backfill legacy data into the default graph and main branch.
 
     This is intentionally conservative:
@@ -784,8 +1049,7 @@ def ensure_graph_scoping_initialized(session: Session) -> None:
     if _SCOPING_INITIALIZED:
         return
 
-    ensure_schema_constraints(session)
-    ensure_default_context(session)
+    yield from _ensure_default_context_plan()
 
     # Backfill Concepts that aren't scoped.
     query_nodes = """
@@ -797,7 +1061,7 @@ def ensure_graph_scoping_initialized(session: Session) -> None:
         c.on_branches = COALESCE(c.on_branches, [$branch_id])
     RETURN count(c) AS updated
     """
-    session.run(query_nodes, graph_id=DEFAULT_GRAPH_ID, branch_id=DEFAULT_BRANCH_ID).consume()
+    (yield Cypher(query_nodes, {"graph_id": DEFAULT_GRAPH_ID, "branch_id": DEFAULT_BRANCH_ID})).consume()
 
     # Ensure existing Concepts have on_branches.
     query_branches = """
@@ -806,7 +1070,7 @@ def ensure_graph_scoping_initialized(session: Session) -> None:
     SET c.on_branches = [$branch_id]
     RETURN count(c) AS updated
     """
-    session.run(query_branches, branch_id=DEFAULT_BRANCH_ID).consume()
+    (yield Cypher(query_branches, {"branch_id": DEFAULT_BRANCH_ID})).consume()
 
     # Backfill relationships between Concepts.
     query_rels = """
@@ -816,7 +1080,7 @@ def ensure_graph_scoping_initialized(session: Session) -> None:
         r.on_branches = COALESCE(r.on_branches, [$branch_id])
     RETURN count(r) AS updated
     """
-    session.run(query_rels, graph_id=DEFAULT_GRAPH_ID, branch_id=DEFAULT_BRANCH_ID).consume()
+    (yield Cypher(query_rels, {"graph_id": DEFAULT_GRAPH_ID, "branch_id": DEFAULT_BRANCH_ID})).consume()
 
     query_rels_branches = """
     MATCH (s:Concept)-[r]->(t:Concept)
@@ -824,10 +1088,10 @@ def ensure_graph_scoping_initialized(session: Session) -> None:
     SET r.on_branches = [$branch_id]
     RETURN count(r) AS updated
     """
-    session.run(query_rels_branches, branch_id=DEFAULT_BRANCH_ID).consume()
+    (yield Cypher(query_rels_branches, {"branch_id": DEFAULT_BRANCH_ID})).consume()
 
     # Backfill Resources that aren't scoped.
-    session.run(
+    (yield Cypher(
         """
         MATCH (g:GraphSpace {graph_id: $graph_id})
         MATCH (r:Resource)
@@ -835,19 +1099,27 @@ def ensure_graph_scoping_initialized(session: Session) -> None:
         MERGE (r)-[:BELONGS_TO]->(g)
         SET r.graph_id = $graph_id
         """,
-        graph_id=DEFAULT_GRAPH_ID,
-    ).consume()
+        {"graph_id": DEFAULT_GRAPH_ID},
+    )).consume()
 
     # Backfill HAS_RESOURCE relationship scoping.
-    session.run(
+    (yield Cypher(
         """
         MATCH (c:Concept)-[rel:HAS_RESOURCE]->(r:Resource)
         WHERE rel.graph_id IS NULL
         SET rel.graph_id = COALESCE(c.graph_id, $graph_id),
             rel.on_branches = COALESCE(rel.on_branches, [$branch_id])
         """,
-        graph_id=DEFAULT_GRAPH_ID,
-        branch_id=DEFAULT_BRANCH_ID,
-    ).consume()
+        {"graph_id": DEFAULT_GRAPH_ID, "branch_id": DEFAULT_BRANCH_ID},
+    )).consume()
 
     _SCOPING_INITIALIZED = True
+
+
+def ensure_graph_scoping_initialized(session: Session) -> None:
+    run_plan(session, graph_scoping_plan())
+
+
+async def ensure_graph_scoping_initialized_async(session) -> None:
+    """ensure_graph_scoping_initialized for an async Neo4j session."""
+    await run_plan_async(session, graph_scoping_plan())
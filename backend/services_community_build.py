@@ -19,6 +19,8 @@ except ImportError:
     # Fallback if script is not importable
     build_communities = None
 
+from services_community_index import invalidate_community_index
+
 logger = logging.getLogger("brain_web")
 
 
@@ -64,6 +66,8 @@ def trigger_community_build(
             resolution=resolution,
             unweighted=unweighted,
         )
+        # Community ids/summaries changed; drop the cached summary index for this graph.
+        invalidate_community_index(graph_id)
         
         logger.info(f"[Community Build] Successfully completed build for graph_id={graph_id}, version={build_version}")
         return True
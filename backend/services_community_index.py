@@ -0,0 +1,165 @@
+"""
+In-process community summary index, one per graph.
+
+Community lookup is the first step of every GraphRAG call. Instead of pulling every
+Community.summary_embedding over Bolt on each question, we load a graph's communities
+once into a float32 matrix (plus id/name/summary arrays) and score queries in memory.
+
+- Loaded lazily on first use per graph_id.
+- Bounded by an LRU over graphs (COMMUNITY_INDEX_MAX_GRAPHS).
+- Invalidated explicitly whenever community summaries are written (upsert_community,
+  build_communities, summarize_all_communities, trigger_community_build).
+- Entries also expire after COMMUNITY_INDEX_TTL_SECONDS so writes made by another
+  process (e.g. the CLI scripts) are eventually picked up.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from neo4j import Session
+
+from services_similarity import EmbeddingMatrix
+
+logger = logging.getLogger("brain_web")
+
+COMMUNITY_INDEX_MAX_GRAPHS = int(os.getenv("COMMUNITY_INDEX_MAX_GRAPHS", "32"))
+COMMUNITY_INDEX_TTL_SECONDS = float(os.getenv("COMMUNITY_INDEX_TTL_SECONDS", "300"))
+
+
+class CommunityIndex:
+    """Community summaries of one graph, packed for batched cosine scoring."""
+
+    def __init__(self, graph_id: str, communities: List[Dict[str, Any]], embeddings: List[List[float]]):
+        self.graph_id = graph_id
+        self.loaded_at = time.monotonic()
+        self._index = EmbeddingMatrix(communities, embeddings)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._index.matrix.nbytes)
+
+    def is_expired(self, ttl_seconds: float) -> bool:
+        return ttl_seconds > 0 and (time.monotonic() - self.loaded_at) > ttl_seconds
+
+    def search(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+        """Top communities by cosine similarity; dicts with community_id, name, score, summary."""
+        if len(self._index) == 0 or not query_embedding:
+            return []
+        if len(query_embedding) != self._index.dim:
+            logger.warning(
+                f"[CommunityIndex] Query dim {len(query_embedding)} != index dim {self._index.dim} for graph {self.graph_id}"
+            )
+            return []
+        return [
+            {**community, "score": score}
+            for community, score in self._index.top_k(query_embedding, limit)
+        ]
+
+
+def load_community_index(session: Session, graph_id: str) -> CommunityIndex:
+    """Read all summarized communities of a graph from Neo4j into a CommunityIndex."""
+    query = """
+    MATCH (g:GraphSpace {graph_id: $graph_id})
+    MATCH (k:Community {graph_id: $graph_id})-[:BELONGS_TO]->(g)
+    WHERE k.summary_embedding IS NOT NULL
+    RETURN k.community_id AS community_id,
+           k.name AS name,
+           k.summary AS summary,
+           k.summary_embedding AS summary_embedding
+    """
+    communities = []
+    embeddings = []
+    for record in session.run(query, graph_id=graph_id):
+        if not record["summary_embedding"]:
+            continue
+        communities.append({
+            "community_id": record["community_id"],
+            "name": record["name"],
+            "summary": record["summary"],
+        })
+        embeddings.append(record["summary_embedding"])
+    return CommunityIndex(graph_id, communities, embeddings)
+
+
+class CommunityIndexCache:
+    """Thread-safe LRU of CommunityIndex objects keyed by graph_id."""
+
+    def __init__(self, max_graphs: int = COMMUNITY_INDEX_MAX_GRAPHS, ttl_seconds: float = COMMUNITY_INDEX_TTL_SECONDS):
+        self.max_graphs = max(1, int(max_graphs))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: "OrderedDict[str, CommunityIndex]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, session: Session, graph_id: str) -> CommunityIndex:
+        with self._lock:
+            index = self._entries.get(graph_id)
+            if index is not None and not index.is_expired(self.ttl_seconds):
+                self._entries.move_to_end(graph_id)
+                self._stats["hits"] += 1
+                return index
+            self._stats["misses"] += 1
+            generation = self._generations.get(graph_id, 0)
+
+        # Load outside the lock so one slow graph doesn't block lookups for others.
+        index = load_community_index(session, graph_id)
+
+        with self._lock:
+            self._stats["loads"] += 1
+            # An invalidation raced with the load; serve this result but don't cache it.
+            if self._generations.get(graph_id, 0) != generation:
+                return index
+            self._entries[graph_id] = index
+            self._entries.move_to_end(graph_id)
+            while len(self._entries) > self.max_graphs:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return index
+
+    def invalidate(self, graph_id: Optional[str] = None) -> None:
+        with self._lock:
+            self._stats["invalidations"] += 1
+            if graph_id is None:
+                for gid in list(self._entries) + list(self._generations):
+                    self._generations[gid] = self._generations.get(gid, 0) + 1
+                self._entries.clear()
+                return
+            self._generations[graph_id] = self._generations.get(graph_id, 0) + 1
+            self._entries.pop(graph_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "graphs": len(self._entries),
+                "max_graphs": self.max_graphs,
+                "communities": sum(len(i) for i in self._entries.values()),
+                "bytes": sum(i.nbytes for i in self._entries.values()),
+            }
+
+
+_cache = CommunityIndexCache()
+
+
+def get_community_index(session: Session, graph_id: str) -> CommunityIndex:
+    """Return the (lazily loaded) community index for a graph."""
+    return _cache.get(session, graph_id)
+
+
+def invalidate_community_index(graph_id: Optional[str] = None) -> None:
+    """Drop the cached index for one graph (or all graphs if graph_id is None)."""
+    _cache.invalidate(graph_id)
+
+
+def get_community_index_stats() -> Dict[str, Any]:
+    return _cache.stats()
@@ -0,0 +1,188 @@
+"""
+Micro-batching of concurrent embedding requests.
+
+Worker threads that each need a handful of embeddings (e.g. the lecture-ingestion
+pool embedding claims chunk by chunk) submit texts here instead of calling the API
+directly. A single dispatcher thread collects everything submitted within a short
+window (EMBEDDING_BATCH_WINDOW_MS) or until the batch is full, sends one
+ModelRouter.embed_many call, and fans the vectors back to the waiting callers.
+
+A merged request rejected by the API (a 4xx such as one over-long input) is split
+in halves and retried, so only the futures of the offending inputs fail. Transport
+errors, rate limits and 5xx fail the whole batch at once: they are not tied to any
+one input, and splitting would only multiply the calls during an outage.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from services_model_router import (
+    model_router,
+    TASK_EMBEDDING,
+    EMBEDDING_MAX_BATCH_INPUTS,
+    EMBEDDING_MAX_BATCH_CHARS,
+)
+
+logger = logging.getLogger("brain_web")
+
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "15"))
+EMBEDDING_BATCH_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_BATCH_TIMEOUT_SECONDS", "120"))
+
+
+def _is_input_error(exc: Exception) -> bool:
+    """True for API rejections of the request body (4xx other than 429)."""
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+class EmbeddingBatcher:
+    """Coalesces single-text embedding requests from many threads into batched calls."""
+
+    def __init__(
+        self,
+        router=model_router,
+        window_ms: float = EMBEDDING_BATCH_WINDOW_MS,
+        max_inputs: int = EMBEDDING_MAX_BATCH_INPUTS,
+        max_chars: int = EMBEDDING_MAX_BATCH_CHARS,
+        task_type: str = TASK_EMBEDDING,
+    ):
+        self.router = router
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_inputs = max(1, int(max_inputs))
+        self.max_chars = max(1, int(max_chars))
+        self.task_type = task_type
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "texts": 0, "errors": 0, "splits": 0}
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+
+    # ---- Submission ----
+
+    def submit(self, text: str) -> Future:
+        """Queue one text; the returned Future resolves to its embedding."""
+        self._ensure_started()
+        fut: Future = Future()
+        self._stats["requests"] += 1
+        self._queue.put((text, fut))
+        return fut
+
+    def embed(self, text: str, timeout: float = EMBEDDING_BATCH_TIMEOUT_SECONDS) -> List[float]:
+        return self.submit(text).result(timeout=timeout)
+
+    def embed_many(
+        self, texts: List[str], timeout: float = EMBEDDING_BATCH_TIMEOUT_SECONDS
+    ) -> List[Optional[List[float]]]:
+        """
+        Embed several texts; they share batches with whatever other threads submit.
+
+        Each input is resolved on its own: a text the API rejects (or that times out)
+        comes back as None while the rest still get their vectors.
+        """
+        futures = [self.submit(t) for t in texts]
+        vectors: List[Optional[List[float]]] = []
+        for i, f in enumerate(futures):
+            try:
+                vectors.append(f.result(timeout=timeout))
+            except Exception as e:
+                logger.warning(f"[embedding_batcher] input {i} of {len(texts)} not embedded: {e}")
+                vectors.append(None)
+        return vectors
+
+    # ---- Dispatcher ----
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        chars = len(batch[0][0])
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_inputs:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if chars + len(item[0]) > self.max_chars:
+                # Over budget: dispatch what we have and let this one lead the next batch.
+                self._dispatch(batch)
+                batch, chars = [item], 0
+            else:
+                batch.append(item)
+            chars += len(item[0])
+        return batch
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]) -> None:
+        live = [(t, f) for t, f in batch if f.set_running_or_notify_cancel()]
+        if live:
+            self._embed_live(live)
+
+    def _embed_live(self, live: List[Tuple[str, Future]]) -> None:
+        try:
+            vectors = self.router.embed_many(
+                [t for t, _ in live],
+                task_type=self.task_type,
+                max_inputs=self.max_inputs,
+                max_chars=self.max_chars,
+            )
+        except Exception as e:
+            self._stats["errors"] += 1
+            if len(live) > 1 and _is_input_error(e):
+                self._stats["splits"] += 1
+                logger.info(f"[embedding_batcher] batch of {len(live)} rejected, splitting: {e}")
+                mid = len(live) // 2
+                self._embed_live(live[:mid])
+                self._embed_live(live[mid:])
+                return
+            logger.warning(f"[embedding_batcher] batch of {len(live)} failed: {e}")
+            for _, f in live:
+                f.set_exception(e)
+            return
+        self._stats["batches"] += 1
+        self._stats["texts"] += len(live)
+        for (_, f), vec in zip(live, vectors):
+            f.set_result(vec)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            self._dispatch(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "pending": self._queue.qsize(),
+            "avg_batch_size": self._stats["texts"] / batches if batches else 0.0,
+            "window_ms": self.window_s * 1000.0,
+        }
+
+
+embedding_batcher = EmbeddingBatcher()
+
+
+def embed_many(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Batched embeddings for a list of texts, coalesced with concurrent callers.
+
+    Inputs that could not be embedded are None in the result.
+    """
+    if not texts:
+        return []
+    return embedding_batcher.embed_many(texts)
+
+
+def get_embedding_batcher_stats() -> Dict[str, Any]:
+    return embedding_batcher.stats()
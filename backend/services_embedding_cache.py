@@ -0,0 +1,246 @@
+"""
+Content-hash keyed embedding cache used by ModelRouter.embed.
+
+One chat/GraphRAG turn embeds the same question several times (retrieval, community
+search, anchor detection, semantic-cache lookup). This cache makes every repeat free:
+
+  L0  request memo  - a dict bound to the current request/turn via a ContextVar
+  L1  process LRU   - bounded OrderedDict of float32 arrays (EMBEDDING_CACHE_MAX_ENTRIES)
+  L2  Redis         - optional, raw float32 bytes with a TTL (EMBEDDING_CACHE_USE_REDIS)
+
+Keys are sha256(model + text), so different models never share vectors.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import redis
+except Exception:  # pragma: no cover
+    redis = None
+
+from config import (
+    USE_REDIS,
+    REDIS_URL,
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_PASSWORD,
+    REDIS_DB,
+)
+
+logger = logging.getLogger("brain_web")
+
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+EMBEDDING_CACHE_REDIS_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_REDIS_TTL_SECONDS", str(60 * 60 * 24 * 7)))
+EMBEDDING_CACHE_USE_REDIS = os.getenv(
+    "EMBEDDING_CACHE_USE_REDIS", "true" if USE_REDIS else "false"
+).lower() in ("true", "1", "yes")
+_REDIS_RETRY_SECONDS = 60.0
+
+_REQUEST_MEMO: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("bw_embedding_request_memo", default=None)
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    digest = hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+    return f"embcache:{model}:{digest}"
+
+
+def begin_embedding_request_scope() -> Token:
+    """Bind a fresh request-scoped embedding memo to the current context."""
+    return _REQUEST_MEMO.set({})
+
+
+def end_embedding_request_scope(token: Token) -> None:
+    """Drop the request-scoped embedding memo."""
+    _REQUEST_MEMO.reset(token)
+
+
+@contextmanager
+def embedding_request_scope() -> Iterator[None]:
+    """
+    Share embeddings across everything that runs inside this block (one turn/request).
+
+    Nested scopes reuse the outer memo.
+    """
+    if _REQUEST_MEMO.get() is not None:
+        yield
+        return
+    token = begin_embedding_request_scope()
+    try:
+        yield
+    finally:
+        end_embedding_request_scope(token)
+
+
+class EmbeddingCache:
+    """Multi-tier embedding cache. Thread-safe."""
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, use_redis: bool = EMBEDDING_CACHE_USE_REDIS):
+        self.max_entries = max(0, int(max_entries))
+        self.use_redis = bool(use_redis) and redis is not None
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis_client = None
+        self._redis_retry_at = 0.0
+        self._stats = {
+            "hits_request": 0,
+            "hits_memory": 0,
+            "hits_redis": 0,
+            "misses": 0,
+        }
+
+    # ---- Redis tier ----
+
+    def _get_redis(self):
+        if not self.use_redis or redis is None:
+            return None
+        if self._redis_client is not None:
+            return self._redis_client
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        try:
+            if REDIS_URL:
+                client = redis.from_url(REDIS_URL, socket_timeout=1)
+            else:
+                client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    socket_timeout=1,
+                )
+            client.ping()
+            self._redis_client = client
+            return client
+        except Exception as e:
+            logger.warning(f"Embedding cache: Redis unavailable ({e})")
+            self._redis_retry_at = time.monotonic() + _REDIS_RETRY_SECONDS
+            return None
+
+    # ---- Public API ----
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings for texts; None where all tiers miss."""
+        keys = [embedding_cache_key(model, t) for t in texts]
+        out: List[Optional[List[float]]] = [None] * len(keys)
+        memo = _REQUEST_MEMO.get()
+
+        pending = []
+        for i, key in enumerate(keys):
+            if memo is not None and key in memo:
+                out[i] = memo[key]
+            else:
+                pending.append(i)
+        with self._lock:
+            self._stats["hits_request"] += len(keys) - len(pending)
+
+        if pending:
+            with self._lock:
+                still_pending = []
+                for i in pending:
+                    arr = self._lru.get(keys[i])
+                    if arr is None:
+                        still_pending.append(i)
+                        continue
+                    self._lru.move_to_end(keys[i])
+                    out[i] = arr.tolist()
+                    self._stats["hits_memory"] += 1
+            pending = still_pending
+
+        if pending:
+            client = self._get_redis()
+            if client is not None:
+                try:
+                    raw = client.mget([keys[i] for i in pending])
+                except Exception as e:
+                    logger.debug(f"Embedding cache: Redis MGET failed ({e})")
+                    raw = [None] * len(pending)
+                still_pending = []
+                for i, blob in zip(pending, raw):
+                    # The client does not decode responses, so hits are raw float32 bytes
+                    if not isinstance(blob, bytes) or not blob:
+                        still_pending.append(i)
+                        continue
+                    arr = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(keys[i], arr)
+                    out[i] = arr.tolist()
+                with self._lock:
+                    self._stats["hits_redis"] += len(pending) - len(still_pending)
+                pending = still_pending
+
+        with self._lock:
+            self._stats["misses"] += len(pending)
+        if memo is not None:
+            for key, vec in zip(keys, out):
+                if vec is not None:
+                    memo[key] = vec
+        return out
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[List[float]]) -> None:
+        """Store freshly computed embeddings in every tier."""
+        memo = _REQUEST_MEMO.get()
+        client = self._get_redis()
+        pipe = client.pipeline(transaction=False) if client is not None else None
+        for text, vec in zip(texts, vectors):
+            if not vec:
+                continue
+            key = embedding_cache_key(model, text)
+            arr = np.asarray(vec, dtype=np.float32)
+            if memo is not None:
+                memo[key] = list(vec)
+            self._remember(key, arr)
+            if pipe is not None:
+                pipe.setex(key, EMBEDDING_CACHE_REDIS_TTL_SECONDS, arr.tobytes())
+        if pipe is not None:
+            try:
+                pipe.execute()
+            except Exception as e:
+                logger.debug(f"Embedding cache: Redis store failed ({e})")
+
+    def _remember(self, key: str, arr: np.ndarray) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._lru[key] = arr
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._stats)
+            memory_size = len(self._lru)
+            memory_bytes = sum(a.nbytes for a in self._lru.values())
+        hits = counters["hits_request"] + counters["hits_memory"] + counters["hits_redis"]
+        total = hits + counters["misses"]
+        return {
+            **counters,
+            "total_hits": hits,
+            "hit_rate": hits / total if total > 0 else 0.0,
+            "memory_size": memory_size,
+            "memory_bytes": memory_bytes,
+            "max_entries": self.max_entries,
+            "redis_enabled": self._redis_client is not None,
+        }
+
+
+embedding_cache = EmbeddingCache()
+
+
+def get_embedding_cache_stats() -> Dict[str, object]:
+    return embedding_cache.stats()
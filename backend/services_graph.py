@@ -45,6 +45,7 @@ from services.graph.communities import (
 from services.graph.relationships import (
     create_relationship,
     get_all_relationships,
+    get_all_relationships_async,
     create_relationship_by_ids,
     delete_relationship,
     relationship_exists,
@@ -57,13 +58,19 @@ from services.graph.relationships import (
 from services.graph.concepts import (
     _normalize_concept_from_db,
     get_concept_by_name,
+    get_concept_by_name_async,
     get_concept_by_id,
+    get_concept_by_id_async,
     get_concept_by_slug,
+    get_concept_by_slug_async,
     create_concept,
     update_concept,
     get_neighbors,
+    get_neighbors_async,
     get_neighbors_with_relationships,
+    get_neighbors_with_relationships_async,
     get_all_concepts,
+    get_all_concepts_async,
     get_graph_overview,
     delete_concept,
     delete_test_concepts,
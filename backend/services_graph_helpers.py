@@ -6,28 +6,27 @@ from typing import Optional, Tuple
 
 from neo4j import Session
 
+from neo4j_query import Cypher, QueryPlan, run_plan, run_plan_async
 from services_branch_explorer import (
-    ensure_graph_scoping_initialized,
-    get_active_graph_context,
+    active_graph_context_plan,
     get_request_graph_identity,
 )
 
 
-def resolve_required_tenant_id(tenant_id: Optional[str] = None, session: Optional[Session] = None) -> str:
-    """Resolve tenant_id from argument or request context; require it for graph reads."""
+def _resolve_required_tenant_id_plan(tenant_id: Optional[str] = None, with_session: bool = True) -> QueryPlan[str]:
     _, req_tenant_id = get_request_graph_identity()
     resolved_tenant_id = str(tenant_id).strip() if tenant_id else (str(req_tenant_id).strip() if req_tenant_id else "")
-    if not resolved_tenant_id and session is not None:
+    if not resolved_tenant_id and with_session:
         try:
-            graph_id, _ = get_active_graph_context(session)
-            rec = session.run(
+            graph_id, _ = yield from active_graph_context_plan()
+            rec = (yield Cypher(
                 """
                 MATCH (g:GraphSpace {graph_id: $graph_id})
                 RETURN g.tenant_id AS tenant_id, g.graph_id AS graph_id
                 LIMIT 1
                 """,
-                graph_id=graph_id,
-            ).single()
+                {"graph_id": graph_id},
+            )).single()
             if rec:
                 # Backward compatibility for legacy graph spaces without tenant_id.
                 tenant = rec.get("tenant_id")
@@ -39,14 +38,50 @@ def resolve_required_tenant_id(tenant_id: Optional[str] = None, session: Optiona
     return resolved_tenant_id
 
 
+def resolve_required_tenant_id(tenant_id: Optional[str] = None, session: Optional[Session] = None) -> str:
+    """Resolve tenant_id from argument or request context; require it for graph reads."""
+    return run_plan(session, _resolve_required_tenant_id_plan(tenant_id, with_session=session is not None))
+
+
+def resolve_graph_tenant_id(session: Session, graph_id: str) -> Optional[str]:
+    """Tenant a graph's data is filed under: request identity first, then GraphSpace.tenant_id."""
+    _, tenant_id = get_request_graph_identity()
+    if tenant_id:
+        return tenant_id
+    rec = session.run(
+        """
+        MATCH (g:GraphSpace {graph_id: $graph_id})
+        RETURN g.tenant_id AS tenant_id
+        LIMIT 1
+        """,
+        graph_id=graph_id,
+    ).single()
+    tenant_id = rec.get("tenant_id") if rec else None
+    return str(tenant_id) if tenant_id else None
+
+
+def tenant_scoped_graph_context_plan(*, tenant_id: Optional[str] = None) -> QueryPlan[Tuple[str, str, str]]:
+    """Query plan resolving (graph_id, branch_id, tenant_id) for sync and async callers."""
+    resolved_tenant_id = yield from _resolve_required_tenant_id_plan(tenant_id)
+    graph_id, branch_id = yield from active_graph_context_plan(tenant_id=resolved_tenant_id)
+    return graph_id, branch_id, resolved_tenant_id
+
+
 def get_tenant_scoped_graph_context(
     session: Session,
     *,
     tenant_id: Optional[str] = None,
 ) -> Tuple[str, str, str]:
-    resolved_tenant_id = resolve_required_tenant_id(tenant_id, session=session)
-    graph_id, branch_id = get_active_graph_context(session, tenant_id=resolved_tenant_id)
-    return graph_id, branch_id, resolved_tenant_id
+    return run_plan(session, tenant_scoped_graph_context_plan(tenant_id=tenant_id))
+
+
+async def get_tenant_scoped_graph_context_async(
+    session,
+    *,
+    tenant_id: Optional[str] = None,
+) -> Tuple[str, str, str]:
+    """get_tenant_scoped_graph_context for an async Neo4j session."""
+    return await run_plan_async(session, tenant_scoped_graph_context_plan(tenant_id=tenant_id))
 
 
 def build_tenant_filter_clause(tenant_id: str) -> str:
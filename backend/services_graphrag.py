@@ -6,7 +6,11 @@ from neo4j import Session
 import math
 import re
 
-from services_search import embed_text, cosine_similarity, semantic_search_nodes
+import numpy as np
+
+from services_search import embed_text, semantic_search_nodes
+from services_similarity import pack_embeddings, cosine_scores, mmr_select_indices
+from services_community_index import get_community_index
 from services_graph import (
     get_claims_for_communities,
     get_evidence_subgraph,
@@ -15,6 +19,7 @@ from services_graph import (
 from services_resources import get_resources_for_concept
 from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context, get_request_graph_identity
 from services_logging import log_graphrag_event
+from services_turn_cache import turn_memo
 
 
 # ========== Part A: Utility Functions ==========
@@ -25,13 +30,17 @@ def mmr_select(
     item_vecs: List[Optional[List[float]]],
     item_relevance: List[float],
     k: int,
-    lambda_mult: float = 0.65
+    lambda_mult: float = 0.65,
+    candidate_sims: Optional[np.ndarray] = None,
 ) -> List[int]:
     """
     Maximal Marginal Relevance selection.
     
     Maximizes: lambda * rel(item) - (1-lambda) * max_sim(item, selected)
     
+    Runs incrementally (see services_similarity.mmr_select_indices): each round only
+    scores candidates against the newly selected item.
+    
     Args:
         items: List of items to select from
         query_vec: Query embedding vector
@@ -39,6 +48,8 @@ def mmr_select(
         item_relevance: List of relevance scores for each item
         k: Number of items to select
         lambda_mult: Lambda multiplier (0-1), higher = more relevance, lower = more diversity
+        candidate_sims: Optional precomputed (n, n) item x item similarity matrix;
+            when given, embeddings are not re-packed or multiplied
     
     Returns:
         List of indices of selected items (deterministic, stable tie-breaking)
@@ -50,66 +61,28 @@ def mmr_select(
     if k >= n:
         return list(range(n))
     
-    selected_indices = []
-    remaining_indices = list(range(n))
-    
     # Filter out items with missing embeddings or zero relevance
-    valid_indices = []
-    for i in range(n):
-        if item_vecs[i] is not None and item_relevance[i] > 0:
-            valid_indices.append(i)
+    valid_indices = [
+        i for i in range(n)
+        if item_vecs[i] is not None and item_relevance[i] > 0
+    ]
     
     if not valid_indices:
         # Fallback: return top k by relevance
         sorted_indices = sorted(range(n), key=lambda i: item_relevance[i], reverse=True)
         return sorted_indices[:k]
     
-    # Select first item: highest relevance
-    first_idx = max(valid_indices, key=lambda i: item_relevance[i])
-    selected_indices.append(first_idx)
-    remaining_indices.remove(first_idx)
-    valid_indices.remove(first_idx)
-    
-    # Select remaining items using MMR
-    selected_embeddings = [item_vecs[first_idx]]
-    
-    for _ in range(min(k - 1, len(valid_indices))):
-        if not valid_indices:
-            break
-        
-        best_score = float('-inf')
-        best_idx = None
-        
-        for candidate_idx in valid_indices:
-            if item_vecs[candidate_idx] is None:
-                continue
-            
-            # Relevance component
-            rel_score = lambda_mult * item_relevance[candidate_idx]
-            
-            # Diversity penalty: max similarity to already selected
-            max_sim = 0.0
-            for sel_vec in selected_embeddings:
-                if sel_vec is not None:
-                    sim = cosine_similarity(item_vecs[candidate_idx], sel_vec)
-                    max_sim = max(max_sim, sim)
-            
-            # MMR score
-            mmr_score = rel_score - (1 - lambda_mult) * max_sim
-            
-            # Tie-breaking: prefer earlier items (deterministic)
-            if mmr_score > best_score or (mmr_score == best_score and candidate_idx < best_idx):
-                best_score = mmr_score
-                best_idx = candidate_idx
-        
-        if best_idx is not None:
-            selected_indices.append(best_idx)
-            remaining_indices.remove(best_idx)
-            valid_indices.remove(best_idx)
-            if item_vecs[best_idx] is not None:
-                selected_embeddings.append(item_vecs[best_idx])
-        else:
-            break
+    candidate_mask = np.zeros(n, dtype=bool)
+    candidate_mask[valid_indices] = True
+    matrix = None if candidate_sims is not None else pack_embeddings(item_vecs)[0]
+    selected_indices = mmr_select_indices(
+        matrix,
+        item_relevance,
+        k,
+        lambda_mult=lambda_mult,
+        candidate_mask=candidate_mask,
+        pairwise_sims=candidate_sims,
+    )
     
     # Sort selected indices for deterministic output
     selected_indices.sort()
@@ -353,45 +326,12 @@ def semantic_search_communities(
         print(f"[GraphRAG] ERROR: Failed to embed query: {e}")
         return []
     
-    # Get all communities with summary_embedding
-    query_cypher = """
-    MATCH (g:GraphSpace {graph_id: $graph_id})
-    MATCH (k:Community {graph_id: $graph_id})-[:BELONGS_TO]->(g)
-    WHERE k.summary_embedding IS NOT NULL
-    RETURN k.community_id AS community_id,
-           k.name AS name,
-           k.summary AS summary,
-           k.summary_embedding AS summary_embedding
-    """
-    result = session.run(query_cypher, graph_id=graph_id)
-    
-    # Compute cosine similarity
-    results = []
-    for record in result:
-        community_id = record["community_id"]
-        name = record["name"]
-        summary = record["summary"]
-        summary_embedding = record["summary_embedding"]
-        
-        if not summary_embedding:
-            continue
-        
-        try:
-            score = cosine_similarity(query_embedding, summary_embedding)
-            results.append({
-                "community_id": community_id,
-                "name": name,
-                "score": score,
-                "summary": summary,
-            })
-        except Exception as e:
-            print(f"[GraphRAG] WARNING: Failed to compute similarity for {community_id}: {e}")
-            continue
-    
-    # Sort by score descending
-    results.sort(key=lambda x: x["score"], reverse=True)
-    
-    return results[:limit]
+    # Score against the cached per-graph community index (no Bolt round trip when warm)
+    return turn_memo(
+        "community_search",
+        (graph_id, query, limit),
+        lambda: get_community_index(session, graph_id).search(query_embedding, limit),
+    )
 
 
 def retrieve_graphrag_context(
@@ -430,7 +370,28 @@ def retrieve_graphrag_context(
         - edges: List of edge dicts
         - debug: Optional debug info
         - has_evidence: bool indicating if sufficient evidence was found
+
+    Within a retrieval turn (services_turn_cache) the result is computed once per
+    set of arguments and shared with every caller of the turn.
     """
+    return turn_memo(
+        "graphrag",
+        (graph_id, branch_id, question, community_k, claims_per_comm, evidence_strictness),
+        lambda: _retrieve_graphrag_context(
+            session, graph_id, branch_id, question, community_k, claims_per_comm, evidence_strictness
+        ),
+    )
+
+
+def _retrieve_graphrag_context(
+    session: Session,
+    graph_id: str,
+    branch_id: str,
+    question: str,
+    community_k: int,
+    claims_per_comm: int,
+    evidence_strictness: Optional[str],
+) -> Dict[str, Any]:
     ensure_graph_scoping_initialized(session)
     
     # Step 1: Get question embedding
@@ -512,16 +473,17 @@ def retrieve_graphrag_context(
     # Step 5: Compute combined relevance scores for claims
     print(f"[GraphRAG] Step 3: Computing claim relevance scores")
     claim_scores = []
-    claim_embeddings = []
+    claim_embeddings = [claim.get("embedding") for claim in all_candidate_claims]
     
-    for claim in all_candidate_claims:
-        # Base relevance: similarity to question
-        sim_q = 0.0
-        if question_embedding and claim.get("embedding"):
-            try:
-                sim_q = cosine_similarity(question_embedding, claim["embedding"])
-            except Exception as e:
-                print(f"[GraphRAG] WARNING: Failed to compute similarity for claim {claim['claim_id']}: {e}")
+    # Base relevance: similarity to question, for all candidates in one batched matvec
+    if question_embedding:
+        claim_matrix, _ = pack_embeddings(claim_embeddings, dim=len(question_embedding))
+        question_sims = cosine_scores(question_embedding, claim_matrix)
+    else:
+        question_sims = np.zeros(len(all_candidate_claims), dtype=np.float32)
+    
+    for claim, sim_q in zip(all_candidate_claims, question_sims):
+        sim_q = float(sim_q)
         
         # Confidence component
         conf = claim.get("confidence", 0.5)
@@ -541,7 +503,6 @@ def retrieve_graphrag_context(
         final_score = base_score + connectivity_boost
         
         claim_scores.append(final_score)
-        claim_embeddings.append(claim.get("embedding"))
     
     # Step 6: MMR selection
     print(f"[GraphRAG] Step 4: Applying MMR selection")
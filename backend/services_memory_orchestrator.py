@@ -6,9 +6,15 @@ Combines all three memory tiers into a single context:
 2. Working memory: Qdrant lecture context (current study session)
 3. Long-term: Neo4j user facts (persistent knowledge about user)
 """
+import contextvars
 import logging
 import json
-from typing import Optional, Dict, List, Any
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 from config import POSTGRES_CONNECTION_STRING
 
 try:
@@ -21,7 +27,22 @@ except ImportError:
 
 logger = logging.getLogger("brain_web")
 
+# Per-tier deadlines for get_unified_context (seconds)
+MEMORY_CONTEXT_TIER_TIMEOUT_SECONDS = float(os.getenv("MEMORY_CONTEXT_TIER_TIMEOUT_SECONDS", "2.0"))
+MEMORY_CONTEXT_LECTURE_TIMEOUT_SECONDS = float(os.getenv("MEMORY_CONTEXT_LECTURE_TIMEOUT_SECONDS", "4.0"))
+MEMORY_CONTEXT_MAX_WORKERS = int(os.getenv("MEMORY_CONTEXT_MAX_WORKERS", "16"))
+# Runs of one tier still going after the caller dropped them at their deadline (stuck
+# backends). At this many, further requests for that tier are shed until one finishes;
+# the default leaves most of the pool to healthy tiers.
+MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER = int(
+    os.getenv("MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER", str(max(1, MEMORY_CONTEXT_MAX_WORKERS // 4)))
+)
+
 _pg_pool: Optional[ThreadedConnectionPool] = None
+_tier_executor: Optional[ThreadPoolExecutor] = None
+_tier_executor_lock = threading.Lock()
+_tier_overdue: Dict[str, int] = {}
+_tier_overdue_lock = threading.Lock()
 
 
 def _get_pg_pool():
@@ -35,6 +56,273 @@ def _get_pg_pool():
     return _pg_pool
 
 
+class ContextTier(NamedTuple):
+    """One independent source of context: fetch() returns its result or raises."""
+    name: str
+    fetch: Callable[[], Any]
+    timeout_seconds: Optional[float] = None  # None: MEMORY_CONTEXT_TIER_TIMEOUT_SECONDS
+    sheddable: bool = True  # False for cheap tiers: never shed, run inline if no worker is free
+
+
+class TierResults(NamedTuple):
+    results: Dict[str, Any]  # tier name -> result, for tiers that finished in time
+    timings_ms: Dict[str, float]  # run time of each tier until it finished, failed or was dropped
+    timed_out: List[str]
+    failed: List[str]
+    queued_ms: Dict[str, float]  # time each tier waited for a worker
+    shed: List[str]  # not run: too many overdue runs of the tier, or no worker in time
+
+
+def _get_tier_executor() -> ThreadPoolExecutor:
+    global _tier_executor
+    if _tier_executor is None:
+        with _tier_executor_lock:
+            if _tier_executor is None:
+                _tier_executor = ThreadPoolExecutor(
+                    max_workers=MEMORY_CONTEXT_MAX_WORKERS,
+                    thread_name_prefix="memory-context",
+                )
+    return _tier_executor
+
+
+class _Run:
+    """One submitted tier run; overdue once its caller dropped it while it was still running."""
+    __slots__ = ("overdue", "done")
+
+    def __init__(self) -> None:
+        self.overdue = False
+        self.done = False
+
+
+def _tier_admitted(name: str) -> bool:
+    with _tier_overdue_lock:
+        return _tier_overdue.get(name, 0) < MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER
+
+
+def _mark_overdue(name: str, run: _Run) -> None:
+    with _tier_overdue_lock:
+        if not run.done and not run.overdue:
+            run.overdue = True
+            _tier_overdue[name] = _tier_overdue.get(name, 0) + 1
+
+
+def _finish_run(name: str, run: _Run) -> None:
+    with _tier_overdue_lock:
+        run.done = True
+        if run.overdue:
+            left = _tier_overdue.get(name, 0) - 1
+            if left > 0:
+                _tier_overdue[name] = left
+            else:
+                _tier_overdue.pop(name, None)
+
+
+def run_context_tiers(tiers: List[ContextTier]) -> TierResults:
+    """
+    Run independent context tiers concurrently, each with its own deadline.
+
+    A tier's deadline counts from when it gets a worker, so time spent queued behind
+    other callers' tiers is reported separately (queued_ms) instead of eating into it.
+    A tier that misses its deadline is dropped (it keeps running in the background; its
+    result is discarded), and a tier that raises is dropped and logged.
+
+    Load shedding keeps stuck backends from filling the shared pool: once a tier has
+    MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER runs still going past their deadline (across all
+    callers), new requests for it are shed until one of them finishes, and a tier that
+    cannot get a worker within its deadline is cancelled. Runs that finish in time never
+    count, so ordinary concurrency sheds nothing. Tiers with sheddable=False are exempt:
+    without a worker in time they run inline in the caller's thread. Shed tiers are
+    reported in `shed`. The caller waits at most twice the longest deadline. Tiers run
+    with the caller's context variables (request identity, embedding scope).
+    """
+    executor = _get_tier_executor()
+    deadlines = {
+        tier.name: tier.timeout_seconds if tier.timeout_seconds is not None else MEMORY_CONTEXT_TIER_TIMEOUT_SECONDS
+        for tier in tiers
+    }
+    submitted = time.perf_counter()
+    started_at: Dict[str, float] = {}
+    finished_at: Dict[str, float] = {}
+    shed: List[str] = []
+
+    def timed(tier: ContextTier, started: threading.Event, run: _Run) -> Any:
+        started_at[tier.name] = time.perf_counter()
+        started.set()
+        try:
+            return tier.fetch()
+        finally:
+            finished_at[tier.name] = time.perf_counter()
+            _finish_run(tier.name, run)
+
+    futures = []
+    for tier in tiers:
+        if tier.sheddable and not _tier_admitted(tier.name):
+            shed.append(tier.name)
+            logger.warning(
+                f"Memory tier {tier.name} has {MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER} overdue runs still going; shed"
+            )
+            continue
+        started, run = threading.Event(), _Run()
+        futures.append((tier, started, run, executor.submit(contextvars.copy_context().run, timed, tier, started, run)))
+
+    results: Dict[str, Any] = {}
+    timed_out: List[str] = []
+    failed: List[str] = []
+    for tier, started, run, future in sorted(futures, key=lambda tsrf: deadlines[tsrf[0].name]):
+        deadline = deadlines[tier.name]
+        if not started.wait(timeout=max(0.0, submitted + deadline - time.perf_counter())):
+            if future.cancel():
+                if not tier.sheddable:
+                    try:
+                        results[tier.name] = timed(tier, started, run)
+                    except Exception as e:
+                        failed.append(tier.name)
+                        logger.warning(f"Failed to load {tier.name}: {e}")
+                    continue
+                _finish_run(tier.name, run)
+                shed.append(tier.name)
+                finished_at[tier.name] = time.perf_counter()
+                logger.warning(f"Memory tier {tier.name} got no worker within {deadline}s; shed")
+                continue
+            started.wait()  # picked up just now
+        remaining = started_at[tier.name] + deadline - time.perf_counter()
+        try:
+            results[tier.name] = future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            _mark_overdue(tier.name, run)
+            timed_out.append(tier.name)
+            logger.warning(f"Memory tier {tier.name} missed its {deadline}s deadline; dropped")
+        except Exception as e:
+            failed.append(tier.name)
+            logger.warning(f"Failed to load {tier.name}: {e}")
+
+    now = time.perf_counter()
+    timings_ms: Dict[str, float] = {}
+    queued_ms: Dict[str, float] = {}
+    for tier in tiers:
+        start = started_at.get(tier.name)
+        end = finished_at.get(tier.name, now)
+        queued_ms[tier.name] = round(((start if start is not None else end) - submitted) * 1000.0, 1)
+        timings_ms[tier.name] = round((end - start) * 1000.0, 1) if start is not None else 0.0
+    return TierResults(results, timings_ms, timed_out, failed, queued_ms, shed)
+
+
+def _in_own_neo4j_session(session, fetch: Callable[[Any], Any]) -> Any:
+    """
+    Run a Neo4j tier on its own session.
+
+    A sync session must not be used from two threads, and a tier that misses its
+    deadline keeps running after the caller has moved on with its own session.
+    """
+    if session is None:
+        return fetch(None)
+    from db_neo4j import neo4j_session
+    with neo4j_session() as own_session:
+        return fetch(own_session)
+
+
+def _fetch_neo4j_user_facts(user_id: str, tenant_id: str, session) -> str:
+    from services_fact_extractor import get_user_facts, format_user_facts_for_prompt
+
+    facts = get_user_facts(
+        user_id=user_id,
+        tenant_id=tenant_id,
+        session=session,
+        limit=5
+    )
+    if not facts:
+        return ""
+    logger.debug(f"Loaded {len(facts)} neo4j user facts")
+    return format_user_facts_for_prompt(facts)
+
+
+def _fetch_profile_facts(user_id: str, tenant_id: str) -> str:
+    from db_postgres import execute_query
+
+    rows = execute_query(
+        """
+        SELECT fact_type, fact_value, confidence
+        FROM user_profile_facts
+        WHERE user_id=%s AND tenant_id=%s AND active=TRUE
+        ORDER BY confidence DESC, updated_at DESC
+        LIMIT 8
+        """,
+        (str(user_id), str(tenant_id)),
+    ) or []
+    if not rows:
+        return ""
+    logger.debug(f"Loaded {len(rows)} consolidated profile facts")
+    return "\n".join(f"- [{r.get('fact_type')}] {r.get('fact_value')}" for r in rows)
+
+
+def _fetch_promoted_memories(user_id: str, tenant_id: str) -> str:
+    from services_memory_promotion import get_promoted_memories_for_prompt
+    promoted = get_promoted_memories_for_prompt(user_id=user_id, tenant_id=tenant_id, limit=8)
+    if not promoted:
+        return ""
+    return "\n".join(f"- [{m.get('tier')}] {m.get('content')}" for m in promoted)
+
+
+def _fetch_recent_memory_events(user_id: str, tenant_id: str) -> str:
+    from services_conversation_memory_events import get_recent_conversation_memory_events
+    events = get_recent_conversation_memory_events(user_id=user_id, tenant_id=tenant_id, limit=6)
+    lines = []
+    for e in events or []:
+        u = (e.get("user_text") or "").strip()
+        if u:
+            lines.append(f"- {u[:140]}{'...' if len(u) > 140 else ''}")
+    return "\n".join(lines[:6])
+
+
+def _fetch_lecture_context(active_lecture_id: str, query: str, branch_id: str, community_k: int, session) -> str:
+    from services_graphrag import retrieve_graphrag_context
+
+    # Get relevant lecture context for current query
+    graphrag_data = retrieve_graphrag_context(
+        session=session,
+        graph_id=active_lecture_id,
+        branch_id=branch_id,
+        question=query,
+        community_k=community_k
+    )
+    context_text = graphrag_data.get("context_text", "")
+    if context_text:
+        logger.debug(f"Loaded GraphRAG context for lecture {active_lecture_id}")
+    return context_text
+
+
+def _fetch_chat_history(chat_id: str, user_id: str, tenant_id: str) -> List[Dict[str, Any]]:
+    from services_chat_history import get_chat_history
+
+    # Get last 10 messages (Redis will be fast!)
+    chat_history = get_chat_history(
+        chat_id=chat_id,
+        limit=10,
+        user_id=user_id,
+        tenant_id=tenant_id
+    )
+    logger.debug(f"Loaded {len(chat_history)} chat messages")
+    return chat_history
+
+
+def _fetch_profiles(user_id: str, session) -> Dict[str, Any]:
+    from services_graph import get_user_profile
+    from services_tutor_profile import get_tutor_profile
+
+    user_profile = get_user_profile(session, user_id=user_id)
+    tutor_profile = get_tutor_profile(session, user_id=user_id)
+    return {
+        "user_identity": {
+            "name": user_profile.name,
+            "learning_goals": user_profile.learning_goals,
+            "domain_background": user_profile.domain_background,
+            "weak_areas": user_profile.weak_areas,
+            "mastered_concepts": list(user_profile.inferred_knowledge_tags.keys())
+        },
+        "tutor_persona": tutor_profile.model_dump(),
+    }
+
+
 def get_unified_context(
     user_id: str,
     tenant_id: str,
@@ -47,9 +335,16 @@ def get_unified_context(
     include_user_facts: bool = True,
     include_study_context: bool = True,
     include_recent_topics: bool = True,  # NEW: cross-surface awareness
+    lecture_branch_id: str = "main",
+    lecture_community_k: int = 3,
 ) -> Dict[str, Any]:
     """
     Orchestrate all three memory tiers into unified context.
+
+    The tiers are independent and are fetched concurrently (see run_context_tiers), so a
+    turn waits for the slowest tier rather than the sum of all of them. A tier that fails
+    or misses its deadline leaves its section empty. Neo4j tiers use their own sessions;
+    `session` only needs to be non-None for them to run.
     
     Args:
         user_id: User identifier
@@ -61,13 +356,20 @@ def get_unified_context(
         include_chat_history: Whether to include short-term memory
         include_lecture_context: Whether to include working memory
         include_user_facts: Whether to include long-term memory
+        lecture_branch_id: Branch for the lecture GraphRAG lookup
+        lecture_community_k: Communities for the lecture GraphRAG lookup; pass the
+            caller's own values to share one retrieval per turn (services_turn_cache)
     
     Returns:
         Dictionary with formatted context sections:
         {
             "user_facts": "...",
             "lecture_context": "...",
-            "chat_history": [...]
+            "chat_history": [...],
+            "tier_timings_ms": {"chat_history": 12.3, ...},
+            "tier_queue_ms": {"chat_history": 0.1, ...},
+            "timed_out_tiers": [...],
+            "shed_tiers": [...]
         }
     """
     context = {
@@ -81,152 +383,70 @@ def get_unified_context(
         "study_context": {},
         "recent_topics": "",  # cross-surface ambient context
     }
-    
-    # 1. Long-term memory: User facts from Neo4j + consolidated profile facts (Postgres)
-    if include_user_facts:
-        facts_chunks = []
-        try:
-            from services_fact_extractor import get_user_facts, format_user_facts_for_prompt
-
-            facts = get_user_facts(
-                user_id=user_id,
-                tenant_id=tenant_id,
-                session=session,
-                limit=5
-            )
 
-            if facts:
-                facts_chunks.append(format_user_facts_for_prompt(facts))
-                logger.debug(f"Loaded {len(facts)} neo4j user facts")
-        except Exception as e:
-            logger.warning(f"Failed to load neo4j user facts: {e}")
-
-        try:
-            rows = execute_query(
-                """
-                SELECT fact_type, fact_value, confidence
-                FROM user_profile_facts
-                WHERE user_id=%s AND tenant_id=%s AND active=TRUE
-                ORDER BY confidence DESC, updated_at DESC
-                LIMIT 8
-                """,
-                (str(user_id), str(tenant_id)),
-            ) or []
-            if rows:
-                lines = [f"- [{r.get('fact_type')}] {r.get('fact_value')}" for r in rows]
-                facts_chunks.append("\n".join(lines))
-                logger.debug(f"Loaded {len(rows)} consolidated profile facts")
-        except Exception as e:
-            logger.warning(f"Failed to load consolidated profile facts: {e}")
-
-        context["user_facts"] = "\n\n".join([c for c in facts_chunks if c]).strip()
-    
-    # 1b. Promoted memory tiers (active/long-term)
+    tiers: List[ContextTier] = []
+    # 1. Long-term memory: User facts from Neo4j + consolidated profile facts (Postgres),
+    #    promoted memory tiers (active/long-term)
     if include_user_facts:
-        try:
-            from services_memory_promotion import get_promoted_memories_for_prompt
-            promoted = get_promoted_memories_for_prompt(user_id=user_id, tenant_id=tenant_id, limit=8)
-            if promoted:
-                lines = [f"- [{m.get('tier')}] {m.get('content')}" for m in promoted]
-                context["promoted_memories"] = "\n".join(lines)
-        except Exception as e:
-            logger.warning(f"Failed to load promoted memories: {e}")
-
+        tiers += [
+            ContextTier("neo4j user facts", partial(
+                _in_own_neo4j_session, session, partial(_fetch_neo4j_user_facts, user_id, tenant_id)
+            )),
+            ContextTier("consolidated profile facts", partial(_fetch_profile_facts, user_id, tenant_id)),
+            ContextTier("promoted memories", partial(_fetch_promoted_memories, user_id, tenant_id)),
+        ]
     # 1c. Canonical recent conversation events
-    if include_chat_history:
-        try:
-            from services_conversation_memory_events import get_recent_conversation_memory_events
-            events = get_recent_conversation_memory_events(user_id=user_id, tenant_id=tenant_id, limit=6)
-            if events:
-                lines = []
-                for e in events:
-                    u = (e.get("user_text") or "").strip()
-                    if u:
-                        lines.append(f"- {u[:140]}{'...' if len(u) > 140 else ''}")
-                context["recent_memory_events"] = "\n".join(lines[:6])
-        except Exception as e:
-            logger.warning(f"Failed to load recent conversation events: {e}")
-
-    # 2. Working memory: Current lecture context from Qdrant
-    if include_lecture_context and active_lecture_id:
-        try:
-            from services_graphrag import retrieve_graphrag_context
-            
-            # Get relevant lecture context for current query
-            graphrag_data = retrieve_graphrag_context(
-                session=session,
-                graph_id=active_lecture_id,
-                branch_id="main", # Default to main if not specified
-                question=query,
-                community_k=3
-            )
-            
-            context_text = graphrag_data.get("context_text", "")
-            if context_text:
-                context["lecture_context"] = context_text
-                logger.debug(f"Loaded GraphRAG context for lecture {active_lecture_id}")
-        except Exception as e:
-            logger.warning(f"Failed to load lecture context: {e}")
-    
     # 3. Short-term memory: Recent chat history from Redis/Postgres
     if include_chat_history:
-        try:
-            from services_chat_history import get_chat_history
-            
-            # Get last 10 messages (Redis will be fast!)
-            chat_history = get_chat_history(
-                chat_id=chat_id,
-                limit=10,
-                user_id=user_id,
-                tenant_id=tenant_id
-            )
-            
-            context["chat_history"] = chat_history
-            logger.debug(f"Loaded {len(chat_history)} chat messages")
-        except Exception as e:
-            logger.warning(f"Failed to load chat history: {e}")
-    
-    # 4. Learning State: Study context from Postgres
+        tiers += [
+            ContextTier("recent conversation events", partial(_fetch_recent_memory_events, user_id, tenant_id)),
+            ContextTier("chat history", partial(_fetch_chat_history, chat_id, user_id, tenant_id), sheddable=False),
+        ]
+    # 2. Working memory: Current lecture context (GraphRAG)
+    if include_lecture_context and active_lecture_id:
+        tiers.append(ContextTier(
+            "lecture context",
+            partial(_in_own_neo4j_session, session, partial(
+                _fetch_lecture_context, active_lecture_id, query, lecture_branch_id, lecture_community_k
+            )),
+            MEMORY_CONTEXT_LECTURE_TIMEOUT_SECONDS,
+        ))
+    # 4. Learning State: profiles (Neo4j) and study context (Postgres)
     if include_study_context:
-        try:
-            from services_graph import get_user_profile
-            from services_tutor_profile import get_tutor_profile
-            
-            # Fetch Profiles
-            user_profile = get_user_profile(session, user_id=user_id)
-            tutor_profile = get_tutor_profile(session, user_id=user_id)
-
-            context["user_identity"] = {
-                "name": user_profile.name,
-                "learning_goals": user_profile.learning_goals,
-                "domain_background": user_profile.domain_background,
-                "weak_areas": user_profile.weak_areas,
-                "mastered_concepts": list(user_profile.inferred_knowledge_tags.keys())
-            }
-            context["tutor_persona"] = tutor_profile.model_dump()
-            
-            study_data = get_study_context(user_id, tenant_id)
-            context["study_context"] = study_data
-            logger.debug("Loaded learning state + profiles (v2)")
-        except Exception as e:
-            logger.warning(f"Failed to load study context or profiles: {e}")
-
+        tiers += [
+            ContextTier("profiles", partial(_in_own_neo4j_session, session, partial(_fetch_profiles, user_id))),
+            ContextTier("study context", partial(get_study_context, user_id, tenant_id)),
+        ]
     # 5. Cross-surface recent topics — what the user was discussing on OTHER screens.
     #    Excluded: the current chat_id so we don't double-count the current convo.
     if include_recent_topics:
-        try:
-            recent = get_recent_cross_surface_topics(
-                user_id=user_id,
-                tenant_id=tenant_id,
-                exclude_chat_id=chat_id,
-                limit=6,
-            )
-            if recent:
-                context["recent_topics"] = recent
-                logger.debug(f"Loaded {len(recent.splitlines())} cross-surface topic lines")
-        except Exception as e:
-            logger.warning(f"Failed to load cross-surface topics: {e}")
-
+        tiers.append(ContextTier("cross-surface topics", partial(
+            get_recent_cross_surface_topics,
+            user_id=user_id,
+            tenant_id=tenant_id,
+            exclude_chat_id=chat_id,
+            limit=6,
+        )))
+
+    fetched = run_context_tiers(tiers)
+    results = fetched.results
+
+    facts_chunks = [results.get("neo4j user facts"), results.get("consolidated profile facts")]
+    context["user_facts"] = "\n\n".join([c for c in facts_chunks if c]).strip()
+    context["promoted_memories"] = results.get("promoted memories") or ""
+    context["recent_memory_events"] = results.get("recent conversation events") or ""
+    context["lecture_context"] = results.get("lecture context") or ""
+    context["chat_history"] = results.get("chat history") or []
+    if results.get("profiles"):
+        context.update(results["profiles"])
+    context["study_context"] = results.get("study context") or {}
+    context["recent_topics"] = results.get("cross-surface topics") or ""
+
+    context["tier_timings_ms"] = fetched.timings_ms
+    context["tier_queue_ms"] = fetched.queued_ms
+    context["timed_out_tiers"] = fetched.timed_out
+    context["shed_tiers"] = fetched.shed
+    logger.debug(f"Unified context tiers (ms): {fetched.timings_ms}")
     return context
 
 
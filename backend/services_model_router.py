@@ -1,8 +1,10 @@
+import asyncio
 import os
 import logging
-from typing import List, Dict, Any, Optional, Union, Generator
-from openai import OpenAI
+from typing import List, Dict, Any, AsyncGenerator, Optional, Union, Generator, overload
+from openai import AsyncOpenAI, OpenAI
 from config import OPENAI_API_KEY
+from services_embedding_cache import embedding_cache
 
 logger = logging.getLogger("brain_web")
 
@@ -42,16 +44,22 @@ DEFAULT_MODELS: Dict[str, str] = {
 # Fallback used if an unknown task type is passed
 _FALLBACK_MODEL = os.getenv("MODEL_FALLBACK", "gpt-4o-mini")
 
+# Per-request limits for embed_many (the API caps inputs per call and total tokens).
+EMBEDDING_MAX_BATCH_INPUTS = int(os.getenv("EMBEDDING_MAX_BATCH_INPUTS", "256"))
+EMBEDDING_MAX_BATCH_CHARS = int(os.getenv("EMBEDDING_MAX_BATCH_CHARS", "200000"))  # ~50k tokens
+
 
 class ModelRouter:
     def __init__(self) -> None:
         self.api_key = OPENAI_API_KEY
         self.client: Optional[OpenAI] = None
+        self.async_client: Optional[AsyncOpenAI] = None
         if self.api_key:
             cleaned = self.api_key.strip().strip('"').strip("'")
             if cleaned and cleaned.startswith("sk-"):
                 try:
                     self.client = OpenAI(api_key=cleaned)
+                    self.async_client = AsyncOpenAI(api_key=cleaned)
                 except Exception as e:
                     logger.error(f"[model_router] Failed to init OpenAI client: {e}")
         if not self.client:
@@ -80,10 +88,109 @@ class ModelRouter:
         if not self.client:
             raise ValueError("[model_router] OpenAI client not initialised. Check OPENAI_API_KEY.")
 
-        model = self.get_model_for_task(task_type)
+        kwargs = self._completion_kwargs(
+            messages, task_type, temperature, max_tokens, stream, response_format, tools, tool_choice
+        )
+        try:
+            response = self.client.chat.completions.create(**kwargs)
+            if stream:
+                return response  # caller iterates the generator
+            return response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"[model_router] completion failed (task={task_type} model={kwargs['model']}): {e}")
+            raise
+
+    async def astream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        task_type: str = TASK_CHAT_FAST,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: Optional[str] = None,
+        cancel_event: Optional[asyncio.Event] = None,
+    ) -> AsyncGenerator[Any, None]:
+        """
+        Stream a chat completion on the async client, yielding the raw chunks.
+
+        Use this instead of completion(stream=True) from async code: waiting for the
+        next token never blocks the event loop. The HTTP stream is closed (and the
+        generation stops being billed) as soon as cancel_event is set, in which case
+        the iterator just ends, or when the consumer stops early or is cancelled.
+        """
+        if not self.async_client:
+            raise ValueError("[model_router] OpenAI client not initialised. Check OPENAI_API_KEY.")
+
+        kwargs = self._completion_kwargs(messages, task_type, temperature, max_tokens, True, None, tools, tool_choice)
+        try:
+            stream = await self.async_client.chat.completions.create(**kwargs)
+        except Exception as e:
+            logger.error(f"[model_router] completion failed (task={task_type} model={kwargs['model']}): {e}")
+            raise
+
+        cancelled = asyncio.ensure_future(cancel_event.wait()) if cancel_event is not None else None
+        chunks = stream.__aiter__()
+        try:
+            while True:
+                if cancelled is None:
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        return
+                else:
+                    next_chunk = asyncio.ensure_future(chunks.__anext__())
+                    await asyncio.wait({next_chunk, cancelled}, return_when=asyncio.FIRST_COMPLETED)
+                    if not next_chunk.done():
+                        next_chunk.cancel()
+                        await asyncio.wait({next_chunk})
+                        logger.debug(f"[model_router] stream cancelled (task={task_type})")
+                        return
+                    try:
+                        chunk = next_chunk.result()
+                    except StopAsyncIteration:
+                        return
+                yield chunk
+        finally:
+            if cancelled is not None:
+                cancelled.cancel()
+            await stream.close()
+
+    async def astream_text(
+        self,
+        messages: List[Dict[str, Any]],
+        task_type: str = TASK_CHAT_FAST,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        cancel_event: Optional[asyncio.Event] = None,
+    ) -> AsyncGenerator[str, None]:
+        """Content deltas of astream_completion (empty deltas skipped)."""
+        stream = self.astream_completion(
+            messages,
+            task_type=task_type,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            cancel_event=cancel_event,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            await stream.aclose()
 
+    def _completion_kwargs(
+        self,
+        messages: List[Dict[str, Any]],
+        task_type: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        stream: bool,
+        response_format: Optional[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        tool_choice: Optional[str],
+    ) -> Dict[str, Any]:
         kwargs: Dict[str, Any] = {
-            "model": model,
+            "model": self.get_model_for_task(task_type),
             "messages": messages,
             "stream": stream,
         }
@@ -97,33 +204,74 @@ class ModelRouter:
             kwargs["tools"] = tools
         if tool_choice is not None:
             kwargs["tool_choice"] = tool_choice
+        return kwargs
 
-        try:
-            response = self.client.chat.completions.create(**kwargs)
-            if stream:
-                return response  # caller iterates the generator
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"[model_router] completion failed (task={task_type} model={model}): {e}")
-            raise
+    @overload
+    def embed(self, text: str, task_type: str = TASK_EMBEDDING) -> List[float]: ...
+
+    @overload
+    def embed(self, text: List[str], task_type: str = TASK_EMBEDDING) -> List[List[float]]: ...
 
     def embed(self, text: Union[str, List[str]], task_type: str = TASK_EMBEDDING) -> Union[List[float], List[List[float]]]:
-        """Generate embeddings for text or list of texts."""
+        """
+        Generate embeddings for text or list of texts.
+
+        Served through the content-hash embedding cache (services_embedding_cache):
+        only texts missing from every tier are sent, deduplicated, in one API call.
+        """
+        vectors = self._embed_batch([text] if isinstance(text, str) else list(text), task_type)
+        if isinstance(text, str):
+            return vectors[0]
+        return vectors
+
+    def _embed_batch(self, texts: List[str], task_type: str) -> List[List[float]]:
+        """One embedding per text, in order; cache misses go out in a single API call."""
         if not self.client:
             raise ValueError("[model_router] OpenAI client not initialised.")
-            
+
         model = self.get_model_for_task(task_type)
-        try:
-            response = self.client.embeddings.create(
-                model=model,
-                input=text
-            )
-            if isinstance(text, str):
-                return response.data[0].embedding
-            return [d.embedding for d in response.data]
-        except Exception as e:
-            logger.error(f"[model_router] embedding failed: {e}")
-            raise
+        cached = embedding_cache.get_many(model, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        by_text: Dict[str, List[float]] = {}
+        if missing:
+            try:
+                response = self.client.embeddings.create(
+                    model=model,
+                    input=missing
+                )
+            except Exception as e:
+                logger.error(f"[model_router] embedding failed: {e}")
+                raise
+            fresh = [d.embedding for d in response.data]
+            embedding_cache.put_many(model, missing, fresh)
+            by_text = dict(zip(missing, fresh))
+        return [v if v is not None else by_text[t] for t, v in zip(texts, cached)]
+
+    def embed_many(
+        self,
+        texts: List[str],
+        task_type: str = TASK_EMBEDDING,
+        max_inputs: int = EMBEDDING_MAX_BATCH_INPUTS,
+        max_chars: int = EMBEDDING_MAX_BATCH_CHARS,
+    ) -> List[List[float]]:
+        """
+        Embed a list of texts in as few API calls as possible.
+
+        Splits into sub-batches of at most max_inputs texts / max_chars characters
+        so large ingestion jobs stay under the per-request limits.
+        """
+        out: List[List[float]] = []
+        batch: List[str] = []
+        batch_chars = 0
+        for t in texts:
+            if batch and (len(batch) >= max_inputs or batch_chars + len(t) > max_chars):
+                out.extend(self._embed_batch(batch, task_type))
+                batch, batch_chars = [], 0
+            batch.append(t)
+            batch_chars += len(t)
+        if batch:
+            out.extend(self._embed_batch(batch, task_type))
+        return out
 
 
 # Singleton — import this everywhere
@@ -0,0 +1,143 @@
+"""
+Background re-embedding of stale concept vectors.
+
+semantic_search_nodes never embeds concepts inline: concepts whose text hash no longer
+matches the stored vector are handed to this worker and the search keeps using the last
+good vector (or skips concepts that have none yet).
+
+- Pending work is keyed by node_id, so re-enqueuing the same concept while it waits only
+  refreshes its text.
+- A fixed number of worker threads (REEMBED_WORKER_CONCURRENCY) each drain up to
+  REEMBED_BATCH_SIZE items per embed_many call.
+- embed_many returns None for an input it could not embed; only that concept fails.
+  Failed concepts (and whole failed batches) are dropped: they are still stale and will
+  be re-enqueued by the next search that sees them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("brain_web")
+
+REEMBED_WORKER_CONCURRENCY = int(os.getenv("REEMBED_WORKER_CONCURRENCY", "2"))
+REEMBED_BATCH_SIZE = int(os.getenv("REEMBED_BATCH_SIZE", "128"))
+
+
+class ReembedWorker:
+    """Deduplicating queue of (node_id, text_hash, text) drained by a small thread pool."""
+
+    def __init__(
+        self,
+        store,
+        embed_many: Callable[[List[str]], List[Optional[List[float]]]],
+        concurrency: int = REEMBED_WORKER_CONCURRENCY,
+        batch_size: int = REEMBED_BATCH_SIZE,
+    ):
+        self.store = store
+        self.embed_many = embed_many
+        self.concurrency = max(1, int(concurrency))
+        self.batch_size = max(1, int(batch_size))
+        self._pending: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._in_flight: Dict[str, str] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stats = {
+            "enqueued": 0,
+            "deduplicated": 0,
+            "completed": 0,
+            "failed": 0,
+            "batches": 0,
+            "last_batch_ms": 0.0,
+        }
+
+    def _ensure_started(self) -> None:
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.concurrency:
+            t = threading.Thread(target=self._run, name=f"reembed-worker-{len(self._threads)}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def enqueue(self, items: Sequence[Tuple[str, str, str]]) -> int:
+        """Queue (node_id, text_hash, text) items. Returns how many were newly queued."""
+        added = 0
+        with self._cond:
+            for node_id, text_hash, text in items:
+                if self._in_flight.get(node_id) == text_hash:
+                    self._stats["deduplicated"] += 1
+                    continue
+                if node_id in self._pending:
+                    self._stats["deduplicated"] += 1
+                else:
+                    added += 1
+                self._pending[node_id] = (text_hash, text)
+            if added:
+                self._stats["enqueued"] += added
+                self._ensure_started()
+                self._cond.notify_all()
+        return added
+
+    def _take_batch(self) -> List[Tuple[str, str, str]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                node_id, (text_hash, text) = self._pending.popitem(last=False)
+                self._in_flight[node_id] = text_hash
+                batch.append((node_id, text_hash, text))
+            return batch
+
+    def _process(self, batch: List[Tuple[str, str, str]]) -> None:
+        start = time.perf_counter()
+        completed = 0
+        try:
+            vectors = self.embed_many([text for _, _, text in batch])
+            embedded = [
+                (node_id, text_hash, vec)
+                for (node_id, text_hash, _), vec in zip(batch, vectors)
+                if vec is not None
+            ]
+            if embedded:
+                self.store.put_many(embedded)
+            completed = len(embedded)
+        except Exception as e:
+            logger.warning(f"[reembed_worker] batch of {len(batch)} failed: {e}")
+        with self._cond:
+            for node_id, _, _ in batch:
+                self._in_flight.pop(node_id, None)
+            self._stats["batches"] += 1
+            self._stats["completed"] += completed
+            self._stats["failed"] += len(batch) - completed
+            self._stats["last_batch_ms"] = (time.perf_counter() - start) * 1000.0
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            self._process(self._take_batch())
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is pending or in flight (tests / scripts). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "pending": len(self._pending),
+                "in_flight": len(self._in_flight),
+                "workers": len([t for t in self._threads if t.is_alive()]),
+                "concurrency": self.concurrency,
+            }
@@ -1,15 +1,24 @@
 """
 Shared helper functions for intent-based retrieval plans.
 """
+import logging
+import os
+import time
 from typing import List, Dict, Any, Optional
 from neo4j import Session
+
+from config import USE_QDRANT
 from services_graphrag import semantic_search_communities
 from services_graph import (
     get_claims_for_communities,
     get_evidence_subgraph,
 )
-from services_search import embed_text, cosine_similarity
+from services_search import embed_text
+from services_similarity import EmbeddingMatrix
 from services_branch_explorer import ensure_graph_scoping_initialized, get_active_graph_context
+from services_graph_helpers import resolve_graph_tenant_id
+
+logger = logging.getLogger("brain_web")
 
 
 def retrieve_focus_communities(
@@ -83,43 +92,141 @@ def retrieve_claims_for_community_ids(
     return all_claims
 
 
-def retrieve_top_claims_by_query_embedding(
+# Qdrant hits fetched per requested claim; leaves room for hits the Neo4j check drops
+CLAIM_QDRANT_OVERFETCH = 2
+
+# Graphs whose existing claims migrate_claims_from_neo4j has copied to Qdrant. The marker
+# is never removed, so a positive answer is remembered for the life of the process.
+# A backfilled graph is re-checked after this long: failed ingestion indexing clears the marker
+CLAIMS_BACKFILL_MARKER_TTL_SECONDS = float(os.getenv("CLAIMS_BACKFILL_MARKER_TTL_SECONDS", "60"))
+_claims_backfilled_graphs: Dict[str, float] = {}
+
+
+def _claims_backfilled(session: Session, graph_id: str) -> bool:
+    """True while the graph's claims are all in Qdrant (GraphSpace marker)."""
+    checked_at = _claims_backfilled_graphs.get(graph_id)
+    if checked_at is not None and time.monotonic() - checked_at < CLAIMS_BACKFILL_MARKER_TTL_SECONDS:
+        return True
+    rec = session.run(
+        """
+        MATCH (g:GraphSpace {graph_id: $graph_id})
+        RETURN g.claims_qdrant_backfilled_at IS NOT NULL AS backfilled
+        """,
+        graph_id=graph_id,
+    ).single()
+    if rec and rec["backfilled"]:
+        _claims_backfilled_graphs[graph_id] = time.monotonic()
+        return True
+    _claims_backfilled_graphs.pop(graph_id, None)
+    return False
+
+
+def _current_claims(
     session: Session,
     graph_id: str,
     branch_id: str,
-    query: str,
-    limit: int = 30,
-    ingestion_run_id: Optional[Any] = None
+    claim_ids: List[str],
+    run_ids: Optional[List[str]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Neo4j's view of Qdrant hits: {claim_id: claim} for the ids still in the graph.
+
+    "visible" says whether the claim still passes the same filters as the Neo4j path
+    (branch membership, embedding, ingestion runs).
+    """
+    result = session.run(
+        """
+        MATCH (g:GraphSpace {graph_id: $graph_id})
+        MATCH (claim:Claim {graph_id: $graph_id})-[:BELONGS_TO]->(g)
+        WHERE claim.claim_id IN $claim_ids
+        OPTIONAL MATCH (claim)-[:SUPPORTED_BY]->(chunk:SourceChunk {graph_id: $graph_id})
+        WITH claim, head(collect(chunk.chunk_id)) AS chunk_id
+        RETURN claim.claim_id AS claim_id,
+               claim.text AS text,
+               COALESCE(claim.confidence, 0.5) AS confidence,
+               claim.source_id AS source_id,
+               claim.source_span AS source_span,
+               chunk_id,
+               ($branch_id IN COALESCE(claim.on_branches, [])
+                AND claim.embedding IS NOT NULL
+                AND ($run_ids IS NULL OR claim.ingestion_run_id IN $run_ids)) AS visible
+        """,
+        graph_id=graph_id,
+        branch_id=branch_id,
+        claim_ids=claim_ids,
+        run_ids=run_ids,
+    )
+    return {record["claim_id"]: dict(record) for record in result}
+
+
+def _search_claims_in_qdrant(
+    session: Session,
+    graph_id: str,
+    branch_id: str,
+    query_embedding: List[float],
+    limit: int,
+    run_ids: Optional[List[str]],
 ) -> List[Dict[str, Any]]:
     """
-    Retrieve top claims by embedding similarity to query.
-    
-    Args:
-        session: Neo4j session
-        graph_id: Graph ID
-        branch_id: Branch ID
-        query: Query text
-        limit: Max claims to return
-        ingestion_run_id: Optional run ID or list of IDs filter
-    
-    Returns:
-        List of claim dicts sorted by similarity
+    ANN top-k over the Qdrant claims collection, shaped like the Neo4j path.
+
+    Qdrant only ranks: hits are checked against Neo4j, the source of truth, so claims
+    deleted or moved off the branch since they were indexed are dropped, and the
+    returned fields are Neo4j's. Points whose claim is gone from the graph are removed
+    from Qdrant on the way.
     """
-    ensure_graph_scoping_initialized(session)
-    
-    # Normalize ingestion_run_id to a list for Cypher IN operator
-    run_ids = None
-    if ingestion_run_id:
-        run_ids = ingestion_run_id if isinstance(ingestion_run_id, list) else [ingestion_run_id]
+    from vector_store_qdrant import delete_claims, search_claims
 
-    # Get query embedding
-    try:
-        query_embedding = embed_text(query)
-    except Exception as e:
-        print(f"[Retrieval Helpers] Failed to embed query: {e}")
+    tenant_id = resolve_graph_tenant_id(session, graph_id)
+    if not tenant_id:
         return []
-    
-    # Fetch claims with embeddings
+    hits = search_claims(
+        query_embedding=query_embedding,
+        tenant_id=tenant_id,
+        graph_id=graph_id,
+        branch_id=branch_id,
+        ingestion_run_ids=run_ids,
+        limit=limit * CLAIM_QDRANT_OVERFETCH,
+    )
+    if not hits:
+        return []
+
+    current = _current_claims(session, graph_id, branch_id, [hit["claim_id"] for hit in hits], run_ids)
+    claims = []
+    for hit in hits:
+        claim = current.get(hit["claim_id"])
+        if claim is None or not claim["visible"]:
+            continue
+        claims.append({
+            "claim_id": claim["claim_id"],
+            "text": claim["text"],
+            "confidence": claim["confidence"],
+            "source_id": claim["source_id"],
+            "source_span": claim["source_span"],
+            "chunk_id": claim["chunk_id"],
+            "similarity": hit["score"],
+        })
+        if len(claims) == limit:
+            break
+
+    gone = [hit["claim_id"] for hit in hits if hit["claim_id"] not in current]
+    if gone:
+        try:
+            delete_claims(graph_id, gone)
+        except Exception as e:
+            logger.warning(f"[Retrieval Helpers] Failed to prune {len(gone)} stale claims from Qdrant: {e}")
+    return claims
+
+
+def _search_claims_in_neo4j(
+    session: Session,
+    graph_id: str,
+    branch_id: str,
+    query_embedding: List[float],
+    limit: int,
+    run_ids: Optional[List[str]],
+) -> List[Dict[str, Any]]:
+    """Score Claim embeddings stored in Neo4j (capped at 200 candidates)."""
     query_cypher = """
     MATCH (g:GraphSpace {graph_id: $graph_id})
     MATCH (claim:Claim {graph_id: $graph_id})-[:BELONGS_TO]->(g)
@@ -144,30 +251,92 @@ def retrieve_top_claims_by_query_embedding(
         run_ids=run_ids
     )
     
-    claims_with_scores = []
+    claims = []
+    embeddings = []
     for record in result:
         claim_embedding = record.get("embedding")
         if not claim_embedding:
             continue
-        
+        claims.append({
+            "claim_id": record["claim_id"],
+            "text": record["text"],
+            "confidence": record["confidence"],
+            "source_id": record["source_id"],
+            "source_span": record["source_span"],
+            "chunk_id": record.get("chunk_id"),
+        })
+        embeddings.append(claim_embedding)
+    
+    # Score all claims in one batched matvec; top-k via argpartition
+    index = EmbeddingMatrix(claims, embeddings, dim=len(query_embedding))
+    return [
+        {**claim, "similarity": similarity}
+        for claim, similarity in index.top_k(query_embedding, limit)
+    ]
+
+
+def retrieve_top_claims_by_query_embedding(
+    session: Session,
+    graph_id: str,
+    branch_id: str,
+    query: str,
+    limit: int = 30,
+    ingestion_run_id: Optional[Any] = None
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve top claims by embedding similarity to query.
+    
+    Uses a filtered ANN search over the Qdrant claims collection when enabled, so every
+    claim in the graph is a candidate. Until the graph's existing claims have been
+    backfilled (scripts/migrate_to_qdrant.py --claims), Qdrant only holds the claims
+    written since, so its hits are merged with the Neo4j scan of Claim embeddings
+    (capped at 200). Ingestion clears the backfill marker when it fails to index claims
+    in Qdrant, which turns the merge back on. The Neo4j scan alone is used when Qdrant is disabled, unreachable,
+    or returns nothing.
+    
+    Args:
+        session: Neo4j session
+        graph_id: Graph ID
+        branch_id: Branch ID
+        query: Query text
+        limit: Max claims to return
+        ingestion_run_id: Optional run ID or list of IDs filter
+    
+    Returns:
+        List of claim dicts sorted by similarity
+    """
+    ensure_graph_scoping_initialized(session)
+    
+    # Normalize ingestion_run_id to a list for Cypher IN operator
+    run_ids = None
+    if ingestion_run_id:
+        run_ids = ingestion_run_id if isinstance(ingestion_run_id, list) else [ingestion_run_id]
+
+    # Get query embedding
+    try:
+        query_embedding = embed_text(query)
+    except Exception as e:
+        print(f"[Retrieval Helpers] Failed to embed query: {e}")
+        return []
+    
+    qdrant_claims: List[Dict[str, Any]] = []
+    if USE_QDRANT:
         try:
-            similarity = cosine_similarity(query_embedding, claim_embedding)
-            claims_with_scores.append({
-                "claim_id": record["claim_id"],
-                "text": record["text"],
-                "confidence": record["confidence"],
-                "source_id": record["source_id"],
-                "source_span": record["source_span"],
-                "chunk_id": record.get("chunk_id"),
-                "similarity": similarity,
-            })
+            qdrant_claims = _search_claims_in_qdrant(
+                session, graph_id, branch_id, query_embedding, limit, run_ids
+            )
+            if qdrant_claims and _claims_backfilled(session, graph_id):
+                return qdrant_claims
         except Exception as e:
-            print(f"[Retrieval Helpers] Failed to compute similarity: {e}")
-            continue
+            logger.warning(f"[Retrieval Helpers] Qdrant claim search failed, falling back to Neo4j: {e}")
     
-    # Sort by similarity
-    claims_with_scores.sort(key=lambda x: x["similarity"], reverse=True)
-    return claims_with_scores[:limit]
+    # Fallback (or, for a graph not yet backfilled, complement): claims with embeddings in Neo4j
+    claims = _search_claims_in_neo4j(session, graph_id, branch_id, query_embedding, limit, run_ids)
+    if not qdrant_claims:
+        return claims
+    merged = {claim["claim_id"]: claim for claim in claims}
+    merged.update({claim["claim_id"]: claim for claim in qdrant_claims})
+    return sorted(merged.values(), key=lambda claim: claim["similarity"], reverse=True)[:limit]
 
 
 def fetch_source_chunks_by_ids(
@@ -1,55 +1,78 @@
 from typing import List, Dict, Optional, Any
-import math
-import json
 import hashlib
 import logging
+import os
+import threading
 from neo4j import Session
 from pathlib import Path
 
+import numpy as np
+
 from config import OPENAI_API_KEY, USE_QDRANT
 from services_model_router import model_router, TASK_EMBEDDING
 from services_graph import get_all_concepts
+from services_similarity import (
+    cosine_similarity as _vector_cosine_similarity,
+    top_k_indices,
+)
+from vector_store_mmap import MmapVectorStore, import_legacy_json_cache
+from services_reembed_worker import ReembedWorker
+from services_embedding_batcher import embed_many
+from services_turn_cache import turn_memo
 
 logger = logging.getLogger("brain_web")
 
-# Embeddings cache file path
+# Legacy JSON cache, imported once into the memory-mapped store on first use
 EMBEDDINGS_CACHE_FILE = Path(__file__).parent / "embeddings_cache.json"
+LOCAL_VECTOR_STORE_DIR = Path(
+    os.getenv("LOCAL_VECTOR_STORE_DIR", str(Path(__file__).parent / "embeddings_store"))
+)
 
-# In-memory cache for embeddings (keyed by node_id)
-_embedding_cache: Dict[str, Dict] = {}
+_vector_store: Optional[MmapVectorStore] = None
+_reembed_worker: Optional[ReembedWorker] = None
+_vector_store_lock = threading.Lock()
 
 def _compute_text_hash(node_text: str) -> str:
     """Compute a hash of the node text to detect changes"""
     return hashlib.md5(node_text.encode()).hexdigest()
 
-def _load_embeddings_cache() -> Dict[str, Dict]:
-    if not EMBEDDINGS_CACHE_FILE.exists():
-        return {}
-    try:
-        with open(EMBEDDINGS_CACHE_FILE, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        logger.warning(f"Failed to load embeddings cache: {e}")
-        return {}
-
-def _save_embeddings_cache():
-    try:
-        with open(EMBEDDINGS_CACHE_FILE, "w") as f:
-            json.dump(_embedding_cache, f)
-    except Exception as e:
-        logger.warning(f"Failed to save embeddings cache: {e}")
+def _concept_text(concept) -> str:
+    return f"{concept.name}\n{concept.description or ''}\n{', '.join(concept.tags or [])}"
+
+def get_local_vector_store() -> MmapVectorStore:
+    """Memory-mapped concept embedding store used by the local (non-Qdrant) search path."""
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                store = MmapVectorStore(LOCAL_VECTOR_STORE_DIR)
+                import_legacy_json_cache(store, EMBEDDINGS_CACHE_FILE)
+                _vector_store = store
+    return _vector_store
+
+def get_reembed_worker() -> ReembedWorker:
+    """Background worker that refreshes stale vectors in the local store."""
+    global _reembed_worker
+    if _reembed_worker is None:
+        store = get_local_vector_store()
+        with _vector_store_lock:
+            if _reembed_worker is None:
+                _reembed_worker = ReembedWorker(store, embed_many)
+    return _reembed_worker
+
+def get_reembed_stats() -> Dict[str, Any]:
+    stats = get_reembed_worker().stats()
+    stats["store"] = get_local_vector_store().stats()
+    return stats
 
 def embed_text(text: str) -> List[float]:
-    """Uses model_router to get vector representation."""
-    return model_router.embed(text)
+    """Uses model_router to get vector representation (once per retrieval turn)."""
+    return turn_memo("embedding", text, lambda: model_router.embed(text))
 
 def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     if not vec1 or not vec2 or len(vec1) != len(vec2):
         return 0.0
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    mag1 = math.sqrt(sum(a * a for a in vec1))
-    mag2 = math.sqrt(sum(a * a for a in vec2))
-    return dot_product / (mag1 * mag2) if mag1 > 0 and mag2 > 0 else 0.0
+    return _vector_cosine_similarity(vec1, vec2)
 
 def semantic_search_nodes(
     query: str,
@@ -66,38 +89,29 @@ def semantic_search_nodes(
             logger.warning(f"Qdrant search failed, falling back to local: {e}")
 
     # Local fallback
-    global _embedding_cache
-    if not _embedding_cache:
-        _embedding_cache = _load_embeddings_cache()
+    store = get_local_vector_store()
 
     concepts = get_all_concepts(session)
     if not concepts: return []
     
     query_vec = embed_text(query)
-    results = []
-    updated = False
-    
-    for concept in concepts:
-        text = f"{concept.name}\n{concept.description or ''}\n{', '.join(concept.tags or [])}"
-        text_hash = _compute_text_hash(text)
-        
-        cache_entry = _embedding_cache.get(concept.node_id)
-        if cache_entry and cache_entry.get("text_hash") == text_hash:
-            vec = cache_entry["embedding"]
-        else:
-            vec = embed_text(text)
-            _embedding_cache[concept.node_id] = {"embedding": vec, "text_hash": text_hash}
-            updated = True
-        
-        results.append({"node": concept, "score": cosine_similarity(query_vec, vec)})
-    
-    if updated:
-        _save_embeddings_cache()
-    
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results[:limit]
+    node_ids = [c.node_id for c in concepts]
+    texts = [_concept_text(c) for c in concepts]
+    text_hashes = [_compute_text_hash(t) for t in texts]
+    rows, fresh = store.lookup(node_ids, text_hashes)
+
+    # Never embed inline: stale/missing concepts go to the background worker, and this
+    # search uses their last good vector or skips them.
+    stale = np.flatnonzero(~fresh)
+    if stale.size:
+        get_reembed_worker().enqueue([(node_ids[i], text_hashes[i], texts[i]) for i in stale])
+
+    # Score every concept in one batched matvec over the mapped file; only the top `limit` get sorted.
+    scores = store.scores(query_vec, rows)
+    return [
+        {"node": concepts[i], "score": float(scores[i])}
+        for i in top_k_indices(scores, limit, valid=rows >= 0)
+    ]
 
 def invalidate_embedding(node_id: str):
-    if node_id in _embedding_cache:
-        del _embedding_cache[node_id]
-        _save_embeddings_cache()
+    get_local_vector_store().tombstone(node_id)
@@ -18,6 +18,7 @@ from vector_store_qdrant import (
     get_collection_info
 )
 from config import OPENAI_API_KEY
+from services_model_router import model_router
 
 # Initialize OpenAI client
 client = None
@@ -33,6 +34,7 @@ if OPENAI_API_KEY:
 def embed_text(text: str) -> List[float]:
     """
     Uses OpenAI embeddings (text-embedding-3-small) to get vector representation.
+    Goes through model_router so repeated texts hit the shared embedding cache.
     """
     if not client:
         error_msg = "ERROR: OpenAI client not initialized. Check OPENAI_API_KEY environment variable."
@@ -40,11 +42,7 @@ def embed_text(text: str) -> List[float]:
         raise ValueError(error_msg)
     
     try:
-        response = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=text
-        )
-        return response.data[0].embedding
+        return model_router.embed(text)
     except Exception as e:
         error_str = str(e)
         if "invalid_api_key" in error_str.lower() or "incorrect api key" in error_str.lower():
@@ -2,32 +2,44 @@
 Semantic Cache (Redis Hot Path)
 
 Goal:
-  - Before calling the LLM, check Redis for a semantically-similar question.
+  - Before calling the LLM, check for a semantically-similar question.
   - If a near-duplicate exists (cosine distance < threshold), return cached answer.
 
 Notes:
   - This implementation uses vanilla Redis (no Redis Stack / RediSearch vector index).
-  - We keep a small, tenant+user-scoped rolling window of recent Q&A embeddings in Redis
-    and do an in-process similarity scan over the last N entries.
+  - Each (tenant, user) has an in-process index: a float32 matrix of unit question
+    embeddings plus entry ids and expiry times. A lookup scores every live entry with one
+    matvec and only fetches the answer of the best hit.
+  - Redis is the shared, persistent copy:
+        semcache:{tenant}:{user}:vec     hash  entry_id -> raw float32 bytes
+        semcache:{tenant}:{user}:expiry  zset  entry_id -> expires_at (unix seconds)
+        semcache:{tenant}:{user}:ver     int   bumped on every write/eviction
+        semcache:{tenant}:{user}:entry:{id}  JSON {question, answer, created_at, extra}
+    The in-process index reloads only when `ver` moved (another worker wrote), so a
+    lookup is one small GET plus local math.
+  - Expired entries are evicted lazily on lookup; the oldest entries are evicted when a
+    user exceeds max_entries.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import os
+import threading
 import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+import numpy as np
+
 try:
     import redis
 except Exception:  # pragma: no cover
     redis = None
 
-from openai import OpenAI
-
 from config import (
-    OPENAI_API_KEY,
     USE_REDIS,
     REDIS_URL,
     REDIS_HOST,
@@ -35,17 +47,20 @@ from config import (
     REDIS_PASSWORD,
     REDIS_DB,
 )
+from services_model_router import model_router
+from services_similarity import cosine_similarity as _vector_cosine_similarity, to_unit_vector
 
 logger = logging.getLogger("brain_web")
 
 # Defaults tuned for "hot path" speed and bounded memory.
 DEFAULT_DISTANCE_THRESHOLD = 0.1  # cosine distance = 1 - cosine_similarity
-DEFAULT_MAX_CANDIDATES = 50
+DEFAULT_MAX_CANDIDATES = 50  # kept for API compatibility; the index scores every entry
 DEFAULT_ENTRY_TTL_SECONDS = 60 * 60 * 24  # 24h
 DEFAULT_MAX_ENTRIES = 200
+# Number of (tenant, user) indexes kept in process memory.
+SEMANTIC_CACHE_MAX_INDEXES = int(os.getenv("SEMANTIC_CACHE_MAX_INDEXES", "1024"))
 
 _redis_client = None
-_openai_client: Optional[OpenAI] = None
 
 
 def _get_redis_client():
@@ -56,15 +71,16 @@ def _get_redis_client():
         return _redis_client
 
     try:
+        # Binary client: embeddings are stored as raw float32 bytes.
         if REDIS_URL:
-            _redis_client = redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=2)
+            _redis_client = redis.from_url(REDIS_URL, decode_responses=False, socket_timeout=2)
         else:
             _redis_client = redis.Redis(
                 host=REDIS_HOST,
                 port=REDIS_PORT,
                 db=REDIS_DB,
                 password=REDIS_PASSWORD,
-                decode_responses=True,
+                decode_responses=False,
                 socket_timeout=2,
             )
         _redis_client.ping()
@@ -75,49 +91,163 @@ def _get_redis_client():
         return None
 
 
-def _get_openai_client() -> OpenAI:
-    global _openai_client
-    if _openai_client is None:
-        if not OPENAI_API_KEY:
-            raise ValueError("OPENAI_API_KEY not set (required for semantic cache embeddings)")
-        _openai_client = OpenAI(api_key=str(OPENAI_API_KEY).strip().strip('"').strip("'"))
-    return _openai_client
-
-
 def embed_text(text: str) -> List[float]:
-    """Get an embedding for semantic cache lookup/storage."""
-    client = _get_openai_client()
-    resp = client.embeddings.create(model="text-embedding-3-small", input=text)
-    return resp.data[0].embedding
+    """Get an embedding for semantic cache lookup/storage (shared embedding cache)."""
+    return model_router.embed(text)
 
 
 def _cosine_similarity(a: List[float], b: List[float]) -> float:
     if len(a) != len(b) or not a:
         return 0.0
-    dot = 0.0
-    na = 0.0
-    nb = 0.0
-    for x, y in zip(a, b):
-        dot += x * y
-        na += x * x
-        nb += y * y
-    if na <= 0.0 or nb <= 0.0:
-        return 0.0
-    return dot / ((na ** 0.5) * (nb ** 0.5))
+    return _vector_cosine_similarity(a, b)
 
 
 def _cosine_distance(a: List[float], b: List[float]) -> float:
     return 1.0 - _cosine_similarity(a, b)
 
 
-def _recent_list_key(*, tenant_id: str, user_id: str) -> str:
-    return f"semcache:{tenant_id}:{user_id}:recent"
+def _vectors_key(*, tenant_id: str, user_id: str) -> str:
+    return f"semcache:{tenant_id}:{user_id}:vec"
+
+
+def _expiry_key(*, tenant_id: str, user_id: str) -> str:
+    return f"semcache:{tenant_id}:{user_id}:expiry"
+
+
+def _version_key(*, tenant_id: str, user_id: str) -> str:
+    return f"semcache:{tenant_id}:{user_id}:ver"
 
 
 def _entry_key(*, tenant_id: str, user_id: str, entry_id: str) -> str:
     return f"semcache:{tenant_id}:{user_id}:entry:{entry_id}"
 
 
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+# ---------------------------------------------------------------------------
+# In-process index
+# ---------------------------------------------------------------------------
+
+class _UserIndex:
+    """Unit question embeddings of one (tenant, user), packed for batched scoring."""
+
+    def __init__(self, version: int, ids: List[str], matrix: np.ndarray, expires_at: np.ndarray):
+        self.version = version
+        self.ids = ids
+        self.matrix = matrix
+        self.expires_at = expires_at
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    def appended(self, version: int, entry_id: str, vector: np.ndarray, expires_at: float) -> "_UserIndex":
+        if not len(self.ids) or vector.shape[0] != self.dim:
+            return _UserIndex(version, [entry_id], vector[None, :], np.array([expires_at]))
+        return _UserIndex(
+            version,
+            self.ids + [entry_id],
+            np.vstack([self.matrix, vector[None, :]]),
+            np.append(self.expires_at, expires_at),
+        )
+
+    def without(self, version: int, entry_ids: List[str]) -> "_UserIndex":
+        drop = set(entry_ids)
+        keep = [i for i, eid in enumerate(self.ids) if eid not in drop]
+        return _UserIndex(version, [self.ids[i] for i in keep], self.matrix[keep], self.expires_at[keep])
+
+
+_indexes: "OrderedDict[Tuple[str, str], _UserIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _load_index(r, *, tenant_id: str, user_id: str) -> _UserIndex:
+    pipe = r.pipeline(transaction=False)
+    pipe.get(_version_key(tenant_id=tenant_id, user_id=user_id))
+    pipe.hgetall(_vectors_key(tenant_id=tenant_id, user_id=user_id))
+    pipe.zrange(_expiry_key(tenant_id=tenant_id, user_id=user_id), 0, -1, withscores=True)
+    raw_version, raw_vectors, raw_expiry = pipe.execute()
+
+    expiry = {_decode(eid): float(score) for eid, score in raw_expiry or []}
+    ids: List[str] = []
+    rows: List[np.ndarray] = []
+    expires_at: List[float] = []
+    dim = None
+    for raw_id, blob in (raw_vectors or {}).items():
+        eid = _decode(raw_id)
+        if eid not in expiry or not blob:
+            continue
+        vec = np.frombuffer(blob, dtype=np.float32)
+        if dim is None:
+            dim = vec.shape[0]
+        if vec.shape[0] != dim:
+            continue
+        ids.append(eid)
+        rows.append(vec)
+        expires_at.append(expiry[eid])
+    matrix = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+    return _UserIndex(int(raw_version or 0), ids, matrix, np.array(expires_at, dtype=np.float64))
+
+
+def _remember_index(key: Tuple[str, str], index: Optional[_UserIndex]) -> None:
+    with _indexes_lock:
+        if index is None:
+            _indexes.pop(key, None)
+            return
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > SEMANTIC_CACHE_MAX_INDEXES:
+            _indexes.popitem(last=False)
+
+
+def _apply_local(key: Tuple[str, str], version: int, update) -> None:
+    """Apply a write to the cached index if it is exactly one version behind; else drop it."""
+    with _indexes_lock:
+        index = _indexes.get(key)
+    if index is not None and index.version == version - 1:
+        _remember_index(key, update(index))
+    else:
+        _remember_index(key, None)
+
+
+def _get_index(r, *, tenant_id: str, user_id: str) -> _UserIndex:
+    """Current index for (tenant, user); reloads from Redis only if its version moved."""
+    key = (tenant_id, user_id)
+    version = int(r.get(_version_key(tenant_id=tenant_id, user_id=user_id)) or 0)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and index.version == version:
+            _indexes.move_to_end(key)
+            return index
+    index = _load_index(r, tenant_id=tenant_id, user_id=user_id)
+    _remember_index(key, index)
+    return index
+
+
+def _evict(r, *, tenant_id: str, user_id: str, entry_ids: List[str]) -> None:
+    """Remove entries from Redis and from the in-process index."""
+    if not entry_ids:
+        return
+    key = (tenant_id, user_id)
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.hdel(_vectors_key(tenant_id=tenant_id, user_id=user_id), *entry_ids)
+        pipe.zrem(_expiry_key(tenant_id=tenant_id, user_id=user_id), *entry_ids)
+        pipe.delete(*[_entry_key(tenant_id=tenant_id, user_id=user_id, entry_id=eid) for eid in entry_ids])
+        pipe.incr(_version_key(tenant_id=tenant_id, user_id=user_id))
+        version = int(pipe.execute()[-1])
+    except Exception as e:
+        logger.debug(f"Semantic cache eviction failed: {e}")
+        _remember_index(key, None)
+        return
+    _apply_local(key, version, lambda index: index.without(version, entry_ids))
+
+
 def find_similar(
     *,
     tenant_id: str,
@@ -130,6 +260,9 @@ def find_similar(
     """
     Return best semantic cache hit if within distance_threshold.
 
+    Every live entry of (tenant, user) is scored; max_candidates is accepted for
+    backward compatibility and ignored.
+
     Returns a dict like:
       {
         "answer": "...",
@@ -145,45 +278,52 @@ def find_similar(
     if not r:
         return None
 
-    list_key = _recent_list_key(tenant_id=tenant_id, user_id=user_id)
     try:
-        entry_ids = r.lrange(list_key, 0, max(0, max_candidates - 1))
-        if not entry_ids:
-            return None
-
-        entry_keys = [_entry_key(tenant_id=tenant_id, user_id=user_id, entry_id=eid) for eid in entry_ids]
-        raw_entries = r.mget(entry_keys)
+        index = _get_index(r, tenant_id=tenant_id, user_id=user_id)
     except Exception as e:
         logger.debug(f"Semantic cache lookup failed: {e}")
         return None
+    if not len(index):
+        return None
 
-    best: Optional[Dict[str, Any]] = None
-    best_distance = float("inf")
+    live = index.expires_at > time.time()
+    if not live.all():
+        _evict(r, tenant_id=tenant_id, user_id=user_id, entry_ids=[index.ids[i] for i in np.flatnonzero(~live)])
+        if not live.any():
+            return None
 
-    for eid, raw in zip(entry_ids, raw_entries):
-        if not raw:
-            continue
-        try:
-            entry = json.loads(raw)
-            emb = entry.get("embedding")
-            if not isinstance(emb, list) or not emb:
-                continue
-            dist = _cosine_distance(query_embedding, emb)
-            if dist < best_distance:
-                best_distance = dist
-                best = {
-                    "entry_id": eid,
-                    "question": entry.get("question", ""),
-                    "answer": entry.get("answer", ""),
-                    "distance": dist,
-                }
-        except Exception:
-            continue
+    q = to_unit_vector(query_embedding, dim=index.dim)
+    if q is None:
+        return None
+    # Score every entry in one batched matvec.
+    scores = index.matrix @ q
+    scores[~live] = -1.0
+    best_idx = int(scores.argmax())
+    best_distance = 1.0 - float(scores[best_idx])
+    if best_distance >= float(distance_threshold):
+        return None
 
-    if best and best_distance < float(distance_threshold):
-        # Guardrail: ensure we only return non-empty answers.
-        if isinstance(best.get("answer"), str) and best["answer"].strip():
-            return best
+    eid = index.ids[best_idx]
+    try:
+        raw = r.get(_entry_key(tenant_id=tenant_id, user_id=user_id, entry_id=eid))
+        entry = json.loads(raw) if raw else None
+    except Exception as e:
+        logger.debug(f"Semantic cache entry fetch failed: {e}")
+        return None
+    if not entry:
+        # Entry payload expired under us; drop the dangling vector.
+        _evict(r, tenant_id=tenant_id, user_id=user_id, entry_ids=[eid])
+        return None
+
+    best = {
+        "entry_id": eid,
+        "question": entry.get("question", ""),
+        "answer": entry.get("answer", ""),
+        "distance": best_distance,
+    }
+    # Guardrail: ensure we only return non-empty answers.
+    if isinstance(best.get("answer"), str) and best["answer"].strip():
+        return best
     return None
 
 
@@ -205,35 +345,55 @@ def store(
         return None
     if not isinstance(answer, str) or not answer.strip():
         return None
+    vector = to_unit_vector(question_embedding)
+    if vector is None:
+        return None
 
     r = _get_redis_client()
     if not r:
         return None
 
     entry_id = uuid4().hex
+    now = time.time()
+    expires_at = now + int(ttl_seconds)
     entry = {
         "question": question,
         "answer": answer,
-        "embedding": question_embedding,
-        "created_at": int(time.time()),
+        "created_at": int(now),
     }
     if extra:
         entry["extra"] = extra
 
-    list_key = _recent_list_key(tenant_id=tenant_id, user_id=user_id)
-    key = _entry_key(tenant_id=tenant_id, user_id=user_id, entry_id=entry_id)
+    vectors_key = _vectors_key(tenant_id=tenant_id, user_id=user_id)
+    expiry_key = _expiry_key(tenant_id=tenant_id, user_id=user_id)
+    version_key = _version_key(tenant_id=tenant_id, user_id=user_id)
     try:
         pipe = r.pipeline(transaction=False)
-        pipe.setex(key, int(ttl_seconds), json.dumps(entry))
-        pipe.lpush(list_key, entry_id)
-        pipe.ltrim(list_key, 0, max(0, int(max_entries) - 1))
-        pipe.expire(list_key, int(ttl_seconds))
-        pipe.execute()
-        return entry_id
+        pipe.setex(_entry_key(tenant_id=tenant_id, user_id=user_id, entry_id=entry_id), int(ttl_seconds), json.dumps(entry))
+        pipe.hset(vectors_key, entry_id, vector.tobytes())
+        pipe.zadd(expiry_key, {entry_id: expires_at})
+        for k in (vectors_key, expiry_key, version_key):
+            pipe.expire(k, int(ttl_seconds))
+        pipe.incr(version_key)
+        pipe.zcard(expiry_key)
+        results = pipe.execute()
+        version, count = int(results[-2]), int(results[-1])
     except Exception as e:
         logger.debug(f"Semantic cache store failed: {e}")
         return None
 
+    _apply_local((tenant_id, user_id), version, lambda index: index.appended(version, entry_id, vector, expires_at))
+
+    overflow = count - max(1, int(max_entries))
+    if overflow > 0:
+        try:
+            oldest = [_decode(eid) for eid in r.zrange(expiry_key, 0, overflow - 1)]
+        except Exception as e:
+            logger.debug(f"Semantic cache trim failed: {e}")
+            oldest = []
+        _evict(r, tenant_id=tenant_id, user_id=user_id, entry_ids=oldest)
+    return entry_id
+
 
 def lookup_question(
     *,
@@ -248,19 +408,16 @@ def lookup_question(
       - embeds the question
       - finds a similar cached entry
     Returns (hit, embedding).
+
+    The embedding is returned even when the cache is empty so the caller can store
+    the answer; it goes through the shared embedding cache, so retrieval reuses it.
     """
     if not tenant_id or not user_id:
         return (None, None)
 
-    # Avoid embedding calls if Redis isn't available or cache is empty.
     r = _get_redis_client()
     if not r:
         return (None, None)
-    try:
-        if not r.lrange(_recent_list_key(tenant_id=tenant_id, user_id=user_id), 0, 0):
-            return (None, None)
-    except Exception:
-        return (None, None)
 
     try:
         q_emb = embed_text(question)
@@ -276,3 +433,12 @@ def lookup_question(
         max_candidates=max_candidates,
     )
     return (hit, q_emb)
+
+
+def get_semantic_cache_stats() -> Dict[str, Any]:
+    with _indexes_lock:
+        return {
+            "indexes": len(_indexes),
+            "entries": sum(len(i) for i in _indexes.values()),
+            "bytes": sum(int(i.matrix.nbytes) for i in _indexes.values()),
+        }
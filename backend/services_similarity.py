@@ -0,0 +1,246 @@
+"""
+Vectorized cosine-similarity kernel shared by the retrieval paths.
+
+Candidate embeddings are packed into contiguous, L2-normalised float32 matrices so a
+query can be scored against every candidate with one matrix-vector product instead of
+a pure-Python loop per pair. Top-k selection uses argpartition (O(n)) and only sorts
+the k winners.
+
+Missing, empty, zero-norm or dimension-mismatched vectors are kept as zero rows and
+flagged invalid, so indices always line up with the caller's candidate list and those
+rows score 0.0 (matching the old scalar helpers).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+_EPS = 1e-12
+
+
+def to_unit_vector(vec: Any, dim: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Convert a vector-like to a normalised 1-D float32 array.
+
+    Returns None for missing/empty/zero-norm vectors or when `dim` is given and does not match.
+    """
+    if vec is None:
+        return None
+    try:
+        arr = np.asarray(vec, dtype=np.float32).reshape(-1)
+    except (TypeError, ValueError):
+        return None
+    if arr.size == 0 or (dim is not None and arr.size != dim):
+        return None
+    norm = float(np.linalg.norm(arr))
+    if not np.isfinite(norm) or norm <= _EPS:
+        return None
+    return arr / norm
+
+
+def pack_embeddings(
+    vectors: Sequence[Any],
+    dim: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack vectors into a contiguous (n, dim) float32 matrix of unit rows.
+
+    Args:
+        vectors: Sequence of embeddings (lists, arrays or None)
+        dim: Expected dimension; inferred from the first usable vector if omitted
+
+    Returns:
+        Tuple of (matrix, valid_mask). Invalid rows are all zeros.
+    """
+    n = len(vectors)
+    if dim is None:
+        for v in vectors:
+            if v is not None and len(v) > 0:
+                dim = len(v)
+                break
+    if not dim:
+        return np.zeros((n, 0), dtype=np.float32), np.zeros(n, dtype=bool)
+
+    matrix = np.zeros((n, dim), dtype=np.float32)
+    valid = np.zeros(n, dtype=bool)
+    for i, v in enumerate(vectors):
+        if v is None or len(v) != dim:
+            continue
+        try:
+            matrix[i] = np.asarray(v, dtype=np.float32)
+        except (TypeError, ValueError):
+            continue
+        valid[i] = True
+
+    norms = np.linalg.norm(matrix, axis=1)
+    valid &= np.isfinite(norms) & (norms > _EPS)
+    safe = np.where(valid, norms, 1.0).astype(np.float32)
+    matrix /= safe[:, None]
+    matrix[~valid] = 0.0
+    return matrix, valid
+
+
+def cosine_scores(query: Any, matrix: np.ndarray) -> np.ndarray:
+    """
+    Score a query against every row of a packed matrix (one matvec).
+
+    Returns a float32 array of length n; all zeros if the query is unusable.
+    """
+    n = matrix.shape[0]
+    if n == 0 or matrix.shape[1] == 0:
+        return np.zeros(n, dtype=np.float32)
+    q = to_unit_vector(query, dim=matrix.shape[1])
+    if q is None:
+        return np.zeros(n, dtype=np.float32)
+    return matrix @ q
+
+
+def top_k_indices(
+    scores: np.ndarray,
+    k: int,
+    valid: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first (ties broken by lower index).
+
+    Uses argpartition so only the k winners are sorted. Rows where `valid` is False
+    are never returned.
+    """
+    scores = np.asarray(scores, dtype=np.float32)
+    if valid is not None:
+        candidates = np.flatnonzero(valid)
+    else:
+        candidates = np.arange(scores.shape[0])
+    if k <= 0 or candidates.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    cand_scores = scores[candidates]
+    if k < candidates.size:
+        part = np.argpartition(-cand_scores, k - 1)[:k]
+        # Pull in anything tied with the k-th score so tie-breaking stays deterministic.
+        kth = cand_scores[part].min()
+        part = np.flatnonzero(cand_scores >= kth)
+        candidates = candidates[part]
+        cand_scores = cand_scores[part]
+
+    order = np.lexsort((candidates, -cand_scores))[:k]
+    return candidates[order]
+
+
+def cosine_similarity(vec1: Any, vec2: Any) -> float:
+    """Cosine similarity of two vectors; 0.0 if either is unusable or dimensions differ."""
+    a = to_unit_vector(vec1)
+    if a is None:
+        return 0.0
+    b = to_unit_vector(vec2, dim=a.size)
+    if b is None:
+        return 0.0
+    return float(np.dot(a, b))
+
+
+class EmbeddingMatrix(Generic[T]):
+    """
+    A batch of candidate embeddings packed for fast scoring.
+
+    Holds the caller's items alongside a contiguous float32 matrix of unit rows, so
+    repeated queries (or one query plus MMR) never touch Python-level float lists again.
+    """
+
+    def __init__(self, items: Sequence[T], vectors: Sequence[Any], dim: Optional[int] = None):
+        if len(items) != len(vectors):
+            raise ValueError("items and vectors must have the same length")
+        self.items: List[T] = list(items)
+        self.matrix, self.valid = pack_embeddings(vectors, dim=dim)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1])
+
+    def scores(self, query: Any) -> np.ndarray:
+        """Cosine score of the query against every item (0.0 for invalid rows)."""
+        return cosine_scores(query, self.matrix)
+
+    def top_k(
+        self,
+        query: Any,
+        k: int,
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[T, float]]:
+        """Return up to k (item, score) pairs, best first, skipping items without a usable vector."""
+        scores = self.scores(query)
+        mask = self.valid
+        if min_score is not None:
+            mask = mask & (scores >= float(min_score))
+        idx = top_k_indices(scores, k, valid=mask)
+        return [(self.items[i], float(scores[i])) for i in idx]
+
+
+def mmr_select_indices(
+    matrix: Optional[np.ndarray],
+    relevance: Sequence[float],
+    k: int,
+    lambda_mult: float = 0.65,
+    candidate_mask: Optional[np.ndarray] = None,
+    pairwise_sims: Optional[np.ndarray] = None,
+) -> List[int]:
+    """
+    Incremental Maximal Marginal Relevance over a packed matrix.
+
+    Maximizes: lambda * rel(i) - (1 - lambda) * max(0, max_sim(i, selected))
+
+    A running max-similarity vector is kept per candidate and updated only against the
+    item picked in the previous round (one matvec, or one column lookup when
+    `pairwise_sims` is given), so selection costs O(k*n*d) instead of O(k^2*n*d).
+
+    Args:
+        matrix: (n, d) unit-row matrix from `pack_embeddings` (may be None with `pairwise_sims`)
+        relevance: Relevance score per row
+        k: Number of items to select
+        lambda_mult: Higher = more relevance, lower = more diversity
+        candidate_mask: Optional bool mask of rows eligible for selection
+        pairwise_sims: Optional precomputed (n, n) candidate x candidate similarity block
+
+    Returns:
+        Selected row indices in selection order (ties go to the lower index)
+    """
+    rel = np.asarray(relevance, dtype=np.float32)
+    n = rel.shape[0]
+    if k <= 0 or n == 0:
+        return []
+    if pairwise_sims is not None and pairwise_sims.shape != (n, n):
+        raise ValueError(f"pairwise_sims must have shape ({n}, {n}), got {pairwise_sims.shape}")
+    if pairwise_sims is None and (matrix is None or matrix.shape[0] != n):
+        raise ValueError("matrix must have one row per relevance score")
+
+    remaining = np.ones(n, dtype=bool) if candidate_mask is None else np.asarray(candidate_mask, dtype=bool).copy()
+    if not remaining.any():
+        return []
+
+    relevance_term = lambda_mult * rel
+    max_sim = np.zeros(n, dtype=np.float32)
+    scores = np.where(remaining, rel, -np.inf)
+
+    selected: List[int] = []
+    for _ in range(min(k, int(remaining.sum()))):
+        best = int(np.argmax(scores))
+        selected.append(best)
+        remaining[best] = False
+        if not remaining.any():
+            break
+
+        if pairwise_sims is not None:
+            sims = np.asarray(pairwise_sims[:, best], dtype=np.float32)
+        else:
+            assert matrix is not None  # checked above when pairwise_sims is None
+            sims = matrix @ matrix[best]
+        np.maximum(max_sim, sims, out=max_sim)
+        scores = np.where(remaining, relevance_term - (1 - lambda_mult) * max_sim, -np.inf)
+
+    return selected
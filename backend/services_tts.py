@@ -7,9 +7,13 @@ This is designed to be used over WebSockets, chunked sentence-by-sentence.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 import re
-from typing import Iterable, List, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from openai import OpenAI
 
@@ -18,6 +22,14 @@ from config import OPENAI_API_KEY
 logger = logging.getLogger("brain_web")
 
 _SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+# Streaming segmentation: a sentence end must be followed by whitespace so "3.14" is not cut
+_SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n")
+_CLAUSE_END_RE = re.compile(r"[,;:](?=\s)|\s[—–-](?=\s)")
+
+# Segments synthesized ahead of the one being sent (TtsPipeline)
+TTS_PIPELINE_LOOKAHEAD = max(1, int(os.getenv("TTS_PIPELINE_LOOKAHEAD", "2")))
+# The first segment of a reply may end at a clause boundary once it is this long
+TTS_FIRST_CLAUSE_MIN_CHARS = int(os.getenv("TTS_FIRST_CLAUSE_MIN_CHARS", "24"))
 
 
 def _get_openai_client() -> OpenAI:
@@ -138,3 +150,206 @@ def synthesize_speech_bytes(
     )
     return bytes(resp.content)
 
+
+
+class SpeechSegmenter:
+    """
+    Cuts a streamed reply into TTS segments as the text arrives.
+
+    Segments end at sentence boundaries (and are longer than `min_chars`). The first
+    segment may also end at a clause boundary (",", ";", ":", dash) so speech starts
+    before the first full sentence is generated. Text with no boundary is soft-wrapped
+    at `max_chars`.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_chars: int = 10,
+        first_clause_min_chars: int = TTS_FIRST_CLAUSE_MIN_CHARS,
+        max_chars: int = 240,
+    ) -> None:
+        self.min_chars = min_chars
+        self.first_clause_min_chars = first_clause_min_chars
+        self.max_chars = max_chars
+        self._buf = ""
+        self._emitted = 0
+
+    def feed(self, delta: str) -> List[str]:
+        """Add streamed text; return the segments it completed (possibly none)."""
+        self._buf += delta or ""
+        out: List[str] = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                return out
+            segment, self._buf = self._buf[:cut].strip(), self._buf[cut:]
+            if segment:
+                out.append(segment)
+                self._emitted += 1
+
+    def flush(self) -> List[str]:
+        """End of the stream: return whatever is left as a last segment."""
+        segment, self._buf = self._buf.strip(), ""
+        if not segment:
+            return []
+        self._emitted += 1
+        return [segment]
+
+    def _next_cut(self) -> Optional[int]:
+        buf = self._buf
+        for m in _SENTENCE_END_RE.finditer(buf):
+            if len(buf[: m.end()].strip()) > self.min_chars:
+                return m.end()
+        if self._emitted == 0:
+            for m in _CLAUSE_END_RE.finditer(buf):
+                if len(buf[: m.end()].strip()) >= self.first_clause_min_chars:
+                    return m.end()
+        if len(buf) > self.max_chars:
+            space = buf.rfind(" ", 0, self.max_chars)
+            return space if space > 0 else self.max_chars
+        return None
+
+
+@dataclass
+class _TtsSegment:
+    seq: int
+    text: str
+    submitted_at: float
+    task: "Optional[asyncio.Future[bytes]]" = None
+    synth_started_at: Optional[float] = None
+    ready_at: Optional[float] = None
+    sent_at: Optional[float] = None
+    audio_bytes: int = 0
+
+
+@dataclass
+class TtsPipeline:
+    """
+    Synthesizes segments concurrently and delivers them strictly in `seq` order.
+
+    `submit()` starts synthesizing a segment right away (in a worker thread) while
+    earlier segments are still being synthesized or sent; at most `lookahead`
+    segments are in flight beyond the one being delivered, after that `submit()`
+    waits (back-pressure on the producer). `deliver(seq, text, audio)` is awaited for
+    each segment in order. `cancel()` stops everything immediately: queued syntheses
+    are dropped and nothing more is delivered.
+    """
+
+    deliver: Callable[[int, str, bytes], Awaitable[None]]
+    voice: str = "alloy"
+    speed: float = 1.0
+    instructions: Optional[str] = None
+    response_format: str = "mp3"
+    lookahead: int = TTS_PIPELINE_LOOKAHEAD
+    synthesize: Callable[..., bytes] = synthesize_speech_bytes
+    cancelled: bool = field(default=False, init=False)
+
+    def __post_init__(self) -> None:
+        self._started_at = time.perf_counter()
+        self._slots = asyncio.Semaphore(max(1, self.lookahead) + 1)
+        self._queue: "asyncio.Queue[Optional[_TtsSegment]]" = asyncio.Queue()
+        self._segments: List[_TtsSegment] = []
+        self._sender: Optional[asyncio.Task] = None
+
+    async def submit(self, text: str) -> Optional[int]:
+        """Queue a segment; returns its seq, or None if empty or cancelled."""
+        value = (text or "").strip()
+        if not value or self.cancelled:
+            return None
+        await self._slots.acquire()
+        if self.cancelled:
+            self._slots.release()  # pass the wake-up on to the next blocked submit
+            return None
+        seg = _TtsSegment(seq=len(self._segments) + 1, text=value, submitted_at=time.perf_counter())
+        seg.task = asyncio.ensure_future(self._synthesize(seg))
+        self._segments.append(seg)
+        self._queue.put_nowait(seg)
+        if self._sender is None:
+            self._sender = asyncio.ensure_future(self._send_loop())
+        return seg.seq
+
+    async def drain(self) -> None:
+        """Wait until every submitted segment has been delivered (or dropped)."""
+        if self._sender is None:
+            return
+        self._queue.put_nowait(None)
+        await asyncio.wait({self._sender})
+
+    def cancel(self) -> None:
+        if self.cancelled:
+            return
+        self._abort()
+        if self._sender is not None:
+            self._sender.cancel()
+
+    @property
+    def first_audio_ms(self) -> Optional[int]:
+        sent = [s.sent_at for s in self._segments if s.sent_at is not None and s.audio_bytes]
+        return self._ms(min(sent)) if sent else None
+
+    def segment_metrics(self) -> List[Dict[str, Any]]:
+        """Per-segment latency; *_at_ms are relative to pipeline creation."""
+        out: List[Dict[str, Any]] = []
+        for s in self._segments:
+            synth_ms = None
+            if s.synth_started_at is not None and s.ready_at is not None:
+                synth_ms = int((s.ready_at - s.synth_started_at) * 1000)
+            out.append({
+                "seq": s.seq,
+                "chars": len(s.text),
+                "synth_ms": synth_ms,
+                "submitted_at_ms": self._ms(s.submitted_at),
+                "ready_at_ms": self._ms(s.ready_at),
+                "sent_at_ms": self._ms(s.sent_at),
+                "audio_bytes": s.audio_bytes,
+            })
+        return out
+
+    def _ms(self, t: Optional[float]) -> Optional[int]:
+        return None if t is None else int((t - self._started_at) * 1000)
+
+    def _abort(self) -> None:
+        self.cancelled = True
+        for seg in self._segments:
+            if seg.task is not None:
+                seg.task.cancel()
+        self._slots.release()
+
+    async def _synthesize(self, seg: _TtsSegment) -> bytes:
+        seg.synth_started_at = time.perf_counter()
+        try:
+            audio = await asyncio.to_thread(
+                self.synthesize,
+                seg.text,
+                voice=self.voice,
+                speed=self.speed,
+                response_format=self.response_format,
+                instructions=self.instructions,
+            )
+        except Exception as e:
+            logger.error(f"[TTS] segment {seg.seq} failed: {e}")
+            audio = b""
+        seg.ready_at = time.perf_counter()
+        return audio or b""
+
+    async def _send_loop(self) -> None:
+        while True:
+            seg = await self._queue.get()
+            if seg is None:
+                return
+            try:
+                # submit() starts the task before queueing the segment
+                audio = await seg.task if seg.task is not None else b""
+                if self.cancelled:
+                    return
+                await self.deliver(seg.seq, seg.text, audio)
+                seg.sent_at = time.perf_counter()
+                seg.audio_bytes = len(audio)
+            except Exception as e:
+                logger.error(f"[TTS] delivering segment {seg.seq} failed: {e}")
+                self._abort()
+                return
+            finally:
+                if not self.cancelled:
+                    self._slots.release()
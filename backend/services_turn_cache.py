@@ -0,0 +1,101 @@
+"""
+Turn-scoped memo for retrieval results.
+
+One conversational turn often asks the same retrieval question from several places
+(e.g. GraphRAG embeds the question for its own ranking, its community search and its
+anchor detection).
+Inside `retrieval_turn()`, `turn_memo(kind, key, compute)` runs `compute` at most once
+per (kind, key) and hands the result to every consumer of the turn, including threads
+started with a copy of the context (asyncio.to_thread, run_context_tiers). Concurrent
+callers wait for the first one instead of computing the same thing in parallel.
+
+Outside a turn `turn_memo` simply calls `compute`, so instrumented functions behave
+exactly as before for every other caller. Results are shared, not copied: consumers
+must treat them as read-only.
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_current_turn: ContextVar[Optional["RetrievalTurn"]] = ContextVar("retrieval_turn", default=None)
+
+
+class _Entry:
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.failed = False
+
+
+class RetrievalTurn:
+    """Results computed during one turn, with per-kind hit/miss counts."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Hashable], _Entry] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def memo(self, kind: str, key: Hashable, compute: Callable[[], T]) -> T:
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            owner = entry is None
+            if owner:
+                entry = self._entries[(kind, key)] = _Entry()
+                self._misses[kind] = self._misses.get(kind, 0) + 1
+            else:
+                self._hits[kind] = self._hits.get(kind, 0) + 1
+
+        if not owner:
+            entry.done.wait()
+            if entry.failed:
+                return compute()  # failures are not shared; try on our own
+            return entry.value
+
+        try:
+            entry.value = compute()
+        except BaseException:
+            entry.failed = True
+            with self._lock:
+                self._entries.pop((kind, key), None)
+            raise
+        finally:
+            entry.done.set()
+        return entry.value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {"hits": n, "misses": n}} -- misses are the computations that ran."""
+        with self._lock:
+            kinds = sorted(set(self._hits) | set(self._misses))
+            return {k: {"hits": self._hits.get(k, 0), "misses": self._misses.get(k, 0)} for k in kinds}
+
+
+@contextmanager
+def retrieval_turn(turn: Optional[RetrievalTurn] = None) -> Iterator[RetrievalTurn]:
+    """
+    Make `turn` (or a new one) the current turn for this context.
+
+    Pass the same RetrievalTurn to every thread of a turn that does not inherit the
+    context it was created in.
+    """
+    turn = turn if turn is not None else RetrievalTurn()
+    token = _current_turn.set(turn)
+    try:
+        yield turn
+    finally:
+        _current_turn.reset(token)
+
+
+def turn_memo(kind: str, key: Hashable, compute: Callable[[], T]) -> T:
+    """compute(), shared with the rest of the current turn if there is one."""
+    turn = _current_turn.get()
+    if turn is None:
+        return compute()
+    return turn.memo(kind, key, compute)
@@ -1,25 +1,35 @@
 """
 Voice activity detection (server-side) helpers.
 
-Energy VAD by default, with optional Silero VAD (when a local torchscript model is available).
+Energy VAD by default, with optional Silero VAD (when a local torchscript or ONNX model is available).
 Falls back safely so dev/test environments keep working without downloads.
 
-Designed for streaming PCM16LE mono @ 16kHz.
+Designed for streaming PCM16LE mono @ 16kHz. Frames are scored in batches: the segmenter
+keeps the stream in a NumPy sample buffer and hands every complete frame of a chunk to the
+detector at once as a (n_frames, frame_samples) view.
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-from collections import deque
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Deque, Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Protocol, Tuple, Union
 
 import numpy as np
 
 logger = logging.getLogger("brain_web")
 
+# Upper bound on sessions per Silero forward pass (one window of each)
+SILERO_VAD_MAX_BATCH_STREAMS = int(os.getenv("SILERO_VAD_MAX_BATCH_STREAMS", "256"))
+# How long a session waits for the shared inference worker before giving up
+SILERO_VAD_INFER_TIMEOUT_SECONDS = float(os.getenv("SILERO_VAD_INFER_TIMEOUT_SECONDS", "10"))
+
 
 @dataclass(frozen=True)
 class VadConfig:
@@ -78,9 +88,23 @@ class UtteranceSegment:
 
 
 class SpeechDetector:
+    # True when scoring is expensive enough to run off the event loop (see aprocess_pcm16)
+    blocking: bool = False
+
     def speech_probability(self, pcm16_frame: bytes, *, sample_rate_hz: int) -> float:  # pragma: no cover - interface
         raise NotImplementedError
 
+    def speech_probabilities(self, frames: np.ndarray, *, sample_rate_hz: int) -> np.ndarray:
+        """
+        Probabilities for a (n_frames, frame_samples) int16 array.
+
+        Override to score a batch at once; this default calls speech_probability per frame.
+        """
+        return np.array(
+            [self.speech_probability(f.tobytes(), sample_rate_hz=sample_rate_hz) for f in frames],
+            dtype=np.float32,
+        )
+
 
 class EnergySpeechDetector(SpeechDetector):
     """
@@ -93,51 +117,315 @@ class EnergySpeechDetector(SpeechDetector):
     def speech_probability(self, pcm16_frame: bytes, *, sample_rate_hz: int) -> float:
         if not pcm16_frame:
             return 0.0
-        samples = np.frombuffer(pcm16_frame, dtype=np.int16).astype(np.float32)
+        samples = np.frombuffer(pcm16_frame, dtype=np.int16)
         if samples.size == 0:
             return 0.0
-        rms = float(np.sqrt(np.mean(samples * samples)) / 32768.0)
-        p = max(0.0, min(1.0, rms * self.gain))
-        return p
+        return float(self.speech_probabilities(samples.reshape(1, -1), sample_rate_hz=sample_rate_hz)[0])
 
+    def speech_probabilities(self, frames: np.ndarray, *, sample_rate_hz: int) -> np.ndarray:
+        if frames.size == 0:
+            return np.zeros(frames.shape[0], dtype=np.float32)
+        x = frames.astype(np.float32)
+        rms = np.sqrt(np.einsum("ij,ij->i", x, x) / frames.shape[1]) / 32768.0
+        return np.clip(rms * self.gain, 0.0, 1.0)
 
-class SileroSpeechDetector(SpeechDetector):
+
+# Silero VAD v5+: exact window and leading context per sample rate, and LSTM state width
+_SILERO_WINDOWS = {16000: (512, 64), 8000: (256, 32)}
+_SILERO_STATE_DIM = 128
+
+# step(x, state, sample_rate_hz) -> (probs, state): x is (batch, context + window) float32,
+# state is (2, batch, _SILERO_STATE_DIM), probs is (batch,)
+SileroStep = Callable[[np.ndarray, np.ndarray, int], Tuple[np.ndarray, np.ndarray]]
+
+
+class WindowInference(Protocol):
+    """What SileroSpeechDetector runs its windows through (_InferenceQueue, or a stand-in)."""
+
+    def infer(self, windows: np.ndarray, state: np.ndarray, sample_rate_hz: int) -> Tuple[np.ndarray, np.ndarray]:
+        ...
+
+
+def _silero_window(sample_rate_hz: int) -> Tuple[int, int]:
+    try:
+        return _SILERO_WINDOWS[int(sample_rate_hz)]
+    except KeyError:
+        raise ValueError(f"Silero VAD supports {sorted(_SILERO_WINDOWS)} Hz, got {sample_rate_hz}") from None
+
+
+class _StreamRequest:
+    __slots__ = ("windows", "state", "sample_rate_hz", "future", "probs", "next")
+
+    def __init__(self, windows: np.ndarray, state: np.ndarray, sample_rate_hz: int):
+        self.windows = windows
+        self.state = state
+        self.sample_rate_hz = sample_rate_hz
+        self.future: Future = Future()
+        self.probs = np.empty(windows.shape[0], dtype=np.float32)
+        self.next = 0
+
+
+class _InferenceQueue:
     """
-    Silero VAD wrapper (requires a local torchscript model).
+    Serializes inference on one shared recurrent model and batches it across sessions.
 
-    We deliberately do not auto-download (network may be restricted). Provide the model
-    via `SILERO_VAD_MODEL_PATH` or config.silero_model_path.
+    Each caller submits the windows of one stream, in order, together with that stream's
+    recurrent state, and blocks for (probabilities, new state). A single worker thread
+    runs the model one step at a time: a step is one forward pass over the next window of
+    every active request (up to `max_batch_streams`), with their states stacked along the
+    batch dimension. Requests that arrive meanwhile join at the next step. Windows of one
+    stream are therefore never scored out of order or on another stream's state.
+
+    Callers wait at most `timeout_s`. If the worker thread dies, the pending requests and
+    every later call fail with the worker's error instead of hanging.
+    """
+
+    def __init__(
+        self,
+        step: SileroStep,
+        *,
+        max_batch_streams: int = SILERO_VAD_MAX_BATCH_STREAMS,
+        timeout_s: float = SILERO_VAD_INFER_TIMEOUT_SECONDS,
+    ):
+        self._step = step
+        self.max_batch_streams = max(1, int(max_batch_streams))
+        self.timeout_s = timeout_s
+        self._queue: "queue.Queue[_StreamRequest]" = queue.Queue()
+        self.steps = 0
+        self.windows = 0
+        self._failure: Optional[BaseException] = None
+        self._worker = threading.Thread(target=self._run, name="vad-inference", daemon=True)
+        self._worker.start()
+
+    def infer(self, windows: np.ndarray, state: np.ndarray, sample_rate_hz: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(probability per window, state after the last window) for one stream."""
+        if windows.shape[0] == 0:
+            return np.zeros(0, dtype=np.float32), state
+        self._raise_if_dead()
+        request = _StreamRequest(windows, state, int(sample_rate_hz))
+        self._queue.put(request)
+        try:
+            return request.future.result(timeout=self.timeout_s)
+        except FutureTimeoutError:
+            self._raise_if_dead()
+            raise TimeoutError(f"VAD inference did not answer within {self.timeout_s:.1f}s") from None
+
+    def _raise_if_dead(self) -> None:
+        if self._failure is not None:
+            raise RuntimeError(f"VAD inference worker failed: {self._failure!r}") from self._failure
+        if not self._worker.is_alive():
+            raise RuntimeError("VAD inference worker is not running")
+
+    def _run(self) -> None:
+        active: List[_StreamRequest] = []
+        try:
+            while True:
+                if not active:
+                    active.append(self._queue.get())
+                while len(active) < self.max_batch_streams:
+                    try:
+                        active.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                active = self._step_once(active)
+        except BaseException as e:
+            self._failure = e
+            logger.error(f"[VAD] inference worker died: {e!r}")
+            while True:
+                try:
+                    active.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for request in active:
+                if not request.future.done():
+                    request.future.set_exception(RuntimeError(f"VAD inference worker failed: {e!r}"))
+
+    def _step_once(self, active: List[_StreamRequest]) -> List[_StreamRequest]:
+        """Advance every active request by one window; return the unfinished ones."""
+        groups: Dict[Tuple[int, int], List[_StreamRequest]] = {}
+        for request in active:
+            groups.setdefault((request.sample_rate_hz, request.windows.shape[1]), []).append(request)
+
+        remaining: List[_StreamRequest] = []
+        for (sample_rate_hz, _), requests in groups.items():
+            try:
+                x = np.stack([r.windows[r.next] for r in requests])
+                state = requests[0].state if len(requests) == 1 else np.concatenate([r.state for r in requests], axis=1)
+                out, new_state = self._step(x, state, sample_rate_hz)
+                out = np.asarray(out, dtype=np.float32).reshape(-1)
+                new_state = np.asarray(new_state, dtype=np.float32)
+            except Exception as e:
+                for r in requests:
+                    r.future.set_exception(e)
+                continue
+            self.steps += 1
+            self.windows += len(requests)
+            for b, r in enumerate(requests):
+                r.probs[r.next] = out[b]
+                r.state = new_state[:, b : b + 1].copy()
+                r.next += 1
+                if r.next == r.windows.shape[0]:
+                    r.future.set_result((r.probs, r.state))
+                else:
+                    remaining.append(r)
+        return remaining
+
+
+_shared_silero: Dict[str, Optional[_InferenceQueue]] = {}
+_shared_silero_lock = threading.Lock()
+
+
+def _load_silero_step(model_path: Path) -> Optional[SileroStep]:
     """
+    Stateless step function of a Silero v5+ model (.onnx or torchscript).
 
-    def __init__(self, *, model_path: str):
+    None for older torchscript models that only expose the stateful `model(x, sr)` call.
+    """
+    if model_path.suffix == ".onnx":
         try:
-            import torch  # type: ignore
+            import onnxruntime  # type: ignore
         except Exception as e:
-            raise RuntimeError("torch is required for Silero VAD") from e
+            raise RuntimeError("onnxruntime is required for an .onnx Silero VAD model") from e
+
+        opts = onnxruntime.SessionOptions()
+        opts.inter_op_num_threads = 1
+        opts.intra_op_num_threads = 1
+        session = onnxruntime.InferenceSession(str(model_path), sess_options=opts, providers=["CPUExecutionProvider"])
+
+        def onnx_step(x: np.ndarray, state: np.ndarray, sample_rate_hz: int) -> Tuple[np.ndarray, np.ndarray]:
+            out, new_state = session.run(None, {"input": x, "state": state, "sr": np.array(sample_rate_hz, dtype=np.int64)})
+            return out.reshape(-1), new_state
+
+        return onnx_step
+
+    try:
+        import torch  # type: ignore
+    except Exception as e:
+        raise RuntimeError("torch is required for Silero VAD") from e
+
+    model = torch.jit.load(str(model_path), map_location="cpu")
+    model.eval()
+    if not hasattr(model, "_model"):
+        return None
+    steps = {16000: model._model, 8000: getattr(model, "_model_8k", None)}
+
+    def torch_step(x: np.ndarray, state: np.ndarray, sample_rate_hz: int) -> Tuple[np.ndarray, np.ndarray]:
+        sub = steps.get(sample_rate_hz)
+        if sub is None:
+            raise ValueError(f"Silero VAD model has no {sample_rate_hz} Hz variant")
+        with torch.no_grad():
+            out, new_state = sub(torch.from_numpy(x), torch.from_numpy(state))
+        return out.detach().cpu().numpy().reshape(-1), new_state.detach().cpu().numpy()
+
+    return torch_step
+
+
+def _get_shared_silero(model_path: str) -> Optional[_InferenceQueue]:
+    """Shared inference queue for the model at `model_path`, or None for legacy models."""
+    p = Path(model_path).expanduser()
+    if not p.exists():
+        raise FileNotFoundError(f"Silero VAD model not found at {p}")
+    key = str(p.resolve())
+    with _shared_silero_lock:
+        if key not in _shared_silero:
+            step = _load_silero_step(p)
+            _shared_silero[key] = _InferenceQueue(step) if step is not None else None
+        return _shared_silero[key]
 
-        p = Path(model_path).expanduser()
-        if not p.exists():
-            raise FileNotFoundError(f"Silero VAD model not found at {p}")
+
+class _LegacySileroModel:
+    """Pre-v5 torchscript model: one instance per session, frames scored in order."""
+
+    def __init__(self, model_path: str):
+        import torch  # type: ignore
 
         self._torch = torch
-        self._model = torch.jit.load(str(p), map_location="cpu")
+        self._model = torch.jit.load(str(Path(model_path).expanduser()), map_location="cpu")
         self._model.eval()
 
+    def __call__(self, frames: np.ndarray, sample_rate_hz: int) -> np.ndarray:
+        out = np.empty(frames.shape[0], dtype=np.float32)
+        with self._torch.no_grad():
+            for i, frame in enumerate(frames):
+                out[i] = float(self._model(self._torch.from_numpy(frame).unsqueeze(0), int(sample_rate_hz)).item())
+        return out
+
+
+class SileroSpeechDetector(SpeechDetector):
+    """
+    Silero VAD wrapper (requires a local .onnx or torchscript model).
+
+    We deliberately do not auto-download (network may be restricted). Provide the model
+    via `SILERO_VAD_MODEL_PATH` or config.silero_model_path.
+
+    Silero is recurrent, so every detector (one per session) keeps its own state: LSTM
+    state, the context samples before the next window, and samples that do not fill a
+    window yet. The model is loaded once per path and shared; the stream is re-cut into
+    the model's fixed windows, which go through a queue that batches concurrent sessions
+    step by step (see _InferenceQueue). Each frame gets the probability of the last
+    window completed by the end of that frame.
+    """
+
+    blocking = True
+
+    def __init__(self, *, model_path: str, inference: Optional[WindowInference] = None):
+        # `inference` replaces the shared queue for model_path (tests, benchmarks)
+        self._inference = inference if inference is not None else _get_shared_silero(model_path)
+        self._legacy = _LegacySileroModel(model_path) if self._inference is None else None
+        self._lock = threading.Lock()  # one request per stream in flight: windows stay in order
+        self.reset()
+
+    def reset(self) -> None:
+        self._sample_rate_hz = 0
+        self._state = np.zeros((2, 1, _SILERO_STATE_DIM), dtype=np.float32)
+        self._context = np.zeros(0, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._last_prob = 0.0
+
     def speech_probability(self, pcm16_frame: bytes, *, sample_rate_hz: int) -> float:
         if not pcm16_frame:
             return 0.0
-        audio = np.frombuffer(pcm16_frame, dtype=np.int16).astype(np.float32) / 32768.0
-        if audio.size == 0:
+        samples = np.frombuffer(pcm16_frame, dtype=np.int16)
+        if samples.size == 0:
             return 0.0
-        t = self._torch.from_numpy(audio)
-        if t.dim() == 1:
-            t = t.unsqueeze(0)
-        with self._torch.no_grad():
-            out = self._model(t, int(sample_rate_hz))
-        try:
-            return float(out.item())
-        except Exception:
-            return float(out.squeeze().detach().cpu().numpy().reshape(-1)[0])
+        return float(self.speech_probabilities(samples.reshape(1, -1), sample_rate_hz=sample_rate_hz)[0])
+
+    def speech_probabilities(self, frames: np.ndarray, *, sample_rate_hz: int) -> np.ndarray:
+        audio = frames.astype(np.float32) / 32768.0
+        if self._legacy is not None:
+            with self._lock:
+                return self._legacy(audio, sample_rate_hz)
+        inference = self._inference
+        if inference is None:  # __init__ always sets one of _inference / _legacy
+            raise RuntimeError("Silero VAD detector has no model")
+
+        window, context = _silero_window(sample_rate_hz)
+        with self._lock:
+            if sample_rate_hz != self._sample_rate_hz:
+                self.reset()
+                self._sample_rate_hz = sample_rate_hz
+                self._context = np.zeros(context, dtype=np.float32)
+
+            # [context | pending | new audio]; window j starts at pending offset j * window
+            carried = self._pending.size
+            stream = np.concatenate([self._context, self._pending, audio.reshape(-1)])
+            n_windows = (stream.size - context) // window
+            if n_windows:
+                rows = np.lib.stride_tricks.sliding_window_view(stream, context + window)[::window][:n_windows]
+                probs, self._state = inference.infer(np.ascontiguousarray(rows), self._state, sample_rate_hz)
+                consumed = n_windows * window
+                self._context = stream[consumed : consumed + context].copy()
+                self._pending = stream[context + consumed :].copy()
+            else:
+                probs = np.zeros(0, dtype=np.float32)
+                self._pending = stream[context:].copy()
+
+            # Last window completed by each frame's end (-1: none this call, keep the previous)
+            frame_ends = carried + frames.shape[1] * np.arange(1, frames.shape[0] + 1)
+            history = np.concatenate([np.array([self._last_prob], dtype=np.float32), probs])
+            if n_windows:
+                self._last_prob = float(probs[-1])
+            return history[frame_ends // window]
 
 
 def _default_silero_model_path() -> str:
@@ -169,9 +457,75 @@ def get_speech_detector(config: VadConfig) -> SpeechDetector:
         return EnergySpeechDetector()
 
 
+class _PcmBuffer:
+    """
+    Growable int16 sample buffer for one stream.
+
+    Incoming bytes are copied in once; complete frames come out as a (n, frame_samples)
+    view (no per-frame copies). The last `history` samples before the read position stay
+    readable, which is where the pre-roll comes from. Views are valid until the next write.
+    """
+
+    def __init__(self, *, history: int, capacity: int = 16000):
+        self.history = max(0, int(history))
+        self._buf = np.zeros(max(int(capacity), 2 * self.history, 1), dtype=np.int16)
+        self._lo = 0  # oldest readable sample
+        self._start = 0  # next unread sample
+        self._end = 0
+        self._odd = b""  # trailing byte of an odd-length chunk
+
+    def clear(self) -> None:
+        self._lo = self._start = self._end = 0
+        self._odd = b""
+
+    def write(self, pcm16_bytes: bytes) -> None:
+        data: Union[bytes, memoryview] = pcm16_bytes
+        if self._odd:
+            data = self._odd + bytes(data)
+            self._odd = b""
+        if len(data) % 2:
+            self._odd = bytes(data[-1:])
+            data = memoryview(data)[:-1]
+        samples = np.frombuffer(data, dtype=np.int16)
+        if samples.size == 0:
+            return
+        if self._end + samples.size > self._buf.size:
+            self._compact(samples.size)
+        self._buf[self._end : self._end + samples.size] = samples
+        self._end += samples.size
+
+    def take_frames(self, frame_samples: int) -> Tuple[int, np.ndarray]:
+        """(buffer offset of the first frame, frames view); consumes the frames."""
+        n = (self._end - self._start) // frame_samples
+        base = self._start
+        self._start += n * frame_samples
+        return base, self._buf[base : self._start].reshape(n, frame_samples)
+
+    def before(self, offset: int) -> np.ndarray:
+        """Up to `history` samples ending just before buffer offset `offset`."""
+        return self._buf[max(self._lo, offset - self.history) : offset]
+
+    def _compact(self, incoming: int) -> None:
+        keep_from = max(self._lo, self._start - self.history)
+        kept = self._end - keep_from
+        if kept + incoming > self._buf.size:
+            grown = np.zeros(max(2 * self._buf.size, kept + incoming), dtype=np.int16)
+            grown[:kept] = self._buf[keep_from : self._end]
+            self._buf = grown
+        else:
+            self._buf[:kept] = self._buf[keep_from : self._end]
+        self._start -= keep_from
+        self._end = kept
+        self._lo = 0
+
+
 class VadUtteranceSegmenter:
     """
     Streaming end-of-utterance segmentation using a frame-level speech detector.
+
+    Each chunk is scored with one detector call over all of its complete frames; only the
+    utterance state machine steps frame by frame (and is skipped for all-silence chunks
+    between utterances).
     """
 
     def __init__(self, detector: SpeechDetector, config: Optional[VadConfig] = None):
@@ -180,14 +534,12 @@ class VadUtteranceSegmenter:
 
         self._frame_samples = int(self.config.sample_rate_hz * (self.config.frame_ms / 1000.0))
         self._frame_samples = max(160, self._frame_samples)
-        self._frame_bytes = self._frame_samples * 2  # PCM16 mono
 
         pre_frames = 0
         if self.config.pre_roll_ms > 0:
             pre_frames = max(0, int(self.config.pre_roll_ms / self.config.frame_ms))
-        self._pre_roll_frames: Deque[bytes] = deque(maxlen=pre_frames or 0)
+        self._pcm = _PcmBuffer(history=pre_frames * self._frame_samples)
 
-        self._remainder = bytearray()
         self._in_utt = False
         self._utt_buf: bytearray = bytearray()
         self._speech_start_sample: int = 0
@@ -207,7 +559,7 @@ class VadUtteranceSegmenter:
         return self._in_utt
 
     def reset(self) -> None:
-        self._remainder = bytearray()
+        self._pcm.clear()
         self._in_utt = False
         self._utt_buf = bytearray()
         self._speech_start_sample = 0
@@ -217,13 +569,10 @@ class VadUtteranceSegmenter:
         self._total_samples = 0
         self._speech_start_emitted = False
         self._pending_speech_start_sample = None
-        self._pre_roll_frames.clear()
 
-    def _start_utterance(self, *, frame: bytes, frame_start_sample: int, frame_end_sample: int) -> None:
+    def _start_utterance(self, *, pre_roll: np.ndarray, frame: np.ndarray, frame_start_sample: int, frame_end_sample: int) -> None:
         self._in_utt = True
-        self._utt_buf = bytearray()
-        for pf in self._pre_roll_frames:
-            self._utt_buf.extend(pf)
+        self._utt_buf = bytearray(pre_roll)
         self._utt_buf.extend(frame)
         self._speech_start_sample = frame_start_sample
         self._last_speech_sample = frame_end_sample
@@ -278,31 +627,60 @@ class VadUtteranceSegmenter:
     def process_pcm16(self, pcm16_bytes: bytes) -> List[UtteranceSegment]:
         if not pcm16_bytes:
             return []
-        self._remainder.extend(pcm16_bytes)
+        self._pcm.write(pcm16_bytes)
+        base, frames = self._pcm.take_frames(self._frame_samples)
+        if not len(frames):
+            return []
+        probs = self.detector.speech_probabilities(frames, sample_rate_hz=self.config.sample_rate_hz)
+        return self._advance(base, frames, probs)
 
-        out: List[UtteranceSegment] = []
-        while len(self._remainder) >= self._frame_bytes:
-            frame = bytes(self._remainder[: self._frame_bytes])
-            del self._remainder[: self._frame_bytes]
+    async def aprocess_pcm16(self, pcm16_bytes: bytes) -> List[UtteranceSegment]:
+        """
+        process_pcm16 for event-loop callers.
 
+        Blocking detectors (Silero) score the frames in a worker thread, where batches from
+        concurrent sessions are merged; buffering and the state machine stay on the loop,
+        so flush() from another task never races with them.
+        """
+        if not self.detector.blocking:
+            return self.process_pcm16(pcm16_bytes)
+        if not pcm16_bytes:
+            return []
+        self._pcm.write(pcm16_bytes)
+        base, frames = self._pcm.take_frames(self._frame_samples)
+        if not len(frames):
+            return []
+        probs = await asyncio.to_thread(
+            self.detector.speech_probabilities, frames, sample_rate_hz=self.config.sample_rate_hz
+        )
+        return self._advance(base, frames, probs)
+
+    def _advance(self, base: int, frames: np.ndarray, probs: np.ndarray) -> List[UtteranceSegment]:
+        is_speech = np.asarray(probs) >= self.config.speech_threshold
+        if not self._in_utt and not is_speech.any():
+            # Silence between utterances: only the clock moves (pre-roll stays in the buffer)
+            self._total_samples += len(frames) * self._frame_samples
+            return []
+
+        out: List[UtteranceSegment] = []
+        for i, frame in enumerate(frames):
             frame_start = self._total_samples
             frame_end = frame_start + self._frame_samples
             self._total_samples = frame_end
 
-            prob = self.detector.speech_probability(frame, sample_rate_hz=self.config.sample_rate_hz)
-            is_speech = prob >= self.config.speech_threshold
-
             if not self._in_utt:
-                if is_speech:
-                    self._start_utterance(frame=frame, frame_start_sample=frame_start, frame_end_sample=frame_end)
-                # Update pre-roll after decision so it contains "previous" frames on start.
-                if self._pre_roll_frames.maxlen:
-                    self._pre_roll_frames.append(frame)
+                if is_speech[i]:
+                    self._start_utterance(
+                        pre_roll=self._pcm.before(base + i * self._frame_samples),
+                        frame=frame,
+                        frame_start_sample=frame_start,
+                        frame_end_sample=frame_end,
+                    )
                 continue
 
             # In utterance
             self._utt_buf.extend(frame)
-            if is_speech:
+            if is_speech[i]:
                 self._last_speech_sample = frame_end
                 self._speech_ms += self.config.frame_ms
                 self._silence_ms = 0
@@ -312,9 +690,6 @@ class VadUtteranceSegmenter:
             else:
                 self._silence_ms += self.config.frame_ms
 
-            if self._pre_roll_frames.maxlen:
-                self._pre_roll_frames.append(frame)
-
             utt_ms = int((frame_end - self._speech_start_sample) * 1000 / self.config.sample_rate_hz)
             force_end = utt_ms >= self.config.max_utterance_ms
             end_by_silence = self._silence_ms >= self.config.end_silence_ms
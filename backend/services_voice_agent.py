@@ -12,7 +12,7 @@ from datetime import datetime
 import uuid
 
 from db_neo4j import neo4j_session
-from services_graphrag import retrieve_graphrag_context
+from services_turn_cache import RetrievalTurn, retrieval_turn
 from utils.timestamp import utcnow_ms
 from services_supermemory import search_memories, sync_learning_moment
 from services_usage_tracker import log_usage, check_limit
@@ -23,6 +23,7 @@ from config import (
     VOICE_AGENT_CACHE_TTL_SECONDS,
     VOICE_SESSION_HISTORY_LIMIT,
     VOICE_CONTEXT_MAX_LENGTH,
+    VOICE_GRAPHRAG_COMMUNITY_K,
     VOICE_MEMORY_CONTEXT_MAX_LENGTH,
     VOICE_CONCEPT_EXTRACTION_MAX_TOKENS,
     VOICE_ARTICLE_TEXT_MAX_LENGTH,
@@ -887,9 +888,12 @@ Transcript with timestamps:
         client_end_ms: Optional[int] = None,
         stt_metadata: Optional[Dict[str, Any]] = None,
         is_incognito: bool = False,
+        cancel_event: Optional[asyncio.Event] = None,
     ) -> Dict[str, Any]:
         """
         Now includes Fog-Clearing, Session Continuity, and Ephemeral Mode support.
+
+        cancel_event (the caller's interrupt signal) stops the streamed LLM reply.
         """
         start_time = time.perf_counter()
         is_incognito = is_incognito or self._is_incognito_request(last_transcript)
@@ -1060,6 +1064,9 @@ Transcript with timestamps:
                     async def _reply_streamer():
                         nonlocal agent_reply
                         full_reply = ""
+                        # The lecture tier is this turn's GraphRAG retrieval; the turn shares the question's
+                        # embedding across its steps and reports the reuse as "retrieval_cache" in perf metrics
+                        retrieval = RetrievalTurn()
                         try:
                             # Phase 7: Yield thinking bit immediately to fill silence
                             if thinking_bit:
@@ -1109,13 +1116,14 @@ Transcript with timestamps:
                                 profile = None
                                 g_ctx = ""
                                 try:
-                                    with neo4j_session() as neo_session:
+                                    with retrieval_turn(retrieval), neo4j_session() as neo_session:
                                         from services_memory_orchestrator import get_unified_context
                                         v_chat_id = session_id or f"voice_{self.user_id}"
                                         ctx = get_unified_context(
                                             user_id=self.user_id, tenant_id=self.tenant_id, chat_id=v_chat_id, query=last_transcript, session=neo_session,
-                                            active_lecture_id=graph_id, include_chat_history=True, include_lecture_context=True, include_user_facts=True,
-                                            include_study_context=True, include_recent_topics=True
+                                            active_lecture_id=graph_id, include_chat_history=True, include_lecture_context=not is_low_complexity, include_user_facts=True,
+                                            include_study_context=True, include_recent_topics=True,
+                                            lecture_branch_id=branch_id, lecture_community_k=VOICE_GRAPHRAG_COMMUNITY_K,
                                         )
                                         # Use cached profile if available and fresh
                                         if self._tutor_profile_cache and (current_time - self._cache_timestamp) < self._CACHE_TTL_SECONDS:
@@ -1125,9 +1133,8 @@ Transcript with timestamps:
                                             if profile:
                                                 self._tutor_profile_cache = profile
                                                 self._cache_timestamp = current_time
-                                        if not is_low_complexity:
-                                            grag = retrieve_graphrag_context(session=neo_session, graph_id=graph_id, branch_id=branch_id, question=last_transcript)
-                                            g_ctx = grag.get("context_text", "")
+                                        # The lecture tier is the turn's GraphRAG retrieval (skipped for low-complexity turns)
+                                        g_ctx = ctx.get("lecture_context", "")
                                 except Exception as e:
                                     logger.warning(f"[voice_agent] Heavy context thread failed: {e}")
                                     ctx = {"user_facts": "", "lecture_context": "", "chat_history": []}
@@ -1204,13 +1211,11 @@ Transcript with timestamps:
                             messages.extend(llm_history)
                             messages.append({"role": "user", "content": last_transcript})
 
-                            raw_stream = model_router.completion(messages=messages, task_type=TASK_VOICE, stream=True)
-                            
-                            for chunk in raw_stream:
-                                bit = chunk.choices[0].delta.content or ""
-                                if bit:
-                                    full_reply += bit
-                                    yield {"type": "content", "delta": bit}
+                            async for bit in model_router.astream_text(
+                                messages=messages, task_type=TASK_VOICE, cancel_event=cancel_event
+                            ):
+                                full_reply += bit
+                                yield {"type": "content", "delta": bit}
 
                         except Exception as e:
                             logger.error(f"[voice_agent] Streaming error: {e}")
@@ -1218,9 +1223,9 @@ Transcript with timestamps:
                             full_reply += fallback
                             yield {"type": "content", "delta": fallback}
                         finally:
-                            # Final done signal
                             agent_reply = full_reply
-                            yield {"type": "done", "full_response": full_reply}
+                        # Final done signal (not from `finally`: a closed generator must not yield)
+                        yield {"type": "done", "full_response": full_reply, "retrieval_cache": retrieval.stats()}
 
                     return {
                         "reply_stream": _reply_streamer(),
@@ -16,7 +16,7 @@ from fastapi.testclient import TestClient
 from typing import Generator, List, Dict, Any, Optional, Callable
 
 # Import mock classes from mock_helpers
-from tests.mock_helpers import MockNeo4jRecord, MockNeo4jResult
+from tests.mock_helpers import MockAsyncNeo4jSession, MockNeo4jRecord, MockNeo4jResult
 
 # Override environment variables to prevent real API calls
 os.environ.setdefault("OPENAI_API_KEY", "test-key-sk-1234567890")
@@ -262,19 +262,28 @@ def override_neo4j_dependency(test_app, mock_neo4j_session):
     
     This fixture is autouse=True, so it runs for every test automatically.
     """
-    from db_neo4j import get_neo4j_session
+    from db_neo4j import get_async_neo4j_session, get_neo4j_session
     
     def get_mock_session():
         """Generator function that yields the mock session (matching get_neo4j_session signature)."""
         yield mock_neo4j_session
+
+    async def get_mock_async_session():
+        """Async routes get the same mock behind an AsyncSession-like facade."""
+        yield MockAsyncNeo4jSession(mock_neo4j_session)
     
     # Override the dependency
     test_app.dependency_overrides[get_neo4j_session] = get_mock_session
+    test_app.dependency_overrides[get_async_neo4j_session] = get_mock_async_session
+    # Resolved graph contexts are cached per process; don't leak them across mocks
+    from services_branch_explorer import clear_graph_context_cache
+    clear_graph_context_cache()
     
     yield
     
     # Clean up: remove the override after the test
     test_app.dependency_overrides.pop(get_neo4j_session, None)
+    test_app.dependency_overrides.pop(get_async_neo4j_session, None)
 
 
 @pytest.fixture
@@ -74,3 +74,38 @@ class MockNeo4jResult:
     def __len__(self):
         """Return the number of records."""
         return len(self._records)
+
+
+class MockAsyncNeo4jResult:
+    """Async-iterable view of a sync (mock) result, as returned by AsyncSession.run()."""
+    def __init__(self, result: Any):
+        records = list(iter(result))
+        if not records:
+            # MagicMock results configured only via single.return_value
+            record = result.single()
+            if record is not None:
+                records = [record]
+        self._records = records
+
+    async def __aiter__(self):
+        for record in self._records:
+            yield record
+
+
+class MockAsyncNeo4jSession:
+    """
+    Async session facade over a sync mock session.
+
+    Routes using get_async_neo4j_session see the same queries and canned results
+    as the sync mock_neo4j_session fixture, so tests configure one mock for both.
+    """
+    def __init__(self, session: Any):
+        self.session = session
+
+    async def run(self, query: str, parameters: Optional[dict] = None, **kwargs) -> MockAsyncNeo4jResult:
+        if parameters is not None:
+            return MockAsyncNeo4jResult(self.session.run(query, parameters, **kwargs))
+        return MockAsyncNeo4jResult(self.session.run(query, **kwargs))
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,332 @@
+"""
+Tests for cache_utils: the bounded memory level, namespace invalidation and stats.
+"""
+import threading
+
+import pytest
+
+import cache_utils
+from cache_utils import _MemoryCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def memory_only(monkeypatch):
+    """Memory level only, empty, with fresh stats."""
+    monkeypatch.setattr(cache_utils, "_disk_cache_ready", True)
+    monkeypatch.setattr(cache_utils, "_disk_cache", None)
+    monkeypatch.setattr(cache_utils, "_redis_ready", True)
+    monkeypatch.setattr(cache_utils, "_redis_client", None)
+    monkeypatch.setattr(cache_utils, "_memory_cache", _MemoryCache(100, 1_000_000))
+    monkeypatch.setattr(cache_utils, "_namespace_stats", {})
+    monkeypatch.setattr(cache_utils, "_cache_stats", dict.fromkeys(cache_utils._cache_stats, 0))
+    return cache_utils
+
+
+def test_lru_evicts_least_recently_used_entry():
+    cache = _MemoryCache(max_entries=2, max_bytes=1000)
+    cache.set("a:1", 1, expires_at=100, size=1)
+    cache.set("a:2", 2, expires_at=100, size=1)
+    cache.get("a:1", now=0)  # a:1 is now most recent
+
+    evicted = cache.set("a:3", 3, expires_at=100, size=1)
+
+    assert evicted == ["a"]
+    assert cache.get("a:2", now=0) == (False, None)
+    assert cache.get("a:1", now=0) == (True, 1)
+
+
+def test_byte_limit_evicts_until_it_fits():
+    cache = _MemoryCache(max_entries=10, max_bytes=10)
+    cache.set("a:1", "x", expires_at=100, size=4)
+    cache.set("b:1", "y", expires_at=100, size=4)
+    cache.set("c:1", "z", expires_at=100, size=7)
+
+    assert len(cache) == 1
+    assert cache.bytes == 7
+    assert cache.namespace_usage() == {"c": (1, 7)}
+
+
+def test_value_larger_than_limit_is_not_stored():
+    cache = _MemoryCache(max_entries=10, max_bytes=10)
+    cache.set("a:1", "x", expires_at=100, size=4)
+
+    cache.set("b:1", "huge", expires_at=100, size=11)
+
+    assert cache.get("a:1", now=0) == (True, "x")
+    assert cache.get("b:1", now=0) == (False, None)
+
+
+def test_sweep_removes_only_expired_entries():
+    cache = _MemoryCache(max_entries=10, max_bytes=1000)
+    cache.set("a:1", 1, expires_at=10, size=1)
+    cache.set("a:2", 2, expires_at=50, size=1)
+    cache.set("a:1", 1, expires_at=60, size=1)  # rewritten: old heap record is stale
+
+    assert cache.sweep(now=20) == 0
+    assert cache.sweep(now=55) == 1
+    assert cache.get("a:1", now=55) == (True, 1)
+    assert cache.get("a:2", now=55) == (False, None)
+
+
+def test_pop_prefix_keeps_other_namespaces():
+    cache = _MemoryCache(max_entries=10, max_bytes=1000)
+    for key in ("lectures:list", "lectures:steps:L1", "lectures:steps:L2", "graph_overview:t:g"):
+        cache.set(key, 1, expires_at=100, size=1)
+
+    assert cache.pop_prefix("lectures:steps:L1") == 1
+    assert cache.pop_prefix("graph") == 1
+    assert sorted(cache.namespace_usage()) == ["lectures"]
+    assert cache.get("lectures:steps:L2", now=0) == (True, 1)
+
+
+def test_get_cached_ignores_ttl_keyword(memory_only):
+    memory_only.set_cached("graph_overview", {"nodes": []}, "t1", "g1", ttl_seconds=120)
+
+    assert memory_only.get_cached("graph_overview", "t1", "g1", ttl_seconds=120) == {"nodes": []}
+
+
+def test_expired_entry_is_a_miss(memory_only, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_utils.time, "time", lambda: now[0])
+    memory_only.set_cached("lectures", [1], "list", ttl_seconds=10)
+
+    now[0] += 11
+
+    assert memory_only.get_cached("lectures", "list") is None
+
+
+def test_narrow_pattern_keeps_the_rest_of_the_namespace_on_disk(memory_only, monkeypatch, tmp_path):
+    diskcache = pytest.importorskip("diskcache")
+    disk = diskcache.Cache(str(tmp_path))
+    disk.create_tag_index()
+    monkeypatch.setattr(cache_utils, "_disk_cache", disk)
+    memory_only.set_cached("lectures", [1], "steps", "L1")
+    memory_only.set_cached("lectures", [2], "steps", "L2")
+    memory_only.set_cached("graphs", [3], "concepts")
+
+    memory_only.invalidate_cache_pattern("lectures:steps:L1")
+
+    assert "lectures:steps:L1" not in disk
+    assert disk.get("lectures:steps:L2") == [2]
+    assert memory_only.get_cached("lectures", "steps", "L2") == [2]
+
+    memory_only.invalidate_cache_pattern("lectures")
+
+    assert "lectures:steps:L2" not in disk
+    assert disk.get("graphs:concepts") == [3]
+    assert memory_only.get_cache_stats()["disk_size"] == 1
+    disk.close()
+
+
+def test_stats_are_reported_per_namespace(memory_only):
+    memory_only.set_cached("lectures", [1, 2], "list")
+    memory_only.get_cached("lectures", "list")
+    memory_only.get_cached("lectures", "detail", "L9")
+    memory_only.get_cached("graphs", "concepts")
+
+    stats = memory_only.get_cache_stats()
+
+    assert stats["hits_l1"] == 1
+    assert stats["misses"] == 2
+    lectures = stats["namespaces"]["lectures"]
+    assert lectures["hits_l1"] == 1
+    assert lectures["misses"] == 1
+    assert lectures["hit_rate"] == 0.5
+    assert lectures["memory_entries"] == 1
+    assert lectures["memory_bytes"] == len("[1,2]")
+    assert stats["namespaces"]["graphs"]["hit_rate"] == 0.0
+
+
+def test_cached_single_flight_across_threads(memory_only):
+    import threading
+    import time
+
+    calls = []
+    release = threading.Event()
+
+    @memory_only.cached("overview", key=lambda graph_id: (graph_id,))
+    def compute(graph_id):
+        calls.append(graph_id)
+        release.wait(2)
+        return {"graph": graph_id}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(compute("g1"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["g1"]
+    assert results == [{"graph": "g1"}] * 8
+    assert memory_only.get_cache_stats()["namespaces"]["overview"]["coalesced"] == 7
+
+
+def test_cached_single_flight_async(memory_only):
+    import asyncio
+
+    calls = []
+
+    @memory_only.cached("neighbors", key=lambda node_id: (node_id,))
+    async def compute(node_id):
+        calls.append(node_id)
+        await asyncio.sleep(0.01)
+        return [node_id]
+
+    async def run():
+        return await asyncio.gather(*(compute("n1") for _ in range(5)))
+
+    assert asyncio.run(run()) == [["n1"]] * 5
+    assert calls == ["n1"]
+
+
+class _RecordingRedis:
+    """Fake Redis client that records which thread each call runs on."""
+
+    def __init__(self, stored=None):
+        self.stored = dict(stored or {})
+        self.threads = []
+
+    def pipeline(self):
+        client = self
+        keys = []
+
+        class _Pipe:
+            def get(self, key):
+                keys.append(key)
+
+            def ttl(self, key):
+                pass
+
+            def execute(self):
+                client.threads.append(threading.get_ident())
+                return client.stored.get(keys[0]), 60
+
+        return _Pipe()
+
+    def setex(self, key, ttl, data):
+        self.threads.append(threading.get_ident())
+        self.stored[key] = data
+
+
+def test_async_cache_calls_keep_redis_off_the_event_loop(memory_only, monkeypatch):
+    import asyncio
+    import json
+
+    redis_client = _RecordingRedis({"graph_neighbors:t1:n1": json.dumps({"n": 1})})
+    monkeypatch.setattr(cache_utils, "_redis_client", redis_client)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        from_redis = await memory_only.aget_cached("graph_neighbors", "t1", "n1")
+        await memory_only.aset_cached("graph_neighbors", {"n": 2}, "t1", "n2", ttl_seconds=60)
+        calls_before_hit = len(redis_client.threads)
+        from_memory = await memory_only.aget_cached("graph_neighbors", "t1", "n2")
+        return loop_thread, from_redis, from_memory, calls_before_hit
+
+    loop_thread, from_redis, from_memory, calls_before_hit = asyncio.run(run())
+
+    assert from_redis == {"n": 1} and from_memory == {"n": 2}
+    assert len(redis_client.threads) == calls_before_hit == 2  # memory hit needed no Redis call
+    assert loop_thread not in redis_client.threads
+
+
+def test_cached_serves_stale_value_while_one_caller_refreshes(memory_only, monkeypatch):
+    import threading
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_utils.time, "time", lambda: now[0])
+    version = [1]
+    refreshing = threading.Event()
+    release = threading.Event()
+
+    @memory_only.cached("overview", key=lambda: ("g1",), ttl_seconds=10, stale_ttl_seconds=60)
+    def compute():
+        if version[0] > 1:
+            refreshing.set()
+            release.wait(2)
+        return version[0]
+
+    assert compute() == 1
+    now[0] += 20
+    version[0] = 2
+
+    refresher = threading.Thread(target=compute)
+    refresher.start()
+    refreshing.wait(2)
+    stale = compute()  # concurrent caller does not wait for the refresh
+    release.set()
+    refresher.join()
+
+    assert stale == 1
+    assert compute() == 2
+
+
+def test_cached_serves_stale_value_when_refresh_fails(memory_only, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_utils.time, "time", lambda: now[0])
+    fail = [False]
+
+    @memory_only.cached("overview", key=lambda: ("g1",), ttl_seconds=10, stale_ttl_seconds=60)
+    def compute():
+        if fail[0]:
+            raise RuntimeError("neo4j down")
+        return "ok"
+
+    compute()
+    now[0] += 20
+    fail[0] = True
+
+    assert compute() == "ok"
+
+
+def test_cached_negative_ttl(memory_only, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_utils.time, "time", lambda: now[0])
+    calls = []
+
+    @memory_only.cached("neighbors", key=lambda node_id: (node_id,), ttl_seconds=60, negative_ttl_seconds=5)
+    def compute(node_id):
+        calls.append(node_id)
+        return []
+
+    compute("n1")
+    compute("n1")
+    now[0] += 6
+    compute("n1")
+
+    assert calls == ["n1", "n1"]
+
+
+def test_cached_never_caches_empty_results_with_zero_negative_ttl(memory_only):
+    calls = []
+
+    @memory_only.cached(
+        "overview", key=lambda: ("g1",), is_empty=lambda r: not r["nodes"], negative_ttl_seconds=0
+    )
+    def compute():
+        calls.append(1)
+        return {"nodes": []}
+
+    compute()
+    compute()
+
+    assert len(calls) == 2
+
+
+def test_cached_does_not_cache_exceptions(memory_only):
+    calls = []
+
+    @memory_only.cached("overview", key=lambda: ("g1",))
+    def compute():
+        calls.append(1)
+        raise ValueError("boom")
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            compute()
+    assert len(calls) == 2
@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import MagicMock
+
+from tests.mock_helpers import MockNeo4jRecord, MockNeo4jResult
+from services_community_index import CommunityIndexCache
+
+pytestmark = pytest.mark.unit
+
+
+def _session_with_communities(rows):
+    session = MagicMock()
+    session.run.side_effect = lambda *args, **kwargs: MockNeo4jResult(
+        records=[MockNeo4jRecord(dict(r)) for r in rows]
+    )
+    return session
+
+
+ROWS = [
+    {"community_id": "k1", "name": "Physics", "summary": "forces", "summary_embedding": [1.0, 0.0]},
+    {"community_id": "k2", "name": "Biology", "summary": "cells", "summary_embedding": [0.0, 1.0]},
+    {"community_id": "k3", "name": "Unsummarized", "summary": None, "summary_embedding": []},
+]
+
+
+def test_index_loads_lazily_and_serves_from_memory():
+    cache = CommunityIndexCache(max_graphs=4, ttl_seconds=0)
+    session = _session_with_communities(ROWS)
+
+    first = cache.get(session, "g1").search([0.9, 0.1], limit=5)
+    second = cache.get(session, "g1").search([0.1, 0.9], limit=1)
+
+    assert [c["community_id"] for c in first] == ["k1", "k2"]
+    assert first[0]["name"] == "Physics" and first[0]["summary"] == "forces"
+    assert [c["community_id"] for c in second] == ["k2"]
+    assert session.run.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_forces_reload():
+    cache = CommunityIndexCache(max_graphs=4, ttl_seconds=0)
+    session = _session_with_communities(ROWS)
+
+    cache.get(session, "g1")
+    cache.invalidate("g1")
+    cache.get(session, "g1")
+
+    assert session.run.call_count == 2
+
+
+def test_lru_evicts_least_recently_used_graph():
+    cache = CommunityIndexCache(max_graphs=2, ttl_seconds=0)
+    session = _session_with_communities(ROWS)
+
+    cache.get(session, "g1")
+    cache.get(session, "g2")
+    cache.get(session, "g1")  # g1 becomes most recent
+    cache.get(session, "g3")  # evicts g2
+
+    stats = cache.stats()
+    assert stats["graphs"] == 2
+    assert stats["evictions"] == 1
+
+    calls = session.run.call_count
+    cache.get(session, "g1")
+    assert session.run.call_count == calls
+    cache.get(session, "g2")
+    assert session.run.call_count == calls + 1
+
+
+def test_search_rejects_dimension_mismatch():
+    cache = CommunityIndexCache(max_graphs=2, ttl_seconds=0)
+    index = cache.get(_session_with_communities(ROWS), "g1")
+
+    assert index.search([1.0, 0.0, 0.0], limit=3) == []
@@ -0,0 +1,96 @@
+"""Tests for the Neo4j connection manager (no server required)."""
+from collections import deque
+
+import pytest
+from neo4j.exceptions import ServiceUnavailable
+
+import db_neo4j
+from db_neo4j import Neo4jConnectionManager
+
+pytestmark = pytest.mark.unit
+
+
+class FakeConnection:
+    def __init__(self, in_use):
+        self.in_use = in_use
+
+
+class FakePool:
+    def __init__(self):
+        self.connections = {"addr": deque([FakeConnection(True), FakeConnection(False)])}
+
+    def acquire(self, *args, **kwargs):
+        return self.connections["addr"][0]
+
+
+class FakeDriver:
+    def __init__(self, healthy=True):
+        self._pool = FakePool()
+        self.healthy = healthy
+        self.verify_calls = 0
+        self.closed = False
+
+    def verify_connectivity(self):
+        self.verify_calls += 1
+        if not self.healthy:
+            raise ServiceUnavailable("Failed to establish connection")
+
+    def session(self, **kwargs):
+        self._pool.acquire()
+        return object()
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def drivers(monkeypatch):
+    created = []
+
+    def fake_driver(*args, **kwargs):
+        created.append(FakeDriver())
+        return created[-1]
+
+    monkeypatch.setattr(db_neo4j.GraphDatabase, "driver", fake_driver)
+    monkeypatch.setattr(db_neo4j, "NEO4J_PASSWORD", "test-password")
+    return created
+
+
+def test_driver_is_reused_without_connectivity_round_trips(drivers):
+    manager = Neo4jConnectionManager(probe_interval=0)
+    for _ in range(5):
+        manager.driver().session()
+
+    assert len(drivers) == 1
+    assert drivers[0].verify_calls == 0
+    stats = manager.stats()
+    assert stats["acquisition"]["count"] == 5
+    assert stats["pool"] == {"connected": True, "in_use": 1, "idle": 1, "max_size": db_neo4j.NEO4J_MAX_CONNECTION_POOL_SIZE}
+
+
+def test_failed_probe_resets_driver_and_next_use_rebuilds_it(drivers):
+    manager = Neo4jConnectionManager(probe_interval=0)
+    manager.driver().healthy = False
+
+    assert manager.verify() is False
+    assert drivers[0].closed
+    stats = manager.stats()
+    assert stats["healthy"] is False
+    assert stats["resets"] == 1
+    assert stats["probe_failures"] == 1
+
+    assert manager.driver() is drivers[1]
+    assert manager.verify() is True
+    assert manager.stats()["healthy"] is True
+
+
+def test_defunct_errors_are_counted(drivers):
+    manager = Neo4jConnectionManager(probe_interval=0)
+    manager.driver()
+    manager.reset("Failed to read from defunct connection")
+    manager.reset("no driver to reset")
+
+    stats = manager.stats()
+    assert stats["resets"] == 1
+    assert stats["defunct_resets"] == 1
+    assert stats["pool"]["connected"] is False
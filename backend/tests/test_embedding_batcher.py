@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+from services_embedding_batcher import EmbeddingBatcher
+
+pytestmark = pytest.mark.unit
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class FakeRouter:
+    def __init__(self, fail=False, reject=None):
+        self.calls = []
+        self.fail = fail
+        self.reject = reject
+
+    def embed_many(self, texts, task_type=None, max_inputs=None, max_chars=None):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("boom")
+        if self.reject in texts:
+            raise BadRequest(f"input too long: {self.reject}")
+        return [[float(len(t))] for t in texts]
+
+
+def test_concurrent_requests_share_one_batch():
+    router = FakeRouter()
+    batcher = EmbeddingBatcher(router=router, window_ms=200, max_inputs=64)
+    results = {}
+    start = threading.Barrier(8)
+
+    def worker(i):
+        start.wait()
+        results[i] = batcher.embed("x" * (i + 1), timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {i: [float(i + 1)] for i in range(8)}
+    assert len(router.calls) == 1
+    assert batcher.stats()["avg_batch_size"] == 8
+
+
+def test_embed_many_respects_max_inputs_and_order():
+    router = FakeRouter()
+    batcher = EmbeddingBatcher(router=router, window_ms=50, max_inputs=2)
+
+    out = batcher.embed_many(["a", "bb", "ccc"], timeout=5)
+
+    assert out == [[1.0], [2.0], [3.0]]
+    assert all(len(call) <= 2 for call in router.calls)
+
+
+def test_failure_leaves_every_input_unembedded():
+    batcher = EmbeddingBatcher(router=FakeRouter(fail=True), window_ms=10)
+
+    assert batcher.embed_many(["a", "b"], timeout=5) == [None, None]
+    assert batcher.stats()["errors"] >= 1
+
+
+def test_embed_many_returns_none_only_for_rejected_input():
+    batcher = EmbeddingBatcher(router=FakeRouter(reject="bad"), window_ms=50, max_inputs=64)
+
+    assert batcher.embed_many(["a", "bad", "ccc"], timeout=5) == [[1.0], None, [3.0]]
+
+
+def test_rejected_batch_fails_only_the_bad_input():
+    router = FakeRouter(reject="bad")
+    batcher = EmbeddingBatcher(router=router, window_ms=50, max_inputs=64)
+
+    futures = [batcher.submit(t) for t in ["a", "bb", "bad", "cccc", "ddddd"]]
+
+    with pytest.raises(BadRequest):
+        futures[2].result(timeout=5)
+    assert [f.result(timeout=5) for i, f in enumerate(futures) if i != 2] == [[1.0], [2.0], [4.0], [5.0]]
+    assert router.calls[0] == ["a", "bb", "bad", "cccc", "ddddd"]
+    assert batcher.stats()["splits"] >= 1
+
+
+def test_transport_failure_is_not_split():
+    router = FakeRouter(fail=True)
+    batcher = EmbeddingBatcher(router=router, window_ms=50)
+
+    futures = [batcher.submit(t) for t in ["a", "b", "c", "d"]]
+
+    for f in futures:
+        with pytest.raises(RuntimeError):
+            f.result(timeout=5)
+    assert len(router.calls) == 1
+
+
+def test_rejected_claim_keeps_sibling_embeddings(monkeypatch):
+    from services.lecture_ingestion import chunk_claims
+
+    batcher = EmbeddingBatcher(router=FakeRouter(reject="bad"), window_ms=50, max_inputs=64)
+    claims = [{"claim_text": t} for t in ["a", "bad", "ccc"]]
+    monkeypatch.setattr(chunk_claims, "extract_claims_from_chunk", lambda text, known: claims)
+    monkeypatch.setattr(chunk_claims, "embed_many", lambda texts: batcher.embed_many(texts, timeout=5))
+
+    result = chunk_claims.process_chunk_atomic({"index": 0, "text": "..."}, [])
+
+    assert result["errors"] == []
+    assert [c["embedding"] for c in result["claims"]] == [[1.0], None, [3.0]]
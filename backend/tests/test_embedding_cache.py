@@ -0,0 +1,76 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import services_model_router
+from services_embedding_cache import EmbeddingCache, embedding_request_scope
+from services_model_router import ModelRouter
+
+pytestmark = pytest.mark.unit
+
+
+def _router_with_fake_client(monkeypatch, cache):
+    client = MagicMock()
+    client.embeddings.create.side_effect = lambda model, input: SimpleNamespace(
+        data=[SimpleNamespace(embedding=[float(len(t)), 1.0]) for t in input]
+    )
+    router = ModelRouter.__new__(ModelRouter)
+    router.client = client
+    monkeypatch.setattr(router, "get_model_for_task", lambda task_type: "test-model", raising=False)
+    monkeypatch.setattr(services_model_router, "embedding_cache", cache)
+    return router, client
+
+
+def test_repeated_text_is_embedded_once(monkeypatch):
+    cache = EmbeddingCache(max_entries=16, use_redis=False)
+    router, client = _router_with_fake_client(monkeypatch, cache)
+
+    first = router.embed("what is entropy")
+    second = router.embed("what is entropy")
+
+    assert first == second == [15.0, 1.0]
+    assert client.embeddings.create.call_count == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits_memory"] == 1
+
+
+def test_batch_sends_only_deduplicated_misses_and_keeps_order(monkeypatch):
+    cache = EmbeddingCache(max_entries=16, use_redis=False)
+    router, client = _router_with_fake_client(monkeypatch, cache)
+    router.embed("a")
+
+    out = router.embed(["bb", "a", "ccc", "bb"])
+
+    assert out == [[2.0, 1.0], [1.0, 1.0], [3.0, 1.0], [2.0, 1.0]]
+    assert client.embeddings.create.call_args.kwargs["input"] == ["bb", "ccc"]
+
+
+def test_request_scope_serves_repeats_without_process_cache(monkeypatch):
+    cache = EmbeddingCache(max_entries=0, use_redis=False)
+    router, client = _router_with_fake_client(monkeypatch, cache)
+
+    with embedding_request_scope():
+        router.embed("q")
+        router.embed("q")
+    router.embed("q")
+
+    assert client.embeddings.create.call_count == 2
+    assert cache.stats()["hits_request"] == 1
+
+
+def test_lru_is_bounded():
+    cache = EmbeddingCache(max_entries=2, use_redis=False)
+    cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+
+    assert cache.get_many("m", ["a", "b", "c"]) == [None, [2.0], [3.0]]
+    assert cache.get_many("other-model", ["b"]) == [None]
+
+
+def test_embed_many_splits_by_input_count(monkeypatch):
+    cache = EmbeddingCache(max_entries=16, use_redis=False)
+    router, client = _router_with_fake_client(monkeypatch, cache)
+
+    out = router.embed_many(["a", "bb", "ccc"], max_inputs=2)
+
+    assert out == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert [c.kwargs["input"] for c in client.embeddings.create.call_args_list] == [["a", "bb"], ["ccc"]]
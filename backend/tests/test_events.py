@@ -142,3 +142,128 @@ def test_session_context_projector(sqlite_store, monkeypatch):
     assert len(context.active_objects) > 0
     assert 0.0 <= context.uncertainty_score <= 1.0
 
+
+
+def test_get_event_store_builds_once_per_config(monkeypatch, tmp_path):
+    """The factory reuses one store (one schema bootstrap) per configuration."""
+    from events.store import factory
+
+    monkeypatch.setattr(factory, "_stores", {})
+    monkeypatch.delenv("EVENTS_DDB_TABLE", raising=False)
+    monkeypatch.setenv("EVENTS_POSTGRES", "false")
+    monkeypatch.setenv("EVENTS_SQLITE_PATH", str(tmp_path / "events.db"))
+    inits = []
+    original_init_db = SQLiteEventStore._init_db
+    monkeypatch.setattr(SQLiteEventStore, "_init_db", lambda self: (inits.append(1), original_init_db(self)))
+
+    first = factory.get_event_store()
+    second = factory.get_event_store()
+    first.append(EventEnvelope(
+        event_id="reg-1",
+        event_type=EventType.CHAT_MESSAGE_CREATED,
+        session_id="session-reg",
+        occurred_at=datetime.utcnow(),
+    ))
+
+    assert first is second
+    assert len(inits) == 1
+    stats = factory.get_event_store_stats()
+    (store_stats,) = stats.values()
+    assert store_stats["backend"] == "sqlite"
+    assert store_stats["operations"]["append"]["calls"] == 1
+
+
+def test_postgres_fallback_is_retried_with_backoff(monkeypatch, tmp_path):
+    """A failed Postgres init falls back to SQLite, reports it, and retries later."""
+    from events.store import factory
+
+    monkeypatch.setattr(factory, "_stores", {})
+    monkeypatch.delenv("EVENTS_DDB_TABLE", raising=False)
+    monkeypatch.setenv("EVENTS_POSTGRES", "true")
+    monkeypatch.setenv("EVENTS_SQLITE_PATH", str(tmp_path / "events.db"))
+    monkeypatch.setattr(factory, "EVENTS_POSTGRES_RETRY_SECONDS", 0.0)
+    attempts = []
+    postgres = SQLiteEventStore(db_path=str(tmp_path / "pg.db"))
+
+    def build_postgres():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("connection pool exhausted")
+        return postgres
+
+    monkeypatch.setattr(factory, "_build_postgres_store", build_postgres)
+
+    first = factory.get_event_store()
+    assert first.backend == "sqlite"
+    (store_stats,) = factory.get_event_store_stats().values()
+    assert store_stats["fallback"]["from"] == "postgres"
+    assert store_stats["fallback"]["retryable"] is True
+
+    assert factory.get_event_store() is first  # second attempt fails, fallback kept
+    assert first.fallback["attempts"] == 2
+
+    recovered = factory.get_event_store()
+    assert recovered.backend == "postgres"
+    assert recovered.inner is postgres
+    assert factory.get_event_store() is recovered
+    assert len(attempts) == 3
+    assert "fallback" not in factory.get_event_store_stats()["postgres"]
+
+
+def test_events_written_to_the_fallback_are_replayed_on_recovery(monkeypatch, tmp_path):
+    """Events appended to SQLite while Postgres was down are copied over when it recovers."""
+    from events.store import factory
+
+    def event(n):
+        return EventEnvelope(
+            event_id=f"evt-{n}",
+            event_type=EventType.CHAT_MESSAGE_CREATED,
+            session_id="session-1",
+            occurred_at=datetime(2026, 1, 1, 0, 0, n),
+            payload={"n": n},
+        )
+
+    sqlite_path = tmp_path / "events.db"
+    SQLiteEventStore(db_path=str(sqlite_path)).append(event(0))  # before the outage
+    monkeypatch.setattr(factory, "_stores", {})
+    monkeypatch.delenv("EVENTS_DDB_TABLE", raising=False)
+    monkeypatch.setenv("EVENTS_POSTGRES", "true")
+    monkeypatch.setenv("EVENTS_SQLITE_PATH", str(sqlite_path))
+    monkeypatch.setattr(factory, "EVENTS_POSTGRES_RETRY_SECONDS", 0.0)
+    monkeypatch.setattr(factory, "EVENTS_FALLBACK_REPLAY_BATCH", 2)
+    postgres = SQLiteEventStore(db_path=str(tmp_path / "pg.db"))
+    postgres_up = [False]
+    real_append = postgres.append
+
+    def flaky_append(e):
+        if e.event_id == "evt-3" and not postgres_up[0]:
+            raise RuntimeError("connection reset")
+        real_append(e)
+
+    monkeypatch.setattr(postgres, "append", flaky_append)
+
+    attempts = []
+
+    def build_postgres():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("connection refused")
+        return postgres
+
+    monkeypatch.setattr(factory, "_build_postgres_store", build_postgres)
+
+    fallback = factory.get_event_store()
+    for n in (1, 2, 3):
+        fallback.append(event(n))
+
+    assert factory.get_event_store() is fallback  # Postgres still down
+    assert factory.get_event_store() is fallback  # replay broke off after the first page
+    assert [e.event_id for e in postgres.replay("session-1")] == ["evt-1", "evt-2"]
+
+    postgres_up[0] = True
+    recovered = factory.get_event_store()
+
+    assert recovered.backend == "postgres"
+    assert [e.event_id for e in recovered.list_events("session-1")] == ["evt-1", "evt-2", "evt-3"]
+    stats = factory.get_event_store_stats()["postgres"]["recovered_from_fallback"]
+    assert stats["replayed"] == 1 and stats["unreplayed_after_rowid"] is None
@@ -0,0 +1,109 @@
+"""Tests for the cached active graph-context resolution."""
+import json
+
+import pytest
+
+import services_branch_explorer as be
+
+pytestmark = pytest.mark.unit
+
+
+class FakeResult:
+    def __init__(self, record):
+        self.record = record
+
+    def single(self):
+        return self.record
+
+    def consume(self):
+        return None
+
+
+class FakeSession:
+    """Answers the handful of queries get_active_graph_context issues."""
+
+    def __init__(self):
+        self.queries = []
+        self.prefs = {}
+        self.graph_tenants = {}
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        if "MERGE (u:UserProfile" in query and "SET u.learning_preferences" in query:
+            self.prefs = json.loads(params["learning_preferences"])
+            return FakeResult(None)
+        if "MERGE (u:UserProfile" in query:
+            return FakeResult({"learning_preferences": json.dumps(self.prefs)})
+        if "MERGE (b:Branch" in query:
+            return FakeResult({"b": {"graph_id": params["graph_id"], "branch_id": params["branch_id"]}})
+        if "MERGE (g:GraphSpace" in query:
+            self.graph_tenants.setdefault(params["graph_id"], params.get("tenant_id"))
+            return FakeResult({"g": {"graph_id": params["graph_id"], "tenant_id": params.get("tenant_id")}})
+        if "WHERE g.tenant_id = $tenant_id" in query:
+            ok = self.graph_tenants.get(params["graph_id"]) == params["tenant_id"]
+            return FakeResult({"g": {}} if ok else None)
+        if "RETURN g.tenant_id AS tenant_id" in query:
+            gid = params["graph_id"]
+            return FakeResult({"tenant_id": self.graph_tenants[gid]} if gid in self.graph_tenants else None)
+        return FakeResult(None)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(be, "_SCHEMA_INITIALIZED", True)
+    be.clear_graph_context_cache()
+    yield FakeSession()
+    be.clear_graph_context_cache()
+
+
+def test_second_resolution_is_served_from_cache(session):
+    first = be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+    issued = len(session.queries)
+    second = be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+
+    assert first == second == ("default_t1", "main")
+    assert len(session.queries) == issued
+
+
+def test_known_graphspaces_are_not_merged_again_for_other_users(session):
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+    issued = len(session.queries)
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u2")
+
+    new_queries = session.queries[issued:]
+    assert not any("MERGE (g:GraphSpace" in q for q in new_queries)
+    assert not any("MERGE (b:Branch" in q for q in new_queries)
+
+
+def test_set_active_graph_invalidates_only_that_user(session):
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u2")
+    session.graph_tenants["G1"] = "t1"
+
+    be.set_active_graph(session, "G1", tenant_id="t1", user_id="u1")
+
+    assert be.get_active_graph_context(session, tenant_id="t1", user_id="u1") == ("G1", "main")
+    stats = be.get_graph_context_cache_stats()
+    assert stats["invalidations"] == 1
+    assert stats["contexts"] == 2
+
+
+def test_zero_ttl_disables_caching(session, monkeypatch):
+    monkeypatch.setattr(be, "_context_cache", be._TTLCache(0, 16))
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+    issued = len(session.queries)
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+    assert len(session.queries) > issued
+
+
+def test_selected_graph_is_reensured_after_context_expiry(session):
+    session.graph_tenants["G1"] = "t1"
+    be.set_active_graph(session, "G1", tenant_id="t1", user_id="u1")
+    be.get_active_graph_context(session, tenant_id="t1", user_id="u1")
+    be._context_cache.clear()  # context TTL expired; G1 is still in the known-node cache
+    issued = len(session.queries)
+
+    assert be.get_active_graph_context(session, tenant_id="t1", user_id="u1") == ("G1", "main")
+    new_queries = session.queries[issued:]
+    assert any("MERGE (g:GraphSpace" in q for q in new_queries)
+    assert any("MERGE (b:Branch" in q for q in new_queries)
@@ -0,0 +1,53 @@
+"""
+Tests for the async home feed (api_home).
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+import api_home
+from tests.mock_helpers import MockAsyncNeo4jSession, MockNeo4jRecord, MockNeo4jResult
+
+
+def test_home_feed_reads_neo4j_async_and_postgres_off_the_loop(monkeypatch):
+    session = MagicMock()
+    session.run.return_value = MockNeo4jResult(
+        records=[MockNeo4jRecord({"id": "t1", "title": "Review notes", "priority": "high", "due_date": None})]
+    )
+    postgres_threads = []
+
+    def fake_execute_query(query, params):
+        postgres_threads.append(threading.get_ident())
+        if "chat_messages" in query:
+            return [{"content": "what is ATP?"}]
+        return [{"c": 2}]
+
+    def fake_suggestions(*, user_id, tenant_id, limit):
+        postgres_threads.append(threading.get_ident())
+        return [{"id": "s1", "title": "Krebs cycle"}]
+
+    monkeypatch.setattr(api_home, "execute_query", fake_execute_query)
+    monkeypatch.setattr(api_home, "get_recent_suggestions", fake_suggestions)
+
+    async def run():
+        feed = await api_home.get_home_feed(
+            user_ctx=SimpleNamespace(user_id="u1", tenant_id="tenant-a"),
+            session=MockAsyncNeo4jSession(session),
+        )
+        return feed, threading.get_ident()
+
+    feed, loop_thread = asyncio.run(run())
+
+    assert feed == {
+        "today": {"tasks": [{"id": "t1", "title": "Review notes", "priority": "high", "due_date": None}], "task_count": 1},
+        "picks": [{"id": "s1", "title": "Krebs cycle"}],
+        "continuity": ["what is ATP?"],
+        "capture_inbox": {"new_count": 2},
+    }
+    assert session.run.call_args.kwargs["tenant_id"] == "tenant-a"
+    assert len(postgres_threads) == 3 and loop_thread not in postgres_threads
@@ -0,0 +1,159 @@
+"""
+Tests for the concurrent tier fan-out behind get_unified_context.
+"""
+import time
+from contextvars import ContextVar
+
+import pytest
+
+import services_memory_orchestrator as orchestrator
+from services_memory_orchestrator import ContextTier, run_context_tiers
+
+pytestmark = pytest.mark.unit
+
+
+def _sleep_then(seconds, value):
+    def fetch():
+        time.sleep(seconds)
+        return value
+    return fetch
+
+
+def test_tiers_run_concurrently():
+    tiers = [ContextTier(f"tier{i}", _sleep_then(0.2, i), 2.0) for i in range(5)]
+
+    started = time.perf_counter()
+    fetched = run_context_tiers(tiers)
+    elapsed = time.perf_counter() - started
+
+    assert fetched.results == {f"tier{i}": i for i in range(5)}
+    assert elapsed < 0.6
+    assert set(fetched.timings_ms) == {f"tier{i}" for i in range(5)}
+    assert all(ms >= 190 for ms in fetched.timings_ms.values())
+
+
+def test_slow_tier_is_dropped_at_its_deadline():
+    tiers = [
+        ContextTier("fast", _sleep_then(0.01, "ok"), 1.0),
+        ContextTier("slow", _sleep_then(1.0, "late"), 0.1),
+    ]
+
+    started = time.perf_counter()
+    fetched = run_context_tiers(tiers)
+
+    assert time.perf_counter() - started < 0.5
+    assert fetched.results == {"fast": "ok"}
+    assert fetched.timed_out == ["slow"]
+
+
+def test_failing_tier_is_dropped():
+    def boom():
+        raise RuntimeError("postgres down")
+
+    fetched = run_context_tiers([ContextTier("ok", lambda: 1), ContextTier("broken", boom)])
+
+    assert fetched.results == {"ok": 1}
+    assert fetched.failed == ["broken"]
+
+
+def test_tiers_see_callers_context_vars():
+    identity = ContextVar("identity", default=None)
+    identity.set("user-1")
+
+    fetched = run_context_tiers([ContextTier("who", identity.get)])
+
+    assert fetched.results == {"who": "user-1"}
+
+
+def test_unified_context_keeps_sections_of_tiers_that_finish(monkeypatch):
+    monkeypatch.setattr(orchestrator, "_fetch_chat_history", lambda chat_id, user_id, tenant_id: [{"role": "user"}])
+    monkeypatch.setattr(orchestrator, "_fetch_recent_memory_events", lambda user_id, tenant_id: time.sleep(1) or "late")
+    monkeypatch.setattr(orchestrator, "MEMORY_CONTEXT_TIER_TIMEOUT_SECONDS", 0.1)
+
+    context = orchestrator.get_unified_context(
+        user_id="u1",
+        tenant_id="t1",
+        chat_id="c1",
+        query="hi",
+        session=None,
+        include_lecture_context=False,
+        include_user_facts=False,
+        include_study_context=False,
+        include_recent_topics=False,
+    )
+
+    assert context["chat_history"] == [{"role": "user"}]
+    assert context["recent_memory_events"] == ""
+    assert context["timed_out_tiers"] == ["recent conversation events"]
+    assert set(context["tier_timings_ms"]) == {"recent conversation events", "chat history"}
+
+
+def _single_worker(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(orchestrator, "_tier_executor", ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(orchestrator, "_tier_overdue", {})
+
+
+def test_deadline_starts_when_the_tier_gets_a_worker(monkeypatch):
+    _single_worker(monkeypatch)
+    tiers = [ContextTier(f"tier{i}", _sleep_then(0.15, i), 0.25) for i in range(2)]
+
+    fetched = run_context_tiers(tiers)
+
+    # The second tier queued 0.15s behind the first; that does not count against it
+    assert fetched.results == {"tier0": 0, "tier1": 1}
+    assert fetched.timed_out == [] and fetched.shed == []
+    assert fetched.queued_ms["tier1"] >= 140
+    assert 140 <= fetched.timings_ms["tier1"] < 250
+
+
+def test_tier_with_too_many_overdue_runs_is_shed(monkeypatch):
+    monkeypatch.setattr(orchestrator, "_tier_overdue", {})
+    monkeypatch.setattr(orchestrator, "MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER", 1)
+    stuck = ContextTier("neo4j user facts", _sleep_then(0.3, "late"), 0.05)
+
+    first = run_context_tiers([stuck])
+    second = run_context_tiers([stuck, ContextTier("chat history", lambda: [])])
+    time.sleep(0.35)
+    third = run_context_tiers([ContextTier("neo4j user facts", lambda: "facts")])
+
+    assert first.timed_out == ["neo4j user facts"]
+    # The dropped run still holds its slot, so the next caller does not pile on
+    assert second.shed == ["neo4j user facts"] and second.results == {"chat history": []}
+    assert third.results == {"neo4j user facts": "facts"}
+
+
+def test_tier_without_a_worker_by_its_deadline_is_shed(monkeypatch):
+    _single_worker(monkeypatch)
+    run_context_tiers([ContextTier("stuck", _sleep_then(0.3, "late"), 0.01)])
+
+    started = time.perf_counter()
+    fetched = run_context_tiers([ContextTier("profiles", lambda: {}, 0.1)])
+
+    assert time.perf_counter() - started < 0.25
+    assert fetched.shed == ["profiles"] and fetched.results == {}
+    assert orchestrator._tier_overdue.get("profiles") is None
+
+
+def test_concurrent_callers_within_their_deadlines_are_not_shed(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(orchestrator, "_tier_overdue", {})
+    monkeypatch.setattr(orchestrator, "MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER", 1)
+    tier = ContextTier("neo4j user facts", _sleep_then(0.05, "facts"), 1.0)
+
+    with ThreadPoolExecutor(max_workers=8) as callers:
+        runs = list(callers.map(lambda _: run_context_tiers([tier]), range(8)))
+
+    assert all(r.results == {"neo4j user facts": "facts"} and r.shed == [] for r in runs)
+
+
+def test_unsheddable_tier_runs_inline_without_a_worker(monkeypatch):
+    _single_worker(monkeypatch)
+    monkeypatch.setattr(orchestrator, "MEMORY_CONTEXT_MAX_OVERDUE_PER_TIER", 1)
+    run_context_tiers([ContextTier("chat history", _sleep_then(0.3, "late"), 0.01, sheddable=False)])
+
+    fetched = run_context_tiers([ContextTier("chat history", lambda: ["hi"], 0.05, sheddable=False)])
+
+    assert fetched.results == {"chat history": ["hi"]} and fetched.shed == []
@@ -0,0 +1,76 @@
+"""
+Tests for the pure ASGI TimeoutMiddleware.
+"""
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from middleware_timeout import TimeoutMiddleware
+
+pytestmark = pytest.mark.unit
+
+
+def _app(timeout_seconds: float) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TimeoutMiddleware, timeout_seconds=timeout_seconds)
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(1)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    @app.get("/chat-stream")
+    async def chat_stream():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    @app.get("/slow-body")
+    async def slow_body():
+        async def chunks():
+            yield b"a"
+            await asyncio.sleep(0.2)
+            yield b"b"
+        return StreamingResponse(chunks())
+
+    @app.get("/raises-timeout")
+    async def raises_timeout():
+        raise TimeoutError("upstream")
+
+    return app
+
+
+def test_slow_request_returns_504():
+    response = TestClient(_app(0.05)).get("/slow")
+
+    assert response.status_code == 504
+    assert response.json()["timeout_seconds"] == 0.05
+
+
+def test_fast_request_passes_through():
+    response = TestClient(_app(0.05)).get("/fast")
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+
+
+def test_streaming_paths_skip_timeout():
+    assert TestClient(_app(0.05)).get("/chat-stream").status_code == 200
+
+
+def test_deadline_stops_once_response_started():
+    response = TestClient(_app(0.05)).get("/slow-body")
+
+    assert response.status_code == 200
+    assert response.content == b"ab"
+
+
+def test_endpoint_timeout_error_is_not_a_504():
+    with pytest.raises(TimeoutError):
+        TestClient(_app(5)).get("/raises-timeout")
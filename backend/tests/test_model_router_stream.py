@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services_model_router import ModelRouter
+
+pytestmark = pytest.mark.unit
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeAsyncStream:
+    """Stands in for openai.AsyncStream: yields chunks, optionally stalling after them."""
+
+    def __init__(self, texts, stall_after=False):
+        self.texts = texts
+        self.stall_after = stall_after
+        self.closed = False
+
+    async def _gen(self):
+        for text in self.texts:
+            await asyncio.sleep(0)
+            yield _chunk(text)
+        if self.stall_after:
+            await asyncio.sleep(3600)
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def close(self):
+        self.closed = True
+
+
+def _router_with_stream(stream):
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+        return stream
+
+    router = ModelRouter.__new__(ModelRouter)
+    router.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return router
+
+
+def test_astream_text_yields_content_and_closes_stream():
+    stream = FakeAsyncStream(["Hel", None, "lo"])
+    router = _router_with_stream(stream)
+
+    async def run():
+        return [bit async for bit in router.astream_text([{"role": "user", "content": "hi"}])]
+
+    assert asyncio.run(run()) == ["Hel", "lo"]
+    assert stream.closed
+
+
+def test_cancel_event_stops_a_stalled_stream():
+    stream = FakeAsyncStream(["one ", "two"], stall_after=True)
+    router = _router_with_stream(stream)
+
+    async def run():
+        cancel = asyncio.Event()
+        received = []
+
+        async def consume():
+            async for bit in router.astream_text([], cancel_event=cancel):
+                received.append(bit)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)  # both chunks delivered, now waiting on the stalled stream
+        cancel.set()
+        await asyncio.wait_for(task, timeout=1)
+        return received
+
+    assert asyncio.run(run()) == ["one ", "two"]
+    assert stream.closed
+
+
+def test_consumer_stopping_early_closes_stream():
+    stream = FakeAsyncStream(["a", "b", "c"])
+    router = _router_with_stream(stream)
+
+    async def run():
+        gen = router.astream_text([])
+        first = await gen.__anext__()
+        await gen.aclose()
+        return first
+
+    assert asyncio.run(run()) == "a"
+    assert stream.closed
@@ -0,0 +1,106 @@
+"""
+Tests for neo4j_query: one query plan driven by sync and async sessions.
+"""
+import asyncio
+
+import pytest
+from neo4j.exceptions import ServiceUnavailable
+
+from neo4j_query import BufferedResult, Cypher, run_plan, run_plan_async
+from tests.mock_helpers import MockAsyncNeo4jSession, MockNeo4jRecord, MockNeo4jResult
+
+pytestmark = pytest.mark.unit
+
+
+class FakeSession:
+    """Sync session returning canned results keyed by a substring of the query."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.queries = []
+
+    def run(self, query, **params):
+        self.queries.append((query, params))
+        for needle, response in self.responses.items():
+            if needle in query:
+                if isinstance(response, Exception):
+                    raise response
+                return response
+        return MockNeo4jResult()
+
+
+def _concept_names_plan(domain):
+    rec = (yield Cypher("MATCH (d:Domain {name: $domain}) RETURN d.id AS id", {"domain": domain})).single()
+    if not rec:
+        return []
+    names = []
+    for row in (yield Cypher("MATCH (c:Concept {domain_id: $id}) RETURN c.name AS name", {"id": rec["id"]})):
+        names.append(row["name"])
+    return names
+
+
+def _responses():
+    return {
+        "MATCH (d:Domain": MockNeo4jResult(MockNeo4jRecord({"id": "D1"})),
+        "MATCH (c:Concept": MockNeo4jResult(records=[
+            MockNeo4jRecord({"name": "Attention"}),
+            MockNeo4jRecord({"name": "Transformers"}),
+        ]),
+    }
+
+
+def test_sync_and_async_sessions_run_the_same_plan():
+    sync_session = FakeSession(_responses())
+    async_backing = FakeSession(_responses())
+
+    sync_names = run_plan(sync_session, _concept_names_plan("ML"))
+    async_names = asyncio.run(run_plan_async(MockAsyncNeo4jSession(async_backing), _concept_names_plan("ML")))
+
+    assert sync_names == async_names == ["Attention", "Transformers"]
+    assert sync_session.queries == async_backing.queries
+    assert sync_session.queries[1][1] == {"id": "D1"}
+
+
+def test_plan_short_circuits_on_missing_record():
+    session = FakeSession({"MATCH (d:Domain": MockNeo4jResult(record=None)})
+
+    assert run_plan(session, _concept_names_plan("ML")) == []
+    assert len(session.queries) == 1
+
+
+def test_driver_errors_are_thrown_into_the_plan():
+    def plan():
+        try:
+            (yield Cypher("SHOW CONSTRAINTS")).consume()
+        except ServiceUnavailable:
+            return "fallback"
+        return "ok"
+
+    session = FakeSession({"SHOW CONSTRAINTS": ServiceUnavailable("down")})
+
+    assert run_plan(session, plan()) == "fallback"
+    assert asyncio.run(run_plan_async(MockAsyncNeo4jSession(session), plan())) == "fallback"
+
+
+def test_unhandled_errors_propagate():
+    session = FakeSession({"SHOW CONSTRAINTS": ServiceUnavailable("down")})
+
+    with pytest.raises(ServiceUnavailable):
+        run_plan(session, _constraints_plan())
+    with pytest.raises(ServiceUnavailable):
+        asyncio.run(run_plan_async(MockAsyncNeo4jSession(session), _constraints_plan()))
+
+
+def _constraints_plan():
+    return (yield Cypher("SHOW CONSTRAINTS")).data()
+
+
+def test_buffered_result_matches_sync_result_api():
+    records = [MockNeo4jRecord({"n": 1}), MockNeo4jRecord({"n": 2})]
+    result = BufferedResult(records)
+
+    assert result.single() is records[0]
+    assert result.data() == [{"n": 1}, {"n": 2}]
+    assert list(result) == records
+    assert len(result) == 2
+    assert BufferedResult([]).single() is None
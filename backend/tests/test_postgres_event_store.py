@@ -0,0 +1,197 @@
+"""Tests for the pooled / buffered Postgres event store (no live database)."""
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+
+import events.store.postgres as pg
+from events.schema import EventEnvelope, EventType
+
+pytestmark = pytest.mark.unit
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.statements.append(sql)
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db.commits += 1
+
+    def rollback(self):
+        pass
+
+
+class FakeDB:
+    def __init__(self):
+        self.statements, self.rows, self.commits = [], {}, 0
+        self.connects = 0
+        self.fail = False
+        self.poison = set()  # event ids the DB rejects as bad data
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeDB()
+
+    def make_pool(minconn, maxconn, dsn):
+        pool = MagicMock()
+        conn = FakeConnection(db)
+
+        def getconn():
+            db.connects += 1
+            return conn
+
+        pool.getconn.side_effect = getconn
+        return pool
+
+    def execute_values(cur, sql, rows, page_size=None):
+        if db.fail:
+            raise psycopg2.OperationalError("db down")
+        if any(row[0] in db.poison for row in rows):
+            raise psycopg2.DataError("invalid input syntax")
+        inserted = 0
+        for row in rows:
+            event_id, idem = row[0], row[8]
+            if event_id in db.rows or any(r[8] == idem for r in db.rows.values() if idem):
+                continue
+            db.rows[event_id] = row
+            inserted += 1
+        cur.rowcount = inserted
+
+    monkeypatch.setattr(pg, "ThreadedConnectionPool", make_pool)
+    monkeypatch.setattr(pg, "execute_values", execute_values)
+    monkeypatch.setattr(pg.atexit, "register", lambda fn: None)
+    return db
+
+
+def _event(i, key=None):
+    return EventEnvelope(
+        event_id=f"e{i}",
+        event_type=EventType.CHAT_MESSAGE_CREATED,
+        session_id="s1",
+        occurred_at=datetime.utcnow(),
+        idempotency_key=key or f"k{i}",
+        payload={"i": i},
+    )
+
+
+def test_sync_append_is_one_insert_and_skips_duplicates(fake_db):
+    store = pg.PostgresEventStore(connection_string="postgresql://test", buffered=False)
+    commits_after_init = fake_db.commits
+
+    store.append(_event(1))
+    store.append(_event(2, key="k1"))  # same idempotency key
+
+    assert list(fake_db.rows) == ["e1"]
+    assert fake_db.commits - commits_after_init == 2
+    assert store.stats()["duplicates"] == 1
+    assert not any("SELECT event_id" in s for s in fake_db.statements)
+
+
+def test_buffered_mode_group_commits_and_flushes(fake_db):
+    store = pg.PostgresEventStore(
+        connection_string="postgresql://test", buffered=True, batch_size=50, flush_interval_ms=10_000
+    )
+    for i in range(5):
+        store.append(_event(i))
+
+    assert store.flush(timeout=5)
+    assert len(fake_db.rows) == 5
+    assert store.stats()["batches"] == 1
+    store.close()
+
+
+def test_buffer_is_bounded_and_keeps_events_on_failure(fake_db):
+    store = pg.PostgresEventStore(
+        connection_string="postgresql://test", buffered=True, batch_size=2, max_buffered=2,
+        flush_interval_ms=10_000,
+    )
+    fake_db.fail = True
+    store.append(_event(1))
+    store.append(_event(2))
+    for i in range(3, 6):
+        with pytest.raises(psycopg2.OperationalError):
+            store.append(_event(i))  # buffer full -> inline flush fails -> rejected, not queued
+    stats = store.stats()
+    assert stats["buffered"] == 2
+    assert stats["rejected"] == 3
+
+    fake_db.fail = False
+    store.append(_event(6))  # inline flush makes room
+    assert store.flush(timeout=5)
+    assert sorted(fake_db.rows) == ["e1", "e2", "e6"]
+    store.close()
+
+
+def test_unserializable_payload_fails_its_own_append(fake_db):
+    store = pg.PostgresEventStore(connection_string="postgresql://test", buffered=True, flush_interval_ms=10_000)
+    bad = _event(1)
+    bad.payload = {"when": object()}
+
+    with pytest.raises(TypeError):
+        store.append(bad)
+    store.append(_event(2))
+
+    assert store.flush(timeout=5)
+    assert list(fake_db.rows) == ["e2"]
+    store.close()
+
+
+def test_rejected_row_is_dead_lettered_without_blocking_the_batch(fake_db):
+    store = pg.PostgresEventStore(
+        connection_string="postgresql://test", buffered=True, batch_size=10, flush_interval_ms=10_000
+    )
+    fake_db.poison.add("e2")
+    for i in range(1, 5):
+        store.append(_event(i))
+
+    assert store.flush(timeout=5)
+    assert sorted(fake_db.rows) == ["e1", "e3", "e4"]
+    assert store.stats()["dead_lettered"] == 1
+    assert [row[0] for row, _ in store.dead_letters] == ["e2"]
+    store.close()
+
+
+def test_callers_wait_for_a_pooled_connection(fake_db):
+    store = pg.PostgresEventStore(connection_string="postgresql://test", buffered=False, pool_max=1)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with store._connection():
+            held.set()
+            release.wait(2)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    held.wait(2)
+    threading.Timer(0.05, release.set).start()
+    started = time.monotonic()
+    store.append(_event(1))  # waits for the held connection instead of raising PoolError
+
+    assert time.monotonic() - started >= 0.04
+    assert list(fake_db.rows) == ["e1"]
+    holder.join()
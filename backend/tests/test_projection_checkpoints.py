@@ -0,0 +1,145 @@
+"""Tests for incremental (checkpointed) projections."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from events.schema import EventEnvelope, EventType, ObjectRef
+from events.store.sqlite import SQLiteEventStore
+import projectors.checkpoint as checkpoint_module
+from projectors.checkpoint import ProjectionCheckpoint, checkpoint_cache, fold_new_events
+from projectors.session_context import SessionContextProjector
+from projectors.user_preferences import UserPreferencesProjector
+
+pytestmark = pytest.mark.unit
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    checkpoint_cache.clear()
+    yield SQLiteEventStore(db_path=str(tmp_path / "events.db"))
+    checkpoint_cache.clear()
+
+
+def _view(i, concept_id, at, session_id="s1"):
+    return EventEnvelope(
+        event_id=f"e{i}",
+        event_type=EventType.USER_VIEWED,
+        session_id=session_id,
+        actor_id="u1",
+        occurred_at=at,
+        object_ref=ObjectRef(type="concept", id=concept_id),
+        payload={"name": concept_id.upper(), "domain": "physics"},
+    )
+
+
+class CountingStore:
+    def __init__(self, inner):
+        self.inner = inner
+        self.returned = 0
+
+    def list_events(self, session_id, after_ts=None, limit=100):
+        events = self.inner.list_events(session_id, after_ts=after_ts, limit=limit)
+        self.returned += len(events)
+        return events
+
+
+def test_session_context_folds_only_new_events(store, monkeypatch):
+    monkeypatch.setattr(checkpoint_module, "PROJECTION_LATE_EVENT_WINDOW_SECONDS", 1.5)
+    projector = SessionContextProjector(use_read_model=False)
+    counting = CountingStore(store)
+    projector.store = counting
+
+    for i in range(3):
+        store.append(_view(i, "c1", T0 + timedelta(seconds=i)))
+    first = projector.project("s1")
+    fetched_first = counting.returned
+
+    store.append(_view(3, "c2", T0 + timedelta(seconds=3)))
+    second = projector.project("s1")
+
+    # Only the new event plus the already-applied events inside the late-event window
+    assert counting.returned - fetched_first == 3
+    weights = {c.concept_id: c.weight for c in second.active_concepts}
+    assert weights == {"c1": pytest.approx(0.6), "c2": pytest.approx(0.2)}
+    assert first.uncertainty_score == second.uncertainty_score == 0.8
+
+
+def test_events_sharing_the_checkpoint_timestamp_are_not_lost_or_doubled(store):
+    checkpoint = ProjectionCheckpoint(projector="count", session_id="s1", state={"ids": []})
+    apply = lambda state, event: state["ids"].append(event.event_id)
+
+    store.append(_view(1, "c1", T0))
+    fold_new_events(store, checkpoint, apply)
+    store.append(_view(2, "c1", T0))  # same timestamp, arrives later
+    store.append(_view(3, "c1", T0 + timedelta(seconds=1)))
+    fold_new_events(store, checkpoint, apply)
+    fold_new_events(store, checkpoint, apply)
+
+    assert checkpoint.state["ids"] == ["e1", "e2", "e3"]
+    assert checkpoint.event_count == 3
+
+
+def test_late_event_inside_the_window_is_applied_once(store):
+    checkpoint = ProjectionCheckpoint(projector="count", session_id="s1", state={"ids": []})
+    apply = lambda state, event: state["ids"].append(event.event_id)
+
+    store.append(_view(1, "c1", T0))
+    store.append(_view(3, "c1", T0 + timedelta(seconds=10)))
+    fold_new_events(store, checkpoint, apply, late_window_seconds=60)
+    store.append(_view(2, "c1", T0 + timedelta(seconds=5)))  # older than the checkpoint, stored later
+    fold_new_events(store, checkpoint, apply, late_window_seconds=60)
+    fold_new_events(store, checkpoint, apply, late_window_seconds=60)
+
+    assert checkpoint.state["ids"] == ["e1", "e3", "e2"]
+    assert checkpoint.last_occurred_at == T0 + timedelta(seconds=10)
+    assert checkpoint.event_count == 3
+
+
+def test_recent_ids_are_pruned_to_the_window(store):
+    checkpoint = ProjectionCheckpoint(projector="count", session_id="s1", state={"n": 0})
+    for i in range(5):
+        store.append(_view(i, "c1", T0 + timedelta(seconds=10 * i)))
+
+    def apply(state, event):
+        state["n"] += 1
+
+    fold_new_events(store, checkpoint, apply, late_window_seconds=15)
+
+    assert sorted(checkpoint.recent_events) == ["e3", "e4"]
+    assert fold_new_events(store, checkpoint, apply, late_window_seconds=15) == 0
+
+
+def test_paging_walks_past_the_page_size(store):
+    checkpoint = ProjectionCheckpoint(projector="count", session_id="s1", state={"n": 0})
+    for i in range(7):
+        store.append(_view(i, "c1", T0 + timedelta(seconds=i)))
+
+    def apply(state, event):
+        state["n"] += 1
+
+    assert fold_new_events(store, checkpoint, apply, page_size=3) == 7
+    store.append(_view(7, "c1", T0 + timedelta(seconds=7)))
+    # The window re-reads more than a page of applied events before reaching the new one
+    assert fold_new_events(store, checkpoint, apply, page_size=3) == 1
+    assert checkpoint.state["n"] == 8
+
+
+def test_user_preferences_incremental_matches_full_projection(store):
+    for i in range(4):
+        store.append(_view(i, f"c{i % 2}", T0 + timedelta(seconds=i)))
+    incremental = UserPreferencesProjector(use_read_model=False)
+    incremental.store = store
+    incremental.update_preferences("s1")
+    store.append(_view(4, "c1", T0 + timedelta(seconds=4)))
+    result = incremental.update_preferences("s1")
+
+    checkpoint_cache.clear()
+    full = UserPreferencesProjector(use_read_model=False)
+    full.store = store
+    expected = full.update_preferences("s1")
+
+    assert result.model_dump(exclude={"last_updated"}) == expected.model_dump(exclude={"last_updated"})
+    assert result.preferred_concepts[0] == "c1"
+    assert result.interaction_style == "explorer"
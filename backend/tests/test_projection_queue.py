@@ -0,0 +1,119 @@
+"""Tests for the coalescing background projection queue."""
+import threading
+import time
+
+import pytest
+
+from events.background import ProjectionTaskQueue
+
+pytestmark = pytest.mark.unit
+
+
+class RecordingRunner:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = set()
+        self.overlaps = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, session_id, projector_name):
+        with self._lock:
+            if session_id in self.active:
+                self.overlaps += 1
+            self.active.add(session_id)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active.discard(session_id)
+            self.calls.append((session_id, projector_name))
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def _make(runner, **kwargs):
+        queue = ProjectionTaskQueue(runner=runner, **kwargs)
+        queue.start_worker()
+        queues.append(queue)
+        return queue
+
+    yield _make
+    for queue in queues:
+        queue.stop_worker(drain_timeout=1.0)
+
+
+def test_burst_on_one_session_is_coalesced(make_queue):
+    runner = RecordingRunner()
+    queue = make_queue(runner, workers=2, debounce_ms=50)
+
+    for _ in range(50):
+        queue.enqueue("s1")
+    time.sleep(0.3)
+
+    assert runner.calls == [("s1", "session_context")]
+    stats = queue.stats()
+    assert stats["enqueued"] == 50
+    assert stats["coalesced"] == 49
+    assert stats["processed"] == 1
+    assert stats["depth"] == 0
+    assert stats["latency"]["session_context"]["runs"] == 1
+
+
+def test_enqueue_during_projection_runs_again_without_overlap(make_queue):
+    runner = RecordingRunner(delay=0.1)
+    queue = make_queue(runner, workers=4, debounce_ms=0)
+
+    queue.enqueue("s1")
+    time.sleep(0.03)
+    queue.enqueue("s1")  # arrives while the first run is in progress
+    assert queue.drain(timeout=2.0)
+
+    assert runner.calls == [("s1", "session_context"), ("s1", "session_context")]
+    assert runner.overlaps == 0
+
+
+def test_sessions_run_in_parallel_and_projectors_in_order(make_queue):
+    runner = RecordingRunner(delay=0.1)
+    queue = make_queue(runner, workers=3, debounce_ms=0)
+
+    queue.enqueue("s1", "session_context")
+    queue.enqueue("s1", "user_preferences")
+    queue.enqueue("s2")
+    queue.enqueue("s3")
+    started = time.perf_counter()
+    assert queue.drain(timeout=2.0)
+    elapsed = time.perf_counter() - started
+
+    s1_calls = [p for s, p in runner.calls if s == "s1"]
+    assert s1_calls == ["session_context", "user_preferences"]
+    assert runner.overlaps == 0
+    assert elapsed < 0.35  # s2/s3 did not wait behind s1
+
+
+def test_stop_worker_drains_debounced_work(make_queue):
+    runner = RecordingRunner()
+    queue = make_queue(runner, debounce_ms=60_000, max_delay_ms=60_000)
+
+    queue.enqueue("s1")
+    queue.enqueue("s2")
+    assert queue.stats()["depth"] == 2
+    queue.stop_worker(drain_timeout=2.0)
+
+    assert sorted(runner.calls) == [("s1", "session_context"), ("s2", "session_context")]
+    assert queue.stats()["workers"] == 0
+
+
+def test_failures_are_counted_and_do_not_stop_the_worker(make_queue):
+    def runner(session_id, projector_name):
+        if session_id == "bad":
+            raise RuntimeError("boom")
+
+    queue = make_queue(runner, workers=1, debounce_ms=0)
+    queue.enqueue("bad")
+    queue.enqueue("good")
+    assert queue.drain(timeout=2.0)
+
+    stats = queue.stats()
+    assert stats["failed"] == 1
+    assert stats["processed"] == 1
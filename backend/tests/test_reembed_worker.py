@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from services_reembed_worker import ReembedWorker
+from vector_store_mmap import MmapVectorStore
+
+pytestmark = pytest.mark.unit
+
+
+def test_worker_batches_and_updates_store(tmp_path):
+    store = MmapVectorStore(tmp_path)
+    calls = []
+
+    def embed_many(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    worker = ReembedWorker(store, embed_many, concurrency=1, batch_size=10)
+    worker.enqueue([("n1", "h1", "a"), ("n2", "h2", "bb")])
+
+    assert worker.wait_idle(timeout=5)
+    assert store.lookup(["n1", "n2"], ["h1", "h2"])[1].tolist() == [True, True]
+    assert worker.stats()["completed"] == 2
+
+
+def test_pending_items_are_deduplicated_by_node_id(tmp_path):
+    store = MmapVectorStore(tmp_path)
+    gate = threading.Event()
+    seen = []
+
+    def embed_many(texts):
+        gate.wait(5)
+        seen.extend(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+    worker = ReembedWorker(store, embed_many, concurrency=1, batch_size=1)
+    worker.enqueue([("busy", "h", "first")])
+    worker.enqueue([("n1", "old", "old text")])
+    worker.enqueue([("n1", "new", "new text")])
+    gate.set()
+
+    assert worker.wait_idle(timeout=5)
+    assert seen == ["first", "new text"]
+    assert store.lookup(["n1"], ["new"])[1].tolist() == [True]
+    assert worker.stats()["deduplicated"] == 1
+
+
+def test_failed_batch_is_counted_and_dropped(tmp_path):
+    def embed_many(texts):
+        raise RuntimeError("rate limited")
+
+    worker = ReembedWorker(MmapVectorStore(tmp_path), embed_many, concurrency=1)
+    worker.enqueue([("n1", "h", "t")])
+
+    assert worker.wait_idle(timeout=5)
+    stats = worker.stats()
+    assert stats["failed"] == 1 and stats["pending"] == 0
+
+
+def test_rejected_input_fails_alone(tmp_path):
+    store = MmapVectorStore(tmp_path)
+
+    def embed_many(texts):
+        return [None if t == "too long" else [1.0, 0.0] for t in texts]
+
+    worker = ReembedWorker(store, embed_many, concurrency=1, batch_size=10)
+    worker.enqueue([("n1", "h", "a"), ("n2", "h", "too long"), ("n3", "h", "c")])
+
+    assert worker.wait_idle(timeout=5)
+    assert store.lookup(["n1", "n2", "n3"], ["h", "h", "h"])[1].tolist() == [True, False, True]
+    stats = worker.stats()
+    assert stats["completed"] == 2 and stats["failed"] == 1
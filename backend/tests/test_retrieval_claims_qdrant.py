@@ -0,0 +1,160 @@
+"""
+Tests for claim retrieval through Qdrant: hits are checked against Neo4j.
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+import services_retrieval_helpers
+import vector_store_qdrant
+from tests.mock_helpers import MockNeo4jRecord, MockNeo4jResult
+
+
+def _claim(claim_id, visible=True):
+    return MockNeo4jRecord({
+        "claim_id": claim_id,
+        "text": f"neo4j text of {claim_id}",
+        "confidence": 0.9,
+        "source_id": "src",
+        "source_span": None,
+        "chunk_id": f"chunk-{claim_id}",
+        "visible": visible,
+    })
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    calls = {"search_limit": None, "deleted": []}
+
+    def fake_search(**kwargs):
+        calls["search_limit"] = kwargs["limit"]
+        return [
+            {"claim_id": cid, "score": score, "metadata": {"text": f"stale payload of {cid}"}}
+            for cid, score in (("C1", 0.9), ("GONE", 0.8), ("OFF_BRANCH", 0.7), ("C2", 0.6), ("C3", 0.5))
+        ]
+
+    monkeypatch.setattr(vector_store_qdrant, "search_claims", fake_search)
+    monkeypatch.setattr(vector_store_qdrant, "delete_claims", lambda graph_id, ids: calls["deleted"].append((graph_id, ids)))
+    monkeypatch.setattr(services_retrieval_helpers, "resolve_graph_tenant_id", lambda session, graph_id: "t1")
+    return calls
+
+
+def test_qdrant_hits_are_filtered_and_shaped_by_neo4j(qdrant):
+    session = MagicMock()
+    session.run.return_value = MockNeo4jResult(
+        records=[_claim("C1"), _claim("OFF_BRANCH", visible=False), _claim("C2"), _claim("C3")]
+    )
+
+    claims = services_retrieval_helpers._search_claims_in_qdrant(session, "g1", "main", [0.1, 0.2], 2, None)
+
+    assert [c["claim_id"] for c in claims] == ["C1", "C2"]
+    assert claims[0]["text"] == "neo4j text of C1" and claims[0]["similarity"] == 0.9
+    assert qdrant["search_limit"] == 2 * services_retrieval_helpers.CLAIM_QDRANT_OVERFETCH
+    assert session.run.call_args.kwargs["claim_ids"] == ["C1", "GONE", "OFF_BRANCH", "C2", "C3"]
+    # Only claims missing from the graph are pruned; off-branch ones may be visible elsewhere
+    assert qdrant["deleted"] == [("g1", ["GONE"])]
+
+
+@pytest.fixture
+def claim_sources(monkeypatch):
+    state = {"backfilled": False}
+    monkeypatch.setattr(services_retrieval_helpers, "USE_QDRANT", True)
+    monkeypatch.setattr(services_retrieval_helpers, "ensure_graph_scoping_initialized", lambda session: None)
+    monkeypatch.setattr(services_retrieval_helpers, "embed_text", lambda text: [0.1, 0.2])
+    monkeypatch.setattr(
+        services_retrieval_helpers, "_claims_backfilled", lambda session, graph_id: state["backfilled"]
+    )
+    monkeypatch.setattr(
+        services_retrieval_helpers,
+        "_search_claims_in_qdrant",
+        lambda *args: [{"claim_id": "NEW", "similarity": 0.7}, {"claim_id": "BOTH", "similarity": 0.5}],
+    )
+    monkeypatch.setattr(
+        services_retrieval_helpers,
+        "_search_claims_in_neo4j",
+        lambda *args: [{"claim_id": "OLD", "similarity": 0.9}, {"claim_id": "BOTH", "similarity": 0.5}],
+    )
+    return state
+
+
+def test_claims_not_yet_backfilled_are_merged_from_neo4j(claim_sources):
+    claims = services_retrieval_helpers.retrieve_top_claims_by_query_embedding(MagicMock(), "g1", "main", "q", limit=5)
+
+    assert [c["claim_id"] for c in claims] == ["OLD", "NEW", "BOTH"]
+
+
+def test_backfilled_graph_uses_qdrant_only(claim_sources):
+    claim_sources["backfilled"] = True
+
+    claims = services_retrieval_helpers.retrieve_top_claims_by_query_embedding(MagicMock(), "g1", "main", "q", limit=5)
+
+    assert [c["claim_id"] for c in claims] == ["NEW", "BOTH"]
+
+
+def test_claim_backfill_pages_by_graph_and_claim_id(monkeypatch):
+    rows = [("g1", "c1"), ("g1", "c2"), ("g2", "c1"), ("g2", "c3")]
+    pages = []
+    session = MagicMock()
+
+    def run(query, **params):
+        if "claims_qdrant_backfilled_at" in query:
+            return MagicMock()
+        pages.append((params["after_graph_id"], params["after_claim_id"]))
+        after = (params["after_graph_id"], params["after_claim_id"])
+        page = [r for r in rows if r > after][: params["limit"]]
+        return [
+            MockNeo4jRecord({"graph_id": g, "claim_id": c, "tenant_id": "t1", "embedding": [0.1]})
+            for g, c in page
+        ]
+
+    session.run.side_effect = run
+    upserted = []
+    monkeypatch.setattr(vector_store_qdrant, "batch_upsert_claims", lambda points: upserted.extend(points))
+
+    migrated = vector_store_qdrant.migrate_claims_from_neo4j(session, batch_size=2)
+
+    assert migrated == 4
+    assert [(p["metadata"]["graph_id"], p["claim_id"]) for p in upserted] == rows
+    assert pages == [("", ""), ("g1", "c2"), ("g2", "c3")]
+
+
+def test_failed_ingestion_indexing_clears_the_backfill_marker(monkeypatch):
+    from services.lecture_ingestion import chunk_claims
+
+    def fail(points):
+        raise ConnectionError("qdrant down")
+
+    cleared = []
+    monkeypatch.setattr(chunk_claims, "USE_QDRANT", True)
+    monkeypatch.setattr(vector_store_qdrant, "batch_upsert_claims", fail)
+    monkeypatch.setattr(
+        vector_store_qdrant, "clear_claims_backfill_marker", lambda session, graph_id: cleared.append(graph_id)
+    )
+
+    indexed = chunk_claims.index_claims_in_qdrant(
+        MagicMock(), "g1", [{"claim_id": "c1", "embedding": [0.1], "metadata": {}}], tenant_id="t1"
+    )
+
+    assert indexed == 0
+    assert cleared == ["g1"]
+
+
+def test_backfill_marker_is_rechecked_after_its_ttl(monkeypatch):
+    now = [1000.0]
+    backfilled = [True]
+    session = MagicMock()
+    session.run.side_effect = lambda query, **params: MagicMock(
+        single=lambda: MockNeo4jRecord({"backfilled": backfilled[0]})
+    )
+    monkeypatch.setattr(services_retrieval_helpers.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(services_retrieval_helpers, "_claims_backfilled_graphs", {})
+
+    assert services_retrieval_helpers._claims_backfilled(session, "g1")
+    backfilled[0] = False
+    assert services_retrieval_helpers._claims_backfilled(session, "g1")
+
+    now[0] += services_retrieval_helpers.CLAIMS_BACKFILL_MARKER_TTL_SECONDS
+    assert not services_retrieval_helpers._claims_backfilled(session, "g1")
+    assert session.run.call_count == 2
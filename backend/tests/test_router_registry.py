@@ -0,0 +1,123 @@
+"""
+Tests for router_registry: the ROUTERS table and lazy router loading.
+"""
+import importlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from router_registry import ROUTERS, LazyRouterMiddleware, RouterLoader, RouterSpec
+
+pytestmark = pytest.mark.unit
+
+
+def _route_paths(app) -> set:
+    return {getattr(r, "path", None) for r in app.router.routes}
+
+
+def test_segments_cover_every_route():
+    """Lazy mode finds a route only through its declared segment."""
+    for spec in ROUTERS:
+        try:
+            module = importlib.import_module(spec.module)
+        except ImportError:
+            assert spec.optional, f"{spec.module} is required but cannot be imported"
+            continue
+        router = getattr(module, spec.attr)
+        for route in router.routes:
+            segment = route.path.lstrip("/").split("/", 1)[0]
+            assert segment in spec.segments, f"{spec.module}.{spec.attr} serves {route.path}"
+
+
+def test_lazy_loader_includes_only_requested_segment():
+    app = FastAPI()
+    loader = RouterLoader(app)
+    app.add_middleware(LazyRouterMiddleware, loader=loader)
+    client = TestClient(app)
+
+    client.get("/health")
+
+    loaded = [spec.module for spec, done in zip(loader.specs, loader._loaded) if done]
+    assert loaded == ["api_health"]
+    assert not loader.fully_loaded
+
+
+def test_openapi_loads_every_router_like_eager_mode():
+    eager = FastAPI()
+    RouterLoader(eager).load_all()
+
+    lazy = FastAPI()
+    loader = RouterLoader(lazy)
+    lazy.add_middleware(LazyRouterMiddleware, loader=loader)
+    response = TestClient(lazy).get("/openapi.json")
+
+    assert response.status_code == 200
+    assert loader.fully_loaded
+    assert _route_paths(lazy) == _route_paths(eager)
+
+
+def test_routers_sharing_a_segment_load_in_table_order():
+    app = FastAPI()
+    builtin = len(app.router.routes)
+    loader = RouterLoader(app)
+
+    loader.load_for_path("/ai/chat")
+
+    expected = [r.path for r in importlib.import_module("api_ai").router.routes]
+    expected += [r.path for r in importlib.import_module("api_retrieval").router.routes]
+    assert [r.path for r in app.router.routes[builtin:]] == expected
+    assert set(loader.stats()["load_ms"]) == {"api_ai", "api_retrieval"}
+
+
+def test_optional_router_import_error_is_skipped():
+    app = FastAPI()
+    loader = RouterLoader(app, [RouterSpec("module_that_does_not_exist", "router", ("x",), optional=True)])
+
+    loader.load_all()
+
+    assert loader.fully_loaded
+    assert "module_that_does_not_exist" in loader.stats()["skipped"]
+
+
+def test_required_router_import_error_propagates():
+    loader = RouterLoader(FastAPI(), [RouterSpec("module_that_does_not_exist", "router", ("x",))])
+
+    with pytest.raises(ImportError):
+        loader.load_all()
+    assert not loader.fully_loaded
+
+
+def test_middleware_imports_routers_off_the_event_loop(monkeypatch):
+    import asyncio
+    import threading
+
+    import router_registry
+
+    import_threads = []
+    real_import = importlib.import_module
+
+    def recording_import(name):
+        import_threads.append(threading.get_ident())
+        return real_import(name)
+
+    monkeypatch.setattr(router_registry.importlib, "import_module", recording_import)
+    loader = RouterLoader(FastAPI(), [RouterSpec("api_health", "router", ("health",))])
+    served = []
+
+    async def inner(scope, receive, send):
+        served.append(scope["path"])
+
+    middleware = LazyRouterMiddleware(inner, loader)
+
+    async def run():
+        scope = {"type": "http", "path": "/health"}
+        await middleware(scope, None, None)
+        await middleware(scope, None, None)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+
+    assert served == ["/health", "/health"]
+    assert len(import_threads) == 1 and import_threads[0] != loop_thread
+    assert not loader.needs_load("/health")
@@ -0,0 +1,128 @@
+import pytest
+
+import services_semantic_cache as semcache
+
+pytestmark = pytest.mark.unit
+
+
+class FakeRedis:
+    """Just enough of redis-py (bytes mode) for the semantic cache."""
+
+    def __init__(self):
+        self.kv, self.hashes, self.zsets = {}, {}, {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def setex(self, key, ttl, value):
+        self.kv[key] = value.encode() if isinstance(value, str) else value
+
+    def incr(self, key):
+        self.kv[key] = str(int(self.kv.get(key, 0)) + 1).encode()
+        return int(self.kv[key])
+
+    def expire(self, key, ttl):
+        return True
+
+    def delete(self, *keys):
+        for k in keys:
+            self.kv.pop(k, None)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field.encode()] = value
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for f in fields:
+            self.hashes.get(key, {}).pop(f.encode(), None)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update({k.encode(): v for k, v in mapping.items()})
+
+    def zrem(self, key, *members):
+        for m in members:
+            self.zsets.get(key, {}).pop(m.encode(), None)
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def zrange(self, key, start, end, withscores=False):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda kv: kv[1])
+        items = items[start:] if end == -1 else items[start:end + 1]
+        return items if withscores else [k for k, _ in items]
+
+
+class FakePipeline:
+    def __init__(self, r):
+        self.r, self.ops = r, []
+
+    def __getattr__(self, name):
+        return lambda *a, **kw: self.ops.append((name, a, kw))
+
+    def execute(self):
+        return [getattr(self.r, name)(*a, **kw) for name, a, kw in self.ops]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    r = FakeRedis()
+    monkeypatch.setattr(semcache, "_get_redis_client", lambda: r)
+    semcache._indexes.clear()
+    yield r
+    semcache._indexes.clear()
+
+
+def _lookup(embedding):
+    return semcache.find_similar(tenant_id="t", user_id="u", query="q", query_embedding=embedding)
+
+
+def test_hit_within_threshold_and_miss_outside(fake_redis):
+    semcache.store(tenant_id="t", user_id="u", question="what is x", answer="x is y", question_embedding=[1.0, 0.0])
+
+    hit = _lookup([0.99, 0.01])
+    assert hit["answer"] == "x is y" and hit["distance"] < 0.01
+    assert _lookup([0.0, 1.0]) is None
+
+
+def test_vectors_are_stored_as_binary_not_json(fake_redis):
+    entry_id = semcache.store(tenant_id="t", user_id="u", question="q", answer="a", question_embedding=[3.0, 4.0])
+
+    blob = fake_redis.hashes["semcache:t:u:vec"][entry_id.encode()]
+    assert len(blob) == 2 * 4
+    assert b"embedding" not in fake_redis.kv[f"semcache:t:u:entry:{entry_id}"]
+
+
+def test_other_worker_writes_are_picked_up_via_version(fake_redis):
+    semcache.store(tenant_id="t", user_id="u", question="q1", answer="a1", question_embedding=[1.0, 0.0])
+    assert _lookup([0.0, 1.0]) is None
+
+    semcache._indexes.clear()  # simulate a different process holding no index
+    semcache.store(tenant_id="t", user_id="u", question="q2", answer="a2", question_embedding=[0.0, 1.0])
+    semcache._indexes.clear()
+
+    assert _lookup([0.0, 1.0])["answer"] == "a2"
+    assert _lookup([1.0, 0.0])["answer"] == "a1"
+
+
+def test_expired_entries_are_evicted(fake_redis):
+    semcache.store(tenant_id="t", user_id="u", question="q", answer="a", question_embedding=[1.0, 0.0], ttl_seconds=-1)
+
+    assert _lookup([1.0, 0.0]) is None
+    assert fake_redis.zcard("semcache:t:u:expiry") == 0
+    assert fake_redis.hgetall("semcache:t:u:vec") == {}
+
+
+def test_max_entries_evicts_oldest(fake_redis):
+    for i in range(3):
+        semcache.store(
+            tenant_id="t", user_id="u", question=f"q{i}", answer=f"a{i}",
+            question_embedding=[1.0, float(i)], ttl_seconds=100 + i, max_entries=2,
+        )
+
+    assert fake_redis.zcard("semcache:t:u:expiry") == 2
+    assert _lookup([1.0, 0.0]) is None  # q0 (the oldest) was evicted
@@ -0,0 +1,123 @@
+import pytest
+import numpy as np
+
+pytestmark = pytest.mark.unit
+
+from services_similarity import (
+    EmbeddingMatrix,
+    cosine_scores,
+    cosine_similarity,
+    mmr_select_indices,
+    pack_embeddings,
+    top_k_indices,
+)
+
+
+def test_pack_embeddings_flags_unusable_rows():
+    matrix, valid = pack_embeddings([[3.0, 4.0], None, [], [1.0, 2.0, 3.0], [0.0, 0.0]])
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape == (5, 2)
+    assert valid.tolist() == [True, False, False, False, False]
+    assert np.allclose(matrix[0], [0.6, 0.8])
+    assert not matrix[1:].any()
+
+
+def test_cosine_scores_match_scalar_helper():
+    rng = np.random.default_rng(7)
+    vecs = rng.normal(size=(20, 16)).tolist()
+    query = rng.normal(size=16).tolist()
+
+    matrix, _ = pack_embeddings(vecs)
+    scores = cosine_scores(query, matrix)
+
+    expected = [cosine_similarity(query, v) for v in vecs]
+    assert np.allclose(scores, expected, atol=1e-5)
+
+
+def test_cosine_similarity_handles_mismatch_and_zero():
+    assert cosine_similarity([1.0, 0.0], [1.0, 0.0, 0.0]) == 0.0
+    assert cosine_similarity([0.0, 0.0], [1.0, 0.0]) == 0.0
+    assert cosine_similarity(None, [1.0]) == 0.0
+    assert cosine_similarity([1.0, 1.0], [2.0, 2.0]) == pytest.approx(1.0)
+
+
+def test_top_k_indices_orders_best_first_with_stable_ties():
+    scores = np.array([0.1, 0.9, 0.5, 0.9, 0.3], dtype=np.float32)
+
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 2]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 4, 0]
+    assert top_k_indices(scores, 0).tolist() == []
+
+    valid = np.array([True, False, True, True, True])
+    assert top_k_indices(scores, 2, valid=valid).tolist() == [3, 2]
+
+
+def test_embedding_matrix_top_k_skips_invalid_and_applies_min_score():
+    index = EmbeddingMatrix(
+        ["a", "b", "c", "d"],
+        [[1.0, 0.0], [0.0, 1.0], None, [0.7, 0.7]],
+    )
+
+    hits = index.top_k([1.0, 0.0], k=3)
+    assert [item for item, _ in hits] == ["a", "d", "b"]
+    assert hits[0][1] == pytest.approx(1.0)
+
+    hits = index.top_k([1.0, 0.0], k=3, min_score=0.5)
+    assert [item for item, _ in hits] == ["a", "d"]
+
+
+def test_embedding_matrix_rejects_length_mismatch():
+    with pytest.raises(ValueError):
+        EmbeddingMatrix(["a"], [[1.0], [2.0]])
+
+
+def _naive_mmr(vecs, rel, k, lambda_mult, mask):
+    remaining = [i for i in range(len(rel)) if mask[i]]
+    first = max(remaining, key=lambda i: rel[i])
+    selected = [first]
+    remaining.remove(first)
+    while remaining and len(selected) < k:
+        def score(i):
+            max_sim = max(0.0, max(cosine_similarity(vecs[i], vecs[j]) for j in selected))
+            return lambda_mult * rel[i] - (1 - lambda_mult) * max_sim
+        best = max(remaining, key=lambda i: (score(i), -i))
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def test_mmr_select_indices_matches_naive_mmr():
+    rng = np.random.default_rng(3)
+    vecs = rng.normal(size=(60, 12)).tolist()
+    rel = rng.random(60).tolist()
+    mask = np.ones(60, dtype=bool)
+    mask[[4, 9]] = False
+
+    matrix, _ = pack_embeddings(vecs)
+    got = mmr_select_indices(matrix, rel, 15, lambda_mult=0.7, candidate_mask=mask)
+
+    assert got == _naive_mmr(vecs, rel, 15, 0.7, mask)
+    assert 4 not in got and 9 not in got
+
+
+def test_mmr_select_indices_accepts_precomputed_pairwise_block():
+    rng = np.random.default_rng(5)
+    matrix, _ = pack_embeddings(rng.normal(size=(40, 8)).tolist())
+    rel = rng.random(40)
+
+    from_matrix = mmr_select_indices(matrix, rel, 10)
+    from_block = mmr_select_indices(None, rel, 10, pairwise_sims=matrix @ matrix.T)
+
+    assert from_matrix == from_block
+
+    with pytest.raises(ValueError):
+        mmr_select_indices(None, rel, 10, pairwise_sims=np.zeros((3, 3)))
+
+
+def test_mmr_select_indices_prefers_diverse_items():
+    # Two near-duplicates with top relevance and one orthogonal item.
+    matrix, _ = pack_embeddings([[1.0, 0.0], [1.0, 0.01], [0.0, 1.0]])
+    rel = [0.9, 0.89, 0.6]
+
+    assert mmr_select_indices(matrix, rel, 2, lambda_mult=0.5) == [0, 2]
@@ -1,9 +1,13 @@
+import asyncio
+import threading
+import time
+
 import pytest
 import numpy as np
 
 pytestmark = pytest.mark.unit
 
-from services_vad import EnergySpeechDetector, VadConfig, VadUtteranceSegmenter
+from services_vad import EnergySpeechDetector, SileroSpeechDetector, VadConfig, VadUtteranceSegmenter, _InferenceQueue
 
 
 def _pcm_frame(*, frame_samples: int, amp: int) -> bytes:
@@ -157,3 +161,212 @@ def test_vad_segmenter_ignores_short_noise_for_speech_start():
     for _ in range(12):
         seg.process_pcm16(silence)
         assert seg.pop_speech_start_sample() is None
+
+
+def _chunks(data: bytes, sizes):
+    pos = 0
+    for size in sizes:
+        yield data[pos : pos + size]
+        pos += size
+    if pos < len(data):
+        yield data[pos:]
+
+
+def _stream_with_pre_roll():
+    rng = np.random.default_rng(7)
+    parts = []
+    for amp, n in [(0, 4000), (6000, 6400), (0, 12000), (6000, 3200), (0, 9000)]:
+        parts.append((rng.standard_normal(n) * amp).clip(-32768, 32767).astype(np.int16))
+    return np.concatenate(parts).tobytes()
+
+
+def test_vad_segmenter_results_do_not_depend_on_chunking():
+    cfg = VadConfig(frame_ms=20, speech_threshold=0.5, end_silence_ms=200, min_speech_ms=100, pre_roll_ms=100)
+    data = _stream_with_pre_roll()
+
+    whole = VadUtteranceSegmenter(EnergySpeechDetector(), cfg).process_pcm16(data)
+    chunked_seg = VadUtteranceSegmenter(EnergySpeechDetector(), cfg)
+    chunked = []
+    for chunk in _chunks(data, [1, 2, 639, 641, 4095, 3, 8192] * 4):
+        chunked += chunked_seg.process_pcm16(chunk)
+
+    assert len(whole) == 2
+    assert chunked == whole
+
+
+def test_vad_segmenter_pre_roll_is_the_audio_before_onset():
+    cfg = VadConfig(frame_ms=20, speech_threshold=0.5, end_silence_ms=200, min_speech_ms=100, pre_roll_ms=100)
+    data = _stream_with_pre_roll()
+
+    utt = VadUtteranceSegmenter(EnergySpeechDetector(), cfg).process_pcm16(data)[0]
+
+    pre_roll_samples = 5 * 320
+    first_byte = (utt.start_sample - pre_roll_samples) * 2
+    assert utt.pcm16 == data[first_byte : first_byte + len(utt.pcm16)]
+
+
+def test_energy_batch_matches_per_frame_scores():
+    rng = np.random.default_rng(3)
+    frames = (rng.standard_normal((16, 480)) * 2000).astype(np.int16)
+    detector = EnergySpeechDetector()
+
+    batch = detector.speech_probabilities(frames, sample_rate_hz=16000)
+    single = [detector.speech_probability(f.tobytes(), sample_rate_hz=16000) for f in frames]
+
+    assert np.allclose(batch, single, atol=1e-6)
+
+
+class _RecurrentStep:
+    """Stand-in for a Silero step: the output depends on the window, its context and the state."""
+
+    def __init__(self):
+        self.batch_sizes = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, x, state, sample_rate_hz):
+        self.gate.wait(2)
+        self.batch_sizes.append(x.shape[0])
+        prob = 0.5 * state[0, :, 0] + np.abs(x).mean(axis=1) + x[:, 0]
+        new_state = state.copy()
+        new_state[0, :, 0] = prob
+        return prob, new_state
+
+
+def _sequential(step, windows, state):
+    probs = []
+    for row in windows:
+        out, state = step(row.reshape(1, -1), state, 16000)
+        probs.append(out[0])
+    return np.array(probs, dtype=np.float32), state
+
+
+def test_inference_queue_batches_sessions_step_by_step():
+    step = _RecurrentStep()
+    inference = _InferenceQueue(step)
+    rng = np.random.default_rng(5)
+    requests = [(rng.standard_normal((n, 576)).astype(np.float32), np.full((2, 1, 128), n, dtype=np.float32)) for n in (1, 1, 2, 3)]
+    results = [None] * len(requests)
+
+    def call(i):
+        results[i] = inference.infer(*requests[i], 16000)
+
+    step.gate.clear()
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(requests))]
+    threads[0].start()
+    time.sleep(0.05)  # first request is in the model; the rest queue up behind it
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.05)
+    step.gate.set()
+    for t in threads:
+        t.join()
+
+    # One forward pass per step, sessions stacked on the batch dimension
+    assert step.batch_sizes == [1, 3, 2, 1]
+    for (windows, state), (probs, new_state) in zip(requests, results):
+        expected_probs, expected_state = _sequential(_RecurrentStep(), windows, state)
+        assert np.allclose(probs, expected_probs)
+        assert np.allclose(new_state, expected_state)
+
+
+def test_inference_queue_propagates_model_errors():
+    def broken(x, state, sample_rate_hz):
+        raise RuntimeError("bad model")
+
+    with pytest.raises(RuntimeError):
+        _InferenceQueue(broken).infer(np.zeros((2, 576), dtype=np.float32), np.zeros((2, 1, 128), dtype=np.float32), 16000)
+
+
+class _WorkerCrash(BaseException):
+    """Escapes the per-step error handling and kills the worker thread."""
+
+
+def test_inference_queue_surfaces_a_dead_worker():
+    def crashing(x, state, sample_rate_hz):
+        raise _WorkerCrash("segfault-ish")
+
+    inference = _InferenceQueue(crashing)
+    windows, state = np.zeros((2, 576), dtype=np.float32), np.zeros((2, 1, 128), dtype=np.float32)
+
+    with pytest.raises(RuntimeError, match="worker failed"):
+        inference.infer(windows, state, 16000)
+    with pytest.raises(RuntimeError, match="worker failed"):
+        inference.infer(windows, state, 16000)  # later calls fail fast instead of hanging
+
+
+def test_inference_queue_times_out():
+    step = _RecurrentStep()
+    step.gate.clear()
+    inference = _InferenceQueue(step, timeout_s=0.05)
+
+    with pytest.raises(TimeoutError):
+        inference.infer(np.zeros((1, 576), dtype=np.float32), np.zeros((2, 1, 128), dtype=np.float32), 16000)
+    step.gate.set()
+
+
+def _silero_detectors(n):
+    inference = _InferenceQueue(_RecurrentStep())
+    return [SileroSpeechDetector(model_path="unused", inference=inference) for _ in range(n)]
+
+
+def _reference_frame_probs(samples, frame_samples):
+    """Whole stream cut into 512-sample windows (64 samples of context) and scored in order."""
+    audio = np.concatenate([np.zeros(64, dtype=np.float32), samples.astype(np.float32) / 32768.0])
+    n_windows = (audio.size - 64) // 512
+    windows = np.stack([audio[j * 512 : j * 512 + 576] for j in range(n_windows)])
+    probs, _ = _sequential(_RecurrentStep(), windows, np.zeros((2, 1, 128), dtype=np.float32))
+    ends = frame_samples * np.arange(1, samples.size // frame_samples + 1)
+    return np.concatenate([[0.0], probs])[ends // 512]
+
+
+def test_silero_detector_keeps_stream_state_across_calls():
+    rng = np.random.default_rng(7)
+    samples = (rng.standard_normal(480 * 40) * 3000).astype(np.int16)
+    frames = samples.reshape(-1, 480)
+    whole, chunked = _silero_detectors(2)
+
+    at_once = whole.speech_probabilities(frames, sample_rate_hz=16000)
+    pieces = np.concatenate([chunked.speech_probabilities(frames[i : i + n], sample_rate_hz=16000) for i, n in ((0, 3), (3, 1), (4, 17), (21, 19))])
+
+    assert np.allclose(at_once, _reference_frame_probs(samples, 480), atol=1e-5)
+    assert np.allclose(pieces, at_once, atol=1e-5)
+
+
+def test_silero_sessions_batched_together_keep_their_own_state():
+    rng = np.random.default_rng(11)
+    streams = [(rng.standard_normal(480 * 24) * amp).astype(np.int16) for amp in (200, 3000, 8000)]
+    detectors = _silero_detectors(len(streams))
+    results = [[] for _ in streams]
+
+    def feed(i):
+        frames = streams[i].reshape(-1, 480)
+        for pos in range(0, len(frames), 4):
+            results[i].append(detectors[i].speech_probabilities(frames[pos : pos + 4], sample_rate_hz=16000))
+
+    threads = [threading.Thread(target=feed, args=(i,)) for i in range(len(streams))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for samples, probs in zip(streams, results):
+        assert np.allclose(np.concatenate(probs), _reference_frame_probs(samples, 480), atol=1e-5)
+
+
+def test_aprocess_pcm16_with_blocking_detector_matches_sync():
+    class _Blocking(EnergySpeechDetector):
+        blocking = True
+
+    cfg = VadConfig(frame_ms=20, speech_threshold=0.5, end_silence_ms=200, min_speech_ms=100, pre_roll_ms=100)
+    data = _stream_with_pre_roll()
+    expected = VadUtteranceSegmenter(EnergySpeechDetector(), cfg).process_pcm16(data)
+
+    async def run():
+        seg = VadUtteranceSegmenter(_Blocking(), cfg)
+        out = []
+        for chunk in _chunks(data, [4096] * 20):
+            out += await seg.aprocess_pcm16(chunk)
+        return out
+
+    assert asyncio.run(run()) == expected
@@ -0,0 +1,144 @@
+"""
+Tests for the streaming TTS stage in services_tts: SpeechSegmenter and TtsPipeline.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from services_tts import SpeechSegmenter, TtsPipeline
+
+
+def _feed_all(segmenter, deltas):
+    out = []
+    for delta in deltas:
+        out.extend(segmenter.feed(delta))
+    return out + segmenter.flush()
+
+
+def test_segmenter_starts_on_first_clause():
+    segmenter = SpeechSegmenter(first_clause_min_chars=20)
+
+    first = segmenter.feed("Photosynthesis, in short, turns light into ")
+
+    assert first == ["Photosynthesis, in short,"]
+    # Later segments wait for a full sentence
+    assert segmenter.feed("sugar, using water") == []
+    assert segmenter.feed(" and CO2. Next") == ["turns light into sugar, using water and CO2."]
+    assert segmenter.flush() == ["Next"]
+
+
+def test_segmenter_does_not_cut_decimals_or_short_sentences():
+    segmenter = SpeechSegmenter(first_clause_min_chars=1000)
+
+    segments = _feed_all(segmenter, ["Yes. Pi is about 3.", "14 and that is ", "enough. Done"])
+
+    assert segments == ["Yes. Pi is about 3.14 and that is enough.", "Done"]
+
+
+def test_segmenter_wraps_text_without_boundaries():
+    segmenter = SpeechSegmenter(max_chars=20)
+
+    segments = _feed_all(segmenter, ["alpha beta gamma delta epsilon zeta"])
+
+    assert all(len(s) <= 20 for s in segments)
+    assert " ".join(segments) == "alpha beta gamma delta epsilon zeta"
+
+
+def _pipeline(delays, delivered, **kwargs):
+    def synthesize(text, **_):
+        time.sleep(delays.get(text, 0))
+        return text.encode()
+
+    async def deliver(seq, text, audio):
+        delivered.append((seq, audio))
+
+    return TtsPipeline(deliver=deliver, synthesize=synthesize, **kwargs)
+
+
+def test_pipeline_delivers_in_seq_order_when_synthesis_finishes_out_of_order():
+    delivered = []
+
+    async def run():
+        tts = _pipeline({"one": 0.1, "two": 0.0, "three": 0.05}, delivered)
+        for text in ("one", "two", "three"):
+            await tts.submit(text)
+        await tts.drain()
+        return tts
+
+    tts = asyncio.run(run())
+
+    assert delivered == [(1, b"one"), (2, b"two"), (3, b"three")]
+    metrics = tts.segment_metrics()
+    assert [m["seq"] for m in metrics] == [1, 2, 3]
+    assert all(m["sent_at_ms"] is not None and m["synth_ms"] is not None for m in metrics)
+    assert tts.first_audio_ms == metrics[0]["sent_at_ms"]
+
+
+def test_pipeline_synthesizes_ahead_while_sending():
+    delivered = []
+
+    async def run():
+        tts = _pipeline({"a": 0.1, "b": 0.1, "c": 0.1}, delivered, lookahead=2)
+        started = time.perf_counter()
+        for text in ("a", "b", "c"):
+            await tts.submit(text)
+        await tts.drain()
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+
+    assert len(delivered) == 3
+    assert elapsed < 0.25  # serial synthesis would take 0.3s
+
+
+def test_pipeline_bounds_lookahead():
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    def synthesize(text, **_):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return b"x"
+
+    async def deliver(seq, text, audio):
+        await asyncio.sleep(0.02)
+
+    async def run():
+        tts = TtsPipeline(deliver=deliver, synthesize=synthesize, lookahead=1)
+        for i in range(6):
+            await tts.submit(f"segment {i}")
+        await tts.drain()
+
+    asyncio.run(run())
+
+    assert peak[0] <= 2  # one being delivered + one ahead
+
+
+def test_cancel_stops_delivery_and_unblocks_submit():
+    delivered = []
+
+    async def run():
+        tts = _pipeline({"first": 0.2, "second": 0.2, "third": 0.2}, delivered, lookahead=1)
+        await tts.submit("first")
+        await tts.submit("second")
+        blocked = asyncio.ensure_future(tts.submit("third"))
+        await asyncio.sleep(0.05)
+        tts.cancel()
+        assert await asyncio.wait_for(blocked, 1) is None
+        await tts.drain()
+        return tts
+
+    tts = asyncio.run(run())
+
+    assert delivered == []
+    assert tts.cancelled
+    assert asyncio.run(tts.submit("late")) is None
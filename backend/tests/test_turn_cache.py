@@ -0,0 +1,118 @@
+"""
+Tests for services_turn_cache: turn-scoped sharing of retrieval results.
+"""
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+import services_graphrag
+import services_search
+from services_memory_orchestrator import ContextTier, _fetch_lecture_context, run_context_tiers
+from services_turn_cache import RetrievalTurn, retrieval_turn, turn_memo
+
+
+def test_outside_a_turn_every_call_computes():
+    calls = []
+
+    for _ in range(2):
+        turn_memo("graphrag", "q", lambda: calls.append(1))
+
+    assert len(calls) == 2
+
+
+def test_turn_computes_each_key_once_and_counts_hits():
+    calls = []
+
+    with retrieval_turn() as turn:
+        a = turn_memo("embedding", "q1", lambda: calls.append("q1") or [1.0])
+        b = turn_memo("embedding", "q1", lambda: calls.append("q1") or [2.0])
+        turn_memo("embedding", "q2", lambda: calls.append("q2") or [3.0])
+
+    assert a is b
+    assert calls == ["q1", "q2"]
+    assert turn.stats() == {"embedding": {"hits": 1, "misses": 2}}
+
+
+def test_concurrent_callers_wait_for_the_first():
+    calls = []
+    release = threading.Event()
+    turn = RetrievalTurn()
+
+    def compute():
+        calls.append(1)
+        release.wait(2)
+        return "ctx"
+
+    results = []
+
+    def worker():
+        with retrieval_turn(turn):
+            results.append(turn_memo("graphrag", "q", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["ctx"] * 4
+    assert turn.stats()["graphrag"] == {"hits": 3, "misses": 1}
+
+
+def test_failures_are_not_shared():
+    turn = RetrievalTurn()
+    with retrieval_turn(turn):
+        with pytest.raises(RuntimeError):
+            turn_memo("graphrag", "q", lambda: (_ for _ in ()).throw(RuntimeError("down")))
+        assert turn_memo("graphrag", "q", lambda: "ok") == "ok"
+
+
+def test_lecture_tier_and_direct_call_share_one_graphrag_run(monkeypatch):
+    calls = []
+
+    def fake_retrieve(session, graph_id, branch_id, question, community_k, claims_per_comm, strictness):
+        calls.append((graph_id, branch_id, question, community_k))
+        return {"context_text": f"context for {question}"}
+
+    monkeypatch.setattr(services_graphrag, "_retrieve_graphrag_context", fake_retrieve)
+
+    with retrieval_turn() as turn:
+        tiers = run_context_tiers([
+            ContextTier("lecture context", lambda: _fetch_lecture_context("g1", "what is ATP", "b1", 5, None)),
+        ])
+        direct = services_graphrag.retrieve_graphrag_context(
+            session=None, graph_id="g1", branch_id="b1", question="what is ATP", community_k=5
+        )
+
+    assert tiers.results["lecture context"] == "context for what is ATP"
+    assert direct["context_text"] == "context for what is ATP"
+    assert calls == [("g1", "b1", "what is ATP", 5)]
+    assert turn.stats()["graphrag"] == {"hits": 1, "misses": 1}
+
+
+def test_one_graphrag_retrieval_reuses_the_question_embedding(monkeypatch):
+    """The voice turn's only GraphRAG retrieval still reports hits: its steps share one embedding."""
+    embedded = []
+
+    class EmptyIndex:
+        def search(self, embedding, limit):
+            return []
+
+    monkeypatch.setattr(services_graphrag, "ensure_graph_scoping_initialized", lambda session: None)
+    monkeypatch.setattr(services_graphrag, "get_community_index", lambda session, graph_id: EmptyIndex())
+    monkeypatch.setattr(services_search.model_router, "embed", lambda text: embedded.append(text) or [1.0])
+
+    with retrieval_turn() as turn:
+        services_graphrag.retrieve_graphrag_context(
+            session=None, graph_id="g1", branch_id="b1", question="what is ATP", community_k=5
+        )
+
+    assert embedded == ["what is ATP"]
+    assert turn.stats()["embedding"] == {"hits": 1, "misses": 1}
+    assert turn.stats()["graphrag"] == {"hits": 0, "misses": 1}
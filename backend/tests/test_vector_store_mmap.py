@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pytest
+
+from vector_store_mmap import MmapVectorStore, import_legacy_json_cache
+
+pytestmark = pytest.mark.unit
+
+
+def test_append_and_reload_from_disk(tmp_path):
+    store = MmapVectorStore(tmp_path)
+    store.put_many([("n1", "h1", [3.0, 4.0]), ("n2", "h2", [0.0, 2.0])])
+
+    reopened = MmapVectorStore(tmp_path)
+    rows, fresh = reopened.lookup(["n1", "n2", "n3"], ["h1", "changed", "h3"])
+
+    assert rows.tolist()[2] == -1
+    assert fresh.tolist() == [True, False, False]
+    np.testing.assert_allclose(reopened.get("n1"), [0.6, 0.8], rtol=1e-6)
+    np.testing.assert_allclose(reopened.scores([0.0, 1.0], rows), [0.8, 1.0, 0.0], rtol=1e-6)
+
+
+def test_update_appends_instead_of_rewriting(tmp_path):
+    store = MmapVectorStore(tmp_path, compact_min_dead_rows=100)
+    store.put("n1", "h1", [1.0, 0.0])
+    size_before = store.vectors_path.stat().st_size
+
+    store.put("n1", "h2", [0.0, 1.0])
+
+    assert store.vectors_path.stat().st_size == 2 * size_before
+    assert store.get("n1", "h1") is None
+    np.testing.assert_allclose(store.get("n1", "h2"), [0.0, 1.0])
+    assert store.stats()["tombstones"] == 1
+
+
+def test_tombstone_and_compaction(tmp_path):
+    store = MmapVectorStore(tmp_path, compact_min_dead_rows=100)
+    store.put_many([(f"n{i}", "h", [float(i + 1), 1.0]) for i in range(4)])
+    store.tombstone("n0")
+    store.tombstone("n2")
+
+    assert "n0" not in store
+    assert store.compact() == 2
+
+    reopened = MmapVectorStore(tmp_path)
+    assert reopened.stats()["rows"] == 2
+    np.testing.assert_allclose(
+        reopened.get("n3"), np.array([4.0, 1.0]) / np.linalg.norm([4.0, 1.0]), rtol=1e-6
+    )
+
+
+def test_automatic_compaction_when_tombstones_dominate(tmp_path):
+    store = MmapVectorStore(tmp_path, compact_min_dead_rows=2)
+    store.put_many([("a", "h", [1.0, 0.0]), ("b", "h", [0.0, 1.0]), ("c", "h", [1.0, 1.0])])
+    store.tombstone("a")
+    store.tombstone("b")
+
+    assert store.stats()["rows"] == 1
+
+
+def test_reopen_with_short_vector_file_starts_from_an_empty_file(tmp_path):
+    store = MmapVectorStore(tmp_path)
+    store.put_many([("a", "h", [1.0, 0.0]), ("b", "h", [0.0, 1.0]), ("c", "h", [1.0, 1.0])])
+    # Crash after compact() replaced the vector file but before it rewrote the index
+    with open(store.vectors_path, "r+b") as f:
+        f.truncate(2 * 4 * 2)
+
+    reopened = MmapVectorStore(tmp_path)
+    assert len(reopened) == 0
+    reopened.put_many([("x", "h", [5.0, 5.0])])
+
+    np.testing.assert_allclose(reopened.get("x"), [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
+    assert reopened.vectors_path.stat().st_size == 4 * 2
+    np.testing.assert_allclose(MmapVectorStore(tmp_path).get("x"), [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
+
+
+def test_imports_legacy_json_cache(tmp_path):
+    legacy = tmp_path / "embeddings_cache.json"
+    legacy.write_text(json.dumps({"n1": {"embedding": [1.0, 0.0], "text_hash": "h1"}}))
+    store = MmapVectorStore(tmp_path / "store")
+
+    assert import_legacy_json_cache(store, legacy) == 1
+    assert import_legacy_json_cache(store, legacy) == 0
+    assert store.lookup(["n1"], ["h1"])[1].tolist() == [True]
@@ -0,0 +1,265 @@
+"""
+Memory-mapped local vector store (fallback when Qdrant is disabled).
+
+Layout of a store directory:
+  vectors.f32   - fixed-width rows of `dim` float32 values (unit-normalised), append-only
+  index.json    - small sidecar: {"dim", "rows", "entries": {node_id: [row, text_hash]}}
+
+- Cold start maps vectors.f32 instead of parsing JSON floats.
+- Updates append new rows and rewrite only the sidecar; the vector file is never rewritten.
+- Replaced/removed rows become tombstones (no index entry points at them).
+- compact() rewrites live rows into a fresh file once tombstones dominate.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services_similarity import to_unit_vector
+
+logger = logging.getLogger("brain_web")
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.json"
+
+# Compact automatically when at least this many dead rows exist and they outnumber live rows.
+MMAP_STORE_COMPACT_MIN_DEAD_ROWS = int(os.getenv("MMAP_STORE_COMPACT_MIN_DEAD_ROWS", "1024"))
+
+
+class MmapVectorStore:
+    """node_id -> unit float32 vector, with text-hash staleness checks. Thread-safe."""
+
+    def __init__(self, directory: Path, compact_min_dead_rows: int = MMAP_STORE_COMPACT_MIN_DEAD_ROWS):
+        self.directory = Path(directory)
+        self.compact_min_dead_rows = int(compact_min_dead_rows)
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._entries: Dict[str, Tuple[int, str]] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._load_index()
+
+    # ---- Paths / persistence ----
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.directory / VECTORS_FILE
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def _load_index(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+            self._dim = data.get("dim")
+            self._rows = int(data.get("rows", 0))
+            self._entries = {k: (int(v[0]), v[1]) for k, v in data.get("entries", {}).items()}
+        except Exception as e:
+            logger.warning(f"[vector_store_mmap] Failed to load index {self.index_path}: {e}")
+            self._reset()
+            return
+        # Rows appended after the last index write (crash mid-update) are unreferenced; drop them.
+        if self._dim and self.vectors_path.exists():
+            on_disk = self.vectors_path.stat().st_size // (4 * self._dim)
+            if on_disk < self._rows:
+                logger.warning("[vector_store_mmap] Vector file shorter than index; resetting store")
+                self._reset()
+            elif on_disk > self._rows:
+                with open(self.vectors_path, "r+b") as f:
+                    f.truncate(self._rows * 4 * self._dim)
+
+    def _reset(self) -> None:
+        """Start empty. Old vector bytes are dropped so new rows are numbered from the file start."""
+        self._dim, self._rows, self._entries = None, 0, {}
+        self._mmap = None
+        self.vectors_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+    def _write_index(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "dim": self._dim,
+                    "rows": self._rows,
+                    "entries": {k: [row, h] for k, (row, h) in self._entries.items()},
+                },
+                f,
+            )
+        os.replace(tmp, self.index_path)
+
+    def _matrix(self) -> np.ndarray:
+        if self._rows == 0 or not self._dim:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+        if self._mmap is None or self._mmap.shape[0] != self._rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self._rows, self._dim))
+        return self._mmap
+
+    # ---- Reads ----
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._entries
+
+    def get(self, node_id: str, text_hash: Optional[str] = None) -> Optional[np.ndarray]:
+        """Stored unit vector, or None if absent (or stale when text_hash is given)."""
+        with self._lock:
+            entry = self._entries.get(node_id)
+            if entry is None or (text_hash is not None and entry[1] != text_hash):
+                return None
+            return np.array(self._matrix()[entry[0]])
+
+    def lookup(
+        self, node_ids: Sequence[str], text_hashes: Optional[Sequence[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row numbers for node_ids (-1 where absent) and a `fresh` mask that is False where
+        the stored text_hash differs from the given one.
+        """
+        rows = np.full(len(node_ids), -1, dtype=np.int64)
+        fresh = np.zeros(len(node_ids), dtype=bool)
+        with self._lock:
+            for i, node_id in enumerate(node_ids):
+                entry = self._entries.get(node_id)
+                if entry is None:
+                    continue
+                rows[i] = entry[0]
+                fresh[i] = text_hashes is None or entry[1] == text_hashes[i]
+        return rows, fresh
+
+    def scores(self, query: Any, rows: np.ndarray) -> np.ndarray:
+        """
+        Cosine scores of a query against the given rows (0.0 where row == -1).
+
+        One matvec over the mapped file, then a gather; the OS page cache keeps hot rows resident.
+        """
+        out = np.zeros(len(rows), dtype=np.float32)
+        with self._lock:
+            matrix = self._matrix()
+            if matrix.shape[0] == 0:
+                return out
+            q = to_unit_vector(query, dim=self._dim)
+            if q is None:
+                return out
+            present = rows >= 0
+            if present.any():
+                out[present] = (matrix @ q)[rows[present]]
+        return out
+
+    # ---- Writes ----
+
+    def put_many(self, items: Iterable[Tuple[str, str, Any]]) -> int:
+        """
+        Append (node_id, text_hash, vector) rows; existing rows for those ids become tombstones.
+
+        Returns the number of rows written.
+        """
+        with self._lock:
+            new_rows: List[np.ndarray] = []
+            new_entries: Dict[str, Tuple[int, str]] = {}
+            for node_id, text_hash, vec in items:
+                if self._dim is None and vec is not None and len(vec) > 0:
+                    self._dim = len(vec)
+                unit = to_unit_vector(vec, dim=self._dim)
+                if unit is None:
+                    continue
+                new_entries[node_id] = (self._rows + len(new_rows), text_hash)
+                new_rows.append(unit)
+            if not new_rows:
+                return 0
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.vstack(new_rows).astype(np.float32, copy=False).tobytes())
+            self._rows += len(new_rows)
+            self._entries.update(new_entries)
+            self._mmap = None
+            self._write_index()
+            self._maybe_compact()
+            return len(new_rows)
+
+    def put(self, node_id: str, text_hash: str, vector: Any) -> bool:
+        return self.put_many([(node_id, text_hash, vector)]) == 1
+
+    def tombstone(self, node_id: str) -> bool:
+        """Forget node_id; its row stays in the file until the next compaction."""
+        with self._lock:
+            if self._entries.pop(node_id, None) is None:
+                return False
+            self._write_index()
+            self._maybe_compact()
+            return True
+
+    def dead_rows(self) -> int:
+        return self._rows - len(self._entries)
+
+    def _maybe_compact(self) -> None:
+        dead = self.dead_rows()
+        if dead >= self.compact_min_dead_rows and dead > len(self._entries):
+            self.compact()
+
+    def compact(self) -> int:
+        """Rewrite only live rows into a fresh vector file. Returns rows reclaimed."""
+        with self._lock:
+            dead = self.dead_rows()
+            if dead == 0:
+                return 0
+            ids = list(self._entries)
+            old_rows = np.array([self._entries[i][0] for i in ids], dtype=np.int64)
+            live = np.array(self._matrix()[old_rows]) if len(ids) else np.zeros((0, self._dim or 0), np.float32)
+            tmp = self.vectors_path.with_suffix(".f32.tmp")
+            with open(tmp, "wb") as f:
+                f.write(live.astype(np.float32, copy=False).tobytes())
+            self._mmap = None
+            os.replace(tmp, self.vectors_path)
+            self._entries = {node_id: (row, self._entries[node_id][1]) for row, node_id in enumerate(ids)}
+            self._rows = len(ids)
+            self._write_index()
+            logger.info(f"[vector_store_mmap] Compacted {self.directory}: reclaimed {dead} rows")
+            return dead
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "live": len(self._entries),
+                "rows": self._rows,
+                "tombstones": self.dead_rows(),
+                "dim": self._dim,
+                "bytes": self._rows * 4 * (self._dim or 0),
+            }
+
+
+def import_legacy_json_cache(store: MmapVectorStore, json_path: Path) -> int:
+    """One-time import of the old embeddings_cache.json ({node_id: {embedding, text_hash}})."""
+    if len(store) > 0 or not Path(json_path).exists():
+        return 0
+    try:
+        with open(json_path, "r") as f:
+            legacy = json.load(f)
+    except Exception as e:
+        logger.warning(f"[vector_store_mmap] Failed to read legacy cache {json_path}: {e}")
+        return 0
+    imported = store.put_many(
+        (node_id, entry.get("text_hash", ""), entry.get("embedding"))
+        for node_id, entry in legacy.items()
+        if isinstance(entry, dict)
+    )
+    logger.info(f"[vector_store_mmap] Imported {imported} embeddings from {json_path}")
+    return imported
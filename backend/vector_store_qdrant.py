@@ -4,6 +4,9 @@ Qdrant Vector Store Integration
 This module provides a vector database interface for storing and searching concept embeddings.
 Replaces the in-memory + JSON file approach with a proper vector database.
 
+It also hosts the claims collection, so claim retrieval can run a filtered ANN
+top-k instead of pulling Claim.embedding properties over Bolt.
+
 Setup:
     docker run -p 6333:6333 -p 6334:6334 qdrant/qdrant
 
@@ -11,18 +14,26 @@ Environment Variables:
     QDRANT_HOST: Qdrant host (default: localhost)
     QDRANT_PORT: Qdrant port (default: 6333)
     QDRANT_COLLECTION: Collection name (default: concepts)
+    QDRANT_CLAIMS_COLLECTION: Claims collection name (default: claims)
 """
 from typing import List, Dict, Optional, Any
 import os
+from datetime import datetime
+import uuid
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
-    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, MatchAny,
+    PayloadSchemaType, PointIdsList, FilterSelector,
 )
 
 # Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
 QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "concepts")
+QDRANT_CLAIMS_COLLECTION = os.getenv("QDRANT_CLAIMS_COLLECTION", "claims")
+
+# Payload fields we filter claims on; indexed so filtered search stays fast.
+CLAIM_PAYLOAD_INDEX_FIELDS = ("tenant_id", "graph_id", "on_branches", "ingestion_run_id", "status")
 
 # Global client (lazy initialization)
 _client: Optional[QdrantClient] = None
@@ -172,7 +183,9 @@ def batch_upsert(
     Batch upsert multiple concept embeddings.
     
     Args:
-        points: List of dicts with keys: concept_id, embedding, metadata
+        points: List of dicts with keys: concept_id, embedding, metadata.
+            A point may carry "text" instead of "embedding"; all such points are
+            embedded together in one batched call before the upsert.
     """
     if not points:
         return
@@ -183,6 +196,19 @@ def batch_upsert(
     if missing_tenant:
         raise ValueError(f"Qdrant batch_upsert points missing metadata.tenant_id: {missing_tenant[:5]}")
     
+    to_embed = [p for p in points if not p.get("embedding")]
+    if to_embed:
+        from services_embedding_batcher import embed_many
+
+        for p, vec in zip(to_embed, embed_many([p["text"] for p in to_embed])):
+            p["embedding"] = vec
+        skipped = [p.get("concept_id") for p in to_embed if p["embedding"] is None]
+        if skipped:
+            print(f"[Qdrant] WARNING: Skipping {len(skipped)} points that could not be embedded: {skipped[:5]}")
+            points = [p for p in points if p["embedding"] is not None]
+            if not points:
+                return
+
     client = get_client()
     
     # Determine dimension from first point
@@ -223,16 +249,315 @@ def get_collection_info() -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+# ========== Claims collection ==========
+
+_claims_collection_ready = False
+
+
+def claim_point_id(graph_id: str, claim_id: str) -> str:
+    """
+    Deterministic Qdrant point ID for a claim.
+
+    Qdrant only accepts UUIDs/unsigned ints as IDs, so we derive a UUIDv5 from
+    (graph_id, claim_id); the raw claim_id is kept in the payload.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"brainweb:claim:{graph_id}:{claim_id}"))
+
+
+def ensure_claims_collection(dimension: int = 1536) -> None:
+    """
+    Ensure the claims collection and its payload indexes exist.
+
+    Only checked once per process; later calls are free.
+    """
+    global _claims_collection_ready
+    if _claims_collection_ready:
+        return
+
+    client = get_client()
+    collection_names = [c.name for c in client.get_collections().collections]
+    if QDRANT_CLAIMS_COLLECTION not in collection_names:
+        client.create_collection(
+            collection_name=QDRANT_CLAIMS_COLLECTION,
+            vectors_config=VectorParams(
+                size=dimension,
+                distance=Distance.COSINE
+            )
+        )
+        for field_name in CLAIM_PAYLOAD_INDEX_FIELDS:
+            client.create_payload_index(
+                collection_name=QDRANT_CLAIMS_COLLECTION,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
+        print(f"[Qdrant] Created collection '{QDRANT_CLAIMS_COLLECTION}' with dimension {dimension}")
+    _claims_collection_ready = True
+
+
+def batch_upsert_claims(points: List[Dict[str, Any]]) -> None:
+    """
+    Batch upsert claim embeddings.
+    
+    Args:
+        points: List of dicts with keys: claim_id, embedding, metadata.
+            metadata must include tenant_id and graph_id; on_branches, ingestion_run_id,
+            status, confidence, text, source_id, source_span and chunk_id are stored
+            for filtering and to avoid a Neo4j round trip on retrieval.
+    """
+    points = [p for p in points if p.get("embedding")]
+    if not points:
+        return
+
+    # --- Bouncer Layer (Hard Multi-tenant Isolation) ---
+    missing = [
+        p.get("claim_id") for p in points
+        if not (p.get("metadata") or {}).get("tenant_id") or not (p.get("metadata") or {}).get("graph_id")
+    ]
+    if missing:
+        raise ValueError(f"Qdrant batch_upsert_claims points missing metadata.tenant_id/graph_id: {missing[:5]}")
+
+    client = get_client()
+    ensure_claims_collection(dimension=len(points[0]["embedding"]))
+
+    qdrant_points = [
+        PointStruct(
+            id=claim_point_id(p["metadata"]["graph_id"], p["claim_id"]),
+            vector=p["embedding"],
+            payload={**p["metadata"], "claim_id": p["claim_id"]},
+        )
+        for p in points
+    ]
+
+    client.upsert(
+        collection_name=QDRANT_CLAIMS_COLLECTION,
+        points=qdrant_points
+    )
+
+
+def search_claims(
+    query_embedding: List[float],
+    tenant_id: str,
+    graph_id: str,
+    branch_id: Optional[str] = None,
+    ingestion_run_ids: Optional[List[str]] = None,
+    statuses: Optional[List[str]] = None,
+    limit: int = 30,
+    min_score: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    ANN top-k over claim embeddings.
+    
+    Args:
+        query_embedding: Query embedding vector
+        tenant_id: REQUIRED tenant filter (security boundary)
+        graph_id: REQUIRED graph filter
+        branch_id: Optional branch filter (matches claims whose on_branches contains it)
+        ingestion_run_ids: Optional ingestion run filter
+        statuses: Optional verification status filter (e.g. ["VERIFIED"])
+        limit: Maximum number of results
+        min_score: Minimum similarity score
+    
+    Returns:
+        List of results with claim_id, score, and metadata
+    """
+    if not tenant_id:
+        raise ValueError("tenant_id is required for Qdrant search_claims()")
+    if not graph_id:
+        raise ValueError("graph_id is required for Qdrant search_claims()")
+
+    client = get_client()
+    ensure_claims_collection(dimension=len(query_embedding))
+
+    conditions = [
+        FieldCondition(key="tenant_id", match=MatchValue(value=tenant_id)),
+        FieldCondition(key="graph_id", match=MatchValue(value=graph_id)),
+    ]
+    if branch_id:
+        conditions.append(FieldCondition(key="on_branches", match=MatchValue(value=branch_id)))
+    if ingestion_run_ids:
+        conditions.append(FieldCondition(key="ingestion_run_id", match=MatchAny(any=list(ingestion_run_ids))))
+    if statuses:
+        conditions.append(FieldCondition(key="status", match=MatchAny(any=list(statuses))))
+
+    results = client.search(
+        collection_name=QDRANT_CLAIMS_COLLECTION,
+        query_vector=query_embedding,
+        limit=limit,
+        query_filter=Filter(must=conditions),
+        score_threshold=min_score
+    )
+
+    return [
+        {
+            "claim_id": (result.payload or {}).get("claim_id"),
+            "score": result.score,
+            "metadata": result.payload or {},
+        }
+        for result in results
+    ]
+
+
+def delete_claims(graph_id: str, claim_ids: List[str]) -> None:
+    """Delete claim embeddings from Qdrant."""
+    if not claim_ids:
+        return
+    client = get_client()
+    client.delete(
+        collection_name=QDRANT_CLAIMS_COLLECTION,
+        points_selector=PointIdsList(points=[claim_point_id(graph_id, cid) for cid in claim_ids])
+    )
+
+
+def delete_graph_claims(graph_id: str) -> None:
+    """Delete every claim embedding of a graph from Qdrant."""
+    client = get_client()
+    client.delete(
+        collection_name=QDRANT_CLAIMS_COLLECTION,
+        points_selector=FilterSelector(
+            filter=Filter(must=[FieldCondition(key="graph_id", match=MatchValue(value=graph_id))])
+        ),
+    )
+
+
+def migrate_claims_from_neo4j(
+    session,
+    graph_id: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    batch_size: int = 200,
+) -> int:
+    """
+    Backfill claim embeddings from Neo4j into the claims collection.
+
+    Pages through Claim nodes (ordered by graph_id, claim_id, since claim ids are only
+    unique within a graph) so large graphs never load every embedding at once. Every
+    graph whose claims were all copied gets GraphSpace.claims_qdrant_backfilled_at;
+    until then claim retrieval merges the Neo4j scan into Qdrant's hits.
+    
+    Args:
+        session: Neo4j session
+        graph_id: Optional graph to restrict the backfill to
+        tenant_id: Fallback tenant_id for graphs missing GraphSpace.tenant_id
+        batch_size: Number of claims per page / upsert
+
+    Returns:
+        Number of claims migrated
+    """
+    query = """
+    MATCH (claim:Claim)-[:BELONGS_TO]->(g:GraphSpace)
+    WHERE claim.embedding IS NOT NULL
+      AND ($graph_id IS NULL OR g.graph_id = $graph_id)
+      AND (g.graph_id > $after_graph_id OR (g.graph_id = $after_graph_id AND claim.claim_id > $after_claim_id))
+    OPTIONAL MATCH (claim)-[:SUPPORTED_BY]->(chunk:SourceChunk {graph_id: g.graph_id})
+    WITH claim, g, head(collect(chunk.chunk_id)) AS chunk_id
+    RETURN claim.claim_id AS claim_id,
+           claim.embedding AS embedding,
+           claim.text AS text,
+           COALESCE(claim.confidence, 0.5) AS confidence,
+           claim.source_id AS source_id,
+           claim.source_span AS source_span,
+           claim.ingestion_run_id AS ingestion_run_id,
+           COALESCE(claim.status, 'PROPOSED') AS status,
+           COALESCE(claim.on_branches, []) AS on_branches,
+           g.graph_id AS graph_id,
+           g.tenant_id AS tenant_id,
+           chunk_id
+    ORDER BY g.graph_id, claim.claim_id
+    LIMIT $limit
+    """
+
+    migrated = 0
+    skipped = 0
+    incomplete_graph_ids = set()
+    after_graph_id, after_claim_id = "", ""
+    while True:
+        records = list(session.run(
+            query,
+            graph_id=graph_id,
+            after_graph_id=after_graph_id,
+            after_claim_id=after_claim_id,
+            limit=batch_size,
+        ))
+        if not records:
+            break
+        after_graph_id, after_claim_id = records[-1]["graph_id"], records[-1]["claim_id"]
+
+        points = []
+        for record in records:
+            record_tenant_id = record.get("tenant_id") or tenant_id
+            if not record_tenant_id:
+                skipped += 1
+                incomplete_graph_ids.add(record["graph_id"])
+                continue
+            points.append({
+                "claim_id": record["claim_id"],
+                "embedding": record["embedding"],
+                "metadata": {
+                    "tenant_id": record_tenant_id,
+                    "graph_id": record["graph_id"],
+                    "on_branches": record.get("on_branches") or [],
+                    "ingestion_run_id": record.get("ingestion_run_id"),
+                    "status": record.get("status"),
+                    "confidence": record.get("confidence"),
+                    "text": record.get("text"),
+                    "source_id": record.get("source_id"),
+                    "source_span": record.get("source_span"),
+                    "chunk_id": record.get("chunk_id"),
+                },
+            })
+
+        batch_upsert_claims(points)
+        migrated += len(points)
+        print(f"[Migration] Migrated {migrated} claims (skipped {skipped} without tenant_id)...")
+
+    # Graphs with skipped claims keep the Neo4j merge so those claims stay retrievable
+    session.run(
+        """
+        MATCH (g:GraphSpace)
+        WHERE ($graph_id IS NULL OR g.graph_id = $graph_id)
+          AND NOT g.graph_id IN $incomplete_graph_ids
+        SET g.claims_qdrant_backfilled_at = $now
+        """,
+        graph_id=graph_id,
+        incomplete_graph_ids=sorted(incomplete_graph_ids),
+        now=datetime.utcnow().isoformat() + "Z",
+    ).consume()
+
+    print(f"[Migration] Complete! Migrated {migrated} claims to Qdrant")
+    return migrated
+
+
+def clear_claims_backfill_marker(session, graph_id: str) -> None:
+    """
+    Drop GraphSpace.claims_qdrant_backfilled_at after claims of the graph failed to reach
+    Qdrant, so claim retrieval merges the Neo4j scan again until the next backfill.
+    """
+    session.run(
+        """
+        MATCH (g:GraphSpace {graph_id: $graph_id})
+        REMOVE g.claims_qdrant_backfilled_at
+        """,
+        graph_id=graph_id,
+    ).consume()
+
+
 # Migration helper
-def migrate_from_neo4j(session, batch_size: int = 100, tenant_id: Optional[str] = None):
+def migrate_from_neo4j(
+    session,
+    batch_size: int = 100,
+    tenant_id: Optional[str] = None,
+    embed_missing: bool = False,
+):
     """
     Migrate embeddings from Neo4j to Qdrant.
     
     Args:
         session: Neo4j session
         batch_size: Number of concepts to process per batch
+        embed_missing: Embed concepts that have no stored embedding (batched per
+            upsert) instead of skipping them
     """
     from services_graph import get_all_concepts
+    from services_search_qdrant import _build_concept_text
     
     print("[Migration] Fetching all concepts from Neo4j...")
     all_concepts = get_all_concepts(session, tenant_id=tenant_id)
@@ -242,12 +567,13 @@ def migrate_from_neo4j(session, batch_size: int = 100, tenant_id: Optional[str]
     migrated = 0
     
     for concept in all_concepts:
-        if not concept.embedding:
+        if not concept.embedding and not embed_missing:
             continue
         
         points.append({
             "concept_id": concept.node_id,
             "embedding": concept.embedding,
+            "text": _build_concept_text(concept),
             "metadata": {
                 "name": concept.name,
                 "domain": concept.domain or "",